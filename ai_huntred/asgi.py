@@ -58,8 +58,32 @@ class SecureHeadersMiddleware:
 
         await self.app(scope, receive, send_wrapper)
 
+# Django no implementa el protocolo lifespan; se atiende aquí para cerrar
+# los pools HTTP salientes de los canales al apagar el worker
+class LifespanMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'lifespan':
+            await self.app(scope, receive, send)
+            return
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                try:
+                    from app.ats.integrations.channels.http_clients import outbound_http
+                    await outbound_http.aclose()
+                except Exception as e:
+                    logger.warning(f"Error cerrando clientes HTTP salientes: {e}")
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
 # Obtener la aplicación ASGI
 application = get_asgi_application()
 
 # Aplicar middleware de seguridad
 application = SecureHeadersMiddleware(application)
+application = LifespanMiddleware(application)
@@ -11,7 +11,7 @@ import django
 import logging
 from celery import Celery
 from celery.schedules import crontab
-from celery.signals import worker_ready
+from celery.signals import worker_init, worker_process_shutdown, worker_ready
 from django.db.utils import OperationalError
 from django.apps import apps
 
@@ -69,6 +69,14 @@ SCHEDULE_DICT = {
         'task': 'app.tasks.execute_ml_and_scraping',
         'schedule': crontab(hour=7, minute=30),
     },
+    'Precalentar paneles del dashboard': {
+        'task': 'app.tasks.warm_dashboard_panels_task',
+        'schedule': crontab(minute='*/5', hour='7-20', day_of_week='1-5'),
+    },
+    'Reconstruir rollups del dashboard': {
+        'task': 'app.tasks.backfill_dashboard_rollups_task',
+        'schedule': crontab(hour=1, minute=15),
+    },
     'Ejecutar ML y Scraping (mediodía)': {
         'task': 'app.tasks.execute_ml_and_scraping',
         'schedule': crontab(hour=12, minute=15),
@@ -193,5 +201,23 @@ def setup_periodic_tasks(sender, **kwargs):
             logger.error(f"❌ Error registering periodic tasks: {str(e)}")
             break
 
+@worker_init.connect
+def preload_nlp_models(sender=None, **kwargs):
+    """Precarga los modelos NLP seguros para fork antes de crear el pool prefork."""
+    try:
+        from app.ats.chatbot.nlp.model_registry import preload_for_fork
+        preload_for_fork()
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudieron precargar los modelos NLP: {e}")
+
+@worker_process_shutdown.connect
+def close_outbound_http(sender=None, **kwargs):
+    """Cierra los pools HTTP salientes de los canales al terminar cada proceso del pool."""
+    try:
+        from app.ats.integrations.channels.http_clients import outbound_http
+        outbound_http.close()
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudieron cerrar los clientes HTTP salientes: {e}")
+
 # Configuración de tareas
 app.autodiscover_tasks()
\ No newline at end of file
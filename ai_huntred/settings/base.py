@@ -405,6 +405,52 @@ INSTAGRAM_CONFIG = {
     'WEBHOOK_TOKEN': '',  # Obtenido dinámicamente
 }
 
+# Cola de mensajes entrantes de los webhooks de chat
+# (ver app/ats/integrations/channels/inbound_queue.py y process_inbound_messages)
+INBOUND_QUEUE = {
+    'ENABLED': env.bool('INBOUND_QUEUE_ENABLED', default=True),
+    'PARTITIONS': env.int('INBOUND_QUEUE_PARTITIONS', default=16),
+    'DEDUP_TTL': 3 * 24 * 3600,  # Meta reintenta durante días
+    'MAX_STREAM_LENGTH': 100000,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 1.0,
+}
+
+# Límites de envío por canal, compartidos por todos los procesos vía Redis
+# (ver app/ats/chatbot/components/rate_limiter.py). Se combinan con DEFAULT_LIMITS:
+# {'whatsapp': {'account': {'rate': 80, 'burst': 80}, 'recipient': {...}}}
+OUTBOUND_RATE_LIMITS = {}
+
+# Pools HTTP salientes por proveedor (ver app/ats/integrations/channels/http_clients.py).
+# Se combinan con PROVIDERS: {'telegram': {'timeout': 30.0, 'max_concurrency': 20}}
+OUTBOUND_HTTP = {}
+
+# Deduplicación de candidatos (ver app/ats/utils/dedup.py): NAME_THRESHOLD,
+# PHONE_NAME_THRESHOLD, DEFAULT_REGION, CHUNK_SIZE, MAX_BLOCK_SIZE
+DEDUP = {
+    'DEFAULT_REGION': 'MX',
+}
+
+# Directorio de teléfonos para enrutar WhatsApp entre ATS y nómina
+# (ver app/core/messaging/phone_directory.py): TTL y NEGATIVE_TTL en segundos
+PHONE_DIRECTORY = {
+    'TTL': 24 * 3600,
+    'NEGATIVE_TTL': 300,
+}
+
+# Ejecutor de módulos AURA (ver app/ml/aura/executor.py): procesos para los
+# análisis de CPU, módulos concurrentes por análisis y TTL de los resultados
+AURA_EXECUTOR = {
+    'PROCESS_WORKERS': 2,
+    'MAX_CONCURRENCY': 8,
+    'MEMO_TTL': 3600,
+}
+
+# Buzones del scraper de correos (ver app/ats/utils/scraping/imap_sync.py):
+# [{'host': ..., 'account': ..., 'password': ..., 'folders': ['INBOX', ...]}].
+# Vacío = la cuenta de EMAIL_ACCOUNT con las carpetas de EMAIL_SCRAPER_FOLDERS
+EMAIL_SCRAPER_MAILBOXES = []
+
 # Crear directorios necesarios
 for directory in [LOG_DIR, STATIC_ROOT, MEDIA_ROOT, ML_MODELS_DIR]:
     directory.mkdir(parents=True, exist_ok=True) 
\ No newline at end of file
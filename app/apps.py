@@ -1,4 +1,5 @@
 # /home/pablo/app/apps.py
+import importlib
 import logging
 import sys
 import os
@@ -7,6 +8,15 @@ from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Señales que mantienen índices, cachés y rollups precalculados; se cargan por separado
+# para que un fallo en los signals centralizados no las deje sin registrar.
+INDEX_SIGNAL_MODULES = (
+    'app.ats.chatbot.signals',
+    'app.ml.core.features.signals',
+    'app.ats.dashboard.signals',
+    'app.core.messaging.signals',
+)
+
 class AppConfig(DjangoAppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
@@ -30,6 +40,12 @@ class AppConfig(DjangoAppConfig):
         except Exception as e:
             logger.warning(f"Error importing signals: {str(e)}")
 
+        for module_name in INDEX_SIGNAL_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                logger.warning(f"Error importing {module_name}: {str(e)}")
+
         # Registrar handlers solo en entornos de ejecución
         if 'runserver' in sys.argv or 'gunicorn' in os.environ.get('SERVER_SOFTWARE', ''):
             try:
@@ -3,80 +3,274 @@
 # Módulo para gestionar límites de tasa en canales de comunicación.
 # Previene sobrecargas de APIs externas y cumple con términos de servicio.
 # Optimizado para bajo uso de CPU, escalabilidad, y robustez frente a fallos.
+#
+# Los límites se aplican con GCRA (token bucket sin temporizadores) en Redis:
+# un script Lua evalúa y reserva de forma atómica las cubetas del canal, de la
+# cuenta emisora (número de WhatsApp de la BU, bot, página) y del destinatario,
+# así que todos los procesos (Gunicorn, Celery, consumidores) comparten el
+# mismo presupuesto. ``acquire()`` duerme exactamente hasta su turno, sin
+# sondeo. Si Redis no responde se usa la misma lógica en memoria del proceso.
 
-from collections import defaultdict
-from datetime import datetime, timedelta
 import asyncio
 import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from app.ats.utils.tiered_cache import tiered_cache
 
 logger = logging.getLogger('chatbot')
 
+KEY_PREFIX = 'rl'
+SCOPES = ('channel', 'account', 'recipient')
+
+# Límites por canal y alcance: ``rate`` mensajes por segundo y ``burst``
+# mensajes que pueden salir de golpe. Se combinan con OUTBOUND_RATE_LIMITS.
+DEFAULT_LIMITS = {
+    'whatsapp': {
+        'account': {'rate': 80, 'burst': 80},         # Cloud API: 80 msg/s por número
+        'recipient': {'rate': 1 / 6, 'burst': 10},    # Límite por par emisor-destinatario
+    },
+    'telegram': {
+        'account': {'rate': 30, 'burst': 30},         # 30 msg/s por bot
+        'recipient': {'rate': 1, 'burst': 3},         # ~1 msg/s por chat
+    },
+    'messenger': {
+        'account': {'rate': 40, 'burst': 40},
+        'recipient': {'rate': 1, 'burst': 5},
+    },
+    'instagram': {
+        'account': {'rate': 20, 'burst': 20},
+        'recipient': {'rate': 1, 'burst': 5},
+    },
+    'slack': {
+        'account': {'rate': 1, 'burst': 5},           # chat.postMessage: ~1 msg/s por canal
+    },
+    'x': {
+        'account': {'rate': 0.5, 'burst': 5},
+    },
+}
+
+# KEYS: cubetas. ARGV[1]: espera máxima en ms (-1 = sin límite); luego, por
+# cubeta, intervalo de emisión en ms y ráfaga. Devuelve {concedido, espera_ms}.
+GCRA_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local max_wait = tonumber(ARGV[1])
+local start = now
+local tats = {}
+for i, key in ipairs(KEYS) do
+  local interval = tonumber(ARGV[i * 2])
+  local burst = tonumber(ARGV[i * 2 + 1])
+  local stored = redis.call('GET', key)
+  local tat = stored and tonumber(stored) or now
+  if tat < now then tat = now end
+  tats[i] = tat
+  local earliest = tat - interval * (burst - 1)
+  if earliest > start then start = earliest end
+end
+local wait = start - now
+if max_wait >= 0 and wait > max_wait then
+  return {0, math.ceil(wait)}
+end
+for i, key in ipairs(KEYS) do
+  local interval = tonumber(ARGV[i * 2])
+  local tat = tats[i]
+  if start > tat then tat = start end
+  tat = tat + interval
+  redis.call('SET', key, tostring(tat), 'PX', math.ceil(tat - now) + 1000)
+end
+return {1, math.ceil(wait)}
+"""
+
+
+def _configured_limits() -> Dict[str, Dict]:
+    try:
+        return getattr(settings, 'OUTBOUND_RATE_LIMITS', None) or {}
+    except Exception:
+        # Settings aún sin configurar (import fuera de Django)
+        return {}
+
+
+class LocalBuckets:
+    """GCRA en memoria del proceso; respaldo cuando Redis no está disponible."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, buckets: List[Tuple[str, float, float]], max_wait_ms: float) -> Tuple[bool, float]:
+        with self._lock:
+            now = self.clock() * 1000
+            start = now
+            tats = []
+            for key, interval, burst in buckets:
+                tat = max(self._tats.get(key, now), now)
+                tats.append(tat)
+                start = max(start, tat - interval * (burst - 1))
+            wait = start - now
+            if max_wait_ms >= 0 and wait > max_wait_ms:
+                return False, wait
+            for (key, interval, _), tat in zip(buckets, tats):
+                self._tats[key] = max(tat, start) + interval
+            if len(self._tats) > 10000:
+                # Olvidar cubetas ya vencidas (destinatarios inactivos)
+                self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+            return True, wait
+
+
+_local_buckets = LocalBuckets()
+
+
 class RateLimiter:
     """Limitador de tasa para canales de comunicación con prevención de ráfagas y recuperación."""
 
-    def __init__(self, requests_per_minute=None):
+    def __init__(self, requests_per_minute=None, limits: Optional[Dict[str, Dict]] = None,
+                 redis_client: Any = None, local: Optional[LocalBuckets] = None):
         """
         Inicializa el limitador de tasa.
-        
+
         Args:
-            requests_per_minute (dict, optional): Límites por canal. Anula configuración predeterminada.
+            requests_per_minute (dict|int, optional): Límite global por canal en
+                mensajes por minuto (compatibilidad con la versión anterior).
+            limits (dict, optional): Límites por canal y alcance, con el mismo
+                formato que ``DEFAULT_LIMITS``.
+            redis_client: Cliente Redis; por defecto el de ``tiered_cache``.
+            local: Cubetas en memoria para el respaldo (por defecto, compartidas
+                por todo el proceso).
         """
-        self.limits = defaultdict(int)
-        self.last_reset = defaultdict(lambda: datetime.now())
-        
-        # Límites predeterminados por canal (mensajes por minuto)
-        self.channel_limits = {
-            'whatsapp': 20,
-            'telegram': 30,
-            'messenger': 30,
-            'slack': 50,
-            'instagram': 20
-        }
-        
-        # Actualizar con límites personalizados si se proporcionan
+        self.channel_limits = {channel: dict(scopes) for channel, scopes in DEFAULT_LIMITS.items()}
+        for channel, scopes in _configured_limits().items():
+            self.channel_limits.setdefault(channel, {}).update(scopes)
+        for channel, scopes in (limits or {}).items():
+            self.channel_limits.setdefault(channel, {}).update(scopes)
+
         if requests_per_minute:
-            if isinstance(requests_per_minute, dict):
-                self.channel_limits.update(requests_per_minute)
-            elif isinstance(requests_per_minute, int):
-                for channel in self.channel_limits:
-                    self.channel_limits[channel] = requests_per_minute
-    
-    async def check_limit(self, channel: str) -> bool:
+            if isinstance(requests_per_minute, int):
+                requests_per_minute = {channel: requests_per_minute for channel in self.channel_limits}
+            for channel, per_minute in requests_per_minute.items():
+                self.channel_limits.setdefault(channel, {})['channel'] = {
+                    'rate': per_minute / 60, 'burst': per_minute
+                }
+
+        self._redis = redis_client
+        self.local = local or _local_buckets
+        self._script = None
+        self._last_fallback_warning = 0.0
+
+    @property
+    def redis(self):
+        return self._redis if self._redis is not None else tiered_cache.redis
+
+    def _buckets(self, channel: str, account: Optional[str], recipient: Optional[str]) -> List[Tuple[str, float, float]]:
+        """Cubetas aplicables: (clave, intervalo de emisión en ms, ráfaga)."""
+        keys = {
+            'channel': f"{KEY_PREFIX}:{channel}",
+            # Sin cuenta conocida se comparte una cubeta por canal (conservador)
+            'account': f"{KEY_PREFIX}:{channel}:acct:{account or 'default'}",
+            'recipient': f"{KEY_PREFIX}:{channel}:rcpt:{account or '-'}:{recipient}" if recipient else None,
+        }
+        buckets = []
+        for scope in SCOPES:
+            limit = self.channel_limits.get(channel, {}).get(scope)
+            if limit and keys[scope] and limit.get('rate'):
+                buckets.append((keys[scope], 1000 / limit['rate'], max(1, limit.get('burst', 1))))
+        return buckets
+
+    def _reserve_remote(self, redis, buckets, max_wait_ms) -> Tuple[bool, float]:
+        if self._script is None:
+            self._script = redis.register_script(GCRA_SCRIPT)
+        args = [max_wait_ms]
+        for _, interval, burst in buckets:
+            args.extend([interval, burst])
+        granted, wait = self._script(keys=[key for key, _, _ in buckets], args=args)
+        return bool(granted), float(wait)
+
+    def reserve(self, channel: str, account: Optional[str] = None, recipient: Optional[str] = None,
+                max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Reserva el siguiente turno de envío.
+
+        Devuelve los segundos que hay que esperar antes de enviar, o ``None``
+        si la espera superaría ``max_wait`` (en ese caso no se reserva nada).
         """
-        Verifica si podemos enviar otro mensaje en este canal.
-        
+        buckets = self._buckets(channel, account, recipient)
+        if not buckets:
+            return 0.0
+        max_wait_ms = -1 if max_wait is None else max_wait * 1000
+
+        redis = self.redis
+        granted = wait = None
+        if redis is not None:
+            try:
+                granted, wait = self._reserve_remote(redis, buckets, max_wait_ms)
+            except Exception as e:
+                now = time.monotonic()
+                if now - self._last_fallback_warning > 60:
+                    self._last_fallback_warning = now
+                    logger.warning(f"Rate limiter sin Redis, usando límites locales: {e}")
+        if granted is None:
+            granted, wait = self.local.reserve(buckets, max_wait_ms)
+
+        if not granted:
+            logger.warning(f"Rate limit exceeded for {channel} ({account or '-'}/{recipient or '-'}): espera {wait:.0f} ms")
+            return None
+        return wait / 1000
+
+    async def acquire(self, channel: str, account: Optional[str] = None, recipient: Optional[str] = None,
+                      max_wait: Optional[float] = None) -> bool:
+        """
+        Espera hasta poder enviar un mensaje.
+
         Args:
-            channel (str): El canal a verificar (whatsapp, telegram, etc.)
-            
+            channel: Canal (whatsapp, telegram, ...)
+            account: Cuenta emisora (phone_number_id, bot, página)
+            recipient: Destinatario
+            max_wait: Espera máxima en segundos; si se supera devuelve False sin esperar
+
         Returns:
-            bool: True si está dentro del límite, False si excede
+            bool: True cuando ya se puede enviar
         """
-        if channel not in self.channel_limits:
-            return True
-
-        limit = self.channel_limits[channel]
-        now = datetime.now()
-        
-        # Resetear contadores después de un minuto
-        if (now - self.last_reset[channel]).total_seconds() > 60:
-            self.limits[channel] = 0
-            self.last_reset[channel] = now
-        
-        # Verificar si estamos dentro del límite
-        if self.limits[channel] < limit:
-            self.limits[channel] += 1
-            return True
-        
-        # Si excedemos el límite, registrarlo y devolver False
-        logger.warning(f"Rate limit exceeded for {channel}: {self.limits[channel]}/{limit}")
-        return False
-    
-    async def wait_if_needed(self, channel: str) -> None:
+        delay = await asyncio.to_thread(self.reserve, channel, account, recipient, max_wait)
+        if delay is None:
+            return False
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+    def acquire_blocking(self, channel: str, account: Optional[str] = None, recipient: Optional[str] = None,
+                         max_wait: Optional[float] = None) -> bool:
+        """Versión síncrona de ``acquire`` para código sin event loop (Celery, requests)."""
+        delay = self.reserve(channel, account, recipient, max_wait)
+        if delay is None:
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    async def check_limit(self, channel: str, account: Optional[str] = None, recipient: Optional[str] = None) -> bool:
+        """
+        Verifica si podemos enviar otro mensaje en este canal ahora mismo.
+
+        Returns:
+            bool: True si está dentro del límite (y consume el turno), False si excede
+        """
+        return await self.acquire(channel, account, recipient, max_wait=0)
+
+    async def wait_if_needed(self, channel: str, account: Optional[str] = None, recipient: Optional[str] = None) -> None:
         """
         Espera si es necesario para cumplir con los límites de tasa.
-        
+
         Args:
             channel (str): El canal a verificar
         """
-        while not await self.check_limit(channel):
-            await asyncio.sleep(1)
+        await self.acquire(channel, account, recipient)
+
+    wait_for_limit = wait_if_needed
+
+
+rate_limiter = RateLimiter()
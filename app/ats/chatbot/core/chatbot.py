@@ -36,12 +36,14 @@ from app.ats.chatbot.components.rate_limiter import RateLimiter
 
 # Importaciones de servicios
 from app.ats.integrations.services import MessageService
+from app.ats.integrations.channels.http_clients import outbound_http
 # TODO: Implementar gamification_service
 # from app.ats.integrations.services.gamification import gamification_service
 from app.ats.integrations.services.document import CVParser
 
 # Importaciones de NLP
 from app.ats.chatbot.nlp.nlp import NLPProcessor
+from app.ats.chatbot.nlp.intent_matcher import intent_matcher_registry
 
 # Importaciones de middleware
 from app.ats.chatbot.middleware.message_retry import MessageRetry
@@ -242,46 +244,10 @@ class ChatBotHandler:
 
     async def _detect_intent_local(self, text: str, business_unit: BusinessUnit) -> str:
         """✅ Detecta intent usando sistema local sin GPT"""
-        text_lower = text.lower()
-        
-        # Patrones específicos por BU
-        if business_unit.name.lower() == "amigro":
-            if any(word in text_lower for word in ["hola", "buenos días", "buenas"]):
-                return "greeting"
-            elif any(word in text_lower for word in ["perfil", "información", "datos"]):
-                return "profile_creation"
-            elif any(word in text_lower for word in ["trabajo", "empleo", "oportunidad"]):
-                return "job_search"
-            elif any(word in text_lower for word in ["migrante", "migración", "visa"]):
-                return "migration_info"
-        
-        elif business_unit.name.lower() == "huntred":
-            if any(word in text_lower for word in ["hola", "buenos días", "buenas"]):
-                return "greeting"
-            elif any(word in text_lower for word in ["perfil", "cv", "experiencia"]):
-                return "profile_creation"
-            elif any(word in text_lower for word in ["oportunidad", "vacante", "puesto"]):
-                return "job_search"
-            elif any(word in text_lower for word in ["entrevista", "cita", "agendar"]):
-                return "interview_scheduling"
-        
-        # Patrones generales
-        if any(word in text_lower for word in ["hola", "buenos días", "buenas", "hi", "hello"]):
-            return "greeting"
-        elif any(word in text_lower for word in ["ayuda", "help", "soporte"]):
-            return "help"
-        elif any(word in text_lower for word in ["perfil", "información", "datos"]):
-            return "profile_creation"
-        elif any(word in text_lower for word in ["trabajo", "empleo", "oportunidad", "vacante"]):
-            return "job_search"
-        elif any(word in text_lower for word in ["entrevista", "cita", "agendar"]):
-            return "interview_scheduling"
-        elif any(word in text_lower for word in ["oferta", "contrato", "salario"]):
-            return "offer_management"
-        elif any(word in text_lower for word in ["feedback", "opinión", "sugerencia"]):
-            return "feedback"
-        
-        return "unknown"
+        # Matcher compilado por BU: palabras clave + IntentPattern activos
+        matcher = await intent_matcher_registry.aget(self.get_business_unit_key(business_unit))
+        best = matcher.best(text)
+        return best.intent if best else "unknown"
 
     async def _generate_response_local(self, user: Person, chat_state: ChatState, text: str, intent: str, business_unit: BusinessUnit) -> str:
         """✅ Genera respuesta usando sistema local sin GPT"""
@@ -373,7 +339,7 @@ class ChatBotHandler:
         if platform == "telegram":
             telegram_api = await self.get_api_instance("telegram")
             url = f"https://api.telegram.org/bot{telegram_api.api_key}/getFile?file_id={file_id}"
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+            async with outbound_http.client('telegram') as client:
                 response = await client.get(url)
                 response.raise_for_status()
                 file_path = response.json().get("result", {}).get("file_path")
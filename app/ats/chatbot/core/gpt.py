@@ -40,6 +40,7 @@ from app.ats.integrations.services import EmailService
 
 # Importaciones de utilidades
 from app.ats.utils.logger_utils import get_module_logger, log_async_function_call, ResourceMonitor
+from app.ats.chatbot.core.prompt_cache import prompt_cache
 
 # Configuración de TensorFlow (opcional)
 try:
@@ -74,18 +75,19 @@ PROMPT_CACHE_SIZE = 100
 TOKEN_USAGE_ALERT_THRESHOLD = 0.8  # 80% del límite
 
 # Cache mediante el sistema de caché de Django (en lugar de memoria local)
-# Funciones para gestionar cache de respuestas
-def get_cached_response(model, prompt, business_unit=None):
+# Funciones para gestionar cache de respuestas; la clave es un digest estable
+# del prompt completo (ver app.ats.chatbot.core.prompt_cache).
+def get_cached_response(model, prompt, business_unit=None, channel_api=None):
     """Obtiene respuesta cacheada con soporte para BU"""
-    bu_id = getattr(business_unit, 'id', None) or getattr(business_unit, 'name', '')
-    cache_key = f"gpt:{model}:{bu_id}:{hash(prompt[:200])}"
-    return cache.get(cache_key)
+    entry = prompt_cache.lookup(prompt_cache.make_key(model, prompt, business_unit, channel_api), business_unit)
+    return entry["response"] if entry else None
 
-def cache_response(model, prompt, response, business_unit=None, ttl=3600):
+def cache_response(model, prompt, response, business_unit=None, ttl=None, channel_api=None):
     """Almacena respuesta en caché con TTL y soporte para BU"""
-    bu_id = getattr(business_unit, 'id', None) or getattr(business_unit, 'name', '')
-    cache_key = f"gpt:{model}:{bu_id}:{hash(prompt[:200])}"
-    cache.set(cache_key, response, ttl)
+    cache_key = prompt_cache.make_key(model, prompt, business_unit, channel_api)
+    # Dentro de generate_response sólo se marca; el wrapper guarda con métricas
+    if not prompt_cache.mark_cacheable(cache_key, response):
+        prompt_cache.store(cache_key, response, business_unit, ttl=ttl)
     
 # Caché en memoria TTL para respuestas frecuentes (más rápida que Django cache)
 PROMPT_CACHE_SIZE = 1000
@@ -223,32 +225,24 @@ class BaseHandler:
         self.circuit_open_time = 0
         self.token_usage = 0
         self.token_limit = getattr(config, 'token_limit', 100000)
-        # Inicializar cache
-        if config.model not in response_cache:
-            response_cache[config.model] = {}
         
         # Log de inicialización
         logger.info(f"Iniciando handler para modelo {config.model}", 
                    extra={"data": {"model": config.model}})
 
+    def __init_subclass__(cls, **kwargs):
+        """Aplica la caché de prompts (con single-flight) a cada generate_response."""
+        super().__init_subclass__(**kwargs)
+        if 'generate_response' in cls.__dict__:
+            cls.generate_response = prompt_cache.wrap_generate(cls.__dict__['generate_response'])
+
     @log_async_function_call(logger)
     async def initialize(self):
         raise NotImplementedError("Método 'initialize' debe ser implementado.")
 
     @log_async_function_call(logger)
     async def generate_response(self, prompt: str, business_unit=None) -> str:
-        """Generate a response from the OpenAI API."""
-        # Verificar circuit breaker
-        if self._check_circuit_breaker():
-            return "⚠️ Servicio temporalmente no disponible. Intente más tarde."
-        
-        # Verificar caché con sistema de caché de Django
-        model = self.config.model
-        cached_response = get_cached_response(model, prompt, business_unit)
-        if cached_response:
-            logger.info(f"Respuesta obtenida de caché para modelo {model} y BU {getattr(business_unit, 'name', '...')}")
-            return cached_response
-        
+        """Genera la respuesta; la caché se aplica en las subclases vía __init_subclass__."""
         # Implementación específica del handler
         raise NotImplementedError("Método 'generate_response' debe ser implementado.")
         
@@ -300,6 +294,7 @@ class BaseHandler:
     def _update_token_usage(self, tokens: int, business_unit=None):
         """Actualiza contador de tokens por BU y total"""
         self.token_usage += tokens
+        prompt_cache.record_tokens(tokens)
         
         # Contador global del modelo
         usage_percent = self.token_usage / self.token_limit
@@ -378,12 +373,8 @@ class OpenAIHandler(BaseHandler):
         if self._check_circuit_breaker():
             return "⚠️ Servicio temporalmente no disponible. Intente más tarde."
         
-        # Verificar caché con sistema de caché de Django
+        # La caché de prompts se consulta en el wrapper de BaseHandler
         model = self.config.model
-        cached_response = get_cached_response(model, prompt, business_unit)
-        if cached_response:
-            logger.info(f"Respuesta obtenida de caché para modelo {model} y BU {getattr(business_unit, 'name', '...')}")
-            return cached_response
         
         # Implementación específica del handler
         bu_name = business_unit.name if business_unit else "General"
@@ -507,7 +498,10 @@ class GrokHandler(BaseHandler):
                 response.raise_for_status()
                 data = await response.json()
                 logger.debug(f"Respuesta de Grok: {data}")
-                return data["choices"][0]["message"]["content"].strip()
+                response_text = data["choices"][0]["message"]["content"].strip()
+                prompt_cache.record_tokens(data.get("usage", {}).get("total_tokens", 0))
+                cache_response(self.config.model, prompt, response_text, business_unit)
+                return response_text
         except (ClientConnectorSSLError, requests.exceptions.RequestException) as e:
             error_detail = f"Error en Grok: {str(e)}, Status: {getattr(e.response, 'status_code', 'N/A')}"
             logger.error(error_detail)
@@ -551,7 +545,10 @@ class GeminiHandler(BaseHandler):
             async with self.client.post(self.api_url, headers=self.headers, json=payload) as response:
                 response.raise_for_status()
                 data = await response.json()
-                return data["candidates"][0]["content"]["parts"][0]["text"].strip()
+                response_text = data["candidates"][0]["content"]["parts"][0]["text"].strip()
+                prompt_cache.record_tokens(data.get("usageMetadata", {}).get("totalTokenCount", 0))
+                cache_response(self.config.model, prompt, response_text, business_unit)
+                return response_text
         except asyncio.TimeoutError:
             logger.warning("Timeout en Gemini.")
             return "Solicitud tardó demasiado."
@@ -599,7 +596,9 @@ class ClaudeHandler(BaseHandler):
             async with self.client.post(self.api_url, headers=self.headers, json=payload) as response:
                 response.raise_for_status()
                 data = await response.json()
-                return data["completion"].strip()
+                response_text = data["completion"].strip()
+                cache_response(self.config.model, prompt, response_text, business_unit)
+                return response_text
         except requests.exceptions.RequestException as e:
             logger.error(f"Error en Claude: {e}")
             return "Error al comunicarse con Claude."
@@ -638,7 +637,9 @@ class VertexAIHandler(BaseHandler):
                 contents=contents,
                 config=config,
             )
-            return response.text.strip()
+            response_text = response.text.strip()
+            cache_response(self.model, prompt, response_text, business_unit)
+            return response_text
         except Exception as e:
             logger.error(f"Error en Vertex AI: {e}")
             return "Error al comunicarse con Vertex AI."
@@ -696,12 +697,6 @@ class MistralAIHandler(BaseHandler):
             raise Exception("Circuit breaker abierto para Mistral AI")
             
         try:
-            # Verificar caché
-            cached_response = get_cached_response(self.model, prompt, business_unit)
-            if cached_response:
-                logger.info("Respuesta obtenida de caché")
-                return cached_response
-                
             # Preparar payload
             payload = {
                 "model": self.model,
@@ -850,6 +845,8 @@ class MetaAIHandler(BaseHandler):
     """Handler para Meta AI (Llama 3) y otros modelos de Meta.
     Optimizado para Meta Conversations 2025."""
     
+    initialized = False  # se inicializa en la primera llamada
+    
     async def initialize(self):
         """Inicializa el cliente con configuración optimizada para Meta AI."""
         try:
@@ -883,12 +880,6 @@ class MetaAIHandler(BaseHandler):
             logger.warning("Circuit breaker abierto para Meta AI")
             return "⚠️ Servicio no disponible temporalmente. Intente más tarde."
             
-        # Verificar caché
-        cached = get_cached_response(self.model, prompt, business_unit)
-        if cached:
-            logger.debug("Respuesta recuperada de caché para Meta AI")
-            return cached
-            
         try:
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -928,7 +919,7 @@ class MetaAIHandler(BaseHandler):
             tokens_used = response_data.get("usage", {}).get("total_tokens", 0)
             self._reset_failures()
             self._update_token_usage(tokens_used, business_unit)
-            cache_response(self.model, prompt, result, business_unit)
+            cache_response(self.model, prompt, result, business_unit, channel_api=channel_api)
             logger.info(f"Meta AI response generated in {elapsed:.2f}s using {tokens_used} tokens")
             return result
         except Exception as e:
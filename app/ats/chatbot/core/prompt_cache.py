@@ -0,0 +1,477 @@
+"""
+Caché de respuestas de LLM para los handlers de ``app.ats.chatbot.core.gpt``.
+
+- Clave estable: SHA-256 de modelo, BU y prompt normalizado completo, igual
+  en todos los workers de Gunicorn/Celery.
+- Dos niveles: LRU en memoria por BU (L1) delante de la caché de Django (L2),
+  ambos con TTL y límite de entradas por BU. El orden de L2 por BU se lleva
+  en un sorted set de Redis (``ZADD`` + ``ZREMRANGEBYRANK`` atómicos).
+- Single-flight: N llamadas concurrentes con el mismo prompt hacen una sola
+  llamada al proveedor; entre procesos se coordina con un lock en la caché.
+- Contadores de hits/misses/coalesced y tokens/latencia ahorrados por BU,
+  sumados a la caché compartida con ``incr`` (una clave por contador).
+
+Los handlers siguen marcando las respuestas válidas con ``cache_response``;
+las respuestas de error nunca se almacenan.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import inspect
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+CACHE_KEY_VERSION = "v2"
+DEFAULT_TTL = 3600  # 1 hora
+DEFAULT_MAX_ENTRIES = 1000
+INFLIGHT_LOCK_TTL = 90  # segundos; cubre el timeout de los proveedores
+REMOTE_WAIT_TIMEOUT = 30  # segundos esperando a otro proceso antes de llamar al proveedor
+REMOTE_POLL_INTERVAL = 0.1
+STATS_FLUSH_INTERVAL = 60  # segundos entre volcados de contadores a la caché compartida
+STATS_CACHE_KEY = "gpt:prompt_cache:stats"
+STATS_BUSINESS_UNITS_KEY = f"{STATS_CACHE_KEY}:business_units"
+
+STAT_FIELDS = (
+    "hits_l1", "hits_l2", "misses", "coalesced", "coalesced_remote",
+    "upstream_calls", "stores", "evictions", "saved_tokens", "saved_latency_ms",
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class PromptCachePolicy:
+    """TTL y tamaño máximo de la caché para una unidad de negocio."""
+    ttl: int = DEFAULT_TTL
+    max_entries: int = DEFAULT_MAX_ENTRIES
+
+
+@dataclass
+class _CallState:
+    """Estado de la llamada en curso, compartido con ``cache_response``."""
+    key: str
+    cacheable: bool = False
+    response: Optional[str] = None
+    tokens: int = 0
+
+
+@dataclass
+class _Stats:
+    counters: Dict[str, Dict[str, float]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(float)))
+    pending: Dict[str, Dict[str, float]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(float)))
+
+
+_current_call: contextvars.ContextVar = contextvars.ContextVar("prompt_cache_call", default=None)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normaliza el prompt (Unicode NFC, espacios colapsados) sin alterar mayúsculas."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", prompt or "")).strip()
+
+
+def business_unit_key(business_unit) -> str:
+    """Identificador estable de la BU para claves y políticas."""
+    if business_unit is None:
+        return "global"
+    if isinstance(business_unit, (str, int)):
+        return str(business_unit)
+    return str(getattr(business_unit, 'id', None) or getattr(business_unit, 'name', '') or "global")
+
+
+def channel_key(channel_api) -> str:
+    """Identificador estable del canal (``channel_api`` de MetaAIHandler); vacío sin canal."""
+    if channel_api is None:
+        return ""
+    pk = getattr(channel_api, 'pk', None)
+    if pk is not None:
+        return f"{type(channel_api).__name__}:{pk}"
+    return str(channel_api)
+
+
+class PromptCache:
+    """Caché de prompts de dos niveles con de-duplicación de llamadas en vuelo."""
+
+    def __init__(self, backend=None, policies: Optional[Dict[str, Dict[str, int]]] = None,
+                 redis_client=None):
+        self._backend = backend
+        self._redis = redis_client
+        self._policies = policies
+        self._l1: Dict[str, "OrderedDict[str, tuple]"] = defaultdict(OrderedDict)
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = _Stats()
+        self._last_flush = time.monotonic()
+
+    # Configuración -------------------------------------------------------
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            from django.core.cache import cache
+            self._backend = cache
+        return self._backend
+
+    @property
+    def redis(self):
+        """Cliente Redis del índice L2 por BU, o ``None`` si no hay conexión."""
+        if self._redis is not None:
+            return self._redis
+        from app.ats.utils.tiered_cache import tiered_cache
+        return tiered_cache.redis
+
+    def policy_for(self, bu_key: str, business_unit=None) -> PromptCachePolicy:
+        """Política de la BU: ``settings.GPT_PROMPT_CACHE_POLICIES`` por id o nombre."""
+        policies = self._policies
+        if policies is None:
+            try:
+                from django.conf import settings
+                policies = getattr(settings, 'GPT_PROMPT_CACHE_POLICIES', {}) or {}
+            except Exception:
+                policies = {}
+            self._policies = policies
+        name = getattr(business_unit, 'name', None)
+        override = policies.get(bu_key) or (policies.get(name) if name else None) or policies.get('default') or {}
+        return PromptCachePolicy(
+            ttl=int(override.get('ttl', DEFAULT_TTL)),
+            max_entries=int(override.get('max_entries', DEFAULT_MAX_ENTRIES)),
+        )
+
+    def make_key(self, model: str, prompt: str, business_unit=None, channel_api=None) -> str:
+        """Clave estable entre procesos basada en el prompt completo (y el canal, si lo hay)."""
+        bu_key = business_unit_key(business_unit)
+        parts = [str(model or ""), bu_key, normalize_prompt(prompt)]
+        channel = channel_key(channel_api)
+        if channel:
+            parts.append(channel)
+        digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+        return f"gpt:{CACHE_KEY_VERSION}:{bu_key}:{digest}"
+
+    # Lectura / escritura -------------------------------------------------
+
+    def _l1_get(self, bu_key: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entries = self._l1.get(bu_key)
+            if not entries or key not in entries:
+                return None
+            expires_at, entry = entries[key]
+            if expires_at < time.time():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return entry
+
+    def _l1_set(self, bu_key: str, key: str, entry: Dict[str, Any], policy: PromptCachePolicy):
+        evicted = 0
+        with self._lock:
+            entries = self._l1[bu_key]
+            entries[key] = (time.time() + policy.ttl, entry)
+            entries.move_to_end(key)
+            while len(entries) > policy.max_entries:
+                entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._count(bu_key, "evictions", evicted)
+
+    def lookup(self, key: str, business_unit=None) -> Optional[Dict[str, Any]]:
+        """Busca una entrada en L1 y luego en L2 (promoviéndola a L1)."""
+        bu_key = business_unit_key(business_unit)
+        entry = self._l1_get(bu_key, key)
+        if entry is not None:
+            self._record_hit(bu_key, "hits_l1", entry)
+            return entry
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Error leyendo caché de prompts: {str(e)}")
+            entry = None
+        if isinstance(entry, str):
+            entry = {"response": entry}
+        if entry is not None:
+            self._l1_set(bu_key, key, entry, self.policy_for(bu_key, business_unit))
+            self._record_hit(bu_key, "hits_l2", entry)
+        return entry
+
+    def store(self, key: str, response: str, business_unit=None, tokens: int = 0,
+              latency_ms: float = 0.0, ttl: Optional[int] = None):
+        """Guarda la respuesta en ambos niveles respetando el límite de la BU."""
+        bu_key = business_unit_key(business_unit)
+        policy = self.policy_for(bu_key, business_unit)
+        if ttl:
+            policy = PromptCachePolicy(ttl=ttl, max_entries=policy.max_entries)
+        entry = {"response": response, "tokens": tokens, "latency_ms": latency_ms, "created": time.time()}
+        self._l1_set(bu_key, key, entry, policy)
+        try:
+            self.backend.set(key, entry, policy.ttl)
+            self._trim_l2(bu_key, key, policy)
+        except Exception as e:
+            logger.warning(f"Error escribiendo caché de prompts: {str(e)}")
+        self._count(bu_key, "stores")
+
+    def _trim_l2(self, bu_key: str, key: str, policy: PromptCachePolicy):
+        """
+        Mantiene un índice por BU en L2 y expulsa las entradas más antiguas.
+
+        Con Redis el índice es un sorted set por fecha de escritura y el
+        recorte se hace en una transacción; sin Redis (un solo proceso) es
+        una lista en la caché de Django.
+        """
+        index_key = f"gpt:{CACHE_KEY_VERSION}:index:{bu_key}"
+        redis = self.redis
+        if redis is not None:
+            overflow = -(policy.max_entries + 1)
+            with redis.pipeline(transaction=True) as pipe:
+                pipe.zadd(index_key, {key: time.time()})
+                pipe.zrange(index_key, 0, overflow)
+                pipe.zremrangebyrank(index_key, 0, overflow)
+                pipe.expire(index_key, policy.ttl)
+                evicted = [k.decode("utf-8") if isinstance(k, bytes) else k for k in pipe.execute()[1]]
+        else:
+            index = [k for k in (self.backend.get(index_key) or []) if k != key]
+            index.append(key)
+            evicted = index[:-policy.max_entries] if len(index) > policy.max_entries else []
+            self.backend.set(index_key, index[len(evicted):], policy.ttl)
+        if evicted:
+            self.backend.delete_many(evicted)
+            self._count(bu_key, "evictions", len(evicted))
+
+    def invalidate(self, business_unit=None):
+        """Vacía la caché L1 (de una BU o completa) en este proceso."""
+        with self._lock:
+            if business_unit is None:
+                self._l1.clear()
+            else:
+                self._l1.pop(business_unit_key(business_unit), None)
+
+    # Generación con single-flight ---------------------------------------
+
+    async def get_or_generate(self, model: str, prompt: str, business_unit,
+                              generate: Callable[[], Awaitable[str]], channel_api=None) -> str:
+        """Devuelve la respuesta cacheada o la genera una sola vez para todos los solicitantes."""
+        key = self.make_key(model, prompt, business_unit, channel_api)
+        bu_key = business_unit_key(business_unit)
+        entry = self.lookup(key, business_unit)
+        if entry is not None:
+            return entry["response"]
+
+        loop = asyncio.get_running_loop()
+        inflight_key = (id(loop), key)
+        future = self._inflight.get(inflight_key)
+        if future is not None:
+            self._count(bu_key, "coalesced")
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._inflight[inflight_key] = future
+        try:
+            response = await self._generate_as_leader(key, bu_key, business_unit, generate)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita el aviso "exception was never retrieved" si nadie esperaba
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(inflight_key, None)
+
+    async def _generate_as_leader(self, key: str, bu_key: str, business_unit,
+                                  generate: Callable[[], Awaitable[str]]) -> str:
+        lock_key = f"{key}:inflight"
+        try:
+            acquired = self.backend.add(lock_key, 1, INFLIGHT_LOCK_TTL)
+        except Exception:
+            acquired = True
+        if not acquired:
+            entry = await self._wait_for_remote(key, business_unit)
+            if entry is not None:
+                self._count(bu_key, "coalesced_remote")
+                return entry["response"]
+
+        self._count(bu_key, "misses")
+        state = _CallState(key=key)
+        token = _current_call.set(state)
+        started = time.perf_counter()
+        try:
+            self._count(bu_key, "upstream_calls")
+            response = await generate()
+        finally:
+            _current_call.reset(token)
+            if acquired:
+                try:
+                    self.backend.delete(lock_key)
+                except Exception:
+                    pass
+        if state.cacheable and response:
+            self.store(key, response, business_unit, tokens=state.tokens,
+                       latency_ms=(time.perf_counter() - started) * 1000)
+        return response
+
+    async def _wait_for_remote(self, key: str, business_unit) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + REMOTE_WAIT_TIMEOUT
+        lock_key = f"{key}:inflight"
+        while time.monotonic() < deadline:
+            await asyncio.sleep(REMOTE_POLL_INTERVAL)
+            try:
+                entry = self.backend.get(key)
+                if entry is not None:
+                    if isinstance(entry, str):
+                        entry = {"response": entry}
+                    bu_key = business_unit_key(business_unit)
+                    self._l1_set(bu_key, key, entry, self.policy_for(bu_key, business_unit))
+                    return entry
+                if self.backend.get(lock_key) is None:
+                    return None
+            except Exception:
+                return None
+        return None
+
+    # Integración con los handlers ---------------------------------------
+
+    def mark_cacheable(self, key: str, response: str) -> bool:
+        """Marca la llamada en curso como almacenable. Devuelve False si no hay llamada activa."""
+        state = _current_call.get()
+        if state is None or state.key != key:
+            return False
+        state.cacheable = True
+        state.response = response
+        return True
+
+    def record_tokens(self, tokens: int):
+        """Asocia los tokens consumidos a la llamada en curso."""
+        state = _current_call.get()
+        if state is not None:
+            state.tokens += tokens or 0
+
+    def wrap_generate(self, method: Callable) -> Callable:
+        """Envuelve ``generate_response`` de un handler con la caché de prompts."""
+        if getattr(method, "_prompt_cached", False):
+            return method
+        takes_channel = 'channel_api' in inspect.signature(method).parameters
+
+        @wraps(method)
+        async def wrapper(handler, prompt: str, business_unit=None, *args, **kwargs):
+            # La clave debe coincidir con la de cache_response: los handlers que
+            # se inicializan al generar (``initialized``) fijan ahí su modelo
+            if getattr(handler, 'initialized', None) is False:
+                await handler.initialize()
+            model = getattr(handler, 'model', None) or getattr(handler.config, 'model', None)
+            channel_api = None
+            if takes_channel:
+                channel_api = kwargs['channel_api'] if 'channel_api' in kwargs else (args[0] if args else None)
+            return await self.get_or_generate(
+                model, prompt, business_unit,
+                lambda: method(handler, prompt, business_unit, *args, **kwargs),
+                channel_api=channel_api,
+            )
+
+        wrapper._prompt_cached = True
+        return wrapper
+
+    # Métricas ------------------------------------------------------------
+
+    def _count(self, bu_key: str, name: str, amount: float = 1):
+        with self._lock:
+            self._stats.counters[bu_key][name] += amount
+            self._stats.pending[bu_key][name] += amount
+        if time.monotonic() - self._last_flush >= STATS_FLUSH_INTERVAL:
+            self.flush_stats()
+
+    def _record_hit(self, bu_key: str, level: str, entry: Dict[str, Any]):
+        self._count(bu_key, level)
+        self._count(bu_key, "saved_tokens", entry.get("tokens", 0) or 0)
+        self._count(bu_key, "saved_latency_ms", entry.get("latency_ms", 0) or 0)
+
+    @staticmethod
+    def _stat_key(bu_key: str, name: str) -> str:
+        return f"{STATS_CACHE_KEY}:{bu_key}:{name}"
+
+    def _incr(self, key: str, amount: int):
+        try:
+            self.backend.incr(key, amount)
+        except ValueError:
+            # La clave no existe; si otro proceso la creó primero, se incrementa
+            if not self.backend.add(key, amount, None):
+                self.backend.incr(key, amount)
+
+    def flush_stats(self):
+        """
+        Suma los contadores pendientes de este proceso a los compartidos en la
+        caché con ``incr`` (enteros; las fracciones quedan para el siguiente
+        volcado).
+        """
+        with self._lock:
+            pending = self._stats.pending
+            self._stats.pending = defaultdict(lambda: defaultdict(float))
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        carry = defaultdict(dict)
+        try:
+            registered = set(self.backend.get(STATS_BUSINESS_UNITS_KEY) or ())
+            if not registered.issuperset(pending):
+                # Sólo se reescribe al aparecer una BU nueva; si dos procesos
+                # compiten, el siguiente volcado del perdedor la vuelve a agregar
+                self.backend.set(STATS_BUSINESS_UNITS_KEY, sorted(registered | set(pending)), None)
+            for bu_key, counters in pending.items():
+                for name, value in counters.items():
+                    whole = int(value)
+                    if value != whole:
+                        carry[bu_key][name] = value - whole
+                    if whole:
+                        self._incr(self._stat_key(bu_key, name), whole)
+        except Exception as e:
+            logger.debug(f"No se pudieron publicar las métricas de la caché de prompts: {str(e)}")
+            return
+        with self._lock:
+            for bu_key, counters in carry.items():
+                for name, value in counters.items():
+                    self._stats.pending[bu_key][name] += value
+
+    def get_stats(self, shared: bool = False) -> Dict[str, Dict[str, float]]:
+        """
+        Contadores por BU con ratio de aciertos.
+
+        Con ``shared=True`` devuelve el agregado de todos los procesos.
+        """
+        if shared:
+            self.flush_stats()
+            source = {}
+            try:
+                for bu_key in self.backend.get(STATS_BUSINESS_UNITS_KEY) or ():
+                    values = self.backend.get_many([self._stat_key(bu_key, name) for name in STAT_FIELDS])
+                    source[bu_key] = {name: values.get(self._stat_key(bu_key, name), 0) for name in STAT_FIELDS}
+            except Exception:
+                source = {}
+        else:
+            with self._lock:
+                source = {bu: dict(counters) for bu, counters in self._stats.counters.items()}
+        result = {}
+        for bu_key, counters in source.items():
+            data = {name: counters.get(name, 0) for name in STAT_FIELDS}
+            served = data["hits_l1"] + data["hits_l2"] + data["coalesced"] + data["coalesced_remote"]
+            total = served + data["misses"]
+            data["hit_ratio"] = served / total if total else 0.0
+            result[bu_key] = data
+        return result
+
+
+prompt_cache = PromptCache()
+
+
+def get_prompt_cache_stats(shared: bool = True) -> Dict[str, Dict[str, float]]:
+    """Atajo para consultar los contadores de la caché de prompts."""
+    return prompt_cache.get_stats(shared=shared)
@@ -0,0 +1,463 @@
+"""
+Motor compilado de detección de intents para Grupo huntRED®.
+
+Unifica las listas de palabras clave de ``ChatBotHandler``, los patrones
+regex de ``NLPProcessor`` y las filas activas de ``IntentPattern`` en un
+índice por unidad de negocio que se compila una sola vez. Cada mensaje se
+tokeniza una vez y se resuelve con búsquedas en diccionario; sólo los
+patrones regex que no se pueden descomponer en frases pasan por una regex
+combinada.
+
+El índice se reconstruye cuando cambia una fila de ``IntentPattern``: las
+señales incrementan una versión en la caché de Django y cada proceso la
+revisa como máximo cada ``VERSION_CHECK_INTERVAL`` segundos.
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+VERSION_CACHE_KEY = "intent_matcher:patterns_version"
+VERSION_CHECK_INTERVAL = 30  # segundos
+TOKEN_CACHE_SIZE = 50000  # tokens distintos memorizados por matcher
+MIN_PREFIX_LENGTH = 4  # palabras más cortas ("hi", "cv") sólo coinciden completas
+
+PROFILE_CHATBOT = "chatbot"
+PROFILE_NLP = "nlp"
+
+# Palabras clave específicas por BU usadas por ChatBotHandler (orden = prioridad)
+BU_INTENT_KEYWORDS: Dict[str, List[Tuple[str, List[str]]]] = {
+    "amigro": [
+        ("greeting", ["hola", "buenos días", "buenas"]),
+        ("profile_creation", ["perfil", "información", "datos"]),
+        ("job_search", ["trabajo", "empleo", "oportunidad"]),
+        ("migration_info", ["migrante", "migración", "visa"]),
+    ],
+    "huntred": [
+        ("greeting", ["hola", "buenos días", "buenas"]),
+        ("profile_creation", ["perfil", "cv", "experiencia"]),
+        ("job_search", ["oportunidad", "vacante", "puesto"]),
+        ("interview_scheduling", ["entrevista", "cita", "agendar"]),
+    ],
+}
+
+# Palabras clave generales usadas por ChatBotHandler (orden = prioridad)
+GENERAL_INTENT_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("greeting", ["hola", "buenos días", "buenas", "hi", "hello"]),
+    ("help", ["ayuda", "help", "soporte"]),
+    ("profile_creation", ["perfil", "información", "datos"]),
+    ("job_search", ["trabajo", "empleo", "oportunidad", "vacante"]),
+    ("interview_scheduling", ["entrevista", "cita", "agendar"]),
+    ("offer_management", ["oferta", "contrato", "salario"]),
+    ("feedback", ["feedback", "opinión", "sugerencia"]),
+]
+
+# Patrones regex usados por NLPProcessor (orden = prioridad)
+NLP_INTENT_PATTERNS: List[Tuple[str, List[str]]] = [
+    ("greeting", [
+        r'\b(hola|buenos días|buenas tardes|buenas noches|saludos)\b',
+        r'\b(hi|hello|good morning|good afternoon|good evening)\b'
+    ]),
+    ("farewell", [
+        r'\b(adiós|hasta luego|nos vemos|chao|bye)\b',
+        r'\b(goodbye|see you|take care)\b'
+    ]),
+    ("assessment_request", [
+        r'\b(evaluación|assessment|prueba|test|evaluar)\b',
+        r'\b(assessment|evaluation|test|quiz)\b'
+    ]),
+    ("profile_update", [
+        r'\b(actualizar|modificar|cambiar|editar)\s+(perfil|información|datos)\b',
+        r'\b(update|modify|change|edit)\s+(profile|information|data)\b'
+    ]),
+    ("job_search", [
+        r'\b(buscar|encontrar|empleo|trabajo|vacante|oportunidad)\b',
+        r'\b(search|find|job|work|vacancy|opportunity)\b'
+    ]),
+    ("salary_calculation", [
+        r'\b(calcular|salario|sueldo|bruto|neto)\b',
+        r'\b(calculate|salary|wage|gross|net)\b'
+    ]),
+    ("interview_schedule", [
+        r'\b(entrevista|agendar|programar|cita)\b',
+        r'\b(interview|schedule|appointment|meeting)\b'
+    ]),
+    ("support_request", [
+        r'\b(ayuda|soporte|problema|error|duda)\b',
+        r'\b(help|support|problem|error|question)\b'
+    ]),
+]
+
+_TOKEN_RE = re.compile(r"\w+")
+_NO_MATCH = object()
+# \b(a|b c)\b  o  \b(a|b)\s+(c|d)\b  con alternativas de sólo palabras
+_WORD_ALTERNATION = r"\((?:[^\W\d_]+(?: [^\W\d_]+)*)(?:\|[^\W\d_]+(?: [^\W\d_]+)*)*\)"
+_DECOMPOSABLE_RE = re.compile(
+    r"^\\b(%s(?:\\s\+%s)*)\\b$" % (_WORD_ALTERNATION, _WORD_ALTERNATION)
+)
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    """Regla individual: una frase o regex asociada a un intent."""
+    intent: str
+    pattern: str
+    rank: int
+    source: str = "builtin"
+    is_regex: bool = False
+    prefix: bool = False
+
+
+@dataclass
+class IntentMatch:
+    """Resultado de un intent detectado en un mensaje."""
+    intent: str
+    rank: int
+    hits: int = 1
+    pattern: str = ""
+    source: str = "builtin"
+    matched: List[str] = field(default_factory=list)
+
+
+def _decompose_pattern(pattern: str) -> Optional[List[str]]:
+    """
+    Convierte un patrón ``\\b(a|b)\\s+(c|d)\\b`` en la lista de frases que
+    reconoce. Devuelve None si el patrón no es una alternancia simple.
+    """
+    if not _DECOMPOSABLE_RE.match(pattern):
+        return None
+    groups = re.findall(r"\(([^)]*)\)", pattern)
+    phrases = [""]
+    for group in groups:
+        phrases = [
+            f"{prefix} {alternative}".strip()
+            for prefix in phrases
+            for alternative in group.split("|")
+        ]
+    return phrases
+
+
+class CompiledIntentMatcher:
+    """
+    Índice inmutable de reglas de intent.
+
+    Las frases literales se indexan por su primer token; las palabras clave
+    con ``prefix=True`` también aceptan derivados (``vacante`` → ``vacantes``).
+    Los patrones regex no descomponibles se combinan en una única regex con
+    grupos nombrados.
+    """
+
+    def __init__(self, rules: Iterable[IntentRule]):
+        self.rules: List[IntentRule] = []
+        self._exact: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+        self._prefix: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+        self._prefix_lengths: List[int] = []
+        self._regex_rules: List[int] = []
+        self._regex: Optional[re.Pattern] = None
+        self._token_cache: Dict[str, object] = {}
+        for rule in rules:
+            self._add_rule(rule)
+        self._compile_regex()
+        self._prefix_lengths = sorted({len(key) for key in self._prefix})
+
+    def _add_rule(self, rule: IntentRule):
+        if rule.is_regex:
+            phrases = _decompose_pattern(rule.pattern)
+            if phrases is None:
+                self.rules.append(rule)
+                self._regex_rules.append(len(self.rules) - 1)
+                return
+        else:
+            phrases = [rule.pattern]
+
+        for phrase in phrases:
+            tokens = tuple(_TOKEN_RE.findall(phrase.lower()))
+            if not tokens:
+                continue
+            self.rules.append(rule)
+            index = len(self.rules) - 1
+            # Sólo el último token admite coincidencia por prefijo
+            if rule.prefix and len(tokens) == 1:
+                self._prefix.setdefault(tokens[0], []).append((index, ()))
+            else:
+                self._exact.setdefault(tokens[0], []).append((index, tokens[1:]))
+
+    def _compile_regex(self):
+        if not self._regex_rules:
+            return
+        parts = []
+        for index in self._regex_rules:
+            source = self.rules[index].pattern
+            try:
+                re.compile(source)
+            except re.error:
+                logger.warning(f"Patrón de intent inválido, se usa como literal: {source!r}")
+                source = re.escape(source)
+            if "(?P" in source:
+                source = re.escape(source)
+            parts.append(f"(?P<r{index}>{source})")
+        # Lookahead para reportar coincidencias solapadas en una sola pasada
+        self._regex = re.compile("(?=" + "|".join(parts) + ")", re.IGNORECASE)
+
+    def _resolve_token(self, token: str):
+        """Calcula las reglas de un token (coincidencias directas y frases que inicia)."""
+        singles = []
+        phrases = []
+        for index, rest in self._exact.get(token, ()):
+            if rest:
+                phrases.append((index, rest))
+            else:
+                singles.append(index)
+        size = len(token)
+        for length in self._prefix_lengths:
+            if length > size:
+                break
+            for index, _ in self._prefix.get(token[:length], ()):
+                singles.append(index)
+        if not singles and not phrases:
+            return _NO_MATCH
+        return tuple(singles), tuple(phrases)
+
+    def _scan(self, text: str) -> Dict[int, List[str]]:
+        """Recorre el mensaje una sola vez y devuelve las coincidencias por regla."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        found: Dict[int, List[str]] = {}
+        token_cache = self._token_cache
+        count = len(tokens)
+
+        for position, token in enumerate(tokens):
+            entry = token_cache.get(token)
+            if entry is None:
+                entry = self._resolve_token(token)
+                if len(token_cache) >= TOKEN_CACHE_SIZE:
+                    token_cache.clear()
+                token_cache[token] = entry
+            if entry is _NO_MATCH:
+                continue
+            singles, phrases = entry
+            for index in singles:
+                found.setdefault(index, []).append(token)
+            for index, rest in phrases:
+                end = position + 1 + len(rest)
+                if end > count:
+                    continue
+                window = tokens[position + 1:end]
+                if tuple(window[:-1]) == rest[:-1] and (
+                    window[-1] == rest[-1]
+                    or (self.rules[index].prefix and window[-1].startswith(rest[-1]))
+                ):
+                    found.setdefault(index, []).append(" ".join(tokens[position:end]))
+
+        if self._regex is not None:
+            for regex_match in self._regex.finditer(text):
+                group = regex_match.lastgroup
+                if group:
+                    found.setdefault(int(group[1:]), []).append(regex_match.group(group))
+
+        return found
+
+    def match(self, text: str) -> List[IntentMatch]:
+        """Devuelve los intents detectados ordenados por prioridad y número de coincidencias."""
+        if not text:
+            return []
+        found = self._scan(text)
+        return self._rank(found) if found else []
+
+    def _rank(self, found: Dict[int, List[str]]) -> List[IntentMatch]:
+        by_intent: Dict[str, IntentMatch] = {}
+        for index, matched in found.items():
+            rule = self.rules[index]
+            current = by_intent.get(rule.intent)
+            if current is None:
+                by_intent[rule.intent] = IntentMatch(
+                    intent=rule.intent,
+                    rank=rule.rank,
+                    hits=len(set(matched)),
+                    pattern=rule.pattern,
+                    source=rule.source,
+                    matched=list(dict.fromkeys(matched)),
+                )
+                continue
+            current.matched.extend(text for text in matched if text not in current.matched)
+            current.hits = len(current.matched)
+            if rule.rank < current.rank:
+                current.rank = rule.rank
+                current.pattern = rule.pattern
+                current.source = rule.source
+        return sorted(by_intent.values(), key=lambda m: (m.rank, -m.hits))
+
+    def best(self, text: str) -> Optional[IntentMatch]:
+        """Devuelve el intent de mayor prioridad o None."""
+        if not text:
+            return None
+        found = self._scan(text)
+        if not found:
+            return None
+        rules = self.rules
+        top_rank = min(rules[index].rank for index in found)
+        return self._rank({index: matched for index, matched in found.items()
+                           if rules[index].rank == top_rank})[0]
+
+
+def _keyword_rules(groups: Sequence[Tuple[str, List[str]]], start: int, source: str) -> List[IntentRule]:
+    rules = []
+    for offset, (intent, keywords) in enumerate(groups):
+        for keyword in keywords:
+            rules.append(IntentRule(intent=intent, pattern=keyword, rank=start + offset,
+                                    source=source, prefix=len(keyword) >= MIN_PREFIX_LENGTH))
+    return rules
+
+
+def _regex_rules(groups: Sequence[Tuple[str, List[str]]], start: int, source: str) -> List[IntentRule]:
+    rules = []
+    for offset, (intent, patterns) in enumerate(groups):
+        for pattern in patterns:
+            rules.append(IntentRule(intent=intent, pattern=pattern, rank=start + offset,
+                                    source=source, is_regex=True))
+    return rules
+
+
+def _pattern_rows_rules(rows: Sequence[Tuple[str, List[str]]], start: int) -> List[IntentRule]:
+    rules = []
+    for offset, (intent, patterns) in enumerate(rows):
+        for pattern in patterns or []:
+            if not isinstance(pattern, str) or not pattern.strip():
+                continue
+            pattern = pattern.strip()
+            is_regex = bool(re.search(r"[\\()\[\]|*+?^$]", pattern))
+            rules.append(IntentRule(intent=intent, pattern=pattern if is_regex else pattern.lower(),
+                                    rank=start + offset, source="intent_pattern",
+                                    is_regex=is_regex,
+                                    prefix=not is_regex and len(pattern) >= MIN_PREFIX_LENGTH))
+    return rules
+
+
+def build_rules(bu_key: str, profile: str,
+                pattern_rows: Sequence[Tuple[str, List[str]]] = ()) -> List[IntentRule]:
+    """
+    Construye las reglas ordenadas por prioridad para una BU y perfil.
+
+    Orden: palabras clave de la BU, filas de ``IntentPattern`` y, al final,
+    las reglas generales del perfil.
+    """
+    rules: List[IntentRule] = []
+    if profile == PROFILE_CHATBOT:
+        rules.extend(_keyword_rules(BU_INTENT_KEYWORDS.get(bu_key, []), len(rules), f"bu:{bu_key}"))
+    rules.extend(_pattern_rows_rules(pattern_rows, max((rule.rank for rule in rules), default=-1) + 1))
+    start = max((rule.rank for rule in rules), default=-1) + 1
+    if profile == PROFILE_CHATBOT:
+        rules.extend(_keyword_rules(GENERAL_INTENT_KEYWORDS, start, "general"))
+    else:
+        rules.extend(_regex_rules(NLP_INTENT_PATTERNS, start, "nlp"))
+    return rules
+
+
+def _load_pattern_rows() -> List[Tuple[str, List[str]]]:
+    """Carga las filas activas de IntentPattern como (intent, patrones)."""
+    try:
+        from app.models import IntentPattern
+        rows = IntentPattern.objects.filter(is_active=True).order_by('id').values_list('nombre', 'patrones')
+        return [(nombre, patrones if isinstance(patrones, list) else [patrones]) for nombre, patrones in rows]
+    except Exception as e:
+        logger.error(f"Error cargando IntentPattern: {str(e)}")
+        return []
+
+
+class IntentMatcherRegistry:
+    """
+    Registro por proceso de matchers compilados, uno por (BU, perfil).
+
+    Las reconstrucciones se disparan al detectar una nueva versión de
+    patrones en la caché compartida.
+    """
+
+    def __init__(self, rows_loader=_load_pattern_rows):
+        self._rows_loader = rows_loader
+        self._matchers: Dict[Tuple[str, str], CompiledIntentMatcher] = {}
+        self._rows: Optional[List[Tuple[str, List[str]]]] = None
+        self._version = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _shared_version(self):
+        try:
+            from django.core.cache import cache
+            return cache.get(VERSION_CACHE_KEY, 0)
+        except Exception:
+            return self._version
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._last_check < VERSION_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        version = self._shared_version()
+        if version != self._version:
+            with self._lock:
+                self._version = version
+                self._matchers.clear()
+                self._rows = None
+
+    def needs_build(self, bu_key: str, profile: str = PROFILE_CHATBOT) -> bool:
+        """Indica si obtener el matcher requiere acceder a la base de datos."""
+        self._check_version()
+        return (bu_key, profile) not in self._matchers
+
+    def get(self, bu_key: str, profile: str = PROFILE_CHATBOT) -> CompiledIntentMatcher:
+        """Devuelve el matcher compilado para la BU, compilándolo si hace falta."""
+        self._check_version()
+        key = (bu_key, profile)
+        matcher = self._matchers.get(key)
+        if matcher is not None:
+            return matcher
+        with self._lock:
+            matcher = self._matchers.get(key)
+            if matcher is None:
+                if self._rows is None:
+                    self._rows = self._rows_loader()
+                started = time.perf_counter()
+                matcher = CompiledIntentMatcher(build_rules(bu_key, profile, self._rows))
+                self._matchers[key] = matcher
+                logger.info(
+                    f"Matcher de intents compilado para {bu_key}/{profile}: "
+                    f"{len(matcher.rules)} reglas en {(time.perf_counter() - started) * 1000:.1f}ms"
+                )
+        return matcher
+
+    async def aget(self, bu_key: str, profile: str = PROFILE_CHATBOT) -> CompiledIntentMatcher:
+        """Versión async de ``get``; sólo sale del event loop si debe compilar."""
+        self._check_version()
+        # Un invalidate() concurrente puede vaciar el dict: se lee con get()
+        matcher = self._matchers.get((bu_key, profile))
+        if matcher is None:
+            from asgiref.sync import sync_to_async
+            matcher = await sync_to_async(self.get)(bu_key, profile)
+        return matcher
+
+    def invalidate(self):
+        """Descarta los matchers locales y publica una nueva versión para otros procesos."""
+        with self._lock:
+            self._matchers.clear()
+            self._rows = None
+        try:
+            from django.core.cache import cache
+            if not cache.add(VERSION_CACHE_KEY, 1, timeout=None):
+                cache.incr(VERSION_CACHE_KEY)
+            self._version = cache.get(VERSION_CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"No se pudo publicar la versión de patrones de intents: {str(e)}")
+        self._last_check = time.monotonic()
+
+
+intent_matcher_registry = IntentMatcherRegistry()
+
+
+def get_intent_matcher(bu_key: str, profile: str = PROFILE_CHATBOT) -> CompiledIntentMatcher:
+    """Atajo para obtener el matcher compilado del registro global."""
+    return intent_matcher_registry.get(bu_key, profile)
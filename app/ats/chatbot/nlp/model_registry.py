@@ -0,0 +1,266 @@
+# app/ats/chatbot/nlp/model_registry.py
+"""
+Registro de modelos NLP compartido por proceso.
+
+Cada modelo se registra con un loader que importa sus dependencias (spaCy,
+TensorFlow, transformers...) sólo cuando se pide por primera vez, y queda en
+memoria para todo el proceso. El registro anota cuánto tardó la carga y
+cuánta memoria residente agregó.
+
+Precarga antes de fork: los modelos marcados como ``fork_safe`` (spaCy,
+pickles de embeddings) se pueden cargar en el master de Gunicorn o en el
+proceso principal de Celery con ``preload_for_fork()``; los hijos los heredan
+por copy-on-write. Los modelos de TensorFlow/transformers crean hilos al
+inicializarse y no son seguros para fork, así que siempre se cargan de forma
+perezosa en cada hijo.
+
+Modo ligero (``NLP_LIGHT_MODE=true`` o ``settings.NLP_LIGHT_MODE``): los
+modelos ``heavy`` no se cargan y ``get`` devuelve ``None``; el código que los
+usa ya contempla su ausencia.
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Modelos seguros para fork que se precargan si no se indica NLP_PRELOAD_MODELS
+DEFAULT_PRELOAD_MODELS = ('spacy_es', 'skill_embeddings')
+
+
+def _env_flag(name: str, default: str = 'false') -> bool:
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+def light_mode_enabled() -> bool:
+    """Modo ligero desde el entorno o desde settings."""
+    if _env_flag('NLP_LIGHT_MODE'):
+        return True
+    try:
+        from django.conf import settings
+        return bool(getattr(settings, 'NLP_LIGHT_MODE', False))
+    except Exception:
+        return False
+
+
+def current_rss_mb() -> float:
+    """Memoria residente del proceso en MB (psutil o /proc)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except Exception:
+        import resource
+        # ru_maxrss es el pico (KB en Linux), mejor que nada
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@dataclass
+class ModelSpec:
+    """Definición de un modelo registrado."""
+    name: str
+    loader: Callable[[], Any]
+    heavy: bool = False
+    fork_safe: bool = True
+    description: str = ''
+
+
+@dataclass
+class ModelStats:
+    """Métricas de carga de un modelo en este proceso."""
+    loaded: bool = False
+    load_seconds: float = 0.0
+    rss_delta_mb: float = 0.0
+    loaded_at: Optional[float] = None
+    pid: Optional[int] = None
+    error: Optional[str] = None
+    skipped: Optional[str] = None
+    hits: int = 0
+
+
+class ModelRegistry:
+    """Modelos cargados una sola vez por proceso, bajo demanda."""
+
+    def __init__(self, light_mode: Optional[bool] = None):
+        self._light_mode = light_mode
+        self._specs: Dict[str, ModelSpec] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, ModelStats] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    @property
+    def light_mode(self) -> bool:
+        return light_mode_enabled() if self._light_mode is None else self._light_mode
+
+    @light_mode.setter
+    def light_mode(self, value: Optional[bool]):
+        self._light_mode = value
+
+    def register(self, name: str, loader: Callable[[], Any], heavy: bool = False,
+                 fork_safe: bool = True, description: str = ''):
+        """Registra (o reemplaza) el loader de un modelo sin cargarlo."""
+        with self._registry_lock:
+            self._specs[name] = ModelSpec(name, loader, heavy, fork_safe, description)
+            self._locks.setdefault(name, threading.Lock())
+            self._stats.setdefault(name, ModelStats())
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._specs
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        """Devuelve el modelo, cargándolo la primera vez; ``None`` si no está disponible."""
+        model = self._models.get(name, _MISSING)
+        if model is not _MISSING:
+            self._stats[name].hits += 1
+            return model
+
+        spec = self._specs.get(name)
+        if spec is None:
+            raise KeyError(f"Modelo NLP no registrado: {name}")
+        if spec.heavy and self.light_mode:
+            self._stats[name].skipped = 'light_mode'
+            return None
+
+        with self._locks[name]:
+            model = self._models.get(name, _MISSING)
+            if model is not _MISSING:
+                return model
+            return self._load(spec)
+
+    def _load(self, spec: ModelSpec) -> Any:
+        stats = self._stats[spec.name]
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        try:
+            model = spec.loader()
+        except Exception as e:
+            # No se reintenta en cada llamada: el error queda en las métricas
+            logger.error(f"Error cargando modelo NLP '{spec.name}': {e}")
+            model = None
+            stats.error = str(e)
+
+        stats.load_seconds = time.perf_counter() - started
+        stats.rss_delta_mb = current_rss_mb() - rss_before
+        stats.loaded = model is not None
+        stats.loaded_at = time.time()
+        stats.pid = os.getpid()
+        self._models[spec.name] = model
+        logger.info(
+            f"Modelo NLP '{spec.name}' {'cargado' if model is not None else 'no disponible'} "
+            f"en {stats.load_seconds:.2f}s (+{stats.rss_delta_mb:.1f} MB RSS, pid {stats.pid})"
+        )
+        return model
+
+    def unload(self, name: Optional[str] = None):
+        """Descarta uno o todos los modelos cargados (se recargan al pedirlos)."""
+        names = [name] if name else list(self._models)
+        for model_name in names:
+            self._models.pop(model_name, None)
+            if model_name in self._stats:
+                self._stats[model_name] = ModelStats()
+        gc.collect()
+
+    def preload(self, names: Optional[Iterable[str]] = None, fork_safe_only: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Carga modelos por adelantado y devuelve sus métricas.
+
+        Con ``fork_safe_only`` se omiten los modelos que no deben cargarse
+        antes de un fork.
+        """
+        for name in (list(names) if names is not None else list(self._specs)):
+            spec = self._specs.get(name)
+            if spec is None:
+                logger.warning(f"Precarga: modelo NLP no registrado '{name}'")
+                continue
+            if fork_safe_only and not spec.fork_safe:
+                self._stats[name].skipped = 'not_fork_safe'
+                continue
+            self.get(name)
+        return self.stats()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas por modelo más la memoria residente actual del proceso."""
+        report = {
+            name: {
+                'heavy': spec.heavy,
+                'fork_safe': spec.fork_safe,
+                'loaded': self._stats[name].loaded,
+                'load_seconds': round(self._stats[name].load_seconds, 3),
+                'rss_delta_mb': round(self._stats[name].rss_delta_mb, 1),
+                'hits': self._stats[name].hits,
+                'pid': self._stats[name].pid,
+                'error': self._stats[name].error,
+                'skipped': self._stats[name].skipped,
+            }
+            for name, spec in self._specs.items()
+        }
+        report['_process'] = {
+            'pid': os.getpid(),
+            'rss_mb': round(current_rss_mb(), 1),
+            'light_mode': self.light_mode,
+        }
+        return report
+
+    def _after_fork_in_child(self):
+        # Un lock tomado por otro hilo en el padre quedaría bloqueado para siempre en el hijo
+        self._registry_lock = threading.Lock()
+        self._locks = {name: threading.Lock() for name in self._specs}
+
+
+model_registry = ModelRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=model_registry._after_fork_in_child)
+
+
+def preload_names_from_env() -> Optional[List[str]]:
+    """Modelos a precargar según ``NLP_PRELOAD_MODELS`` (lista separada por comas)."""
+    value = os.getenv('NLP_PRELOAD_MODELS')
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def preload_for_fork(names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Precarga en el proceso padre (master de Gunicorn, principal de Celery).
+
+    Importa los loaders del NLP, carga los modelos seguros para fork y congela
+    el GC para que los objetos heredados no se copien al recorrerlos.
+    """
+    if not _env_flag('NLP_PRELOAD', 'true'):
+        logger.info("Precarga de modelos NLP desactivada (NLP_PRELOAD=false)")
+        return {}
+    try:
+        # Registra los loaders del procesador NLP
+        import app.ats.chatbot.nlp.nlp  # noqa: F401
+    except Exception as e:
+        logger.error(f"No se pudo importar el módulo NLP para precargar: {e}")
+        return {}
+
+    if names is None:
+        names = preload_names_from_env()
+    if names is None:
+        names = DEFAULT_PRELOAD_MODELS
+    report = model_registry.preload(names, fork_safe_only=True)
+    if hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
+    logger.info(f"Modelos NLP precargados antes de fork: {report}")
+    return report
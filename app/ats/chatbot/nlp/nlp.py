@@ -9,15 +9,17 @@ import json
 import logging
 import asyncio
 import pickle
-from typing import Dict, List, Optional, Any
+from importlib.util import find_spec
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 import datetime
 import hashlib
 import re
 
-# Importaciones de terceros
+# Importaciones de terceros (ligeras). spaCy, TensorFlow y transformers se
+# importan al cargar cada modelo desde el registro compartido
 import numpy as np
-import spacy
-from cachetools import TTLCache
+from cachetools import LRUCache, TTLCache
 from textblob import TextBlob
 from langdetect import detect
 
@@ -28,61 +30,51 @@ try:
 except ImportError:
     TRANSLATOR_AVAILABLE = False
 
-try:
-    import tensorflow as tf
-    import tensorflow_hub as hub
-    import tensorflow_text as text  # Required for SentencepieceOp
-    TF_AVAILABLE = True
-except ImportError:
-    TF_AVAILABLE = False
-    tf = None
-    hub = None
-    text = None
 
-try:
-    from transformers import TFAutoModelForSequenceClassification, AutoTokenizer
-    from tensorflow.keras.optimizers import Adam
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+def _modules_available(*names: str) -> bool:
+    """Comprueba si los paquetes están instalados sin importarlos."""
+    try:
+        return all(find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+
+TF_AVAILABLE = _modules_available('tensorflow', 'tensorflow_hub', 'tensorflow_text')
+TRANSFORMERS_AVAILABLE = _modules_available('transformers', 'tensorflow')
 
 # Importaciones de utilidades
 from app.ats.utils.logger_utils import get_module_logger
+from app.ats.chatbot.nlp.intent_matcher import intent_matcher_registry, PROFILE_NLP
+from app.ats.chatbot.nlp.model_registry import model_registry
+# Catálogos compartidos con el diccionario compilado de habilidades
+from app.ats.utils.skills.skill_dictionary import FILE_PATHS, MAX_SKILLS, load_skills_catalog
 
 # Configuración del logger
 logger = get_module_logger('nlp')
 
-# Log TensorFlow import success
-if TF_AVAILABLE:
-    logger.info(f"TensorFlow {tf.__version__} y TensorFlow Hub importados correctamente.")
-
 # Configuraciones desde settings.py
 USE_EMBEDDINGS = TF_AVAILABLE and os.getenv('USE_EMBEDDINGS', 'true').lower() == 'true'
 USE_ROBERTA = TRANSFORMERS_AVAILABLE and os.getenv('USE_ROBERTA', 'true').lower() == 'true'
-MAX_SKILLS = int(os.getenv('MAX_SKILLS', 10000))
 RAM_LIMIT = 8 * 1024 * 1024 * 1024  # 8 GB
-EMBEDDINGS_CACHE = "/home/pablo/skills_data/embeddings_cache.pkl"
+EMBEDDINGS_CACHE = os.getenv('NLP_EMBEDDINGS_CACHE', "/home/pablo/skills_data/embeddings_cache.pkl")
 EMBEDDINGS_READY = os.path.exists(EMBEDDINGS_CACHE)
+USE_MODEL_URL = "https://tfhub.dev/google/universal-sentence-encoder-multilingual/3"
+ROBERTA_MODEL_NAME = "pysentimiento/robertuito-sentiment-analysis"
+SPACY_MODELS = {"es": "es_core_news_md", "en": "en_core_web_md"}
+# Tamaño de mini-lote para las APIs batch (nlp.pipe y RoBERTa)
+NLP_BATCH_SIZE = int(os.getenv('NLP_BATCH_SIZE', 32))
+# Textos que se agrupan antes de ordenarlos por longitud (múltiplo del lote)
+BATCH_WINDOW_FACTOR = 8
+# Entradas máximas de cada caché por instancia (intent, sentimiento, entidades, embeddings)
+RESULT_CACHE_SIZE = int(os.getenv('NLP_RESULT_CACHE_SIZE', 10000))
+ROBERTA_LABELS = ['NEG', 'NEU', 'POS']
 
 # Constantes
-FILE_PATHS = {
-    "candidate_quick": "/home/pablo/skills_data/skill_db_relax_20.json",
-    "candidate_deep": "/home/pablo/skills_data/ESCO_occup_skills.json",
-    "opportunity_quick": "/home/pablo/app/utilidades/catalogs/skills.json",
-    "opportunity_deep": "/home/pablo/skills_data/ESCO_occup_skills.json",
-}
 LOCK_FILE = "/home/pablo/skills_data/nlp_init.lock"
 
 # Cachés
 translation_cache = TTLCache(maxsize=1000, ttl=3600)
 embeddings_cache = TTLCache(maxsize=1000, ttl=3600)
-skill_embeddings_cache = None
-
-# Modelos globales
-nlp_spacy = None
-use_model = None
-roberta_model = None
-roberta_tokenizer = None
 
 def initialize_tensorflow():
     """Configura TensorFlow para evitar conflictos."""
@@ -90,87 +82,93 @@ def initialize_tensorflow():
         logger.warning("TensorFlow no disponible, omitiendo inicialización.")
         return
     try:
+        import tensorflow as tf
         tf.config.set_soft_device_placement(True)
         tf.config.threading.set_intra_op_parallelism_threads(1)
         tf.config.threading.set_inter_op_parallelism_threads(1)
         os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
         os.environ['CUDA_VISIBLE_DEVICES'] = ''  # Disable GPU
-        logger.info("TensorFlow configurado con soft placement y hilos mínimos (CPU-only).")
+        logger.info(f"TensorFlow {tf.__version__} configurado con soft placement y hilos mínimos (CPU-only).")
     except Exception as e:
         logger.error(f"Error inicializando TensorFlow: {str(e)}")
 
+# Loaders del registro de modelos (se ejecutan una vez por proceso) ---------
+
+def _load_spacy(language: str):
+    import spacy
+    model_name = SPACY_MODELS.get(language, SPACY_MODELS["en"])
+    # El parser no se usa; NER sí (extracción de entidades)
+    model = spacy.load(model_name, disable=["parser"])
+    logger.info(f"Modelo spaCy '{model_name}' cargado.")
+    return model
+
+def _load_use():
+    if not USE_EMBEDDINGS:
+        return None
+    initialize_tensorflow()
+    import tensorflow_hub as hub
+    import tensorflow_text  # noqa: F401  Required for SentencepieceOp
+    model = hub.load(USE_MODEL_URL)
+    logger.info("Modelo USE multilingüe cargado.")
+    return model
+
+def _load_roberta():
+    if not USE_ROBERTA:
+        return None
+    initialize_tensorflow()
+    import tensorflow as tf
+    from transformers import TFAutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(ROBERTA_MODEL_NAME)
+    # Cargar el modelo con soporte para TensorFlow
+    model = TFAutoModelForSequenceClassification.from_pretrained(
+        ROBERTA_MODEL_NAME,
+        from_pt=True  # Convertir automáticamente los pesos de PyTorch a TensorFlow
+    )
+
+    # Compilar el modelo
+    optimizer = tf.keras.optimizers.Adam(learning_rate=2e-5, epsilon=1e-8)
+    loss = tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True)
+    model.compile(optimizer=optimizer, loss=loss, metrics=['accuracy'])
+    logger.info("Modelo RoBERTa cargado exitosamente con TensorFlow.")
+    return model, tokenizer
+
+def _load_embeddings_file():
+    if not os.path.exists(EMBEDDINGS_CACHE):
+        logger.warning(f"No existe el caché de embeddings {EMBEDDINGS_CACHE}")
+        return {}
+    with open(EMBEDDINGS_CACHE, "rb") as f:
+        return pickle.load(f)
+
+model_registry.register('spacy_es', lambda: _load_spacy('es'), description=SPACY_MODELS['es'])
+model_registry.register('spacy_en', lambda: _load_spacy('en'), description=SPACY_MODELS['en'])
+model_registry.register('use', _load_use, heavy=True, fork_safe=False, description=USE_MODEL_URL)
+model_registry.register('roberta', _load_roberta, heavy=True, fork_safe=False, description=ROBERTA_MODEL_NAME)
+model_registry.register('skill_embeddings', _load_embeddings_file, description=EMBEDDINGS_CACHE)
+
+# API de carga (compatible con los llamadores existentes) -------------------
+
 def load_spacy_model(language: str = "es"):
-    """Carga el modelo spaCy de manera lazy."""
-    global nlp_spacy
-    if nlp_spacy is None:
-        model_name = "es_core_news_md" if language == "es" else "en_core_web_md"
-        try:
-            nlp_spacy = spacy.load(model_name, disable=["ner", "parser"])
-            logger.info(f"Modelo spaCy '{model_name}' cargado.")
-        except Exception as e:
-            logger.error(f"Error cargando spaCy: {str(e)}")
-            nlp_spacy = None
-    return nlp_spacy
+    """Modelo spaCy compartido del proceso; se carga al primer uso."""
+    return model_registry.get('spacy_es' if language == 'es' else 'spacy_en')
 
 def load_use_model():
-    """Carga el modelo USE de manera lazy."""
-    global use_model
-    if use_model is None and USE_EMBEDDINGS and TF_AVAILABLE:
-        try:
-            model_path = "https://tfhub.dev/google/universal-sentence-encoder-multilingual/3"
-            use_model = hub.load(model_path)
-            logger.info("Modelo USE multilingüe cargado.")
-        except Exception as e:
-            logger.error(f"Error cargando USE: {str(e)}")
-            use_model = None
-    return use_model
+    """Modelo USE compartido del proceso (None si no está disponible o en modo ligero)."""
+    return model_registry.get('use')
 
 def load_roberta_model():
-    """Carga el modelo RoBERTa para análisis de sentimiento usando TensorFlow."""
-    global roberta_model, roberta_tokenizer
-    if not TRANSFORMERS_AVAILABLE or roberta_model is not None:
-        return
-    
-    try:
-        model_name = "pysentimiento/robertuito-sentiment-analysis"
-        roberta_tokenizer = AutoTokenizer.from_pretrained(model_name)
-        
-        # Cargar el modelo con soporte para TensorFlow
-        roberta_model = TFAutoModelForSequenceClassification.from_pretrained(
-            model_name, 
-            from_pt=True  # Convertir automáticamente los pesos de PyTorch a TensorFlow
-        )
-        
-        # Compilar el modelo
-        optimizer = tf.keras.optimizers.Adam(learning_rate=2e-5, epsilon=1e-8)
-        loss = tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True)
-        metrics = ['accuracy']
-        
-        roberta_model.compile(optimizer=optimizer, loss=loss, metrics=metrics)
-        logger.info("Modelo RoBERTa cargado exitosamente con TensorFlow.")
-    except Exception as e:
-        logger.error(f"Error cargando el modelo RoBERTa: {str(e)}")
-        roberta_model = None
-        roberta_tokenizer = None
-    return roberta_model, roberta_tokenizer
+    """Modelo y tokenizador RoBERTa compartidos; ``(None, None)`` si no están disponibles."""
+    loaded = model_registry.get('roberta')
+    return loaded if loaded else (None, None)
 
 def load_skill_embeddings(catalog_key: str) -> Dict[str, np.ndarray]:
-    """Carga embeddings pre-generados desde caché."""
-    global skill_embeddings_cache
-    if skill_embeddings_cache is None and EMBEDDINGS_READY:
-        try:
-            with open(EMBEDDINGS_CACHE, "rb") as f:
-                cached_data = pickle.load(f)
-            if cached_data.get("version") == "1.0" and catalog_key in cached_data.get("catalogs", []):
-                skill_embeddings_cache = cached_data.get("embeddings", {})
-                logger.info(f"Embeddings pre-generados cargados para {catalog_key} desde {EMBEDDINGS_CACHE}")
-            else:
-                logger.warning(f"Caché de embeddings inválido o no contiene {catalog_key}")
-                skill_embeddings_cache = {}
-        except Exception as e:
-            logger.error(f"Error cargando embeddings desde {EMBEDDINGS_CACHE}: {str(e)}")
-            skill_embeddings_cache = {}
-    return skill_embeddings_cache or {}
+    """Embeddings pre-generados del catálogo, desde el pickle compartido."""
+    cached_data = model_registry.get('skill_embeddings') or {}
+    if cached_data.get("version") == "1.0" and catalog_key in cached_data.get("catalogs", []):
+        return cached_data.get("embeddings", {})
+    if cached_data:
+        logger.debug(f"Caché de embeddings inválido o no contiene {catalog_key}")
+    return {}
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """Calcula la similitud coseno entre dos vectores."""
@@ -180,95 +178,6 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
         return 0.0
     return np.dot(a, b) / (norm_a * norm_b)
 
-def load_skills_catalog(mode: str, analysis_depth: str) -> Dict[str, List[Dict[str, str]]]:
-    """Carga un catálogo de habilidades según el modo y nivel de procesamiento."""
-    catalog = {"technical": [], "soft": [], "tools": [], "certifications": []}
-    key = f"{mode}_{analysis_depth}"
-    file_path = FILE_PATHS.get(key)
-
-    if not file_path or not os.path.exists(file_path):
-        logger.error(f"Archivo no encontrado: {file_path}. Usando catálogo vacío.")
-        return catalog
-
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if key == "candidate_quick":
-                type_mapping = {
-                    "Hard Skill": "technical",
-                    "Soft Skill": "soft",
-                    "Tool": "tools",
-                    "Certification": "certifications"
-                }
-                for skill_id, skill_data in data.items():
-                    skill_type = skill_data.get("skill_type", "Hard Skill")
-                    category = type_mapping.get(skill_type, "technical")
-                    skill_cleaned = skill_data.get("skill_cleaned", skill_data.get("skill_name", "")).lower()
-                    if skill_cleaned:
-                        catalog[category].append({"original": skill_cleaned})
-            elif key == "candidate_deep":
-                skill_count = 0
-                for _, occ_data in data.items():
-                    for skill_field in ["hasEssentialSkill", "hasOptionalSkill"]:
-                        for skill in occ_data.get(skill_field, []):
-                            skill_name = skill.get("title", "").lower()
-                            if skill_name:
-                                if "certificación" in skill_name or "certificado" in skill_name:
-                                    category = "certifications"
-                                elif "herramienta" in skill_name or "tool" in skill_name:
-                                    category = "tools"
-                                elif "blanda" in skill_name or "soft" in skill_name:
-                                    category = "soft"
-                                else:
-                                    category = "technical"
-                                catalog[category].append({"original": skill_name})
-                                skill_count += 1
-                                if skill_count >= MAX_SKILLS:
-                                    break
-                    if skill_count >= MAX_SKILLS:
-                        break
-            elif key == "opportunity_quick":
-                for role_group, roles in data.items():
-                    for role, categories in roles.items():
-                        for category, skills in categories.items():
-                            target_category = {
-                                "Habilidades Técnicas": "technical",
-                                "Habilidades Blandas": "soft",
-                                "Herramientas": "tools",
-                                "Certificaciones": "certifications"
-                            }.get(category, "technical")
-                            for skill in skills:
-                                catalog[target_category].append({"original": skill.lower(), "role": role})
-            elif key == "opportunity_deep":
-                skill_count = 0
-                for _, occ_data in data.items():
-                    role = occ_data.get("preferredLabel", {}).get("es", "").lower()
-                    for skill_field in ["hasEssentialSkill", "hasOptionalSkill"]:
-                        for skill in occ_data.get(skill_field, []):
-                            skill_name = skill.get("title", "").lower()
-                            if skill_name:
-                                if "certificación" in skill_name or "certificado" in skill_name:
-                                    category = "certifications"
-                                elif "herramienta" in skill_name or "tool" in skill_name:
-                                    category = "tools"
-                                elif "blanda" in skill_name or "soft" in skill_name:
-                                    category = "soft"
-                                else:
-                                    category = "technical"
-                                catalog[category].append({"original": skill_name, "role": role})
-                                skill_count += 1
-                                if skill_count >= MAX_SKILLS:
-                                    break
-                    if skill_count >= MAX_SKILLS:
-                        break
-            total_skills = sum(len(v) for v in catalog.values())
-            logger.info(f"Cargadas {total_skills} habilidades desde {file_path} ({key})")
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parseando JSON en {file_path}: {str(e)}. Usando catálogo vacío.")
-    except Exception as e:
-        logger.error(f"Error cargando {file_path}: {str(e)}. Usando catálogo vacío.")
-    return catalog
-
 class NLPProcessor:
     """
     Motor de procesamiento de lenguaje natural optimizado para Grupo huntRED®.
@@ -303,10 +212,11 @@ class NLPProcessor:
         self.user_preferences = {}
         self.intent_history = []
         
-        # Cache inteligente
-        self.embedding_cache = {}
-        self.intent_cache = {}
-        self.sentiment_cache = {}
+        # Cache inteligente (LRU acotado: los trabajos batch recorren miles de textos)
+        self.embedding_cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
+        self.intent_cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
+        self.sentiment_cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
+        self.entity_cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
         
         # Métricas de performance
         self.performance_metrics = {
@@ -317,20 +227,30 @@ class NLPProcessor:
         }
     
     def _initialize_models(self):
-        """Inicializa modelos con optimizaciones"""
-        try:
-            # Cargar modelos de manera lazy
-            self.nlp = load_spacy_model(self.language)
-            self.use_model = load_use_model()
-            self.roberta_model, self.roberta_tokenizer = load_roberta_model()
-            
-            # Cargar embeddings pre-generados
-            self.skill_embeddings = load_skill_embeddings(f"{self.mode}_{self.analysis_depth}")
-            
-            logger.info(f"NLP Processor inicializado: {self.mode}, {self.language}, {self.analysis_depth}")
-            
-        except Exception as e:
-            logger.error(f"Error inicializando modelos NLP: {str(e)}")
+        """Los modelos se resuelven del registro compartido al primer uso."""
+        logger.info(f"NLP Processor inicializado: {self.mode}, {self.language}, {self.analysis_depth}")
+
+    # Modelos compartidos por proceso (ver model_registry) ------------------
+
+    @property
+    def nlp(self):
+        return load_spacy_model(self.language)
+
+    @property
+    def use_model(self):
+        return load_use_model()
+
+    @property
+    def roberta_model(self):
+        return load_roberta_model()[0]
+
+    @property
+    def roberta_tokenizer(self):
+        return load_roberta_model()[1]
+
+    @property
+    def skill_embeddings(self) -> Dict[str, np.ndarray]:
+        return load_skill_embeddings(f"{self.mode}_{self.analysis_depth}")
     
     async def preprocess(self, text: str) -> Dict[str, str]:
         """
@@ -495,28 +415,17 @@ class NLPProcessor:
         """Análisis de sentimientos en tiempo real"""
         try:
             # Cache de sentimientos
-            text_hash = hashlib.md5(text.encode()).hexdigest()
+            text_hash = self._text_hash(text)
             if text_hash in self.sentiment_cache:
                 return self.sentiment_cache[text_hash]
             
-            # Análisis con TextBlob
-            blob = TextBlob(text)
-            sentiment_score = blob.sentiment.polarity
-            
             # Análisis con RoBERTa si está disponible
             roberta_sentiment = None
             if self.roberta_model and self.roberta_tokenizer:
                 roberta_sentiment = await self._analyze_sentiment_roberta(text)
             
-            # Combinar resultados
-            sentiment_result = {
-                'textblob_score': sentiment_score,
-                'roberta_sentiment': roberta_sentiment,
-                'overall_sentiment': self._combine_sentiment_scores(sentiment_score, roberta_sentiment),
-                'confidence': 0.85
-            }
-            
             # Cachear resultado
+            sentiment_result = self._build_sentiment_result(text, roberta_sentiment)
             self.sentiment_cache[text_hash] = sentiment_result
             
             return sentiment_result
@@ -525,34 +434,42 @@ class NLPProcessor:
             logger.error(f"Error en análisis de sentimientos: {str(e)}")
             return {'overall_sentiment': 'neutral', 'confidence': 0.5}
     
+    def _build_sentiment_result(self, text: str, roberta_sentiment: Optional[str]) -> Dict[str, Any]:
+        """Combina TextBlob con la etiqueta de RoBERTa (si la hay)."""
+        sentiment_score = TextBlob(text).sentiment.polarity
+        return {
+            'textblob_score': sentiment_score,
+            'roberta_sentiment': roberta_sentiment,
+            'overall_sentiment': self._combine_sentiment_scores(sentiment_score, roberta_sentiment),
+            'confidence': 0.85
+        }
+    
     async def _analyze_sentiment_roberta(self, text: str) -> Optional[str]:
         """Análisis de sentimientos con RoBERTa"""
         try:
             if not self.roberta_model or not self.roberta_tokenizer:
                 return None
-            
-            # Tokenizar texto
-            inputs = self.roberta_tokenizer(
-                text, 
-                return_tensors="tf", 
-                truncation=True, 
-                max_length=512
-            )
-            
-            # Predicción
-            outputs = self.roberta_model(inputs)
-            predictions = tf.nn.softmax(outputs.logits, axis=-1)
-            
-            # Obtener sentimiento
-            sentiment_labels = ['NEG', 'NEU', 'POS']
-            predicted_class = tf.argmax(predictions, axis=-1).numpy()[0]
-            
-            return sentiment_labels[predicted_class]
+            return self._roberta_labels([text])[0]
             
         except Exception as e:
             logger.error(f"Error en análisis RoBERTa: {str(e)}")
             return None
     
+    def _roberta_labels(self, texts: List[str]) -> List[str]:
+        """Etiquetas RoBERTa de un mini-lote, con padding al texto más largo."""
+        import tensorflow as tf
+        
+        inputs = self.roberta_tokenizer(
+            texts,
+            return_tensors="tf",
+            padding=True,
+            truncation=True,
+            max_length=512
+        )
+        outputs = self.roberta_model(inputs)
+        predicted = tf.argmax(outputs.logits, axis=-1).numpy()
+        return [ROBERTA_LABELS[index] for index in predicted]
+    
     def _combine_sentiment_scores(self, textblob_score: float, roberta_sentiment: Optional[str]) -> str:
         """Combina scores de sentimientos de diferentes modelos"""
         try:
@@ -586,23 +503,132 @@ class NLPProcessor:
             if not self.nlp:
                 return []
             
-            doc = self.nlp(text)
-            entities = []
-            
-            for ent in doc.ents:
-                entities.append({
-                    'text': ent.text,
-                    'label': ent.label_,
-                    'start': ent.start_char,
-                    'end': ent.end_char
-                })
-            
-            return entities
+            return self._doc_entities(self.nlp(text))
             
         except Exception as e:
             logger.error(f"Error extrayendo entidades: {str(e)}")
             return []
     
+    @staticmethod
+    def _doc_entities(doc) -> List[Dict[str, Any]]:
+        return [
+            {
+                'text': ent.text,
+                'label': ent.label_,
+                'start': ent.start_char,
+                'end': ent.end_char
+            }
+            for ent in doc.ents
+        ]
+    
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        return hashlib.md5(text.encode()).hexdigest()
+    
+    # APIs batch para trabajos offline ---------------------------------------
+    
+    def iter_sentiments(self, texts: Iterable[str], batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Sentimiento de una lista o flujo de textos, en el orden de entrada.
+        
+        Los textos repetidos o ya cacheados se resuelven con ``sentiment_cache``;
+        el resto pasa por RoBERTa en mini-lotes de ``batch_size`` ordenados por
+        longitud para minimizar el padding.
+        """
+        batch_size = batch_size or NLP_BATCH_SIZE
+        use_roberta = bool(self.roberta_model and self.roberta_tokenizer)
+        
+        for window in self._windows(texts, batch_size):
+            pending = self._pending_texts(window, self.sentiment_cache)
+            results = self._cached_results(window, pending, self.sentiment_cache)
+            labels: Dict[str, Optional[str]] = {}
+            if use_roberta and pending:
+                ordered = sorted(pending.values(), key=len)
+                for start in range(0, len(ordered), batch_size):
+                    chunk = ordered[start:start + batch_size]
+                    try:
+                        labels.update(zip(chunk, self._roberta_labels(chunk)))
+                    except Exception as e:
+                        logger.error(f"Error en lote RoBERTa ({len(chunk)} textos): {str(e)}")
+            
+            for text_hash, text in pending.items():
+                try:
+                    results[text_hash] = self._build_sentiment_result(text, labels.get(text))
+                except Exception as e:
+                    logger.error(f"Error en análisis de sentimientos: {str(e)}")
+                    results[text_hash] = {'overall_sentiment': 'neutral', 'confidence': 0.5}
+                self.sentiment_cache[text_hash] = results[text_hash]
+            
+            for text_hash, _ in window:
+                yield results[text_hash]
+    
+    def iter_entities(self, texts: Iterable[str], batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Entidades de una lista o flujo de textos, en el orden de entrada.
+        
+        Usa ``nlp.pipe`` sobre los textos únicos no cacheados de cada ventana.
+        """
+        batch_size = batch_size or NLP_BATCH_SIZE
+        nlp = self.nlp
+        
+        for window in self._windows(texts, batch_size):
+            pending = self._pending_texts(window, self.entity_cache)
+            results = self._cached_results(window, pending, self.entity_cache)
+            if pending:
+                if nlp is None:
+                    docs_entities = [[] for _ in pending]
+                else:
+                    try:
+                        docs_entities = [
+                            self._doc_entities(doc)
+                            for doc in nlp.pipe(pending.values(), batch_size=batch_size)
+                        ]
+                    except Exception as e:
+                        logger.error(f"Error extrayendo entidades en lote: {str(e)}")
+                        docs_entities = [[] for _ in pending]
+                results.update(zip(pending, docs_entities))
+                self.entity_cache.update(zip(pending, docs_entities))
+            
+            for text_hash, _ in window:
+                yield results[text_hash]
+    
+    async def analyze_sentiment_batch(self, texts: Iterable[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Versión batch de ``_analyze_sentiment_realtime`` (resultados en orden)."""
+        return list(self.iter_sentiments(texts, batch_size))
+    
+    async def extract_entities_batch(self, texts: Iterable[str], batch_size: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Versión batch de ``_extract_entities`` (resultados en orden)."""
+        return list(self.iter_entities(texts, batch_size))
+    
+    def _windows(self, texts: Iterable[str], batch_size: int) -> Iterator[List[tuple]]:
+        """Parte el flujo en ventanas de ``(hash, texto)`` sin materializarlo completo."""
+        iterator = iter(texts)
+        window_size = batch_size * BATCH_WINDOW_FACTOR
+        while True:
+            window = [(self._text_hash(text), text) for text in (t or "" for t in islice(iterator, window_size))]
+            if not window:
+                return
+            self.performance_metrics['total_requests'] += len(window)
+            yield window
+    
+    def _pending_texts(self, window: List[tuple], cache: Dict[str, Any]) -> Dict[str, str]:
+        """Textos únicos de la ventana que no están en caché (hash -> texto)."""
+        pending: Dict[str, str] = {}
+        for text_hash, text in window:
+            if text_hash in cache or text_hash in pending:
+                self.performance_metrics['cache_hits'] += 1
+            else:
+                pending[text_hash] = text
+        return pending
+    
+    @staticmethod
+    def _cached_results(window: List[tuple], pending: Dict[str, str], cache: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resultados ya cacheados de la ventana. Se copian antes de calcular los
+        pendientes porque el LRU puede desalojarlos en la misma ventana.
+        """
+        return {text_hash: cache[text_hash] for text_hash, _ in window if text_hash not in pending}
+    
     async def detect_intent(self, text: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Detección de intents mejorada con contexto persistente.
@@ -663,61 +689,17 @@ class NLPProcessor:
     async def _detect_intent_patterns(self, text: str) -> Dict[str, Any]:
         """Detección de intents con patrones mejorados"""
         try:
-            # Patrones de intents específicos para huntRED
-            intent_patterns = {
-                'greeting': [
-                    r'\b(hola|buenos días|buenas tardes|buenas noches|saludos)\b',
-                    r'\b(hi|hello|good morning|good afternoon|good evening)\b'
-                ],
-                'farewell': [
-                    r'\b(adiós|hasta luego|nos vemos|chao|bye)\b',
-                    r'\b(goodbye|see you|take care)\b'
-                ],
-                'assessment_request': [
-                    r'\b(evaluación|assessment|prueba|test|evaluar)\b',
-                    r'\b(assessment|evaluation|test|quiz)\b'
-                ],
-                'profile_update': [
-                    r'\b(actualizar|modificar|cambiar|editar)\s+(perfil|información|datos)\b',
-                    r'\b(update|modify|change|edit)\s+(profile|information|data)\b'
-                ],
-                'job_search': [
-                    r'\b(buscar|encontrar|empleo|trabajo|vacante|oportunidad)\b',
-                    r'\b(search|find|job|work|vacancy|opportunity)\b'
-                ],
-                'salary_calculation': [
-                    r'\b(calcular|salario|sueldo|bruto|neto)\b',
-                    r'\b(calculate|salary|wage|gross|net)\b'
-                ],
-                'interview_schedule': [
-                    r'\b(entrevista|agendar|programar|cita)\b',
-                    r'\b(interview|schedule|appointment|meeting)\b'
-                ],
-                'support_request': [
-                    r'\b(ayuda|soporte|problema|error|duda)\b',
-                    r'\b(help|support|problem|error|question)\b'
-                ]
-            }
+            # Patrones compilados una sola vez (ver intent_matcher.NLP_INTENT_PATTERNS)
+            matcher = await intent_matcher_registry.aget("default", PROFILE_NLP)
+            best_intent = matcher.best(text)
             
-            # Detectar intents
-            detected_intents = []
-            for intent, patterns in intent_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        detected_intents.append({
-                            'intent': intent,
-                            'confidence': 0.8,
-                            'pattern_matched': pattern
-                        })
-            
-            # Retornar el intent con mayor confianza
-            if detected_intents:
-                best_intent = max(detected_intents, key=lambda x: x['confidence'])
+            # Retornar el intent de mayor prioridad
+            if best_intent:
                 return {
-                    'intent': best_intent['intent'],
-                    'confidence': best_intent['confidence'],
+                    'intent': best_intent.intent,
+                    'confidence': 0.8,
                     'entities': [],
-                    'pattern_matched': best_intent['pattern_matched']
+                    'pattern_matched': best_intent.pattern
                 }
             
             # Intent por defecto
@@ -780,7 +762,8 @@ class NLPProcessor:
                 'conversation_contexts': len(self.conversation_context),
                 'embedding_cache_size': len(self.embedding_cache),
                 'intent_cache_size': len(self.intent_cache),
-                'sentiment_cache_size': len(self.sentiment_cache)
+                'sentiment_cache_size': len(self.sentiment_cache),
+                'entity_cache_size': len(self.entity_cache)
             }
             
         except Exception as e:
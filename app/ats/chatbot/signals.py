@@ -0,0 +1,24 @@
+# /home/pablo/app/ats/chatbot/signals.py
+"""
+Señales del chatbot que mantienen sincronizados los índices en memoria.
+
+Cuando cambia una fila de ``IntentPattern`` se invalida el matcher de intents
+compilado y se publica una nueva versión para el resto de procesos.
+"""
+
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from app.models import IntentPattern
+from app.ats.chatbot.nlp.intent_matcher import intent_matcher_registry
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=IntentPattern)
+@receiver(post_delete, sender=IntentPattern)
+def invalidate_intent_matchers(sender, instance, **kwargs):
+    """Recompila los matchers de intents tras cambios en IntentPattern."""
+    intent_matcher_registry.invalidate()
+    logger.info(f"Matchers de intents invalidados por cambio en IntentPattern '{instance}'")
@@ -26,13 +26,17 @@ from app.ats.integrations.channels.whatsapp import WhatsAppService
 from app.ats.analytics.market_analyzer import MarketAnalyzer
 from app.ats.analytics.competitor_analyzer import CompetitorAnalyzer
 from app.ats.ml.recommendation_engine import RecommendationEngine
-from app.ats.utils.cache import cache_result
+from app.ats.dashboard.panel_cache import dashboard_panel
+from app.ats.dashboard import rollups
 from app.aura.engine import AuraEngine  # Integración con AURA
 from app.aura.insights import AuraInsights  # Insights de AURA
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Los paneles se cachean por consultor y unidad de negocio
+PANEL_SCOPE = ('consultant_id', 'business_unit')
+
 class ConsultantDashboard:
     """
     Dashboard consolidado para consultores con todas las funcionalidades.
@@ -255,7 +259,7 @@ class ConsultantDashboard:
     # NUEVAS FUNCIONALIDADES (Métricas y Analytics Avanzados)
     # ============================================================================
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300, scope=PANEL_SCOPE)  # 5 minutos
     async def get_dashboard_data(self) -> Dict[str, Any]:
         """Obtiene todos los datos del dashboard del consultor."""
         return {
@@ -296,7 +300,7 @@ class ConsultantDashboard:
             logger.error(f"Error obteniendo datos de gestión de candidatos: {str(e)}")
             return {}
     
-    @cache_result(ttl=600)  # 10 minutos
+    @dashboard_panel(ttl=600, scope=PANEL_SCOPE)  # 10 minutos
     async def get_performance_metrics(self) -> Dict[str, Any]:
         """Métricas de rendimiento del consultor."""
         now = timezone.now()
@@ -349,7 +353,7 @@ class ConsultantDashboard:
             )
         }
     
-    @cache_result(ttl=1800)  # 30 minutos
+    @dashboard_panel(ttl=1800, scope=PANEL_SCOPE)  # 30 minutos
     async def get_market_insights(self) -> Dict[str, Any]:
         """Insights de mercado en tiempo real."""
         # Análisis de mercado por industria
@@ -372,7 +376,7 @@ class ConsultantDashboard:
             'market_score': self._calculate_market_score(industry_insights, demand_trends)
         }
     
-    @cache_result(ttl=900)  # 15 minutos
+    @dashboard_panel(ttl=900, scope=PANEL_SCOPE)  # 15 minutos
     async def get_productivity_analytics(self) -> Dict[str, Any]:
         """Análisis de productividad del consultor."""
         now = timezone.now()
@@ -404,7 +408,7 @@ class ConsultantDashboard:
             )
         }
     
-    @cache_result(ttl=3600)  # 1 hora
+    @dashboard_panel(ttl=3600, scope=PANEL_SCOPE)  # 1 hora
     async def get_competitor_analysis(self) -> Dict[str, Any]:
         """Análisis de competencia."""
         # Análisis de competidores directos
@@ -427,7 +431,7 @@ class ConsultantDashboard:
             'threat_level': self._calculate_threat_level(direct_competitors, pricing_analysis)
         }
     
-    @cache_result(ttl=1200)  # 20 minutos
+    @dashboard_panel(ttl=1200, scope=PANEL_SCOPE)  # 20 minutos
     async def get_recommendations(self) -> List[Dict[str, Any]]:
         """Recomendaciones inteligentes para el consultor."""
         recommendations = []
@@ -475,7 +479,7 @@ class ConsultantDashboard:
         
         return recommendations
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300, scope=PANEL_SCOPE)  # 5 minutos
     async def get_recent_activities(self) -> List[Dict[str, Any]]:
         """Actividades recientes del consultor."""
         now = timezone.now()
@@ -535,7 +539,7 @@ class ConsultantDashboard:
         activities.sort(key=lambda x: x['timestamp'], reverse=True)
         return activities[:10]
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300, scope=PANEL_SCOPE)  # 5 minutos
     async def get_upcoming_tasks(self) -> List[Dict[str, Any]]:
         """Tareas próximas del consultor."""
         now = timezone.now()
@@ -596,13 +600,53 @@ class ConsultantDashboard:
         }
     
     async def _get_performance_trends(self) -> Dict[str, Any]:
-        """Tendencias de rendimiento."""
-        # Implementar análisis de tendencias
+        """
+        Tendencias de rendimiento: últimos 30 días contra los 30 anteriores.
+
+        Se leen de los rollups del dashboard. Aplicaciones, contrataciones y
+        pagos no tienen consultor asignado, así que se miden en su unidad de
+        negocio; la satisfacción de clientes sí es del consultor.
+        """
+        now = timezone.now()
+        current_start = rollups.period_start(now - timedelta(days=30), rollups.DAY)
+        previous_start = current_start - timedelta(days=30)
+        bu_dims = rollups.dimension_filters(self.business_unit)
+        consultant_dims = rollups.dimension_filters(consultant=self.consultant_id)
+        metrics = ('applications', 'hires', 'payments')
+
+        current = await sync_to_async(rollups.totals)(metrics, current_start, now, **bu_dims)
+        previous = await sync_to_async(rollups.totals)(metrics, previous_start, current_start, **bu_dims)
+        satisfaction_current = await sync_to_async(rollups.totals)(
+            ('satisfaction',), current_start, now, **consultant_dims
+        )
+        satisfaction_previous = await sync_to_async(rollups.totals)(
+            ('satisfaction',), previous_start, current_start, **consultant_dims
+        )
+
+        def ratio(numerator, denominator):
+            return float(numerator) / denominator if denominator else 0.0
+
+        def direction(current_value, previous_value):
+            if current_value > previous_value:
+                return 'up'
+            return 'down' if current_value < previous_value else 'stable'
+
+        applications = (current['applications']['count'], previous['applications']['count'])
         return {
-            'conversion_trend': 'up',
-            'time_to_hire_trend': 'down',
-            'revenue_trend': 'up',
-            'growth_rate': 12.5
+            'conversion_trend': direction(
+                ratio(current['hires']['count'], applications[0]),
+                ratio(previous['hires']['count'], applications[1])
+            ),
+            'time_to_hire_trend': direction(
+                ratio(current['hires']['amount'], current['hires']['count']),
+                ratio(previous['hires']['amount'], previous['hires']['count'])
+            ),
+            'revenue_trend': direction(current['payments']['amount'], previous['payments']['amount']),
+            'satisfaction_trend': direction(
+                ratio(satisfaction_current['satisfaction']['amount'], satisfaction_current['satisfaction']['count']),
+                ratio(satisfaction_previous['satisfaction']['amount'], satisfaction_previous['satisfaction']['count'])
+            ),
+            'growth_rate': round((applications[0] - applications[1]) / applications[1] * 100, 1) if applications[1] else 0.0
         }
     
     async def _get_daily_activities(self, since_date: datetime) -> List[Dict[str, Any]]:
@@ -693,7 +737,7 @@ class ConsultantDashboard:
         # Implementar lógica de amenaza
         return 'medium'
     
-    @cache_result(ttl=1800)  # 30 minutos
+    @dashboard_panel(ttl=1800, scope=PANEL_SCOPE)  # 30 minutos
     async def get_aura_insights(self) -> Dict[str, Any]:
         """Obtiene insights avanzados de AURA para el consultor."""
         try:
@@ -728,7 +772,7 @@ class ConsultantDashboard:
             logger.error(f"Error obteniendo insights de AURA: {str(e)}")
             return {}
     
-    @cache_result(ttl=3600)  # 1 hora
+    @dashboard_panel(ttl=3600, scope=PANEL_SCOPE)  # 1 hora
     async def get_predictive_analytics(self) -> Dict[str, Any]:
         """Obtiene analytics predictivos usando AURA."""
         try:
@@ -0,0 +1,231 @@
+# app/ats/dashboard/panel_cache.py
+"""
+Memoización de paneles de dashboard (métodos async).
+
+``@dashboard_panel(ttl=...)`` guarda el resultado del panel en la caché de
+dos niveles (``tiered_cache``) con la clave formada por la clase, el método,
+los atributos de alcance de la instancia (BU, usuario, consultor...) y los
+argumentos de la llamada (filtros).
+
+Protección contra estampidas:
+
+- Mientras el valor está fresco (``ttl``) se sirve desde caché.
+- Durante ``stale_ttl`` adicional se sirve el valor anterior y un solo
+  proceso lo recalcula en segundo plano (stale-while-revalidate).
+- Sin valor, sólo quien obtiene el lock distribuido (``cache.add``) calcula;
+  los demás esperan a que aparezca el resultado.
+
+Así, 50 administradores abriendo el dashboard a la vez provocan un solo
+recálculo por panel. ``warm_panels`` recalcula todos los paneles de una clase
+y se ejecuta periódicamente desde Celery beat.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from django.core.cache import cache
+
+from app.ats.utils.tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+PANEL_NAMESPACE = 'dashboard_panels'
+DEFAULT_STALE_TTL = 600
+LOCK_TIMEOUT = 120
+WAIT_INTERVAL = 0.1
+
+panel_stats: Counter = Counter()
+_background_refreshes = set()
+
+
+@dataclass(frozen=True)
+class PanelSpec:
+    ttl: int
+    stale_ttl: int
+    scope: Sequence[str]
+
+
+def _namespace():
+    return tiered_cache.namespace(PANEL_NAMESPACE, ttl=DEFAULT_STALE_TTL, serializer='pickle')
+
+
+def _key_part(value: Any) -> str:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if hasattr(value, 'pk'):
+        return f"{type(value).__name__}:{value.pk}"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(map(_key_part, value)) if isinstance(value, (set, frozenset)) else map(_key_part, value)
+        return f"[{','.join(items)}]"
+    if isinstance(value, dict):
+        return json.dumps({str(k): _key_part(v) for k, v in value.items()}, sort_keys=True)
+    return repr(value)
+
+
+def panel_key(func: Callable, instance: Any, scope: Sequence[str], args: tuple, kwargs: dict) -> str:
+    """Clave del panel: método + alcance de la instancia + argumentos."""
+    parts = [f"{func.__module__}.{func.__qualname__}"]
+    parts.extend(f"{attr}={_key_part(getattr(instance, attr, None))}" for attr in scope)
+    parts.extend(_key_part(arg) for arg in args)
+    parts.extend(f"{name}={_key_part(value)}" for name, value in sorted(kwargs.items()))
+    return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _cacheable(value: Any) -> bool:
+    # Los paneles devuelven {'error': ...} cuando fallan; eso no se cachea
+    return not (isinstance(value, dict) and 'error' in value)
+
+
+async def _read(key: str) -> Optional[Dict[str, Any]]:
+    namespace = _namespace()
+    entry = namespace.get_local(key)
+    if entry is None:
+        entry = await asyncio.to_thread(namespace.get_remote, key)
+    return entry
+
+
+async def _store(key: str, value: Any, spec: PanelSpec):
+    now = time.time()
+    entry = {'value': value, 'computed_at': now, 'fresh_until': now + spec.ttl}
+    await asyncio.to_thread(_namespace().set, key, entry, spec.ttl + spec.stale_ttl)
+
+
+async def _acquire(key: str) -> bool:
+    try:
+        return await cache.aadd(f"{PANEL_NAMESPACE}:lock:{key}", 1, LOCK_TIMEOUT)
+    except Exception as e:
+        # Sin caché de Django no hay coordinación entre procesos: se calcula
+        logger.warning(f"No se pudo tomar el lock del panel {key}: {e}")
+        return True
+
+
+async def _release(key: str):
+    try:
+        await cache.adelete(f"{PANEL_NAMESPACE}:lock:{key}")
+    except Exception as e:
+        logger.warning(f"No se pudo liberar el lock del panel {key}: {e}")
+
+
+async def _recompute(key: str, compute: Callable[[], Awaitable[Any]], spec: PanelSpec) -> Any:
+    panel_stats['recomputes'] += 1
+    value = await compute()
+    if _cacheable(value):
+        await _store(key, value, spec)
+    return value
+
+
+async def _refresh_in_background(key: str, compute: Callable[[], Awaitable[Any]], spec: PanelSpec):
+    try:
+        await _recompute(key, compute, spec)
+    except Exception as e:
+        logger.error(f"Error recalculando panel en segundo plano: {e}")
+    finally:
+        await _release(key)
+
+
+async def cached_panel_call(key: str, compute: Callable[[], Awaitable[Any]], spec: PanelSpec) -> Any:
+    """Resuelve un panel desde caché aplicando stale-while-revalidate y lock por clave."""
+    entry = await _read(key)
+    now = time.time()
+    if entry is not None:
+        if now < entry['fresh_until']:
+            panel_stats['fresh'] += 1
+            return entry['value']
+        panel_stats['stale'] += 1
+        if await _acquire(key):
+            task = asyncio.ensure_future(_refresh_in_background(key, compute, spec))
+            _background_refreshes.add(task)
+            task.add_done_callback(_background_refreshes.discard)
+        return entry['value']
+
+    if await _acquire(key):
+        try:
+            return await _recompute(key, compute, spec)
+        finally:
+            await _release(key)
+
+    # Otro proceso lo está calculando: esperar su resultado
+    panel_stats['waits'] += 1
+    deadline = now + LOCK_TIMEOUT
+    while time.time() < deadline:
+        await asyncio.sleep(WAIT_INTERVAL)
+        entry = await _read(key)
+        if entry is not None:
+            return entry['value']
+    logger.warning(f"Tiempo de espera agotado para el panel {key}; se calcula localmente")
+    return await _recompute(key, compute, spec)
+
+
+def dashboard_panel(ttl: int, stale_ttl: int = DEFAULT_STALE_TTL, scope: Sequence[str] = ()):
+    """
+    Decorador para métodos async de dashboards.
+
+    Args:
+        ttl: Segundos en que el valor se considera fresco
+        stale_ttl: Segundos adicionales en que se sirve el valor anterior mientras se recalcula
+        scope: Atributos de la instancia que forman parte de la clave (p. ej. ``consultant_id``)
+    """
+    spec = PanelSpec(ttl=ttl, stale_ttl=stale_ttl, scope=tuple(scope))
+
+    def decorator(func):
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError(f"dashboard_panel requiere un método async: {func.__qualname__}")
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = panel_key(func, self, spec.scope, args, kwargs)
+            return await cached_panel_call(key, lambda: func(self, *args, **kwargs), spec)
+
+        async def refresh(self, *args, **kwargs):
+            """Recalcula y guarda el panel sin consultar la caché."""
+            key = panel_key(func, self, spec.scope, args, kwargs)
+            return await _recompute(key, lambda: func(self, *args, **kwargs), spec)
+
+        wrapper.panel_spec = spec
+        wrapper.refresh = refresh
+        return wrapper
+    return decorator
+
+
+def panel_methods(dashboard_cls) -> Dict[str, Callable]:
+    """Métodos de la clase decorados con ``dashboard_panel``."""
+    return {
+        name: member for name in dir(dashboard_cls)
+        if (member := getattr(dashboard_cls, name, None)) is not None and hasattr(member, 'panel_spec')
+    }
+
+
+async def warm_panels(dashboard: Any, names: Optional[Sequence[str]] = None) -> Dict[str, str]:
+    """
+    Recalcula los paneles (sin argumentos) de una instancia de dashboard.
+
+    Devuelve el estado de cada panel: ``ok``, ``error`` o ``skipped`` si otro
+    proceso ya lo estaba calculando.
+    """
+    results = {}
+    for name, method in panel_methods(type(dashboard)).items():
+        if names and name not in names:
+            continue
+        key = panel_key(method.__wrapped__, dashboard, method.panel_spec.scope, (), {})
+        if not await _acquire(key):
+            results[name] = 'skipped'
+            continue
+        try:
+            value = await method.refresh(dashboard)
+            results[name] = 'ok' if _cacheable(value) else 'error'
+        except Exception as e:
+            logger.error(f"Error precalentando panel {name}: {e}")
+            results[name] = 'error'
+        finally:
+            await _release(key)
+    return results
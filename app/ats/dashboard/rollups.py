@@ -0,0 +1,481 @@
+# app/ats/dashboard/rollups.py
+"""
+Rollups precalculados para los dashboards.
+
+Los paneles de KPIs leen de ``DashboardRollup`` (conteo y monto por periodo,
+unidad de negocio, consultor y cliente) en lugar de recorrer las tablas
+transaccionales en cada petición:
+
+- Cada modelo fuente (``Application``, ``Invoice``, ``Pago``,
+  ``ClientFeedback``) se describe con un ``RollupSource`` que traduce una
+  instancia en hechos (``Fact``).
+- Las señales (``app.ats.dashboard.signals``) comparan los hechos antes y
+  después de cada guardado y aplican sólo la diferencia con ``F()``, al
+  confirmarse la transacción.
+- ``rebuild`` recalcula una ventana desde las tablas fuente; lo ejecuta cada
+  noche ``backfill_dashboard_rollups`` para reparar lo que no pasó por señales
+  (``update()`` masivos, cargas de datos, errores).
+
+Los hechos con fecha se guardan por hora y por día; los de estado actual
+(p. ej. aplicaciones por etapa del pipeline) en una sola fila ``total``.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HOUR, DAY, TOTAL = 'hour', 'day', 'total'
+PERIOD_GRANULARITIES = (HOUR, DAY)
+# Periodo fijo de las filas de estado actual
+TOTAL_PERIOD = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+PIPELINE_PREFIX = 'pipeline:'
+BACKFILL_CHUNK_SIZE = 2000
+
+MONTH_LABELS = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+
+RollupKey = Tuple[str, datetime, str, int, int, int]
+
+
+@dataclass(frozen=True)
+class Fact:
+    """Aporte de una instancia a una métrica. ``at=None`` indica estado actual."""
+    metric: str
+    at: Optional[datetime]
+    business_unit_id: Optional[int] = None
+    consultant_id: Optional[int] = None
+    client_id: Optional[int] = None
+    count: int = 1
+    amount: Decimal = Decimal('0')
+
+
+# ============================================================================
+# FUENTES
+# ============================================================================
+
+class RollupSource:
+    """Describe cómo un modelo transaccional alimenta los rollups."""
+    model_name: str = ''
+    metrics: Tuple[str, ...] = ()
+    related: Tuple[str, ...] = ()
+    # Prefijo de las métricas de estado actual que genera ``stock_facts``
+    stock_prefix: Optional[str] = None
+
+    def model(self):
+        return apps.get_model('app', self.model_name)
+
+    def facts(self, instance) -> List[Fact]:
+        raise NotImplementedError
+
+    def window(self, start: datetime) -> Q:
+        """Filtro de las filas cuyos hechos con fecha pueden caer desde ``start``."""
+        raise NotImplementedError
+
+    def stock_facts(self) -> Iterable[Fact]:
+        """Hechos de estado actual recalculados por completo en el backfill."""
+        return ()
+
+    def prepare(self):
+        """Corrige las filas fuente antes de recalcular (p. ej. fechas faltantes)."""
+
+
+class ApplicationRollups(RollupSource):
+    """Aplicaciones, contrataciones, rechazos y pipeline por vacante."""
+    model_name = 'Application'
+    metrics = ('applications', 'hires', 'rejections')
+    related = ('vacancy',)
+    stock_prefix = PIPELINE_PREFIX
+
+    def facts(self, instance) -> List[Fact]:
+        vacancy = instance.vacancy if instance.vacancy_id else None
+        dims = {
+            'business_unit_id': getattr(vacancy, 'business_unit_id', None),
+            'client_id': getattr(vacancy, 'empresa_id', None),
+        }
+        facts = [
+            Fact('applications', instance.fecha_aplicacion, **dims),
+            Fact(f"{PIPELINE_PREFIX}{instance.estado}", None, **dims),
+        ]
+        # Contrataciones y rechazos se fechan con ``fecha_cierre``, que no cambia
+        # al editar la aplicación; las filas cerradas antes de existir el campo
+        # usan la última actualización hasta que ``prepare`` la congela.
+        # El monto de ``hires`` acumula los días de aplicación a contratación.
+        closed_at = instance.fecha_cierre or instance.ultima_actualizacion
+        if instance.estado == 'CONTRATADO':
+            days = (closed_at - instance.fecha_aplicacion).days
+            facts.append(Fact('hires', closed_at, amount=Decimal(max(days, 0)), **dims))
+        elif instance.estado == 'RECHAZADO':
+            facts.append(Fact('rejections', closed_at, **dims))
+        return facts
+
+    def window(self, start: datetime) -> Q:
+        return (Q(fecha_aplicacion__gte=start) | Q(fecha_cierre__gte=start)
+                | Q(fecha_cierre__isnull=True, ultima_actualizacion__gte=start))
+
+    def prepare(self):
+        # ``update()`` no toca ``ultima_actualizacion`` ni dispara señales
+        frozen = self.model().objects.filter(
+            estado__in=('CONTRATADO', 'RECHAZADO'), fecha_cierre__isnull=True
+        ).update(fecha_cierre=F('ultima_actualizacion'))
+        if frozen:
+            logger.info(f"Fecha de cierre fijada en {frozen} aplicaciones cerradas")
+
+    def stock_facts(self) -> Iterable[Fact]:
+        rows = self.model().objects.values(
+            'estado', 'vacancy__business_unit_id', 'vacancy__empresa_id'
+        ).annotate(total=Count('id'))
+        for row in rows:
+            yield Fact(
+                f"{PIPELINE_PREFIX}{row['estado']}", None,
+                business_unit_id=row['vacancy__business_unit_id'],
+                client_id=row['vacancy__empresa_id'],
+                count=row['total'],
+            )
+
+
+class InvoiceRollups(RollupSource):
+    """Facturas emitidas (excluye borradores y canceladas)."""
+    model_name = 'Invoice'
+    metrics = ('invoices',)
+
+    def facts(self, instance) -> List[Fact]:
+        if instance.status in ('draft', 'cancelled') or instance.issue_date is None:
+            return []
+        return [Fact('invoices', instance.issue_date, business_unit_id=instance.business_unit_id,
+                     amount=instance.total_amount or Decimal('0'))]
+
+    def window(self, start: datetime) -> Q:
+        return Q(issue_date__gte=start)
+
+
+class PaymentRollups(RollupSource):
+    """Pagos completados (ingresos efectivos)."""
+    model_name = 'Pago'
+    metrics = ('payments',)
+
+    def facts(self, instance) -> List[Fact]:
+        if instance.status != 'completed':
+            return []
+        at = instance.completed_at or instance.processed_at or instance.created_at
+        return [Fact('payments', at, business_unit_id=instance.business_unit_id,
+                     amount=instance.amount or Decimal('0'))]
+
+    def window(self, start: datetime) -> Q:
+        return Q(completed_at__gte=start) | Q(processed_at__gte=start) | Q(created_at__gte=start)
+
+
+class SatisfactionRollups(RollupSource):
+    """Encuestas de satisfacción de clientes completadas (suma de calificaciones)."""
+    model_name = 'ClientFeedback'
+    metrics = ('satisfaction',)
+
+    def facts(self, instance) -> List[Fact]:
+        if instance.status != 'COMPLETED' or instance.overall_satisfaction is None:
+            return []
+        return [Fact('satisfaction', instance.completed_date or instance.updated_at,
+                     business_unit_id=instance.business_unit_id,
+                     consultant_id=instance.consultant_id,
+                     client_id=instance.empresa_id,
+                     amount=Decimal(instance.overall_satisfaction))]
+
+    def window(self, start: datetime) -> Q:
+        return Q(completed_date__gte=start) | Q(completed_date__isnull=True, updated_at__gte=start)
+
+
+SOURCES: Tuple[RollupSource, ...] = (
+    ApplicationRollups(),
+    InvoiceRollups(),
+    PaymentRollups(),
+    SatisfactionRollups(),
+)
+
+
+# ============================================================================
+# PERIODOS Y DIFERENCIAS
+# ============================================================================
+
+def _tz(tz=None):
+    return tz or timezone.get_current_timezone()
+
+
+def period_start(value: datetime, granularity: str, tz=None) -> datetime:
+    """Inicio (en hora local) de la hora o el día que contiene ``value``."""
+    local = value.astimezone(_tz(tz))
+    if granularity == HOUR:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return datetime.combine(local.date(), time(), tzinfo=local.tzinfo)
+
+
+def expand(facts: Iterable[Fact], tz=None) -> Dict[RollupKey, List]:
+    """Agrupa hechos en celdas ``(granularidad, periodo, métrica, bu, consultor, cliente)``."""
+    tz = _tz(tz)
+    cells = defaultdict(lambda: [0, Decimal('0')])
+    for fact in facts:
+        dims = (fact.business_unit_id or 0, fact.consultant_id or 0, fact.client_id or 0)
+        if fact.at is None:
+            periods = [(TOTAL, TOTAL_PERIOD)]
+        else:
+            periods = [(granularity, period_start(fact.at, granularity, tz)) for granularity in PERIOD_GRANULARITIES]
+        for granularity, start in periods:
+            cell = cells[(granularity, start, fact.metric) + dims]
+            cell[0] += fact.count
+            cell[1] += Decimal(fact.amount)
+    return dict(cells)
+
+
+def diff(before: Iterable[Fact], after: Iterable[Fact], tz=None) -> Dict[RollupKey, Tuple[int, Decimal]]:
+    """Deltas a aplicar para pasar de los hechos ``before`` a ``after``."""
+    old, new = expand(before, tz), expand(after, tz)
+    deltas = {}
+    for key in old.keys() | new.keys():
+        old_count, old_amount = old.get(key, (0, Decimal('0')))
+        new_count, new_amount = new.get(key, (0, Decimal('0')))
+        if new_count != old_count or new_amount != old_amount:
+            deltas[key] = (new_count - old_count, new_amount - old_amount)
+    return deltas
+
+
+# ============================================================================
+# ESCRITURA
+# ============================================================================
+
+def _rollup_model():
+    return apps.get_model('app', 'DashboardRollup')
+
+
+def _cell_filter(key: RollupKey) -> Dict[str, Any]:
+    granularity, start, metric, business_unit_id, consultant_id, client_id = key
+    return {
+        'granularity': granularity,
+        'period_start': start,
+        'metric': metric,
+        'business_unit_id': business_unit_id,
+        'consultant_id': consultant_id,
+        'client_id': client_id,
+    }
+
+
+def apply_deltas(deltas: Dict[RollupKey, Tuple[int, Decimal]]):
+    """Suma los deltas a sus celdas (upsert con ``F()``, en orden estable para evitar deadlocks)."""
+    Rollup = _rollup_model()
+    for key in sorted(deltas, key=lambda k: (k[0], k[1], k[2:])):
+        count, amount = deltas[key]
+        cell = _cell_filter(key)
+        increment = {'count': F('count') + count, 'amount': F('amount') + amount}
+        if Rollup.objects.filter(**cell).update(**increment):
+            continue
+        try:
+            with transaction.atomic():
+                Rollup.objects.create(count=count, amount=amount, **cell)
+        except IntegrityError:
+            # Otro proceso creó la celda entre el update y el create
+            Rollup.objects.filter(**cell).update(**increment)
+
+
+def record_change(before: Iterable[Fact], after: Iterable[Fact]):
+    """Programa la aplicación de la diferencia al confirmar la transacción actual."""
+    deltas = diff(before, after)
+    if not deltas:
+        return
+
+    def _apply():
+        try:
+            apply_deltas(deltas)
+        except Exception as e:
+            # El backfill nocturno repara lo que no se pudo aplicar aquí
+            logger.error(f"Error actualizando rollups del dashboard: {e}")
+
+    transaction.on_commit(_apply)
+
+
+def rebuild(start: datetime, sources: Optional[Sequence[RollupSource]] = None, include_stock: bool = True) -> Dict[str, int]:
+    """
+    Recalcula los rollups desde ``start`` (alineado al inicio del día) hasta ahora.
+
+    Las celdas de la ventana se reemplazan con lo calculado desde las tablas
+    fuente; las de estado actual se recalculan completas. Devuelve el número de
+    celdas escritas por fuente.
+    """
+    Rollup = _rollup_model()
+    tz = _tz()
+    start = period_start(start, DAY, tz)
+    written = {}
+    for source in sources or SOURCES:
+        source.prepare()
+        rows = source.model().objects.filter(source.window(start)).select_related(*source.related)
+        facts = (
+            fact
+            for instance in rows.iterator(chunk_size=BACKFILL_CHUNK_SIZE)
+            for fact in source.facts(instance)
+            if fact.at is not None and fact.at >= start and fact.metric in source.metrics
+        )
+        cells = expand(facts, tz)
+        with_stock = include_stock and source.stock_prefix is not None
+        if with_stock:
+            cells.update(expand(source.stock_facts(), tz))
+
+        with transaction.atomic():
+            Rollup.objects.filter(
+                metric__in=source.metrics, granularity__in=PERIOD_GRANULARITIES, period_start__gte=start
+            ).delete()
+            if with_stock:
+                Rollup.objects.filter(granularity=TOTAL, metric__startswith=source.stock_prefix).delete()
+            Rollup.objects.bulk_create(
+                [Rollup(count=count, amount=amount, **_cell_filter(key)) for key, (count, amount) in cells.items()],
+                batch_size=BACKFILL_CHUNK_SIZE,
+            )
+        written[source.model_name] = len(cells)
+        logger.info(f"Rollups de {source.model_name} reconstruidos desde {start:%Y-%m-%d}: {len(cells)} celdas")
+    return written
+
+
+# ============================================================================
+# LECTURA
+# ============================================================================
+
+def dimension_filters(business_unit: Any = None, consultant: Any = None, client: Any = None) -> Dict[str, int]:
+    """
+    Traduce los filtros de los dashboards a columnas del rollup.
+
+    ``None`` o ``'all'`` no filtra. La unidad de negocio acepta instancia, ID o
+    nombre; consultor y cliente, instancia o ID. Un valor que no corresponde a
+    ningún registro deja la consulta vacía en lugar de ignorar el filtro.
+    """
+    filters = {}
+    for column, value in (('business_unit_id', business_unit), ('consultant_id', consultant), ('client_id', client)):
+        if value in (None, '', 'all'):
+            continue
+        if hasattr(value, 'pk'):
+            value = value.pk
+        elif isinstance(value, str) and not value.isdigit():
+            if column == 'business_unit_id':
+                value = apps.get_model('app', 'BusinessUnit').objects.filter(
+                    name=value
+                ).values_list('id', flat=True).first()
+            else:
+                value = None
+        filters[column] = -1 if value is None else int(value)
+    return filters
+
+
+def _rows(metrics: Sequence[str], granularity: str, **dims):
+    return _rollup_model().objects.filter(metric__in=list(metrics), granularity=granularity, **dims)
+
+
+def totals(metrics: Sequence[str], start: datetime, end: datetime, **dims) -> Dict[str, Dict[str, Any]]:
+    """Conteo y monto por métrica en ``[start, end)``."""
+    # Con inicio a medianoche bastan las filas diarias; si no, las horarias
+    granularity = DAY if period_start(start, DAY) == start else HOUR
+    result = {metric: {'count': 0, 'amount': Decimal('0')} for metric in metrics}
+    rows = _rows(metrics, granularity, **dims).filter(
+        period_start__gte=period_start(start, granularity), period_start__lt=end
+    ).values('metric').annotate(total_count=Sum('count'), total_amount=Sum('amount'))
+    for row in rows:
+        result[row['metric']] = {'count': row['total_count'] or 0, 'amount': row['total_amount'] or Decimal('0')}
+    return result
+
+
+def _floor(value: datetime, unit: str, tz) -> datetime:
+    if unit == HOUR:
+        return period_start(value, HOUR, tz)
+    day = value.astimezone(tz).date()
+    if unit == 'week':
+        day -= timedelta(days=day.weekday())
+    elif unit == 'month':
+        day = day.replace(day=1)
+    elif unit == 'year':
+        day = day.replace(month=1, day=1)
+    return datetime.combine(day, time(), tzinfo=tz)
+
+
+def _previous(start: datetime, unit: str, tz) -> datetime:
+    if unit == HOUR:
+        return period_start(start - timedelta(hours=1), HOUR, tz)
+    day = start.date()
+    if unit == DAY:
+        day -= timedelta(days=1)
+    elif unit == 'week':
+        day -= timedelta(days=7)
+    elif unit == 'month':
+        day = (day - timedelta(days=1)).replace(day=1)
+    else:
+        day = day.replace(year=day.year - 1)
+    return datetime.combine(day, time(), tzinfo=tz)
+
+
+def bucket_starts(unit: str, periods: int, end: Optional[datetime] = None, tz=None) -> List[datetime]:
+    """Inicios de los ``periods`` últimos periodos (hour, day, week, month, year) hasta ``end``."""
+    tz = _tz(tz)
+    starts = [_floor(end or timezone.now(), unit, tz)]
+    while len(starts) < periods:
+        starts.append(_previous(starts[-1], unit, tz))
+    return starts[::-1]
+
+
+def series(metric: str, unit: str = DAY, periods: int = 7, end: Optional[datetime] = None, **dims) -> List[Dict[str, Any]]:
+    """
+    Serie de ``periods`` periodos consecutivos de una métrica, con ceros donde
+    no hubo actividad.
+    """
+    tz = _tz()
+    starts = bucket_starts(unit, periods, end, tz)
+    granularity = HOUR if unit == HOUR else DAY
+    rows = _rows([metric], granularity, **dims).filter(period_start__gte=starts[0])
+    if end is not None:
+        rows = rows.filter(period_start__lte=end)
+    if unit in (HOUR, DAY):
+        rows = rows.values(bucket=F('period_start'))
+    else:
+        rows = rows.annotate(bucket=Trunc('period_start', unit, tzinfo=tz)).values('bucket')
+    found = {
+        row['bucket']: row
+        for row in rows.annotate(total_count=Sum('count'), total_amount=Sum('amount'))
+    }
+    return [
+        {
+            'period_start': start,
+            'count': found[start]['total_count'] if start in found else 0,
+            'amount': found[start]['total_amount'] if start in found else Decimal('0'),
+        }
+        for start in starts
+    ]
+
+
+def breakdown(metric: str, dimension: str, start: datetime, end: datetime, **dims) -> Dict[int, Dict[str, Any]]:
+    """Totales de una métrica agrupados por ``business_unit_id``, ``consultant_id`` o ``client_id``."""
+    rows = _rows([metric], DAY, **dims).filter(
+        period_start__gte=period_start(start, DAY), period_start__lt=end
+    ).values(dimension).annotate(total_count=Sum('count'), total_amount=Sum('amount'))
+    return {row[dimension]: {'count': row['total_count'], 'amount': row['total_amount']} for row in rows}
+
+
+def pipeline(**dims) -> Dict[str, int]:
+    """Aplicaciones por estado actual."""
+    rows = _rollup_model().objects.filter(
+        granularity=TOTAL, metric__startswith=PIPELINE_PREFIX, **dims
+    ).values('metric').annotate(total=Sum('count'))
+    return {row['metric'][len(PIPELINE_PREFIX):]: row['total'] for row in rows if row['total']}
+
+
+def period_label(start: datetime, unit: str) -> str:
+    """Etiqueta corta para gráficos."""
+    local = start.astimezone(_tz())
+    if unit == HOUR:
+        return f"{local:%H}:00"
+    if unit == DAY:
+        return f"{local:%d/%m}"
+    if unit == 'week':
+        return f"Sem {local.isocalendar()[1]}"
+    if unit == 'month':
+        return f"{MONTH_LABELS[local.month - 1]} {local:%y}"
+    return f"{local.year}"
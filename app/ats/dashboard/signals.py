@@ -0,0 +1,61 @@
+# app/ats/dashboard/signals.py
+"""
+Señales que alimentan de forma incremental los rollups del dashboard.
+
+Antes de guardar se leen los hechos de la versión en base de datos; después,
+los de la nueva versión, y se aplica sólo la diferencia (un cambio de estado
+resta de una celda y suma en otra). Al eliminar se restan todos sus hechos.
+"""
+
+import logging
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from app.ats.dashboard.rollups import SOURCES, RollupSource, record_change
+
+logger = logging.getLogger(__name__)
+
+_PREVIOUS_ATTR = '_dashboard_rollup_facts'
+
+
+def _previous_facts(source: RollupSource, sender, instance):
+    if instance.pk is None:
+        return []
+    previous = sender._default_manager.select_related(*source.related).filter(pk=instance.pk).first()
+    return source.facts(previous) if previous is not None else []
+
+
+def _connect(source: RollupSource):
+    model = source.model()
+
+    def capture_previous_facts(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        try:
+            setattr(instance, _PREVIOUS_ATTR, _previous_facts(source, sender, instance))
+        except Exception as e:
+            logger.warning(f"No se pudieron leer los hechos previos de {source.model_name} {instance.pk}: {e}")
+
+    def record_save(sender, instance, raw=False, **kwargs):
+        if raw or not hasattr(instance, _PREVIOUS_ATTR):
+            return
+        try:
+            facts = source.facts(instance)
+            record_change(getattr(instance, _PREVIOUS_ATTR), facts)
+            setattr(instance, _PREVIOUS_ATTR, facts)
+        except Exception as e:
+            logger.warning(f"No se pudieron actualizar los rollups de {source.model_name} {instance.pk}: {e}")
+
+    def record_delete(sender, instance, **kwargs):
+        try:
+            record_change(source.facts(instance), [])
+        except Exception as e:
+            logger.warning(f"No se pudieron restar los rollups de {source.model_name} {instance.pk}: {e}")
+
+    uid = f"dashboard_rollups_{source.model_name}"
+    pre_save.connect(capture_previous_facts, sender=model, weak=False, dispatch_uid=f"{uid}_pre_save")
+    post_save.connect(record_save, sender=model, weak=False, dispatch_uid=f"{uid}_post_save")
+    post_delete.connect(record_delete, sender=model, weak=False, dispatch_uid=f"{uid}_post_delete")
+
+
+for _source in SOURCES:
+    _connect(_source)
@@ -30,7 +30,8 @@ from app.ats.integrations.channels.whatsapp import WhatsAppService
 from app.ats.analytics.market_analyzer import MarketAnalyzer
 from app.ats.analytics.competitor_analyzer import CompetitorAnalyzer
 from app.ats.ml.recommendation_engine import RecommendationEngine
-from app.ats.utils.cache import cache_result
+from app.ats.dashboard.panel_cache import dashboard_panel
+from app.ats.dashboard import rollups
 from app.aura.engine import AuraEngine
 from app.aura.insights import AuraInsights
 from app.ml.aura.analytics.executive_dashboard import ExecutiveAnalytics
@@ -40,6 +41,16 @@ from app.ats.utils.Events import EventType, EventStatus
 
 logger = logging.getLogger(__name__)
 
+# Columna del kanban para cada estado de Application
+KANBAN_COLUMN_BY_STATUS = {
+    'PENDIENTE': 'sourcing',
+    'EN_REVISION': 'screening',
+    'ENTREVISTA': 'interviewing',
+    'OFERTA': 'offer',
+    'CONTRATADO': 'hired',
+    'RECHAZADO': 'rejected',
+}
+
 @dataclass
 class SystemHealth:
     """Estado de salud del sistema"""
@@ -93,7 +104,7 @@ class SuperAdminDashboard:
         self.competitor_analyzer = CompetitorAnalyzer()
         self.recommendation_engine = RecommendationEngine()
         
-    @cache_result(ttl=60)  # 1 minuto - datos críticos
+    @dashboard_panel(ttl=60)  # 1 minuto - datos críticos
     async def get_system_overview(self) -> Dict[str, Any]:
         """Obtiene visión general completa del sistema."""
         try:
@@ -126,7 +137,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo overview del sistema: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300)  # 5 minutos
     async def get_consultant_analytics(self) -> Dict[str, Any]:
         """Analytics detallados de todos los consultores."""
         try:
@@ -170,7 +181,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de consultores: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300)  # 5 minutos
     async def get_client_analytics(self) -> Dict[str, Any]:
         """Analytics detallados de todos los clientes."""
         try:
@@ -214,7 +225,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de clientes: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=180)  # 3 minutos
+    @dashboard_panel(ttl=180)  # 3 minutos
     async def get_candidate_analytics(self) -> Dict[str, Any]:
         """Analytics detallados de candidatos."""
         try:
@@ -256,7 +267,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de candidatos: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=120)  # 2 minutos
+    @dashboard_panel(ttl=120)  # 2 minutos
     async def get_process_analytics(self) -> Dict[str, Any]:
         """Analytics de todos los procesos."""
         try:
@@ -283,7 +294,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de procesos: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=60)  # 1 minuto
+    @dashboard_panel(ttl=60)  # 1 minuto
     async def get_aura_analytics(self) -> Dict[str, Any]:
         """Analytics completos de AURA."""
         try:
@@ -314,7 +325,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de AURA: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=60)  # 1 minuto
+    @dashboard_panel(ttl=60)  # 1 minuto
     async def get_genia_analytics(self) -> Dict[str, Any]:
         """Analytics de GenIA."""
         try:
@@ -464,7 +475,7 @@ class SuperAdminDashboard:
     # NUEVAS FUNCIONALIDADES BRUCE ALMIGHTY MODE 🚀
     # ============================================================================
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300)  # 5 minutos
     async def get_business_unit_control(self) -> Dict[str, Any]:
         """Control total por unidad de negocio."""
         try:
@@ -507,7 +518,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo control de BU: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=180)  # 3 minutos
+    @dashboard_panel(ttl=180)  # 3 minutos
     async def get_proposals_analytics(self) -> Dict[str, Any]:
         """Analytics completos de propuestas enviadas."""
         try:
@@ -557,7 +568,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de propuestas: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300)  # 5 minutos
     async def get_opportunities_analytics(self) -> Dict[str, Any]:
         """Analytics de oportunidades nuevas."""
         try:
@@ -588,7 +599,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de oportunidades: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=120)  # 2 minutos
+    @dashboard_panel(ttl=120)  # 2 minutos
     async def get_scraping_analytics(self) -> Dict[str, Any]:
         """Analytics de scraping y fuentes de datos."""
         try:
@@ -619,7 +630,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de scraping: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=600)  # 10 minutos
+    @dashboard_panel(ttl=600)  # 10 minutos
     async def get_gpt_job_description_generator(self) -> Dict[str, Any]:
         """Generador de Job Descriptions con GPT."""
         try:
@@ -646,7 +657,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo generador de JD: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300)  # 5 minutos
     async def get_sexsi_analytics(self) -> Dict[str, Any]:
         """Analytics del sistema SEXSI."""
         try:
@@ -673,7 +684,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo analytics de SEXSI: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=180)  # 3 minutos
+    @dashboard_panel(ttl=180)  # 3 minutos
     async def get_process_management(self) -> Dict[str, Any]:
         """Gestión completa de procesos y estados."""
         try:
@@ -704,7 +715,7 @@ class SuperAdminDashboard:
             logger.error(f"Error obteniendo gestión de procesos: {str(e)}")
             return {'error': str(e)}
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300)  # 5 minutos
     async def get_salary_comparator(self) -> Dict[str, Any]:
         """Comparador avanzado de salarios."""
         try:
@@ -2060,84 +2071,44 @@ class SuperAdminDashboard:
     
     def _get_financial_metrics(self, date_range: Dict, business_unit: str, consultant: str) -> Dict:
         """
-        Obtiene métricas financieras principales.
-        """
-        # Simulación de datos financieros (en producción vendrían de modelos reales)
-        base_revenue = {
-            'day': 15000,
-            'week': 85000,
-            'month': 350000,
-            'year': 4200000
-        }
-        
-        base_potential = {
-            'day': 25000,
-            'week': 150000,
-            'month': 600000,
-            'year': 7200000
-        }
-        
-        period = date_range['period_name'].lower()
-        
-        # Ajustar por unidad de negocio
-        bu_multipliers = {
-            'huntRED': 1.0,
-            'huntU': 0.8,
-            'Amigro': 0.6,
-            'SEXSI': 1.2
-        }
-        
-        bu_multiplier = bu_multipliers.get(business_unit, 1.0) if business_unit != 'all' else 1.0
-        
-        # Ajustar por consultor (simulación)
-        consultant_multiplier = 1.0
-        if consultant != 'all':
-            consultant_multipliers = {
-                'consultor1': 1.2,
-                'consultor2': 0.9,
-                'consultor3': 1.1
-            }
-            consultant_multiplier = consultant_multipliers.get(consultant, 1.0)
-        
-        total_multiplier = bu_multiplier * consultant_multiplier
-        
-        revenue = base_revenue.get(period, base_revenue['month']) * total_multiplier
-        potential = base_potential.get(period, base_potential['month']) * total_multiplier
-        
-        # Calcular métricas derivadas
-        conversion_rate = (revenue / potential * 100) if potential > 0 else 0
-        avg_deal_size = revenue / max(1, int(revenue / 15000))  # Simulación de número de deals
-        
+        Obtiene métricas financieras principales desde los rollups del dashboard.
+
+        Ingresos = pagos completados; potencial = facturas emitidas. El periodo
+        anterior tiene la misma duración que el actual. Pagos y facturas no
+        tienen consultor asignado: con filtro de consultor salen en cero.
+        """
+        dims = rollups.dimension_filters(business_unit, consultant)
+        start, end = date_range['start_date'], date_range['end_date']
+        current = self._financial_summary(rollups.totals(('payments', 'invoices'), start, end, **dims))
+        previous = self._financial_summary(rollups.totals(('payments', 'invoices'), start - (end - start), start, **dims))
+
+        metrics = {}
+        for name in ('revenue', 'potential', 'conversion_rate', 'avg_deal_size', 'deals_count'):
+            metrics[name] = {
+                'current': current[name],
+                'previous': previous[name],
+                'change_percent': self._change_percent(current[name], previous[name])
+            }
+            if name in ('revenue', 'potential', 'avg_deal_size'):
+                metrics[name]['currency'] = 'MXN'
+        return metrics
+
+    def _financial_summary(self, totals: Dict) -> Dict:
+        revenue = float(totals['payments']['amount'])
+        potential = float(totals['invoices']['amount'])
+        deals = totals['payments']['count']
         return {
-            'revenue': {
-                'current': revenue,
-                'previous': revenue * 0.95,  # Simulación
-                'change_percent': 5.2,
-                'currency': 'MXN'
-            },
-            'potential': {
-                'current': potential,
-                'previous': potential * 0.98,
-                'change_percent': 2.1,
-                'currency': 'MXN'
-            },
-            'conversion_rate': {
-                'current': conversion_rate,
-                'previous': conversion_rate * 0.97,
-                'change_percent': 3.1
-            },
-            'avg_deal_size': {
-                'current': avg_deal_size,
-                'previous': avg_deal_size * 0.96,
-                'change_percent': 4.2,
-                'currency': 'MXN'
-            },
-            'deals_count': {
-                'current': int(revenue / 15000),
-                'previous': int(revenue / 15000) - 1,
-                'change_percent': 8.3
-            }
+            'revenue': revenue,
+            'potential': potential,
+            'conversion_rate': (revenue / potential * 100) if potential > 0 else 0,
+            'avg_deal_size': revenue / deals if deals else 0,
+            'deals_count': deals
         }
+
+    def _change_percent(self, current: float, previous: float) -> float:
+        if not previous:
+            return 0.0
+        return round((current - previous) / previous * 100, 1)
     
     def _get_financial_breakdowns(self, date_range: Dict, business_unit: str, consultant: str) -> Dict:
         """
@@ -2252,39 +2223,23 @@ class SuperAdminDashboard:
     
     def _get_financial_trends(self, period: str, business_unit: str, consultant: str) -> Dict:
         """
-        Obtiene tendencias financieras.
+        Obtiene tendencias financieras de los últimos 7 periodos desde los rollups.
         """
-        # Tendencias de ingresos por período
-        revenue_trends = {
-            'daily': [12000, 13500, 11800, 14200, 15600, 13800, 16200],
-            'weekly': [85000, 92000, 88000, 95000, 102000, 98000, 105000],
-            'monthly': [320000, 340000, 360000, 380000, 400000, 420000, 440000],
-            'yearly': [3800000, 4000000, 4200000, 4400000, 4600000, 4800000, 5000000]
-        }
-        
-        # Tendencias de potencial
-        potential_trends = {
-            'daily': [20000, 22000, 21000, 24000, 26000, 25000, 28000],
-            'weekly': [120000, 130000, 125000, 140000, 150000, 145000, 160000],
-            'monthly': [500000, 520000, 540000, 560000, 580000, 600000, 620000],
-            'yearly': [6000000, 6200000, 6400000, 6600000, 6800000, 7000000, 7200000]
-        }
-        
-        # Tendencias de conversión
-        conversion_trends = {
-            'daily': [60, 61, 56, 59, 60, 55, 58],
-            'weekly': [71, 71, 70, 68, 68, 68, 66],
-            'monthly': [64, 65, 67, 68, 69, 70, 71],
-            'yearly': [63, 65, 66, 67, 68, 69, 69]
-        }
-        
-        trend_key = period.lower()
-        
+        unit = period.lower() if period.lower() in ('day', 'week', 'month', 'year') else 'month'
+        dims = rollups.dimension_filters(business_unit, consultant)
+        revenue = rollups.series('payments', unit, periods=7, **dims)
+        potential = rollups.series('invoices', unit, periods=7, **dims)
+
+        revenue_trend = [float(point['amount']) for point in revenue]
+        potential_trend = [float(point['amount']) for point in potential]
         return {
-            'revenue_trend': revenue_trends.get(trend_key, revenue_trends['monthly']),
-            'potential_trend': potential_trends.get(trend_key, potential_trends['monthly']),
-            'conversion_trend': conversion_trends.get(trend_key, conversion_trends['monthly']),
-            'labels': self._generate_trend_labels(period)
+            'revenue_trend': revenue_trend,
+            'potential_trend': potential_trend,
+            'conversion_trend': [
+                round(earned / possible * 100, 1) if possible else 0
+                for earned, possible in zip(revenue_trend, potential_trend)
+            ],
+            'labels': [rollups.period_label(point['period_start'], unit) for point in revenue]
         }
     
     def _get_financial_projections(self, period: str, business_unit: str, consultant: str) -> Dict:
@@ -2410,8 +2365,9 @@ class SuperAdminDashboard:
             })
         
         # Insight 4: Análisis de potencial
-        potential_utilization = (metrics['revenue']['current'] / metrics['potential']['current']) * 100
-        if potential_utilization < 60:
+        potential = metrics['potential']['current']
+        potential_utilization = (metrics['revenue']['current'] / potential * 100) if potential else 0
+        if potential and potential_utilization < 60:
             insights.append({
                 'type': 'opportunity',
                 'title': 'Potencial No Aprovechado',
@@ -2423,21 +2379,6 @@ class SuperAdminDashboard:
         
         return insights
     
-    def _generate_trend_labels(self, period: str) -> List[str]:
-        """
-        Genera etiquetas para las tendencias según el período.
-        """
-        if period == 'day':
-            return ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
-        elif period == 'week':
-            return ['Sem 1', 'Sem 2', 'Sem 3', 'Sem 4', 'Sem 5', 'Sem 6', 'Sem 7']
-        elif period == 'month':
-            return ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul']
-        elif period == 'year':
-            return ['2018', '2019', '2020', '2021', '2022', '2023', '2024']
-        else:
-            return ['Per 1', 'Per 2', 'Per 3', 'Per 4', 'Per 5', 'Per 6', 'Per 7']
-
     def get_advanced_kanban_data(self, filters: Dict = None) -> Dict:
         """
         Kanban avanzado con filtros por período, cliente, consultor y gestión completa de candidatos.
@@ -2490,6 +2431,8 @@ class SuperAdminDashboard:
             
             # Obtener métricas del kanban
             kanban_data['metrics'] = self._get_kanban_metrics(filters, date_range)
+            for column, count in kanban_data['metrics']['by_status'].items():
+                kanban_data['columns'][column]['count'] = count
             
             return kanban_data
             
@@ -3014,29 +2957,32 @@ class SuperAdminDashboard:
     
     def _get_kanban_metrics(self, filters: Dict, date_range: Dict) -> Dict:
         """
-        Obtiene métricas del kanban.
+        Obtiene métricas del kanban desde los rollups del dashboard.
         """
+        dims = rollups.dimension_filters(filters.get('business_unit'), client=filters.get('client'))
+        start, end = date_range['start_date'], date_range['end_date']
+        totals = rollups.totals(('applications', 'hires', 'rejections'), start, end, **dims)
+        pipeline = rollups.pipeline(**dims)
+
+        applications = totals['applications']['count']
+        hires = totals['hires']
+        by_business_unit = rollups.breakdown('applications', 'business_unit_id', start, end, **dims)
+        bu_names = dict(BusinessUnit.objects.filter(id__in=by_business_unit).values_list('id', 'name'))
+
         return {
-            'total_candidates': 45,
-            'active_candidates': 38,
-            'hired_this_period': 7,
-            'rejected_this_period': 3,
-            'avg_time_to_hire': '23 días',
-            'conversion_rate': 70.0,
+            'total_candidates': applications,
+            'active_candidates': sum(
+                count for estado, count in pipeline.items() if estado not in ('CONTRATADO', 'RECHAZADO')
+            ),
+            'hired_this_period': hires['count'],
+            'rejected_this_period': totals['rejections']['count'],
+            'avg_time_to_hire': f"{round(hires['amount'] / hires['count'])} días" if hires['count'] else 'N/A',
+            'conversion_rate': round(hires['count'] / applications * 100, 1) if applications else 0.0,
             'by_status': {
-                'sourcing': 12,
-                'screening': 8,
-                'interviewing': 6,
-                'references': 4,
-                'offer': 3,
-                'hired': 7,
-                'rejected': 5
+                column: pipeline.get(estado, 0) for estado, column in KANBAN_COLUMN_BY_STATUS.items()
             },
             'by_business_unit': {
-                'huntRED': 15,
-                'huntU': 18,
-                'Amigro': 8,
-                'SEXSI': 4
+                bu_names.get(bu_id, 'Sin unidad'): values['count'] for bu_id, values in by_business_unit.items()
             }
         }
 
@@ -3292,7 +3238,7 @@ class SuperAdminDashboard:
     # 🚀 MÉTODOS FINANCIEROS Y DE PAGOS - BRUCE ALMIGHTY MODE 🚀
     # ============================================================================
     
-    @cache_result(ttl=300)  # 5 minutos
+    @dashboard_panel(ttl=300)  # 5 minutos
     async def get_financial_dashboard(self) -> Dict[str, Any]:
         """Obtiene dashboard completo de finanzas y pagos."""
         try:
@@ -0,0 +1,472 @@
+# app/ats/integrations/channels/http_clients.py
+"""
+Clientes HTTP salientes compartidos para los canales de mensajería.
+
+Antes cada envío abría su propio ``httpx.AsyncClient`` (o ``requests.post``)
+y pagaba conexión TCP + TLS por mensaje. ``outbound_http`` mantiene un pool
+keep-alive por proveedor (WhatsApp, Telegram, Messenger, Instagram, Slack,
+X) con HTTP/2 cuando ``h2`` está instalado::
+
+    async with outbound_http.client('telegram') as client:
+        resp = await client.post(url, json=payload)
+
+- Concurrencia acotada por proveedor (``max_concurrency``).
+- Timeouts y límites del pool por proveedor; se ajustan con
+  ``settings.OUTBOUND_HTTP``.
+- Reintentos con backoff exponencial y jitter sólo cuando no pueden duplicar
+  un envío: errores de conexión (la petición no salió) en cualquier método y
+  respuestas 429/502/503/504 en métodos idempotentes. Un POST sólo se
+  reintenta por estado si lleva ``Idempotency-Key`` o si es un 429 con
+  ``Retry-After`` (el proveedor lo rechazó sin procesarlo): un 502/504 puede
+  llegar después de que el mensaje ya se entregó.
+- Cada reintento vuelve a pasar por ``rate_limiter`` (``rate_limit=(cuenta,
+  destinatario)`` en la petición), igual que el primer envío.
+- Métricas por proveedor (latencia, errores, reintentos, uso del pool) en
+  ``outbound_http.stats()``.
+
+Un ``httpx.AsyncClient`` queda ligado al event loop que lo usa, así que hay un
+cliente por (loop, proveedor): el servidor ASGI y los consumidores de larga
+vida reutilizan conexiones. Cada cliente se cierra cuando termina su loop
+(``asyncio.run`` y ``async_to_sync`` cancelan sus tareas al salir), además del
+cierre ordenado en el lifespan de ASGI y en el apagado de los workers de
+Celery. El código síncrono usa ``outbound_http.request_sync``
+sobre una ``requests.Session`` por proveedor.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'timeout': 10.0,
+    'connect_timeout': 5.0,
+    'max_connections': 50,
+    'max_keepalive': 20,
+    'keepalive_expiry': 60.0,
+    'max_concurrency': 50,
+    'retries': 2,
+    'backoff': 0.5,
+    'max_backoff': 10.0,
+    'retry_statuses': (429, 502, 503, 504),
+    'idempotency_header': 'Idempotency-Key',
+    'http2': True,
+}
+
+PROVIDERS = {
+    # Graph API (WhatsApp Cloud, Messenger, Instagram) admite HTTP/2
+    'whatsapp': {'max_connections': 100, 'max_keepalive': 50, 'max_concurrency': 80},
+    'messenger': {'max_connections': 50, 'max_concurrency': 40},
+    'instagram': {'max_connections': 30, 'max_concurrency': 20},
+    # Incluye descargas de archivos (getFile)
+    'telegram': {'timeout': 20.0, 'max_connections': 50, 'max_concurrency': 30},
+    'slack': {'max_connections': 10, 'max_concurrency': 10},
+    'x': {'max_connections': 10, 'max_concurrency': 5},
+}
+
+# La petición no llegó a enviarse: reintentar no duplica el mensaje
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+def provider_config(provider: str, overrides: Optional[Dict[str, Dict]] = None) -> Dict[str, Any]:
+    try:
+        configured = (getattr(settings, 'OUTBOUND_HTTP', None) or {}).get(provider, {})
+    except Exception:
+        configured = {}
+    return {**DEFAULTS, **PROVIDERS.get(provider, {}), **configured, **(overrides or {}).get(provider, {})}
+
+
+def status_retry_allowed(config: Dict[str, Any], method: str, status: int,
+                         response_headers, request_headers=None) -> bool:
+    """Indica si reintentar una respuesta con ``status`` no puede duplicar el envío."""
+    if status not in config['retry_statuses']:
+        return False
+    if method.upper() in IDEMPOTENT_METHODS:
+        return True
+    header = (config.get('idempotency_header') or '').lower()
+    if header and any(str(name).lower() == header for name in (request_headers or {})):
+        return True
+    return status == 429 and 'Retry-After' in response_headers
+
+
+@dataclass
+class ProviderStats:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def observe(self, seconds: float):
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        self.latencies.append(seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        recent = sorted(self.latencies)
+        attempts = self.requests + self.retries
+
+        def percentile(p):
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 1) if recent else 0.0
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'latency_avg_ms': round(self.latency_total / attempts * 1000, 1) if attempts else 0.0,
+            'latency_p50_ms': percentile(0.5),
+            'latency_p95_ms': percentile(0.95),
+            'latency_max_ms': round(self.latency_max * 1000, 1),
+        }
+
+
+@dataclass
+class _Pool:
+    loop: asyncio.AbstractEventLoop
+    client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+    closer: Optional[asyncio.Task] = None
+
+
+class ProviderClient:
+    """
+    Vista de un proveedor con la interfaz de ``httpx.AsyncClient``.
+
+    Se usa como ``async with``; al salir no cierra el pool compartido.
+    """
+
+    def __init__(self, registry: 'OutboundHTTP', provider: str):
+        self.registry = registry
+        self.provider = provider
+
+    async def __aenter__(self) -> 'ProviderClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.registry.request(self.provider, method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+
+class OutboundHTTP:
+    """Registro de pools HTTP salientes por proveedor."""
+
+    def __init__(self, providers: Optional[Dict[str, Dict]] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 limiter: Any = None):
+        self._overrides = providers or {}
+        self._transport = transport
+        self._limiter = limiter
+        self._pools: Dict[Tuple[int, str], _Pool] = {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def config(self, provider: str) -> Dict[str, Any]:
+        return provider_config(provider, self._overrides)
+
+    @property
+    def limiter(self):
+        if self._limiter is None:
+            from app.ats.chatbot.components.rate_limiter import rate_limiter
+            self._limiter = rate_limiter
+        return self._limiter
+
+    def _provider_stats(self, provider: str) -> ProviderStats:
+        stats = self._stats.get(provider)
+        if stats is None:
+            stats = self._stats.setdefault(provider, ProviderStats())
+        return stats
+
+    def _build_client(self, config: Dict[str, Any]) -> httpx.AsyncClient:
+        kwargs = {
+            'timeout': httpx.Timeout(config['timeout'], connect=config['connect_timeout']),
+            'limits': httpx.Limits(
+                max_connections=config['max_connections'],
+                max_keepalive_connections=config['max_keepalive'],
+                keepalive_expiry=config['keepalive_expiry'],
+            ),
+            'http2': bool(config['http2'] and HTTP2_AVAILABLE),
+        }
+        if self._transport is not None:
+            kwargs['transport'] = self._transport
+        return httpx.AsyncClient(**kwargs)
+
+    def _pool(self, provider: str) -> _Pool:
+        loop = asyncio.get_running_loop()
+        key = (id(loop), provider)
+        pool = self._pools.get(key)
+        if pool is not None and pool.loop is loop:
+            return pool
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or pool.loop is not loop:
+                # Los loops cerrados (asyncio.run, async_to_sync) ya no pueden usar sus clientes
+                for stale in [k for k, p in self._pools.items() if p.loop.is_closed()]:
+                    del self._pools[stale]
+                config = self.config(provider)
+                pool = _Pool(loop, self._build_client(config), asyncio.Semaphore(config['max_concurrency']))
+                pool.closer = loop.create_task(self._close_with_loop(pool.client))
+                self._pools[key] = pool
+        return pool
+
+    @staticmethod
+    async def _close_with_loop(client: httpx.AsyncClient):
+        """Cierra el cliente cuando se cancelan las tareas del loop al terminar."""
+        try:
+            await asyncio.Future()
+        finally:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error cerrando cliente HTTP saliente: {e}")
+
+    def client(self, provider: str) -> ProviderClient:
+        """Cliente del proveedor para usar con ``async with``."""
+        return ProviderClient(self, provider)
+
+    def _backoff(self, config: Dict[str, Any], attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), config['max_backoff'])
+            except ValueError:
+                pass
+        # Jitter "equal": mitad fija y mitad aleatoria, para no sincronizar reintentos
+        delay = min(config['max_backoff'], config['backoff'] * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def request(self, provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Envía una petición por el pool del proveedor.
+
+        Reintenta errores de conexión y los estados de ``retry_statuses``
+        que permite ``status_retry_allowed``; el resto de errores HTTP se
+        devuelven tal cual (``raise_for_status`` queda a cargo del llamador).
+        ``rate_limit=(cuenta, destinatario)`` indica las cubetas del
+        ``rate_limiter`` por las que pasa cada reintento.
+        """
+        account, recipient = kwargs.pop('rate_limit', None) or (None, None)
+        config = self.config(provider)
+        pool = self._pool(provider)
+        stats = self._provider_stats(provider)
+        stats.requests += 1
+        attempt = 0
+        while True:
+            response = error = None
+            async with pool.semaphore:
+                stats.in_flight += 1
+                stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+                started = time.perf_counter()
+                try:
+                    response = await pool.client.request(method, url, **kwargs)
+                except RETRYABLE_ERRORS as e:
+                    error = e
+                except Exception:
+                    stats.errors += 1
+                    raise
+                finally:
+                    stats.in_flight -= 1
+                    stats.observe(time.perf_counter() - started)
+
+            retryable = error is not None or status_retry_allowed(
+                config, method, response.status_code, response.headers, kwargs.get('headers')
+            )
+            if not retryable or attempt >= config['retries']:
+                if error is not None:
+                    stats.errors += 1
+                    raise error
+                if response.status_code >= 400:
+                    stats.errors += 1
+                return response
+
+            attempt += 1
+            stats.retries += 1
+            delay = self._backoff(config, attempt, response)
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            logger.warning(f"Reintento {attempt}/{config['retries']} de {provider} en {delay:.2f}s: {reason}")
+            if response is not None:
+                await response.aclose()
+            await asyncio.sleep(delay)
+            await self.limiter.acquire(provider, account, recipient)
+
+    async def get(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(provider, 'GET', url, **kwargs)
+
+    async def post(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(provider, 'POST', url, **kwargs)
+
+    # Código síncrono ----------------------------------------------------------
+
+    def session(self, provider: str) -> requests.Session:
+        """``requests.Session`` keep-alive del proveedor; urllib3 sólo reintenta conexiones."""
+        session = self._sessions.get(provider)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                config = self.config(provider)
+                # Los reintentos por estado los decide request_sync
+                retry = Retry(
+                    total=config['retries'],
+                    connect=config['retries'],
+                    read=0,
+                    status=0,
+                    backoff_factor=config['backoff'],
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config['max_connections'], max_retries=retry)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[provider] = session
+        return session
+
+    def request_sync(self, provider: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Versión síncrona de ``request`` para código sin event loop (Celery, requests)."""
+        account, recipient = kwargs.pop('rate_limit', None) or (None, None)
+        config = self.config(provider)
+        kwargs.setdefault('timeout', (config['connect_timeout'], config['timeout']))
+        stats = self._provider_stats(provider)
+        stats.requests += 1
+        attempt = 0
+        while True:
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            started = time.perf_counter()
+            try:
+                response = self.session(provider).request(method, url, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.in_flight -= 1
+                stats.observe(time.perf_counter() - started)
+
+            retryable = status_retry_allowed(
+                config, method, response.status_code, response.headers, kwargs.get('headers')
+            )
+            if not retryable or attempt >= config['retries']:
+                if response.status_code >= 400:
+                    stats.errors += 1
+                return response
+
+            attempt += 1
+            stats.retries += 1
+            delay = self._backoff(config, attempt, response)
+            logger.warning(
+                f"Reintento {attempt}/{config['retries']} de {provider} en {delay:.2f}s: HTTP {response.status_code}"
+            )
+            response.close()
+            time.sleep(delay)
+            self.limiter.acquire_blocking(provider, account, recipient)
+
+    # Métricas y cierre --------------------------------------------------------
+
+    def _pool_usage(self, provider: str) -> Dict[str, Any]:
+        pools = [pool for (_, name), pool in list(self._pools.items()) if name == provider]
+        connections = idle = 0
+        for pool in pools:
+            # API interna de httpcore; si cambia, sólo se pierde este detalle
+            transport_pool = getattr(getattr(pool.client, '_transport', None), '_pool', None)
+            for connection in getattr(transport_pool, 'connections', []) or []:
+                connections += 1
+                try:
+                    idle += bool(connection.is_idle())
+                except Exception:
+                    pass
+        config = self.config(provider)
+        return {
+            'clients': len(pools),
+            'connections': connections,
+            'idle_connections': idle,
+            'max_connections': config['max_connections'],
+            'http2': bool(config['http2'] and HTTP2_AVAILABLE),
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas por proveedor: peticiones, errores, latencias y uso del pool."""
+        providers = set(self._stats) | {name for _, name in list(self._pools)}
+        return {
+            provider: {**self._provider_stats(provider).as_dict(), 'pool': self._pool_usage(provider)}
+            for provider in sorted(providers)
+        }
+
+    async def aclose(self):
+        """Cierra los clientes del event loop actual (lifespan de ASGI, fin de un consumidor)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key, pool in self._pools.items() if pool.loop is loop or pool.loop.is_closed()]
+            pools = [self._pools.pop(key) for key in keys]
+        for pool in pools:
+            if pool.loop is loop:
+                if pool.closer is not None:
+                    pool.closer.cancel()
+                try:
+                    await pool.client.aclose()
+                except Exception as e:
+                    logger.warning(f"Error cerrando cliente HTTP saliente: {e}")
+
+    def close(self):
+        """Cierra todos los clientes y sesiones desde código síncrono (apagado de workers)."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for pool in pools:
+            try:
+                if pool.loop.is_closed():
+                    continue
+                if pool.loop.is_running():
+                    asyncio.run_coroutine_threadsafe(pool.client.aclose(), pool.loop).result(timeout=5)
+                else:
+                    pool.loop.run_until_complete(pool.client.aclose())
+            except Exception as e:
+                logger.warning(f"Error cerrando cliente HTTP saliente: {e}")
+        for session in sessions:
+            session.close()
+
+    def _after_fork_in_child(self):
+        # Los sockets heredados pertenecen al padre: el hijo abre sus propias conexiones
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._sessions = {}
+        self._stats = {}
+
+
+outbound_http = OutboundHTTP()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=outbound_http._after_fork_in_child)
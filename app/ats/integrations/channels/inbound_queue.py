@@ -0,0 +1,378 @@
+# app/ats/integrations/channels/inbound_queue.py
+"""
+Cola durable de mensajes entrantes de los canales de chat.
+
+Los webhooks (WhatsApp, Telegram, Messenger, Instagram) sólo validan el
+payload, descartan duplicados por ID de mensaje y encolan cada mensaje; la
+respuesta HTTP sale en milisegundos y los reintentos de Meta ya no provocan
+procesamiento doble.
+
+- Cada canal tiene ``PARTITIONS`` streams de Redis; un usuario siempre cae en
+  la misma partición, así que sus mensajes conservan el orden.
+- ``InboundConsumer`` (comando ``process_inbound_messages``) lee lotes de sus
+  particiones, agrupa por usuario y procesa usuarios distintos en paralelo,
+  cada uno en orden. Se confirma (XACK) tras procesar; lo no confirmado se
+  vuelve a leer al reiniciar el consumidor.
+- Cada partición tiene un único consumidor lógico: con varios procesos se
+  reparten con ``--worker``/``--workers``.
+- Tras ``MAX_ATTEMPTS`` fallos el mensaje pasa al stream de mensajes muertos.
+
+Si Redis no está disponible, el webhook procesa los mensajes en línea como
+antes.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from app.ats.utils.tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+STREAM_PREFIX = 'inbound'
+GROUP = 'workers'
+# Una partición = un consumidor lógico; el pendiente sobrevive reinicios
+CONSUMER = 'owner'
+
+# Marca el ID como visto y encola el mensaje de forma atómica; nil si ya se vio
+ENQUEUE_SCRIPT = """
+if redis.call('SET', KEYS[1], '1', 'EX', ARGV[1], 'NX') then
+    return redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', 'data', ARGV[3])
+end
+return false
+"""
+
+DEFAULTS = {
+    'ENABLED': True,
+    'PARTITIONS': 16,
+    'DEDUP_TTL': 3 * 24 * 3600,
+    'MAX_STREAM_LENGTH': 100000,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 1.0,
+}
+
+# Procesador de cada canal: coroutine que recibe un ``InboundMessage``
+PROCESSORS = {
+    'whatsapp': 'app.ats.integrations.channels.whatsapp.whatsapp.process_inbound_message',
+    'telegram': 'app.ats.integrations.channels.telegram.telegram.process_inbound_message',
+    'messenger': 'app.ats.integrations.channels.messenger.messenger.process_inbound_message',
+    'instagram': 'app.ats.integrations.channels.instagram.instagram.process_inbound_message',
+}
+
+
+def queue_settings() -> Dict[str, Any]:
+    try:
+        return {**DEFAULTS, **(getattr(settings, 'INBOUND_QUEUE', {}) or {})}
+    except Exception:
+        return dict(DEFAULTS)
+
+
+@dataclass
+class InboundMessage:
+    """Mensaje entrante normalizado, tal como se guarda en la cola."""
+    channel: str
+    message_id: str
+    user_id: str
+    payload: Dict[str, Any]
+    account: Optional[str] = None  # phone_number_id, bot_name o page_id
+    received_at: float = field(default_factory=time.time)
+    attempts: int = 0
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def loads(cls, data) -> 'InboundMessage':
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return cls(**json.loads(data))
+
+
+def partition_for(user_id: str, partitions: int) -> int:
+    """Partición estable del usuario (crc32, igual en todos los procesos)."""
+    return zlib.crc32(str(user_id).encode('utf-8')) % partitions
+
+
+def stream_name(channel: str, partition: int) -> str:
+    return f"{STREAM_PREFIX}:{channel}:{partition}"
+
+
+def dead_letter_stream(channel: str) -> str:
+    return f"{STREAM_PREFIX}:{channel}:dead"
+
+
+def _decode(value) -> str:
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def meta_messaging_messages(payload: Dict[str, Any], channel: str) -> List[InboundMessage]:
+    """Mensajes de un payload ``entry[].messaging[]`` de Messenger o Instagram."""
+    messages = []
+    for entry in payload.get('entry', []):
+        for event in entry.get('messaging', []):
+            message = event.get('message') or {}
+            sender_id = event.get('sender', {}).get('id')
+            if not message.get('mid') or not sender_id or message.get('is_echo'):
+                continue
+            messages.append(InboundMessage(
+                channel=channel,
+                message_id=message['mid'],
+                user_id=str(sender_id),
+                account=str(entry.get('id', '')) or None,
+                payload=message,
+            ))
+    return messages
+
+
+class InboundQueue:
+    """Encola mensajes entrantes y lee lotes por partición."""
+
+    def __init__(self, redis_client: Any = None, partitions: Optional[int] = None,
+                 dedup_ttl: Optional[int] = None, max_stream_length: Optional[int] = None):
+        config = queue_settings()
+        self._redis = redis_client
+        self.partitions = partitions or config['PARTITIONS']
+        self.dedup_ttl = dedup_ttl or config['DEDUP_TTL']
+        self.max_stream_length = max_stream_length or config['MAX_STREAM_LENGTH']
+        self._groups_ready = set()
+        self._enqueue_script = None
+        self._enqueue_script_client = None
+
+    @property
+    def redis(self):
+        """Cliente Redis (compartido con ``tiered_cache``) o ``None`` si no hay conexión."""
+        if self._redis is not None:
+            return self._redis
+        if not queue_settings()['ENABLED']:
+            return None
+        return tiered_cache.redis
+
+    @property
+    def available(self) -> bool:
+        return self.redis is not None
+
+    def _ensure_group(self, stream: str):
+        if stream in self._groups_ready:
+            return
+        try:
+            self.redis.xgroup_create(stream, GROUP, id='0', mkstream=True)
+        except Exception as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._groups_ready.add(stream)
+
+    def _enqueue_one(self, seen_key: str, stream: str, data: str) -> bool:
+        """``SET NX`` + ``XADD`` en un script Lua: ambos o ninguno. False si es duplicado."""
+        redis = self.redis
+        if not hasattr(redis, 'register_script'):
+            # InMemoryRedis: un solo proceso, no hay caída posible entre los dos pasos
+            if not redis.set(seen_key, 1, ex=self.dedup_ttl, nx=True):
+                return False
+            redis.xadd(stream, {'data': data}, maxlen=self.max_stream_length, approximate=True)
+            return True
+        if self._enqueue_script is None or self._enqueue_script_client is not redis:
+            self._enqueue_script = redis.register_script(ENQUEUE_SCRIPT)
+            self._enqueue_script_client = redis
+        return self._enqueue_script(
+            keys=[seen_key, stream], args=[self.dedup_ttl, self.max_stream_length, data]
+        ) is not None
+
+    def enqueue(self, messages: Iterable[InboundMessage]) -> Tuple[int, int]:
+        """
+        Encola los mensajes no vistos antes.
+
+        Devuelve ``(encolados, duplicados)``. La deduplicación usa ``SET NX``
+        sobre el ID del mensaje con TTL ``DEDUP_TTL``, en el mismo script que
+        el ``XADD``: un proceso que muere entre ambos no deja el ID marcado
+        sin mensaje en la cola.
+        """
+        queued = duplicates = 0
+        for message in messages:
+            seen_key = f"{STREAM_PREFIX}:seen:{message.channel}:{message.message_id}"
+            stream = stream_name(message.channel, partition_for(message.user_id, self.partitions))
+            self._ensure_group(stream)
+            try:
+                added = self._enqueue_one(seen_key, stream, message.dumps())
+            except Exception:
+                # Si el XADD falló dentro del script el SET ya quedó aplicado:
+                # liberar el ID para que el reintento del proveedor no se descarte
+                self.redis.delete(seen_key)
+                raise
+            if added:
+                queued += 1
+            else:
+                duplicates += 1
+        return queued, duplicates
+
+    def read(self, channel: str, partitions: Sequence[int], count: int,
+             block_ms: Optional[int] = None, pending: bool = False) -> List[Tuple[str, bytes, InboundMessage]]:
+        """
+        Lee hasta ``count`` mensajes de las particiones indicadas.
+
+        Con ``pending=True`` devuelve los entregados y no confirmados (tras
+        un reinicio) en lugar de los nuevos.
+        """
+        streams = {stream_name(channel, p): ('0' if pending else '>') for p in partitions}
+        for stream in streams:
+            self._ensure_group(stream)
+        response = self.redis.xreadgroup(GROUP, CONSUMER, streams, count=count, block=block_ms) or []
+        entries = []
+        for stream, stream_entries in response:
+            for entry_id, fields in stream_entries:
+                data = fields.get(b'data', fields.get('data')) if fields else None
+                if data is None:
+                    # Entrada recortada por MAXLEN: sólo queda confirmarla
+                    self.ack(_decode(stream), [entry_id])
+                    continue
+                entries.append((_decode(stream), entry_id, InboundMessage.loads(data)))
+        return entries
+
+    def ack(self, stream: str, entry_ids: Sequence[bytes]):
+        if entry_ids:
+            self.redis.xack(stream, GROUP, *entry_ids)
+
+    def dead_letter(self, message: InboundMessage, error: str):
+        self.redis.xadd(
+            dead_letter_stream(message.channel),
+            {'data': message.dumps(), 'error': error[:1000]},
+            maxlen=self.max_stream_length,
+            approximate=True,
+        )
+
+    def backlog(self, channel: str) -> int:
+        return sum(self.redis.xlen(stream_name(channel, p)) for p in range(self.partitions))
+
+
+inbound_queue = InboundQueue()
+
+
+def get_processor(channel: str) -> Callable:
+    return import_string(PROCESSORS[channel])
+
+
+async def accept_messages(messages: List[InboundMessage], queue: Optional[InboundQueue] = None) -> Dict[str, Any]:
+    """
+    Encola los mensajes de un webhook, o los procesa en línea si no hay Redis.
+
+    Devuelve el cuerpo de la respuesta del webhook.
+    """
+    queue = queue or inbound_queue
+    if not messages:
+        return {'status': 'success', 'message': 'No messages to process'}
+
+    if await asyncio.to_thread(lambda: queue.available):
+        try:
+            queued, duplicates = await asyncio.to_thread(queue.enqueue, messages)
+            return {'status': 'success', 'queued': queued, 'duplicates': duplicates}
+        except Exception as e:
+            logger.error(f"No se pudieron encolar mensajes de {messages[0].channel}, se procesan en línea: {e}")
+
+    processor = get_processor(messages[0].channel)
+    processed = 0
+    for message in messages:
+        try:
+            await processor(message)
+            processed += 1
+        except Exception as e:
+            logger.error(f"Error procesando mensaje {message.message_id} de {message.channel}: {e}")
+    return {'status': 'success', 'processed': processed}
+
+
+class InboundConsumer:
+    """
+    Consume las particiones asignadas de un canal.
+
+    Args:
+        channel: Canal a consumir
+        worker: Índice de este proceso (0..workers-1)
+        workers: Número de procesos consumidores del canal
+        batch_size: Mensajes leídos por lote
+        concurrency: Usuarios procesados en paralelo
+    """
+
+    def __init__(self, channel: str, worker: int = 0, workers: int = 1, batch_size: int = 100,
+                 concurrency: int = 20, queue: Optional[InboundQueue] = None,
+                 processor: Optional[Callable] = None):
+        config = queue_settings()
+        self.channel = channel
+        self.queue = queue or inbound_queue
+        self.partitions = [p for p in range(self.queue.partitions) if p % workers == worker]
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.processor = processor or get_processor(channel)
+        self.max_attempts = config['MAX_ATTEMPTS']
+        self.retry_delay = config['RETRY_DELAY']
+        self.stats = {'processed': 0, 'failed': 0, 'batches': 0}
+        self._stopping = False
+
+    def stop(self):
+        self._stopping = True
+
+    async def _process(self, message: InboundMessage) -> bool:
+        while True:
+            message.attempts += 1
+            try:
+                await self.processor(message)
+                self.stats['processed'] += 1
+                return True
+            except Exception as e:
+                if message.attempts >= self.max_attempts:
+                    logger.error(
+                        f"Mensaje {message.message_id} de {self.channel} descartado tras "
+                        f"{message.attempts} intentos: {e}"
+                    )
+                    await asyncio.to_thread(self.queue.dead_letter, message, str(e))
+                    self.stats['failed'] += 1
+                    return False
+                logger.warning(f"Reintentando mensaje {message.message_id} de {self.channel}: {e}")
+                await asyncio.sleep(self.retry_delay * message.attempts)
+
+    async def _process_user(self, entries: List[Tuple[str, bytes, InboundMessage]], semaphore: asyncio.Semaphore):
+        async with semaphore:
+            for stream, entry_id, message in entries:
+                await self._process(message)
+                await asyncio.to_thread(self.queue.ack, stream, [entry_id])
+
+    async def process_batch(self, entries: List[Tuple[str, bytes, InboundMessage]]) -> int:
+        """Procesa un lote: usuarios en paralelo, mensajes de cada usuario en orden."""
+        by_user: Dict[str, List] = OrderedDict()
+        for entry in entries:
+            by_user.setdefault(entry[2].user_id, []).append(entry)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._process_user(user_entries, semaphore) for user_entries in by_user.values()))
+        self.stats['batches'] += 1
+        return len(entries)
+
+    async def drain_pending(self) -> int:
+        """Reprocesa lo entregado y no confirmado antes de un reinicio."""
+        total = 0
+        while True:
+            entries = await asyncio.to_thread(
+                self.queue.read, self.channel, self.partitions, self.batch_size, None, True
+            )
+            if not entries:
+                return total
+            total += await self.process_batch(entries)
+
+    async def run(self, once: bool = False, block_ms: int = 1000):
+        """Bucle de consumo; con ``once`` termina cuando no hay más mensajes."""
+        recovered = await self.drain_pending()
+        if recovered:
+            logger.info(f"Recuperados {recovered} mensajes pendientes de {self.channel}")
+        while not self._stopping:
+            entries = await asyncio.to_thread(
+                self.queue.read, self.channel, self.partitions, self.batch_size, block_ms
+            )
+            if entries:
+                await self.process_batch(entries)
+            elif once:
+                break
+        return self.stats
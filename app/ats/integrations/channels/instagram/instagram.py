@@ -6,7 +6,6 @@
 
 import json
 import logging
-import httpx
 import asyncio
 from typing import Optional, Dict, Any, List, Callable
 from django.views.decorators.csrf import csrf_exempt
@@ -16,7 +15,9 @@ from asgiref.sync import sync_to_async
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.models import Person, BusinessUnit, InstagramAPI, MetaAPI, MessageLog
 from app.ats.chatbot.components.chat_state_manager import ChatStateManager
-from app.ats.chatbot.components.rate_limiter import RateLimiter
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
+from app.ats.integrations.channels.inbound_queue import InboundMessage, accept_messages, meta_messaging_messages
 from app.ats.integrations.services.message import (
     send_message, 
     send_options, 
@@ -43,7 +44,7 @@ async def fetch_instagram_user_data(user_id: str, api_instance: InstagramAPI, pa
             "fields": "username,full_name",
             "access_token": api_instance.access_token
         }
-        async with httpx.AsyncClient() as client:
+        async with outbound_http.client('instagram') as client:
             response = await client.get(url, params=params)
             if response.status_code == 200:
                 data = response.json()
@@ -85,7 +86,7 @@ class InstagramHandler:
             self.instagram_api = cache.get(cache_key_instagram)
             if not self.instagram_api:
                 self.instagram_api = await InstagramAPI.objects.filter(
-                    phoneID=self.phone_id, 
+                    account_id=self.phone_id, 
                     is_active=True
                 ).afirst()
                 if self.instagram_api:
@@ -296,8 +297,9 @@ class InstagramHandler:
                     "quick_replies": quick_replies
                 }
             }
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                resp = await client.post(url, headers=headers, json=payload)
+            await rate_limiter.acquire('instagram', self.phone_id, user_id)
+            async with outbound_http.client('instagram') as client:
+                resp = await client.post(url, headers=headers, json=payload, rate_limit=(self.phone_id, user_id))
                 resp.raise_for_status()
             logger.info(f"✅ Quick replies enviados a {user_id}")
             return True
@@ -338,29 +340,52 @@ class InstagramHandler:
             logger.error(f"Error enviando template message Instagram: {str(e)}")
             return {'error': str(e)}
 
+async def _instagram_api_for(account: Optional[str]) -> InstagramAPI:
+    cache_key = f"instagram_api:{account}"
+    instagram_api = cache.get(cache_key) if account else None
+    if not instagram_api:
+        queryset = InstagramAPI.objects.select_related('business_unit').filter(is_active=True)
+        if account:
+            instagram_api = await queryset.filter(account_id=account).afirst()
+        # Compatibilidad: una sola cuenta activa configurada
+        instagram_api = instagram_api or await queryset.afirst()
+        if not instagram_api:
+            raise ValueError(f"No hay InstagramAPI activa para {account}")
+        if account:
+            cache.set(cache_key, instagram_api, CACHE_TIMEOUT)
+    return instagram_api
+
+
+async def process_inbound_message(inbound: InboundMessage) -> Dict[str, Any]:
+    """Procesa un mensaje de la cola de entrada (consumidor o modo en línea)."""
+    instagram_api = await _instagram_api_for(inbound.account)
+    business_unit = await sync_to_async(lambda: instagram_api.business_unit)()
+    handler = InstagramHandler(inbound.user_id, instagram_api.account_id, business_unit)
+    await handler.initialize()
+    return await handler.handle_message(inbound.payload)
+
+
 @csrf_exempt
 async def instagram_webhook(request):
-    """Webhook para procesar mensajes entrantes de Instagram."""
+    """
+    Webhook para mensajes entrantes de Instagram.
+
+    Encola todos los mensajes del payload (deduplicados por ``mid``) y
+    responde de inmediato.
+    """
     try:
         if request.method != "POST":
             return JsonResponse({"status": "error", "message": "Método no permitido"}, status=405)
 
-        payload = json.loads(request.body.decode("utf-8"))
-        entry = payload.get("entry", [{}])[0]
-        messaging = entry.get("messaging", [{}])[0]
-        user_id = messaging.get("sender", {}).get("id")
-        message = messaging.get("message", {})
-        phone_id = await sync_to_async(lambda: InstagramAPI.objects.filter(
-            is_active=True
-        ).first().phoneID)()
-        business_unit = await sync_to_async(lambda: InstagramAPI.objects.filter(
-            is_active=True
-        ).first().business_unit)()
+        try:
+            payload = json.loads(request.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return JsonResponse({"status": "error", "message": "JSON inválido"}, status=400)
+        if not isinstance(payload, dict) or not isinstance(payload.get("entry"), list):
+            return JsonResponse({"status": "error", "message": "Payload inválido: falta 'entry'"}, status=400)
 
-        handler = InstagramHandler(user_id, phone_id, business_unit)
-        await handler.initialize()
-        response = await handler.handle_message(message)
-        return JsonResponse({"status": "success", "response": response}, status=200)
+        result = await accept_messages(meta_messaging_messages(payload, 'instagram'))
+        return JsonResponse(result, status=200)
     except Exception as e:
         logger.error(f"Error en instagram_webhook: {str(e)}")
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
@@ -6,7 +6,6 @@
 
 import json
 import logging
-import httpx
 import asyncio
 from typing import Optional, Dict, Any, List, Callable
 from django.views.decorators.csrf import csrf_exempt
@@ -16,7 +15,9 @@ from asgiref.sync import sync_to_async
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.models import Person, BusinessUnit, MessengerAPI, MetaAPI, MessageLog
 from app.ats.chatbot.components.chat_state_manager import ChatStateManager
-from app.ats.chatbot.components.rate_limiter import RateLimiter
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
+from app.ats.integrations.channels.inbound_queue import InboundMessage, accept_messages, meta_messaging_messages
 from app.ats.integrations.services.message import (
     send_message, 
     send_options, 
@@ -43,7 +44,7 @@ async def fetch_messenger_user_data(user_id: str, api_instance: MessengerAPI, pa
             "fields": "first_name,last_name,email,locale",
             "access_token": api_instance.page_access_token
         }
-        async with httpx.AsyncClient() as client:
+        async with outbound_http.client('messenger') as client:
             response = await client.get(url, params=params)
             if response.status_code == 200:
                 data = response.json()
@@ -292,8 +293,9 @@ class MessengerHandler:
                     "quick_replies": quick_replies
                 }
             }
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                resp = await client.post(url, headers=headers, json=payload)
+            await rate_limiter.acquire('messenger', self.page_id, user_id)
+            async with outbound_http.client('messenger') as client:
+                resp = await client.post(url, headers=headers, json=payload, rate_limit=(self.page_id, user_id))
                 resp.raise_for_status()
             logger.info(f"✅ Quick replies enviados a {user_id}")
             return True
@@ -334,29 +336,55 @@ class MessengerHandler:
             logger.error(f"Error enviando template message Messenger: {str(e)}")
             return {'error': str(e)}
 
+async def _messenger_api_for(account: Optional[str]) -> MessengerAPI:
+    cache_key = f"messenger_api:{account}"
+    messenger_api = cache.get(cache_key) if account else None
+    if not messenger_api:
+        queryset = MessengerAPI.objects.select_related('business_unit').filter(is_active=True)
+        if account:
+            messenger_api = await queryset.filter(page_id=account).afirst()
+        # Compatibilidad: una sola cuenta activa configurada
+        messenger_api = messenger_api or await queryset.afirst()
+        if not messenger_api:
+            raise ValueError(f"No hay MessengerAPI activa para {account}")
+        if account:
+            cache.set(cache_key, messenger_api, CACHE_TIMEOUT)
+    return messenger_api
+
+
+async def process_inbound_message(inbound: InboundMessage) -> Dict[str, Any]:
+    """Procesa un mensaje de la cola de entrada (consumidor o modo en línea)."""
+    messenger_api = await _messenger_api_for(inbound.account)
+    business_unit = await sync_to_async(lambda: messenger_api.business_unit)()
+    handler = MessengerHandler(inbound.user_id, messenger_api.page_id, business_unit)
+    await handler.initialize()
+    return await handler.handle_message(inbound.payload)
+
+
 @csrf_exempt
-async def messenger_webhook(request):
-    """Webhook para procesar mensajes entrantes de Messenger."""
+async def messenger_webhook(request, page_id: Optional[str] = None):
+    """
+    Webhook para mensajes entrantes de Messenger.
+
+    Encola todos los mensajes del payload (deduplicados por ``mid``) y
+    responde de inmediato.
+    """
     try:
         if request.method != "POST":
             return JsonResponse({"status": "error", "message": "Método no permitido"}, status=405)
 
-        payload = json.loads(request.body.decode("utf-8"))
-        entry = payload.get("entry", [{}])[0]
-        messaging = entry.get("messaging", [{}])[0]
-        user_id = messaging.get("sender", {}).get("id")
-        message = messaging.get("message", {})
-        page_id = await sync_to_async(lambda: MessengerAPI.objects.filter(
-            is_active=True
-        ).first().page_id)()
-        business_unit = await sync_to_async(lambda: MessengerAPI.objects.filter(
-            is_active=True
-        ).first().business_unit)()
+        try:
+            payload = json.loads(request.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return JsonResponse({"status": "error", "message": "JSON inválido"}, status=400)
+        if not isinstance(payload, dict) or not isinstance(payload.get("entry"), list):
+            return JsonResponse({"status": "error", "message": "Payload inválido: falta 'entry'"}, status=400)
 
-        handler = MessengerHandler(user_id, page_id, business_unit)
-        await handler.initialize()
-        response = await handler.handle_message(message)
-        return JsonResponse({"status": "success", "response": response}, status=200)
+        messages = meta_messaging_messages(payload, 'messenger')
+        for message in messages:
+            message.account = message.account or page_id
+        result = await accept_messages(messages)
+        return JsonResponse(result, status=200)
     except Exception as e:
         logger.error(f"Error en messenger_webhook: {str(e)}")
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
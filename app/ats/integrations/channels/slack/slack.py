@@ -17,7 +17,8 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from app.models import SlackAPI, BusinessUnit, Person
 from app.ats.chatbot.core.chatbot import ChatBotHandler
 from app.ats.chatbot.components.chat_state_manager import ChatStateManager
-from app.ats.chatbot.components.rate_limiter import RateLimiter
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
 from app.ats.integrations.services.message import (
     send_message, 
     send_options, 
@@ -50,7 +51,7 @@ class SlackHandler:
         self.business_unit = business_unit
         self.slack_api = None
         self.chat_state_manager = ChatStateManager()
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter
     
     async def initialize(self):
         """Inicializa la conexión con la API de Slack."""
@@ -311,8 +312,7 @@ async def slack_webhook(request):
 
 async def send_slack_message(channel_id: str, message: str, bot_token: str) -> bool:
     """Envía un mensaje de texto a un canal de Slack con rate limiting."""
-    rate_limiter = RateLimiter()
-    await rate_limiter.wait_for_limit('slack')
+    await rate_limiter.acquire('slack', channel_id)
     """Envía un mensaje de texto a un canal de Slack."""
     url = "https://slack.com/api/chat.postMessage"
     headers = {
@@ -324,8 +324,8 @@ async def send_slack_message(channel_id: str, message: str, bot_token: str) -> b
         "text": message
     }
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload)
+        async with outbound_http.client('slack') as client:
+            response = await client.post(url, headers=headers, json=payload, rate_limit=(channel_id, None))
             response.raise_for_status()
         logger.info(f"✅ Mensaje enviado a {channel_id} en Slack: {message}")
         return True
@@ -338,8 +338,7 @@ async def send_slack_message(channel_id: str, message: str, bot_token: str) -> b
 
 async def send_slack_message_with_buttons(channel_id: str, message: str, buttons: List[Dict], bot_token: str) -> bool:
     """Envía un mensaje con botones a Slack con rate limiting."""
-    rate_limiter = RateLimiter()
-    await rate_limiter.wait_for_limit('slack')
+    await rate_limiter.acquire('slack', channel_id)
     """Envía un mensaje con botones a Slack."""
     url = "https://slack.com/api/chat.postMessage"
     headers = {
@@ -373,8 +372,8 @@ async def send_slack_message_with_buttons(channel_id: str, message: str, buttons
         "blocks": blocks
     }
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload)
+        async with outbound_http.client('slack') as client:
+            response = await client.post(url, headers=headers, json=payload, rate_limit=(channel_id, None))
             response.raise_for_status()
         logger.info(f"✅ Mensaje con botones enviado a {channel_id} en Slack")
         return True
@@ -387,8 +386,7 @@ async def send_slack_message_with_buttons(channel_id: str, message: str, buttons
 
 async def send_slack_document(channel_id: str, file_url: str, caption: str, bot_token: str) -> bool:
     """Envía un documento a Slack con rate limiting."""
-    rate_limiter = RateLimiter()
-    await rate_limiter.wait_for_limit('slack')
+    await rate_limiter.acquire('slack', channel_id)
     try:
         url = "https://slack.com/api/files.upload"
         headers = {"Authorization": f"Bearer {bot_token}"}
@@ -398,8 +396,8 @@ async def send_slack_document(channel_id: str, file_url: str, caption: str, bot_
             "file": file_url,
             "filename": "document"
         }
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(url, headers=headers, data=payload)
+        async with outbound_http.client('slack') as client:
+            response = await client.post(url, headers=headers, data=payload, rate_limit=(channel_id, None))
             response.raise_for_status()
         logger.info(f"[send_slack_document] Documento enviado a {channel_id}")
         return True
@@ -415,7 +413,7 @@ async def fetch_slack_user_data(user_id: str, api_instance: SlackAPI, payload: D
         url = "https://slack.com/api/users.info"
         headers = {"Authorization": f"Bearer {api_instance.bot_token}"}
         params = {"user": user_id}
-        async with httpx.AsyncClient() as client:
+        async with outbound_http.client('slack') as client:
             response = await client.get(url, headers=headers, params=params)
             if response.status_code == 200:
                 data = response.json().get("user", {})
@@ -7,7 +7,6 @@
 
 import json
 import logging
-import httpx
 import asyncio
 import time
 import hmac
@@ -22,7 +21,9 @@ from django.core.cache import cache
 from asgiref.sync import sync_to_async
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.models import Person, BusinessUnit, TelegramAPI
-from app.ats.chatbot.components.rate_limiter import RateLimiter
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
+from app.ats.integrations.channels.inbound_queue import InboundMessage, accept_messages
 from app.ats.integrations.services.document import EnhancedDocumentProcessor as DocumentProcessor
 from app.ats.integrations.services.message import (
     send_message, 
@@ -47,7 +48,7 @@ async def fetch_telegram_user_data(user_id: str, api_instance: TelegramAPI, payl
 
         url = f"https://api.telegram.org/bot{api_instance.api_key}/getChat"
         params = {"chat_id": user_id}
-        async with httpx.AsyncClient() as client:
+        async with outbound_http.client('telegram') as client:
             response = await client.get(url, params=params)
             if response.status_code == 200:
                 data = response.json().get('result', {})
@@ -79,7 +80,7 @@ class TelegramHandler:
         self.intent_processor = None  # Inicializado como None para carga perezosa
         self.telegram_api: Optional[TelegramAPI] = None
         self.user_data: Dict[str, Any] = {}
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter
         self.webapp_secret = getattr(settings, 'TELEGRAM_WEBAPP_SECRET', 'default_secret')
         self.base_url = getattr(settings, 'BASE_URL', 'https://grupohuntred.com')
     
@@ -195,7 +196,7 @@ class TelegramHandler:
         url = f"https://api.telegram.org/bot{self.telegram_api.api_key}/answerCallbackQuery"
         payload = {"callback_query_id": callback_query_id}
         try:
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+            async with outbound_http.client('telegram') as client:
                 response = await client.post(url, json=payload)
                 response.raise_for_status()
             return True
@@ -317,8 +318,9 @@ class TelegramHandler:
                 "parse_mode": "HTML",
                 "reply_markup": {"inline_keyboard": inline_keyboard}
             }
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                resp = await client.post(url, json=payload)
+            await self.rate_limiter.acquire('telegram', self.bot_name, str(chat_id))
+            async with outbound_http.client('telegram') as client:
+                resp = await client.post(url, json=payload, rate_limit=(self.bot_name, str(chat_id)))
                 resp.raise_for_status()
             logger.info(f"✅ Inline keyboard enviado a {chat_id}")
             return True
@@ -400,8 +402,9 @@ class TelegramHandler:
                 "media": json.dumps(media)
             }
             
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                resp = await client.post(url, json=payload)
+            await self.rate_limiter.acquire('telegram', self.bot_name, str(chat_id))
+            async with outbound_http.client('telegram') as client:
+                resp = await client.post(url, json=payload, rate_limit=(self.bot_name, str(chat_id)))
                 resp.raise_for_status()
             
             logger.info(f"✅ Media group enviado a {chat_id}")
@@ -421,8 +424,9 @@ class TelegramHandler:
                 "reply_markup": {"inline_keyboard": keyboard}
             }
             
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                resp = await client.post(url, json=payload)
+            await self.rate_limiter.acquire('telegram', self.bot_name, str(chat_id))
+            async with outbound_http.client('telegram') as client:
+                resp = await client.post(url, json=payload, rate_limit=(self.bot_name, str(chat_id)))
                 resp.raise_for_status()
             
             logger.info(f"✅ Mensaje con teclado enviado a {chat_id}")
@@ -510,7 +514,7 @@ class TelegramHandler:
             url = f"https://api.telegram.org/bot{self.telegram_api.api_key}/getFile"
             params = {"file_id": file_id}
             
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+            async with outbound_http.client('telegram') as client:
                 resp = await client.get(url, params=params)
                 resp.raise_for_status()
                 file_info = resp.json()
@@ -571,23 +575,63 @@ class TelegramHandler:
             logger.error(f"❌ Error enviando confirmación de CV: {str(e)}", exc_info=True)
             return False
 
+def inbound_messages(payload: Dict[str, Any], bot_name: str) -> List[InboundMessage]:
+    """Un update de Telegram como mensaje de la cola (deduplicado por update_id)."""
+    update_id = payload.get("update_id")
+    user_id = payload.get("message", {}).get("chat", {}).get("id", payload.get("callback_query", {}).get("from", {}).get("id"))
+    if update_id is None or user_id is None:
+        return []
+    return [InboundMessage(
+        channel='telegram',
+        message_id=f"{bot_name}:{update_id}",
+        user_id=str(user_id),
+        account=bot_name,
+        payload=payload,
+    )]
+
+
+async def _business_unit_for_bot(bot_name: str) -> BusinessUnit:
+    # Misma clave de caché que TelegramHandler.initialize
+    cache_key = f"telegram_api:{bot_name}"
+    telegram_api = cache.get(cache_key)
+    if not telegram_api:
+        telegram_api = await TelegramAPI.objects.select_related('business_unit').filter(
+            bot_name=bot_name, is_active=True
+        ).afirst()
+        if not telegram_api:
+            raise ValueError(f"No se encontró TelegramAPI para bot_name: {bot_name}")
+        cache.set(cache_key, telegram_api, CACHE_TIMEOUT)
+    return await sync_to_async(lambda: telegram_api.business_unit)()
+
+
+async def process_inbound_message(inbound: InboundMessage) -> Dict[str, Any]:
+    """Procesa un update de la cola de entrada (consumidor o modo en línea)."""
+    business_unit = await _business_unit_for_bot(inbound.account)
+    handler = TelegramHandler(inbound.user_id, inbound.account, business_unit)
+    await handler.initialize()
+    return await handler.handle_message(inbound.payload)
+
+
 @csrf_exempt
 async def telegram_webhook(request, bot_name: str):
-    """Webhook para procesar mensajes entrantes de Telegram."""
+    """
+    Webhook para mensajes entrantes de Telegram.
+
+    Encola el update (deduplicado por ``update_id``) y responde de inmediato.
+    """
     try:
         if request.method != "POST":
             return JsonResponse({"status": "error", "message": "Método no permitido"}, status=405)
 
-        payload = json.loads(request.body.decode("utf-8"))
-        user_id = str(payload.get("message", {}).get("chat", {}).get("id", payload.get("callback_query", {}).get("from", {}).get("id")))
-        business_unit = await sync_to_async(lambda: TelegramAPI.objects.filter(
-            bot_name=bot_name, is_active=True
-        ).first().business_unit)()
+        try:
+            payload = json.loads(request.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return JsonResponse({"status": "error", "message": "JSON inválido"}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({"status": "error", "message": "Payload inválido"}, status=400)
 
-        handler = TelegramHandler(user_id, bot_name, business_unit)
-        await handler.initialize()
-        response = await handler.handle_message(payload)
-        return JsonResponse({"status": "success", "response": response}, status=200)
+        result = await accept_messages(inbound_messages(payload, bot_name))
+        return JsonResponse(result, status=200)
     except Exception as e:
         logger.error(f"Error en telegram_webhook: {str(e)}")
-        return JsonResponse({"status": "error", "message": str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
@@ -1,7 +1,8 @@
 from typing import Dict, Any, Optional, List
-import httpx
 import logging
 from app.config import settings as global_settings
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
 
 logger = logging.getLogger('integrations.whatsapp')
 
@@ -110,7 +111,10 @@ class WhatsAppService:
             'Content-Type': 'application/json'
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
+        await rate_limiter.acquire('whatsapp', self.phone_number_id, payload.get('to'))
+        async with outbound_http.client('whatsapp') as client:
+            response = await client.post(
+                url, json=payload, headers=headers, rate_limit=(self.phone_number_id, payload.get('to'))
+            )
             response.raise_for_status()
             return response.json() 
\ No newline at end of file
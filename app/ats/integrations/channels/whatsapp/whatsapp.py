@@ -21,6 +21,8 @@ from django.conf import settings
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 from tenacity import retry, stop_after_attempt, wait_exponential
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
 from app.models import (
     Person, BusinessUnit, WhatsAppAPI, ChatState,
     Chat, ChatMessage, Notification, MessageLog
@@ -35,6 +37,7 @@ def get_intent_processor():
 from app.ats.integrations.services.document import EnhancedDocumentProcessor
 from app.ats.chatbot.middleware.message_retry import MessageRetry
 from app.ats.integrations.services import MessageService
+from app.ats.integrations.channels.inbound_queue import InboundMessage, accept_messages
 
 # Stub temporal para registro_amigro - utilizado durante la migración
 def registro_amigro(phone_number=None, business_unit_id=None, flow_type='registro', **kwargs):
@@ -260,7 +263,10 @@ class WhatsAppHandler:
                     'components': components
                 }
             }
-            response = requests.post(url, headers=headers, json=payload)
+            await rate_limiter.acquire('whatsapp', self.phone_number_id, phone_number)
+            response = await outbound_http.post(
+                'whatsapp', url, headers=headers, json=payload, rate_limit=(self.phone_number_id, phone_number)
+            )
             response.raise_for_status()
             result = response.json()
             # Determinar si estamos en ventana de 24 horas
@@ -319,35 +325,60 @@ class WhatsAppHandler:
             logger.error(f"Error enviando template message: {str(e)}")
             return {'error': str(e)}
 
+def inbound_messages(payload: Dict[str, Any]) -> List[InboundMessage]:
+    """Todos los mensajes de un payload de WhatsApp (todas las entradas y cambios)."""
+    messages = []
+    for entry in payload.get('entry', []):
+        for change in entry.get('changes', []):
+            value = change.get('value', {})
+            phone_number_id = value.get('metadata', {}).get('phone_number_id')
+            for message in value.get('messages', []):
+                if not message.get('id') or not message.get('from'):
+                    continue
+                messages.append(InboundMessage(
+                    channel='whatsapp',
+                    message_id=message['id'],
+                    user_id=message['from'],
+                    account=phone_number_id,
+                    payload=message,
+                ))
+    return messages
+
+
+async def process_inbound_message(inbound: InboundMessage) -> Dict:
+    """Procesa un mensaje de la cola de entrada (consumidor o modo en línea)."""
+    # La ventana de 24h cuenta desde que Meta entregó el mensaje, no desde que se procesa
+    cache_key = f"{LAST_INTERACTION_CACHE_PREFIX}{inbound.user_id}"
+    cache.set(cache_key, inbound.received_at, CACHE_TIMEOUT)
+
+    handler = WhatsAppHandler()
+    response = await handler.receive_message(inbound.payload)
+    if isinstance(response, dict) and response.get('status') == 'error':
+        raise RuntimeError(response.get('error'))
+    return response
+
+
 @csrf_exempt
 async def whatsapp_webhook(request):
-    """Webhook para procesar mensajes entrantes de WhatsApp."""
+    """
+    Webhook para mensajes entrantes de WhatsApp.
+
+    Valida el payload, descarta reintentos por ID de mensaje y encola todos
+    los mensajes; el procesamiento lo hace ``process_inbound_messages``.
+    """
     try:
         if request.method != "POST":
             return JsonResponse({"status": "error", "message": "Método no permitido"}, status=405)
 
-        payload = json.loads(request.body.decode("utf-8"))
-        entry = payload.get('entry', [])[0]
-        changes = entry.get('changes', [])[0]
-        value = changes.get('value', {})
-        messages = value.get('messages', [])
-        if not messages:
-            return JsonResponse({"status": "success", "message": "No messages to process"}, status=200)
-
-        message = messages[0]
-        user_id = message.get('from')
-        phone_number_id = value.get('metadata', {}).get('phone_number_id')
-        business_unit = await sync_to_async(lambda: WhatsAppAPI.objects.filter(
-            phoneID=phone_number_id, is_active=True
-        ).first().business_unit)()
-        
-        # Actualizar caché de última interacción para mantener ventana de 24h
-        cache_key = f"{LAST_INTERACTION_CACHE_PREFIX}{user_id}"
-        cache.set(cache_key, timezone.now().timestamp(), CACHE_TIMEOUT)
+        try:
+            payload = json.loads(request.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return JsonResponse({"status": "error", "message": "JSON inválido"}, status=400)
+        if not isinstance(payload, dict) or not isinstance(payload.get('entry'), list):
+            return JsonResponse({"status": "error", "message": "Payload inválido: falta 'entry'"}, status=400)
 
-        handler = WhatsAppHandler()
-        response = await handler.receive_message(message)
-        return JsonResponse({"status": "success", "response": response}, status=200)
+        result = await accept_messages(inbound_messages(payload))
+        return JsonResponse(result, status=200)
     except Exception as e:
         logger.error(f"Error en whatsapp_webhook: {str(e)}")
-        return JsonResponse({"status": "error", "message": str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
@@ -19,7 +19,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from app.models import XAPI, BusinessUnit, Person
 from app.ats.chatbot.core.chatbot import ChatBotHandler
 from app.ats.chatbot.components.chat_state_manager import ChatStateManager
-from app.ats.chatbot.components.rate_limiter import RateLimiter
+from app.ats.chatbot.components.rate_limiter import rate_limiter
 from app.ats.integrations.services.message import (
     send_message, 
     send_options, 
@@ -51,7 +51,7 @@ class XHandler:
         self.business_unit = business_unit
         self.x_api = None
         self.chat_state_manager = ChatStateManager()
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter
     
     async def initialize(self) -> bool:
         """Inicializa la conexión con la API de X."""
@@ -3,13 +3,15 @@ Integración optimizada con WhatsApp Business API.
 """
 
 import logging
-import requests
 import json
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import base64
 import os
 
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
+
 logger = logging.getLogger(__name__)
 
 class WhatsAppBusinessAPI:
@@ -119,7 +121,11 @@ class WhatsAppBusinessAPI:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            rate_limiter.acquire_blocking('whatsapp', self.phone_number_id, phone_number)
+            response = outbound_http.request_sync(
+                'whatsapp', 'POST', url, headers=headers, json=payload,
+                rate_limit=(self.phone_number_id, phone_number)
+            )
             response.raise_for_status()
             
             result = response.json()
@@ -158,7 +164,11 @@ class WhatsAppBusinessAPI:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            rate_limiter.acquire_blocking('whatsapp', self.phone_number_id, phone_number)
+            response = outbound_http.request_sync(
+                'whatsapp', 'POST', url, headers=headers, json=payload,
+                rate_limit=(self.phone_number_id, phone_number)
+            )
             response.raise_for_status()
             
             result = response.json()
@@ -201,7 +211,11 @@ class WhatsAppBusinessAPI:
             if caption:
                 payload[media_type]['caption'] = caption
             
-            response = requests.post(url, headers=headers, json=payload)
+            rate_limiter.acquire_blocking('whatsapp', self.phone_number_id, phone_number)
+            response = outbound_http.request_sync(
+                'whatsapp', 'POST', url, headers=headers, json=payload,
+                rate_limit=(self.phone_number_id, phone_number)
+            )
             response.raise_for_status()
             
             result = response.json()
@@ -258,7 +272,11 @@ class WhatsAppBusinessAPI:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            rate_limiter.acquire_blocking('whatsapp', self.phone_number_id, phone_number)
+            response = outbound_http.request_sync(
+                'whatsapp', 'POST', url, headers=headers, json=payload,
+                rate_limit=(self.phone_number_id, phone_number)
+            )
             response.raise_for_status()
             
             result = response.json()
@@ -406,7 +424,7 @@ class WhatsAppBusinessAPI:
                 'Authorization': f'Bearer {self.access_token}'
             }
             
-            response = requests.get(url, headers=headers)
+            response = outbound_http.request_sync('whatsapp', 'GET', url, headers=headers)
             response.raise_for_status()
             
             return response.json()
@@ -426,7 +444,7 @@ class WhatsAppBusinessAPI:
                 'Authorization': f'Bearer {self.access_token}'
             }
             
-            response = requests.get(url, headers=headers)
+            response = outbound_http.request_sync('whatsapp', 'GET', url, headers=headers)
             response.raise_for_status()
             
             return response.json()
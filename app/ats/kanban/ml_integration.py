@@ -32,23 +32,10 @@ class CulturalValue:
 class CulturalProfile:  # En realidad puede ser PersonCulturalProfile en el modelo real
     id = 0
     person_id = 0
-# Clases mock para Kanban (comentadas temporalmente)
-# from app.ats.kanban import (
-#     KanbanBoard, KanbanColumn, KanbanCard, KanbanCardHistory
-# )
-
-# Clases mock para evitar errores de importación
-class KanbanBoard:
-    pass
-
-class KanbanColumn:
-    pass
-
-class KanbanCard:
-    pass
-
-class KanbanCardHistory:
-    pass
+from app.ats.kanban.models import (
+    KanbanBoard, KanbanColumn, KanbanCard, KanbanCardHistory
+)
+from app.ml.core.features.similarity_index import similarity_index
 
 # Obtener el logger específico para este módulo
 logger = logging.getLogger('kanban.ml_integration')
@@ -57,6 +44,7 @@ class KanbanMLIntegration:
     """Clase que integra funcionalidades ML en el sistema Kanban."""
     
     CACHE_TTL = 3600  # Cache de 1 hora para predicciones
+    MIN_CARD_SIMILARITY = 0.3  # Jaccard mínimo entre conjuntos de habilidades
     
     def __init__(self, business_unit=None):
         """
@@ -239,66 +227,50 @@ class KanbanMLIntegration:
             logger.error(f"Error prediciendo mejor columna para tarjeta {card.id}: {str(e)}")
             return None, 0.0
     
-    def get_similar_cards(self, card: KanbanCard, limit: int = 3) -> List[Dict[str, Any]]:
+    def get_similar_cards(self, card: KanbanCard, limit: int = 3, same_board: bool = True) -> List[Dict[str, Any]]:
         """
-        Encuentra tarjetas similares a la dada usando ML.
-        
+        Encuentra tarjetas similares a la dada con el índice de similitud.
+
+        Compara el conjunto de habilidades (vacante y candidato) de la tarjeta
+        contra todas las del tablero vía MinHash-LSH; sólo se consulta la base
+        de datos para los datos de las ``limit`` tarjetas resultantes.
+
         Args:
             card: Tarjeta Kanban para la que se buscan similares
             limit: Número máximo de tarjetas similares a devolver
-            
+            same_board: Limitar la búsqueda al tablero de la tarjeta
+
         Returns:
             Lista de tarjetas similares con scores
         """
-        cache_key = f"kanban_ml_similar_cards_{card.id}_{limit}"
-        cached_results = cache.get(cache_key)
-        
-        if cached_results:
-            return cached_results
-        
         try:
-            # Obtener todas las tarjetas excepto la actual
-            other_cards = KanbanCard.objects.exclude(id=card.id)
-            
-            # Si no hay otras tarjetas, retornar lista vacía
-            if not other_cards.exists():
+            board_id = card.column.board_id if same_board else None
+            matches = similarity_index.similar_to(
+                'card', card.id, k=limit, group=board_id, min_similarity=self.MIN_CARD_SIMILARITY
+            )
+            if not matches:
                 return []
-            
-            # Calcular similitud
+
+            cards = KanbanCard.objects.select_related('column', 'person', 'vacancy').in_bulk(
+                [int(key) for key, _ in matches]
+            )
             similar_cards = []
-            for other_card in other_cards[:50]:  # Limitar para optimizar rendimiento
-                try:
-                    # Simplificado: usar similitud de habilidades entre vacantes como base
-                    from app.ml.core.models.base import calculate_match_percentage
-                    
-                    # Usando habilidades requeridas de las vacantes como base de similitud
-                    vacancy1_skills = card.application.vacancy.required_skills or []
-                    vacancy2_skills = other_card.application.vacancy.required_skills or []
-                    
-                    skills_similarity = calculate_match_percentage(vacancy1_skills, vacancy2_skills)
-                    
-                    # Solo considerar si la similitud es suficientemente alta
-                    if skills_similarity > 40:
-                        similar_cards.append({
-                            'card': {
-                                'id': other_card.id,
-                                'column_name': other_card.column.name,
-                                'person_name': f"{other_card.application.user.nombre} {other_card.application.user.apellido_paterno}",
-                                'vacancy_title': other_card.application.vacancy.title,
-                            },
-                            'similarity_score': skills_similarity / 100.0  # Normalizar a escala 0-1
-                        })
-                except Exception as e:
-                    logger.error(f"Error calculando similitud para tarjeta {other_card.id}: {str(e)}")
-            
-            # Ordenar por similitud y limitar
-            similar_cards = sorted(similar_cards, key=lambda x: x['similarity_score'], reverse=True)[:limit]
-            
-            # Guardar en caché
-            cache.set(cache_key, similar_cards, self.CACHE_TTL)
-            
+            for key, score in matches:
+                other_card = cards.get(int(key))
+                if other_card is None:
+                    continue
+                person = other_card.person
+                similar_cards.append({
+                    'card': {
+                        'id': other_card.id,
+                        'column_name': other_card.column.name,
+                        'person_name': f"{person.nombre} {person.apellido_paterno}" if person else None,
+                        'vacancy_title': other_card.vacancy.titulo if other_card.vacancy else None,
+                    },
+                    'similarity_score': score
+                })
             return similar_cards
-            
+
         except Exception as e:
             logger.error(f"Error encontrando tarjetas similares para {card.id}: {str(e)}")
             return []
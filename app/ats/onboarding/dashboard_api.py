@@ -12,13 +12,15 @@ from datetime import datetime, timedelta
 
 from django.http import JsonResponse
 from django.utils import timezone
-from django.db.models import Avg, Count, Q, F, Sum, Case, When, Value, IntegerField
+from django.db.models import Avg, Count, Q, F, DurationField, ExpressionWrapper
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.views import View
 from asgiref.sync import sync_to_async
 
-from app.models import Person, Vacante, BusinessUnit, OnboardingProcess, OnboardingTask, ClientFeedback, ClientFeedbackSchedule
+from app.models import (
+    OnboardingProcess, OnboardingSurveyScore, OnboardingTask, ClientFeedback, SATISFACTION_PERIODS
+)
 from app.ml.onboarding_processor import OnboardingMLProcessor
 
 logger = logging.getLogger(__name__)
@@ -28,7 +30,12 @@ class DashboardDataAPI(View):
     API para proporcionar datos al dashboard de clientes.
     Incluye métricas, tendencias y recomendaciones.
     """
-    
+
+    # Ventanas del gráfico de tendencia mensual (30 días cada una)
+    TREND_WINDOWS = 12
+    TREND_WINDOW_DAYS = 30
+    RECENT_DAYS = 30
+
     @method_decorator(login_required)
     async def get(self, request):
         """
@@ -74,117 +81,103 @@ class DashboardDataAPI(View):
             logger.error(f"Error en DashboardDataAPI.get: {str(e)}")
             return JsonResponse({'error': str(e)}, status=500)
     
+    @staticmethod
+    def _onboarding_queryset(business_unit_id=None, empresa_id=None, start_date=None):
+        """Procesos de onboarding filtrados por unidad de negocio, empresa y fecha de contratación."""
+        filters = {}
+        if empresa_id:
+            filters['vacancy__empresa_id'] = empresa_id
+        if business_unit_id:
+            filters['vacancy__business_unit_id'] = business_unit_id
+        if start_date:
+            filters['hire_date__gte'] = start_date
+        return OnboardingProcess.objects.filter(**filters)
+
+    @staticmethod
+    def _client_feedback_queryset(business_unit_id=None, empresa_id=None, start_date=None):
+        """Encuestas de clientes completadas con los mismos filtros."""
+        filters = {'status': 'COMPLETED'}
+        if business_unit_id:
+            filters['business_unit_id'] = business_unit_id
+        if empresa_id:
+            filters['empresa_id'] = empresa_id
+        if start_date:
+            filters['completed_date__gte'] = start_date
+        return ClientFeedback.objects.filter(**filters)
+
+    @staticmethod
+    def _distribution(field):
+        """Conteos condicionales alto (8-10), medio (5-7) y bajo (<5) de una puntuación."""
+        return {
+            'high': Count('id', filter=Q(**{f'{field}__gte': 8})),
+            'medium': Count('id', filter=Q(**{f'{field}__gte': 5, f'{field}__lt': 8})),
+            'low': Count('id', filter=Q(**{f'{field}__lt': 5})),
+        }
+
+    @staticmethod
+    def _percentages(counts, total):
+        return {key: round(value / total * 100, 2) if total else 0 for key, value in counts.items()}
+
+    @staticmethod
+    def _trend(recent, previous):
+        if not previous:
+            return 0
+        return (recent - previous) / previous * 100
+
     async def get_summary_data(self, business_unit_id=None, empresa_id=None, start_date=None):
         """
         Obtiene un resumen general con las métricas principales para el dashboard.
+
+        Usa las puntuaciones desnormalizadas al registrar cada encuesta y
+        agregación condicional: cuatro consultas sin importar cuántos procesos haya.
         """
         @sync_to_async
         def get_data():
-            filters = {}
-            
-            if business_unit_id:
-                filters['business_unit_id'] = business_unit_id
-            
-            # Métricas de candidatos contratados
-            onboarding_filters = {}
-            if empresa_id:
-                onboarding_filters['vacancy__empresa_id'] = empresa_id
-            
-            if business_unit_id:
-                onboarding_filters['vacancy__business_unit_id'] = business_unit_id
-            
-            if start_date:
-                onboarding_filters['hire_date__gte'] = start_date
-            
-            # Obtener procesos de onboarding
-            onboarding_processes = OnboardingProcess.objects.filter(**onboarding_filters)
-            
+            now = timezone.now()
+            last_30_days = now - timedelta(days=self.RECENT_DAYS)
+            onboarding_processes = self._onboarding_queryset(business_unit_id, empresa_id, start_date)
+
             # Satisfacción de candidatos
-            total_candidates = onboarding_processes.count()
-            
-            # Calcular satisfacción promedio manualmente
-            satisfaction_scores = []
-            for process in onboarding_processes:
-                score = process.get_satisfaction_score()
-                if score is not None:
-                    satisfaction_scores.append(score)
-            
-            avg_candidate_satisfaction = sum(satisfaction_scores) / len(satisfaction_scores) if satisfaction_scores else 0
-            
-            # Satisfacción de clientes
-            client_feedback_filters = filters.copy()
-            if empresa_id:
-                client_feedback_filters['empresa_id'] = empresa_id
-            
-            if start_date:
-                client_feedback_filters['completed_date__gte'] = start_date
-            
-            client_feedback = ClientFeedback.objects.filter(
-                **client_feedback_filters,
-                status='COMPLETED',
-                satisfaction_score__isnull=False
-            )
-            
-            avg_client_satisfaction = client_feedback.aggregate(
+            candidates = onboarding_processes.aggregate(
+                total=Count('id'),
                 avg=Avg('satisfaction_score')
-            )['avg'] or 0
-            
+            )
+
             # Tendencia de satisfacción (últimos 30 días vs período anterior)
-            last_30_days = timezone.now() - timedelta(days=30)
-            
-            recent_candidate_scores = []
-            previous_candidate_scores = []
-            
-            for process in onboarding_processes:
-                if process.last_survey_date and process.last_survey_date >= last_30_days:
-                    score = process.get_satisfaction_score()
-                    if score is not None:
-                        recent_candidate_scores.append(score)
-                elif process.last_survey_date:
-                    score = process.get_satisfaction_score()
-                    if score is not None:
-                        previous_candidate_scores.append(score)
-            
-            recent_candidate_avg = sum(recent_candidate_scores) / len(recent_candidate_scores) if recent_candidate_scores else 0
-            previous_candidate_avg = sum(previous_candidate_scores) / len(previous_candidate_scores) if previous_candidate_scores else 0
-            
-            candidate_trend = 0
-            if previous_candidate_avg > 0:
-                candidate_trend = ((recent_candidate_avg - previous_candidate_avg) / previous_candidate_avg) * 100
-            
-            # Para clientes
-            recent_client_feedback = client_feedback.filter(completed_date__gte=last_30_days)
-            previous_client_feedback = client_feedback.filter(completed_date__lt=last_30_days)
-            
-            recent_client_avg = recent_client_feedback.aggregate(avg=Avg('satisfaction_score'))['avg'] or 0
-            previous_client_avg = previous_client_feedback.aggregate(avg=Avg('satisfaction_score'))['avg'] or 0
-            
-            client_trend = 0
-            if previous_client_avg > 0:
-                client_trend = ((recent_client_avg - previous_client_avg) / previous_client_avg) * 100
-            
-            # Tasa de tareas completadas a tiempo
-            onboarding_tasks = OnboardingTask.objects.filter(
-                onboarding__in=onboarding_processes
+            candidate_windows = OnboardingSurveyScore.objects.filter(
+                process__in=onboarding_processes
+            ).aggregate(
+                recent=Avg('score', filter=Q(answered_at__gte=last_30_days)),
+                previous=Avg('score', filter=Q(answered_at__lt=last_30_days))
             )
-            
-            total_tasks = onboarding_tasks.count()
-            completed_tasks = onboarding_tasks.filter(status='COMPLETED').count()
-            overdue_tasks = onboarding_tasks.filter(status='OVERDUE').count()
-            
-            task_completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            overdue_rate = (overdue_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            
+
+            # Satisfacción de clientes
+            clients = self._client_feedback_queryset(business_unit_id, empresa_id, start_date).aggregate(
+                avg=Avg('satisfaction_score'),
+                recent=Avg('satisfaction_score', filter=Q(completed_date__gte=last_30_days)),
+                previous=Avg('satisfaction_score', filter=Q(completed_date__lt=last_30_days))
+            )
+
+            # Tasa de tareas completadas y vencidas
+            tasks = OnboardingTask.objects.filter(onboarding__in=onboarding_processes).aggregate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='COMPLETED')),
+                overdue=Count('id', filter=Q(status='OVERDUE'))
+            )
+            total_tasks = tasks['total']
+
             return {
-                'period_days': int((timezone.now() - start_date).days),
-                'total_candidates': total_candidates,
-                'candidate_satisfaction': round(avg_candidate_satisfaction, 2),
-                'candidate_satisfaction_trend': round(candidate_trend, 2),
-                'client_satisfaction': round(avg_client_satisfaction, 2),
-                'client_satisfaction_trend': round(client_trend, 2),
-                'task_completion_rate': round(task_completion_rate, 2),
-                'overdue_rate': round(overdue_rate, 2),
-                'timestamp': timezone.now().isoformat()
+                'period_days': int((now - start_date).days),
+                'total_candidates': candidates['total'],
+                'candidate_satisfaction': round(candidates['avg'] or 0, 2),
+                'candidate_satisfaction_trend': round(
+                    self._trend(candidate_windows['recent'] or 0, candidate_windows['previous'] or 0), 2
+                ),
+                'client_satisfaction': round(clients['avg'] or 0, 2),
+                'client_satisfaction_trend': round(self._trend(clients['recent'] or 0, clients['previous'] or 0), 2),
+                'task_completion_rate': round(tasks['completed'] / total_tasks * 100, 2) if total_tasks else 0,
+                'overdue_rate': round(tasks['overdue'] / total_tasks * 100, 2) if total_tasks else 0,
+                'timestamp': now.isoformat()
             }
         
         return await get_data()
@@ -192,108 +185,46 @@ class DashboardDataAPI(View):
     async def get_satisfaction_trend(self, business_unit_id=None, empresa_id=None, start_date=None):
         """
         Obtiene datos de tendencia de satisfacción para gráficos temporales.
+
+        Cada ventana mensual es un ``Avg`` condicional dentro de una sola
+        consulta por fuente; la tendencia por período agrupa en SQL.
         """
         @sync_to_async
         def get_data():
-            # Filtros base
-            filters = {}
-            
-            if business_unit_id:
-                filters['business_unit_id'] = business_unit_id
-            
-            # Filtros para procesos de onboarding
-            onboarding_filters = {}
-            if empresa_id:
-                onboarding_filters['vacancy__empresa_id'] = empresa_id
-            
-            if business_unit_id:
-                onboarding_filters['vacancy__business_unit_id'] = business_unit_id
-            
-            if start_date:
-                onboarding_filters['hire_date__gte'] = start_date
-            
-            # Obtener procesos de onboarding
-            onboarding_processes = OnboardingProcess.objects.filter(**onboarding_filters)
-            
-            # Para feedback de clientes
-            client_feedback_filters = filters.copy()
-            if empresa_id:
-                client_feedback_filters['empresa_id'] = empresa_id
-            
-            if start_date:
-                client_feedback_filters['completed_date__gte'] = start_date
-            
-            client_feedback = ClientFeedback.objects.filter(
-                **client_feedback_filters,
-                status='COMPLETED'
-            )
-            
-            # Generar datos para gráfico de tendencia mensual (últimos 12 meses)
+            onboarding_processes = self._onboarding_queryset(business_unit_id, empresa_id, start_date)
+            scores = OnboardingSurveyScore.objects.filter(process__in=onboarding_processes)
+            client_feedback = self._client_feedback_queryset(business_unit_id, empresa_id, start_date)
+
+            # Ventanas de 30 días hacia atrás desde hoy, de la más antigua a la más reciente
             end_date = timezone.now()
-            months = []
-            candidate_data = []
-            client_data = []
-            
-            for i in range(12):
-                month_end = end_date - timedelta(days=i*30)
-                month_start = month_end - timedelta(days=30)
-                month_label = month_end.strftime('%b %Y')
-                
-                # Datos de candidatos para este mes
-                month_processes = onboarding_processes.filter(
-                    last_survey_date__gte=month_start,
-                    last_survey_date__lt=month_end
-                )
-                
-                month_scores = []
-                for process in month_processes:
-                    score = process.get_satisfaction_score()
-                    if score is not None:
-                        month_scores.append(score)
-                
-                month_avg = sum(month_scores) / len(month_scores) if month_scores else None
-                
-                # Datos de clientes para este mes
-                month_feedback = client_feedback.filter(
-                    completed_date__gte=month_start,
-                    completed_date__lt=month_end
-                )
-                
-                month_client_avg = month_feedback.aggregate(avg=Avg('satisfaction_score'))['avg']
-                
-                months.insert(0, month_label)
-                candidate_data.insert(0, month_avg)
-                client_data.insert(0, month_client_avg)
-            
-            # Generar datos para satisfacción por período (días desde contratación)
-            from app.models import SATISFACTION_PERIODS
-            period_labels = [f"{p} días" for p in SATISFACTION_PERIODS]
-            period_data = []
-            
-            for period in SATISFACTION_PERIODS:
-                period_scores = []
-                for process in onboarding_processes:
-                    if not process.survey_responses:
-                        continue
-                        
-                    period_key = str(period)
-                    if period_key in process.survey_responses:
-                        responses = process.survey_responses[period_key]
-                        if 'general_satisfaction' in responses:
-                            period_scores.append(float(responses['general_satisfaction']))
-                
-                period_avg = sum(period_scores) / len(period_scores) if period_scores else None
-                period_data.append(period_avg)
-            
+            windows = []
+            for i in reversed(range(self.TREND_WINDOWS)):
+                month_end = end_date - timedelta(days=i * self.TREND_WINDOW_DAYS)
+                windows.append((f'w{i}', month_end - timedelta(days=self.TREND_WINDOW_DAYS), month_end))
+
+            candidate_avgs = scores.aggregate(**{
+                key: Avg('score', filter=Q(answered_at__gte=start, answered_at__lt=end))
+                for key, start, end in windows
+            })
+            client_avgs = client_feedback.aggregate(**{
+                key: Avg('satisfaction_score', filter=Q(completed_date__gte=start, completed_date__lt=end))
+                for key, start, end in windows
+            })
+
+            # Satisfacción por período (días desde contratación)
+            by_period = dict(
+                scores.values('period_days').annotate(avg=Avg('score')).values_list('period_days', 'avg')
+            )
+
             return {
                 'monthly_trend': {
-                    'labels': months,
-                    'candidate_data': candidate_data,
-                    'client_data': client_data
+                    'labels': [end.strftime('%b %Y') for _, _, end in windows],
+                    'candidate_data': [candidate_avgs[key] for key, _, _ in windows],
+                    'client_data': [client_avgs[key] for key, _, _ in windows]
                 },
                 'period_trend': {
-                    'labels': period_labels,
-                    'data': period_data
+                    'labels': [f"{p} días" for p in SATISFACTION_PERIODS],
+                    'data': [by_period.get(p) for p in SATISFACTION_PERIODS]
                 },
                 'timestamp': timezone.now().isoformat()
             }
@@ -306,58 +237,26 @@ class DashboardDataAPI(View):
         """
         @sync_to_async
         def get_data():
-            # Filtros para procesos de onboarding
-            onboarding_filters = {}
-            if empresa_id:
-                onboarding_filters['vacancy__empresa_id'] = empresa_id
-            
-            if business_unit_id:
-                onboarding_filters['vacancy__business_unit_id'] = business_unit_id
-            
-            if start_date:
-                onboarding_filters['hire_date__gte'] = start_date
-            
-            # Obtener procesos de onboarding
-            onboarding_processes = OnboardingProcess.objects.filter(**onboarding_filters)
-            
-            # Métricas de tareas
-            onboarding_tasks = OnboardingTask.objects.filter(
-                onboarding__in=onboarding_processes
+            onboarding_processes = self._onboarding_queryset(business_unit_id, empresa_id, start_date)
+            onboarding_tasks = OnboardingTask.objects.filter(onboarding__in=onboarding_processes)
+
+            # Totales y días promedio entre vencimiento y completado (negativo = antes de tiempo)
+            totals = onboarding_tasks.aggregate(
+                total=Count('id'),
+                avg_delay=Avg(
+                    ExpressionWrapper(F('completion_date') - F('due_date'), output_field=DurationField()),
+                    filter=Q(status='COMPLETED', completion_date__isnull=False, due_date__isnull=False)
+                )
             )
-            
-            total_tasks = onboarding_tasks.count()
-            task_status = onboarding_tasks.values('status').annotate(count=Count('id'))
-            
-            task_status_data = {}
-            for status in task_status:
-                task_status_data[status['status']] = status['count']
-            
-            # Tiempo promedio para completar tareas
-            avg_completion_days = None
-            completed_tasks = onboarding_tasks.filter(
-                status='COMPLETED',
-                completion_date__isnull=False,
-                due_date__isnull=False
+            avg_delay = totals['avg_delay']
+
+            task_status_data = dict(
+                onboarding_tasks.values('status').annotate(count=Count('id')).values_list('status', 'count')
             )
-            
-            if completed_tasks.exists():
-                total_days = 0
-                count = 0
-                
-                for task in completed_tasks:
-                    days_taken = (task.completion_date.date() - task.due_date.date()).days
-                    total_days += days_taken
-                    count += 1
-                
-                avg_completion_days = total_days / count if count > 0 else None
-            
-            # Distribución de prioridad de tareas
-            task_priority = onboarding_tasks.values('priority').annotate(count=Count('id'))
-            
-            priority_data = {}
-            for priority in task_priority:
-                priority_data[priority['priority']] = priority['count']
-            
+            priority_data = dict(
+                onboarding_tasks.values('priority').annotate(count=Count('id')).values_list('priority', 'count')
+            )
+
             # Tareas más comunes
             common_tasks = onboarding_tasks.values('title').annotate(
                 count=Count('id')
@@ -365,9 +264,9 @@ class DashboardDataAPI(View):
             
             return {
                 'total_processes': onboarding_processes.count(),
-                'total_tasks': total_tasks,
+                'total_tasks': totals['total'],
                 'task_status': task_status_data,
-                'avg_completion_days': avg_completion_days,
+                'avg_completion_days': round(avg_delay.total_seconds() / 86400, 2) if avg_delay is not None else None,
                 'task_priority': priority_data,
                 'common_tasks': list(common_tasks),
                 'timestamp': timezone.now().isoformat()
@@ -381,98 +280,56 @@ class DashboardDataAPI(View):
         """
         @sync_to_async
         def get_data():
-            # Filtros para procesos de onboarding
-            onboarding_filters = {}
-            if empresa_id:
-                onboarding_filters['vacancy__empresa_id'] = empresa_id
-            
-            if business_unit_id:
-                onboarding_filters['vacancy__business_unit_id'] = business_unit_id
-            
-            if start_date:
-                onboarding_filters['hire_date__gte'] = start_date
-            
-            # Obtener procesos de onboarding
-            onboarding_processes = OnboardingProcess.objects.filter(**onboarding_filters)
-            
-            # Analizar respuestas específicas a preguntas comunes
+            onboarding_processes = self._onboarding_queryset(business_unit_id, empresa_id, start_date)
+
+            # Distribución por nivel de satisfacción en una sola consulta
+            counts = onboarding_processes.aggregate(
+                total=Count('id'),
+                scored=Count('satisfaction_score'),
+                **self._distribution('satisfaction_score')
+            )
+            satisfaction_distribution = self._percentages(
+                {key: counts[key] for key in ('high', 'medium', 'low')}, counts['scored']
+            )
+
+            # Respuestas a preguntas comunes y comentarios: sólo se lee la columna JSON
             question_data = {
                 'position_match': {'yes': 0, 'partly': 0, 'no': 0},
                 'team_integration': {'yes': 0, 'partly': 0, 'no': 0},
                 'resources': {'yes': 0, 'partly': 0, 'no': 0}
             }
-            
             total_responses = 0
-            
-            for process in onboarding_processes:
-                if not process.survey_responses:
-                    continue
-                
-                for period, responses in process.survey_responses.items():
-                    total_responses += 1
-                    
-                    # Analizar respuestas a preguntas específicas
-                    for question in question_data.keys():
-                        if question in responses:
-                            value = responses[question]
-                            if value in question_data[question]:
-                                question_data[question][value] += 1
-            
-            # Convertir conteos a porcentajes
-            for question, values in question_data.items():
-                for key in values:
-                    if total_responses > 0:
-                        question_data[question][key] = round((values[key] / total_responses) * 100, 2)
-            
-            # Obtener comentarios recientes
             recent_comments = []
-            
-            for process in onboarding_processes:
-                if not process.survey_responses:
-                    continue
-                
-                for period, responses in process.survey_responses.items():
-                    if 'comments' in responses and responses['comments'].strip():
+
+            survey_responses = onboarding_processes.exclude(survey_responses={}).order_by(
+                '-last_response_date'
+            ).values_list('survey_responses', flat=True)
+            for responses_by_period in survey_responses.iterator():
+                for period, responses in responses_by_period.items():
+                    total_responses += 1
+                    answers = {
+                        question: answer.get('value') if isinstance(answer, dict) else answer
+                        for question, answer in responses.items()
+                    }
+                    for question, values in question_data.items():
+                        if answers.get(question) in values:
+                            values[answers[question]] += 1
+
+                    comment = answers.get('comments')
+                    if isinstance(comment, str) and comment.strip() and len(recent_comments) < 10:
                         recent_comments.append({
                             'period': period,
-                            'comment': responses['comments'],
-                            'satisfaction': responses.get('general_satisfaction', 'N/A')
+                            'comment': comment,
+                            'satisfaction': answers.get('general_satisfaction', 'N/A')
                         })
-                        
-                        if len(recent_comments) >= 10:
-                            break
-                
-                if len(recent_comments) >= 10:
-                    break
-            
-            # Distribuir por nivel de satisfacción
-            satisfaction_distribution = {
-                'high': 0,  # 8-10
-                'medium': 0,  # 5-7
-                'low': 0  # 1-4
+
+            question_data = {
+                question: self._percentages(values, total_responses)
+                for question, values in question_data.items()
             }
-            
-            satisfaction_scores = []
-            for process in onboarding_processes:
-                score = process.get_satisfaction_score()
-                if score is not None:
-                    satisfaction_scores.append(score)
-                    
-                    if score >= 8:
-                        satisfaction_distribution['high'] += 1
-                    elif score >= 5:
-                        satisfaction_distribution['medium'] += 1
-                    else:
-                        satisfaction_distribution['low'] += 1
-            
-            # Convertir a porcentajes
-            total_scores = len(satisfaction_scores)
-            for key in satisfaction_distribution:
-                if total_scores > 0:
-                    satisfaction_distribution[key] = round((satisfaction_distribution[key] / total_scores) * 100, 2)
-            
+
             return {
-                'total_candidates': onboarding_processes.count(),
+                'total_candidates': counts['total'],
                 'total_responses': total_responses,
                 'question_data': question_data,
                 'satisfaction_distribution': satisfaction_distribution,
@@ -485,122 +342,60 @@ class DashboardDataAPI(View):
     async def get_client_satisfaction(self, business_unit_id=None, empresa_id=None, start_date=None):
         """
         Obtiene datos detallados de satisfacción de clientes.
+
+        Todas las métricas salen de una agregación condicional sobre las
+        columnas de ``ClientFeedback``; sólo las sugerencias recientes leen filas.
         """
         @sync_to_async
         def get_data():
-            # Filtros para feedback de clientes
-            filters = {}
-            
-            if business_unit_id:
-                filters['business_unit_id'] = business_unit_id
-            
-            if empresa_id:
-                filters['empresa_id'] = empresa_id
-            
-            if start_date:
-                filters['completed_date__gte'] = start_date
-            
-            # Obtener feedback completado
-            client_feedback = ClientFeedback.objects.filter(
-                **filters,
-                status='COMPLETED'
+            client_feedback = self._client_feedback_queryset(business_unit_id, empresa_id, start_date)
+
+            counts = client_feedback.aggregate(
+                total=Count('id'),
+                avg_service_quality=Avg('service_quality'),
+                communication_yes=Count('id', filter=Q(communication__gte=8)),
+                communication_partly=Count('id', filter=Q(communication__gte=5, communication__lt=8)),
+                communication_no=Count('id', filter=Q(communication__lt=5)),
+                recommend_yes=Count('id', filter=Q(would_recommend=True)),
+                recommend_maybe=Count('id', filter=Q(would_recommend__isnull=True)),
+                recommend_no=Count('id', filter=Q(would_recommend=False)),
+                **self._distribution('satisfaction_score')
             )
-            
-            # Analizar respuestas específicas a preguntas comunes
+            total_responses = counts['total']
+
             question_data = {
-                'clear_communication': {'yes': 0, 'partly': 0, 'no': 0},
-                'candidate_adaptation': {'yes': 0, 'partly': 0, 'no': 0},
-                'would_recommend': {'yes': 0, 'maybe': 0, 'no': 0}
+                'clear_communication': self._percentages({
+                    'yes': counts['communication_yes'],
+                    'partly': counts['communication_partly'],
+                    'no': counts['communication_no']
+                }, total_responses),
+                'would_recommend': self._percentages({
+                    'yes': counts['recommend_yes'],
+                    'maybe': counts['recommend_maybe'],
+                    'no': counts['recommend_no']
+                }, total_responses)
             }
-            
-            total_responses = client_feedback.count()
-            
-            for feedback in client_feedback:
-                if not feedback.responses:
-                    continue
-                
-                # Analizar respuestas a preguntas específicas
-                for question in question_data.keys():
-                    if question in feedback.responses:
-                        value = feedback.responses[question]
-                        if value in question_data[question]:
-                            question_data[question][value] += 1
-            
-            # Convertir conteos a porcentajes
-            for question, values in question_data.items():
-                for key in values:
-                    if total_responses > 0:
-                        question_data[question][key] = round((values[key] / total_responses) * 100, 2)
-            
-            # Métricas de calidad de candidatos
-            candidate_quality_scores = []
-            recruitment_speed_scores = []
-            
-            for feedback in client_feedback:
-                if not feedback.responses:
-                    continue
-                
-                if 'candidate_quality' in feedback.responses:
-                    try:
-                        score = float(feedback.responses['candidate_quality'])
-                        candidate_quality_scores.append(score)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if 'recruitment_speed' in feedback.responses:
-                    try:
-                        score = float(feedback.responses['recruitment_speed'])
-                        recruitment_speed_scores.append(score)
-                    except (ValueError, TypeError):
-                        pass
-            
-            avg_candidate_quality = sum(candidate_quality_scores) / len(candidate_quality_scores) if candidate_quality_scores else 0
-            avg_recruitment_speed = sum(recruitment_speed_scores) / len(recruitment_speed_scores) if recruitment_speed_scores else 0
-            
-            # Obtener sugerencias de mejora recientes
-            recent_suggestions = []
-            
-            for feedback in client_feedback.order_by('-completed_date')[:10]:
-                if not feedback.responses:
-                    continue
-                
-                if 'improvement_suggestions' in feedback.responses and feedback.responses['improvement_suggestions'].strip():
-                    recent_suggestions.append({
-                        'empresa': feedback.empresa.name,
-                        'date': feedback.completed_date.isoformat() if feedback.completed_date else None,
-                        'suggestion': feedback.responses['improvement_suggestions'],
-                        'satisfaction': feedback.satisfaction_score
-                    })
-            
-            # Distribuir por nivel de satisfacción
-            satisfaction_distribution = {
-                'high': 0,  # 8-10
-                'medium': 0,  # 5-7
-                'low': 0  # 1-4
-            }
-            
-            for feedback in client_feedback:
-                if feedback.satisfaction_score is None:
-                    continue
-                
-                if feedback.satisfaction_score >= 8:
-                    satisfaction_distribution['high'] += 1
-                elif feedback.satisfaction_score >= 5:
-                    satisfaction_distribution['medium'] += 1
-                else:
-                    satisfaction_distribution['low'] += 1
-            
-            # Convertir a porcentajes
-            for key in satisfaction_distribution:
-                if total_responses > 0:
-                    satisfaction_distribution[key] = round((satisfaction_distribution[key] / total_responses) * 100, 2)
-            
+
+            # Sugerencias de mejora recientes
+            recent_suggestions = [
+                {
+                    'empresa': feedback.empresa.name,
+                    'date': feedback.completed_date.isoformat() if feedback.completed_date else None,
+                    'suggestion': feedback.improvement_suggestions,
+                    'satisfaction': feedback.satisfaction_score
+                }
+                for feedback in client_feedback.exclude(improvement_suggestions__isnull=True).exclude(
+                    improvement_suggestions=''
+                ).select_related('empresa').order_by('-completed_date')[:10]
+            ]
+
             return {
                 'total_feedback': total_responses,
                 'question_data': question_data,
-                'avg_candidate_quality': round(avg_candidate_quality, 2),
-                'avg_recruitment_speed': round(avg_recruitment_speed, 2),
-                'satisfaction_distribution': satisfaction_distribution,
+                'avg_candidate_quality': round(counts['avg_service_quality'] or 0, 2),
+                'satisfaction_distribution': self._percentages(
+                    {key: counts[key] for key in ('high', 'medium', 'low')}, total_responses
+                ),
                 'recent_suggestions': recent_suggestions,
                 'timestamp': timezone.now().isoformat()
             }
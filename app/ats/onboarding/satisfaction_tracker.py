@@ -209,9 +209,11 @@ class SatisfactionTracker:
             try:
                 onboarding = OnboardingProcess.objects.get(id=onboarding_id)
                 
-                # Guardar respuesta en modelo
-                onboarding.add_response(period_days, question_id, response)
-                onboarding.save(update_fields=['survey_responses'])
+                # Guardar respuesta en modelo (actualiza también la puntuación desnormalizada)
+                onboarding.add_response(
+                    period_days, question_id, response,
+                    score=self._response_score(question_id, response)
+                )
                 
                 # También guardar en Redis para acceso rápido
                 key = f"{self.redis_prefix}response:{onboarding_id}:{period_days}:{question_id}"
@@ -242,6 +244,14 @@ class SatisfactionTracker:
             logger.error(f"Error procesando respuesta: {e}")
             return {"success": False, "error": str(e)}
     
+    def _response_score(self, question_id: str, response: str) -> Optional[float]:
+        """Puntuación 0-10 según la posición de la opción (la primera es la mejor)."""
+        for q in self.satisfaction_questions:
+            if q["id"] == question_id and response in q["options"]:
+                last = len(q["options"]) - 1
+                return 10 * (last - q["options"].index(response)) / last
+        return None
+
     async def _check_satisfaction_issues(self, onboarding_id: int, period_days: int):
         """Verifica problemas de satisfacción y envía alertas si es necesario"""
         try:
@@ -2,8 +2,9 @@
 Servicio para gestionar entrevistas.
 """
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 
 from app.models import Interview, Person, Vacante
@@ -15,6 +16,7 @@ from app.tasks import (
 )
 from app.ats.utils.vacantes import requiere_slots_grupales
 from app.ats.utils.Events import Event, EventType, EventStatus, EventParticipant
+from app.ats.services.interview_slots import SlotBookingError, slot_calendar
 from app.ats.utils.google_calendar import create_calendar_event, get_available_slots
 
 logger = logging.getLogger(__name__)
@@ -34,6 +36,7 @@ class InterviewService:
         self.business_unit = business_unit
         self.notification_service = InterviewNotificationService(business_unit)
         self.location_tracker = LocationTracker()
+        self.slots = slot_calendar
         
     async def generate_interview_slots(
         self,
@@ -57,18 +60,15 @@ class InterviewService:
             Lista de eventos creados
         """
         try:
-            created_slots = []
-            current_date = start_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            
-            while current_date <= end_date:
-                # Generar slots para cada día hábil (lunes a viernes)
-                if current_date.weekday() < 5:  # 0-4 = lunes a viernes
-                    day_slots = await self._generate_day_slots(
-                        vacancy, current_date, slot_duration, max_slots_per_day
-                    )
-                    created_slots.extend(day_slots)
-                
-                current_date += timedelta(days=1)
+            # Todos los slots del rango en un solo bulk_create
+            created_slots = await sync_to_async(self.slots.generate)(
+                vacancy, start_date, end_date, slot_duration, max_slots_per_day
+            )
+            
+            # Crear eventos en Google Calendar si está configurado
+            if self.business_unit.calendar_id:
+                for slot in created_slots:
+                    await self._create_google_calendar_slot(slot, vacancy)
             
             logger.info(f"Generados {len(created_slots)} slots para vacante {vacancy.id}")
             return created_slots
@@ -77,58 +77,6 @@ class InterviewService:
             logger.error(f"Error generando slots de entrevista: {str(e)}")
             raise
     
-    async def _generate_day_slots(
-        self,
-        vacancy: Vacante,
-        date: datetime,
-        slot_duration: int,
-        max_slots_per_day: int
-    ) -> List[Event]:
-        """
-        Genera slots para un día específico.
-        """
-        slots = []
-        current_time = date.replace(hour=9, minute=0, second=0, microsecond=0)
-        end_time = date.replace(hour=17, minute=0, second=0, microsecond=0)
-        slots_created = 0
-        
-        while current_time < end_time and slots_created < max_slots_per_day:
-            # Verificar si ya existe un slot en este horario
-            existing_slot = await Event.objects.filter(
-                event_type=EventType.ENTREVISTA,
-                start_time=current_time,
-                description__icontains=str(vacancy.id)
-            ).afirst()
-            
-            if not existing_slot:
-                # Determinar si usar slot grupal o individual
-                use_group_slot = requiere_slots_grupales(vacancy)
-                
-                slot = await Event.objects.acreate(
-                    title=f"Entrevista {'grupal' if use_group_slot else 'individual'} - {vacancy.titulo}",
-                    description=f"Slot de entrevista para vacante {vacancy.id} - {vacancy.titulo}",
-                    event_type=EventType.ENTREVISTA,
-                    status=EventStatus.PENDIENTE,
-                    start_time=current_time,
-                    end_time=current_time + timedelta(minutes=slot_duration),
-                    session_type="grupal" if use_group_slot else "individual",
-                    cupo_maximo=vacancy.numero_plazas if use_group_slot else 1,
-                    location=vacancy.ubicacion,
-                    virtual_link=None,  # Se generará cuando se confirme
-                    event_mode=getattr(vacancy, 'modalidad', 'virtual')
-                )
-                
-                # Crear evento en Google Calendar si está configurado
-                if self.business_unit.calendar_id:
-                    await self._create_google_calendar_slot(slot, vacancy)
-                
-                slots.append(slot)
-                slots_created += 1
-            
-            current_time += timedelta(minutes=slot_duration)
-        
-        return slots
-    
     async def _create_google_calendar_slot(self, slot: Event, vacancy: Vacante):
         """
         Crea un slot en Google Calendar.
@@ -166,84 +114,60 @@ class InterviewService:
         interview_type: str,
         location: Optional[Dict[str, Any]] = None,
         additional_notes: str = ''
-    ) -> Interview:
+    ) -> Union[Interview, Dict[str, Any]]:
         """
         Programa una nueva entrevista.
         Si la vacante requiere slots grupales, asigna al candidato a un slot grupal existente o crea uno nuevo.
         Si no, crea una entrevista individual como siempre.
+        
+        Si el slot grupal de ``interview_date`` ya está lleno o el candidato ya
+        está inscrito, devuelve ``{'success': False, 'error': ...}`` como
+        ``book_slot_for_candidate``.
         """
         try:
             # --- LÓGICA PARA SLOTS GRUPALES ---
             if requiere_slots_grupales(vacancy):
                 # Buscar slot grupal existente para la vacante y fecha con cupo disponible
-                slot = await Event.objects.filter(
-                    event_type=EventType.ENTREVISTA,
-                    session_type="grupal",
-                    start_time__date=interview_date.date(),
-                    status=EventStatus.PENDIENTE,
-                    description__icontains=str(vacancy.id)
-                ).afirst()
+                day_start = interview_date.replace(hour=0, minute=0, second=0, microsecond=0)
+                slot = await sync_to_async(self.slots.book_first_available)(
+                    vacancy, person, day_start, day_start + timedelta(days=1),
+                    session_type="grupal", notes=f"Entrevista para {vacancy.titulo}"
+                )
                 
-                if slot and slot.lugares_disponibles() > 0:
-                    # Asignar candidato a slot existente
-                    participant = await EventParticipant.objects.acreate(
-                        event=slot,
-                        person=person,
-                        status=EventStatus.CONFIRMADO,
-                        notes=f"Entrevista para {vacancy.titulo}"
-                    )
-                    
-                    # Si es el primer participante, confirmar el slot
-                    if slot.participants.count() == 1:
-                        slot.status = EventStatus.CONFIRMADO
-                        await slot.asave()
-                    
-                    # Crear registro de entrevista tradicional para compatibilidad
-                    interview = await Interview.objects.acreate(
-                        person=person,
-                        vacancy=vacancy,
-                        interview_date=slot.start_time,
-                        interview_type=interview_type,
-                        location=location,
-                        notes=additional_notes + " (Slot grupal)",
-                        status='scheduled',
-                        event_mode=slot.event_mode
-                    )
-                    
-                else:
+                if slot is None:
                     # Crear nuevo slot grupal
-                    slot = await Event.objects.acreate(
+                    slot = await sync_to_async(self.slots.ensure_slot)(
+                        vacancy,
+                        interview_date,
                         title=f"Entrevista grupal {vacancy.titulo}",
                         description=f"Slot grupal para vacante {vacancy.id}",
-                        event_type=EventType.ENTREVISTA,
-                        status=EventStatus.CONFIRMADO,
-                        start_time=interview_date,
-                        end_time=interview_date + timedelta(minutes=45),
                         session_type="grupal",
                         cupo_maximo=vacancy.numero_plazas,
                         location=location.get('address') if location else None,
                         virtual_link=location.get('virtual_link') if location else None,
                         event_mode=getattr(vacancy, 'modalidad', 'virtual')
                     )
-                    
-                    await EventParticipant.objects.acreate(
-                        event=slot,
-                        person=person,
-                        status=EventStatus.CONFIRMADO,
-                        notes=f"Entrevista para {vacancy.titulo}"
-                    )
-                    
-                    # Crear registro de entrevista tradicional
-                    interview = await Interview.objects.acreate(
-                        person=person,
-                        vacancy=vacancy,
-                        interview_date=interview_date,
-                        interview_type=interview_type,
-                        location=location,
-                        notes=additional_notes + " (Slot grupal)",
-                        status='scheduled',
-                        event_mode=slot.event_mode
-                    )
+                    # Reserva atómica: confirma el slot con el primer participante.
+                    # ensure_slot devuelve el slot existente a esa hora aunque esté lleno.
+                    try:
+                        slot = await sync_to_async(self.slots.book)(
+                            slot.id, person, notes=f"Entrevista para {vacancy.titulo}"
+                        )
+                    except SlotBookingError as e:
+                        logger.info(f"No se pudo reservar el slot grupal {slot.id}: {str(e)}")
+                        return {'success': False, 'error': str(e)}
+                
+                # Crear registro de entrevista tradicional para compatibilidad
+                interview = await Interview.objects.acreate(
+                    person=person,
+                    vacancy=vacancy,
+                    interview_date=slot.start_time,
+                    interview_type=interview_type,
+                    location=location,
+                    notes=additional_notes + " (Slot grupal)",
+                    status='scheduled',
+                    event_mode=slot.event_mode
+                )
                 
                 # Notificar y programar seguimiento
                 await self.notification_service.notify_interview_scheduled(
@@ -314,30 +238,21 @@ class InterviewService:
             if not end_date:
                 end_date = start_date + timedelta(days=7)
             
-            # Buscar slots en la base de datos
-            slots = await Event.objects.filter(
-                event_type=EventType.ENTREVISTA,
-                start_time__gte=start_date,
-                start_time__lte=end_date,
-                description__icontains=str(vacancy.id),
-                status__in=[EventStatus.PENDIENTE, EventStatus.CONFIRMADO]
-            ).order_by('start_time').all()
-            
+            # Slots con cupo en una sola consulta (cupo - booked_count)
             available_slots = []
-            for slot in slots:
-                if slot.lugares_disponibles() > 0:
-                    # Formatear información del slot
-                    slot_info = {
-                        'id': str(slot.id),
-                        'label': f"{slot.start_time.strftime('%A %d/%m %H:%M')} - {slot.get_session_type_display()}",
-                        'datetime': slot.start_time.isoformat(),
-                        'session_type': slot.session_type,
-                        'available_spots': slot.lugares_disponibles(),
-                        'total_spots': slot.cupo_maximo or 1,
-                        'mode': slot.get_event_mode_display(),
-                        'location': slot.location
-                    }
-                    available_slots.append(slot_info)
+            async for slot in self.slots.available(vacancy, start_date, end_date):
+                # Formatear información del slot
+                slot_info = {
+                    'id': str(slot.id),
+                    'label': f"{slot.start_time.strftime('%A %d/%m %H:%M')} - {slot.get_session_type_display()}",
+                    'datetime': slot.start_time.isoformat(),
+                    'session_type': slot.session_type,
+                    'available_spots': slot.spots,
+                    'total_spots': slot.capacity,
+                    'mode': slot.get_event_mode_display(),
+                    'location': slot.location
+                }
+                available_slots.append(slot_info)
             
             # Si no hay slots en la BD, buscar en Google Calendar
             if not available_slots and self.business_unit.calendar_id:
@@ -392,30 +307,13 @@ class InterviewService:
                 # Slot de Google Calendar - crear nuevo evento
                 return await self._book_google_calendar_slot(person, vacancy, slot_id, interview_type)
             else:
-                # Slot de la base de datos
-                slot = await Event.objects.filter(id=slot_id).afirst()
-                if not slot:
-                    return {'success': False, 'error': 'Slot no encontrado'}
-                
-                if slot.lugares_disponibles() <= 0:
-                    return {'success': False, 'error': 'Slot sin cupo disponible'}
-                
-                # Verificar que el candidato no esté ya registrado
-                existing_participant = await EventParticipant.objects.filter(
-                    event=slot,
-                    person=person
-                ).afirst()
-                
-                if existing_participant:
-                    return {'success': False, 'error': 'Ya estás registrado en este slot'}
-                
-                # Registrar participante
-                await EventParticipant.objects.acreate(
-                    event=slot,
-                    person=person,
-                    status=EventStatus.CONFIRMADO,
-                    notes=f"Entrevista para {vacancy.titulo}"
-                )
+                # Slot de la base de datos: reserva atómica contra el cupo
+                try:
+                    slot = await sync_to_async(self.slots.book)(
+                        slot_id, person, notes=f"Entrevista para {vacancy.titulo}", vacancy=vacancy
+                    )
+                except SlotBookingError as e:
+                    return {'success': False, 'error': str(e)}
                 
                 # Crear entrevista
                 interview = await Interview.objects.acreate(
@@ -536,6 +434,11 @@ class InterviewService:
             interview.cancellation_reason = reason
             await interview.asave()
             
+            # Liberar el lugar en el slot, si la entrevista tenía uno
+            await sync_to_async(self.slots.release_for)(
+                interview.vacancy_id, interview.person_id, interview.interview_date
+            )
+            
             # Enviar notificaciones
             await self.notification_service.notify_interview_cancelled(
                 person=interview.person,
@@ -0,0 +1,262 @@
+"""
+Calendario de slots de entrevista por vacante.
+
+Los slots son ``Event`` de tipo entrevista ligados a su vacante por llave
+foránea (``Event.vacancy``, índice ``vacancy, event_type, start_time`` y
+restricción única sobre esas columnas), con un contador de cupo
+(``booked_count``):
+
+- ``generate`` arma todos los slots de un rango de fechas y los inserta con un
+  solo ``bulk_create``, saltando los horarios que ya existen.
+- ``available`` devuelve en una consulta los slots con lugares libres
+  (``capacity - booked_count``).
+- ``book`` reserva de forma atómica: un ``UPDATE`` condicionado a que quede
+  cupo incrementa el contador y registra al participante en la misma
+  transacción, así que dos candidatos que eligen el mismo slot al mismo tiempo
+  no pueden sobrepasar el cupo.
+
+Los métodos son síncronos (usan transacciones); desde código async se llaman
+con ``sync_to_async``.
+"""
+
+import logging
+import re
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from app.ats.utils.Events import Event, EventParticipant, EventStatus, EventType
+from app.ats.utils.vacantes import requiere_slots_grupales
+
+logger = logging.getLogger(__name__)
+
+WORKDAY_START = time(9, 0)
+WORKDAY_END = time(17, 0)
+ACTIVE_STATUSES = (EventStatus.PENDIENTE, EventStatus.CONFIRMADO)
+
+# Descripción de los slots creados antes de la llave foránea
+LEGACY_VACANCY_PATTERN = re.compile(r'vacante (\d+)')
+
+
+class SlotBookingError(Exception):
+    """No se pudo reservar el slot; el mensaje se muestra al candidato."""
+
+
+class SlotNotFound(SlotBookingError):
+    pass
+
+
+class SlotFull(SlotBookingError):
+    pass
+
+
+class AlreadyBooked(SlotBookingError):
+    pass
+
+
+def capacity_expression():
+    """Cupo del slot en SQL (equivalente a ``Event.capacity``)."""
+    return Case(
+        When(session_type='grupal', cupo_maximo__gt=0, then=F('cupo_maximo')),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def slot_times(start_date: datetime, end_date: datetime, slot_duration: int = 45,
+               max_slots_per_day: int = 8) -> List[datetime]:
+    """Horarios de inicio en días hábiles, de 9:00 a 17:00, hasta ``end_date``."""
+    times = []
+    day = start_date.replace(hour=WORKDAY_START.hour, minute=WORKDAY_START.minute, second=0, microsecond=0)
+    while day <= end_date:
+        if day.weekday() < 5:  # 0-4 = lunes a viernes
+            current = day
+            closing = day.replace(hour=WORKDAY_END.hour, minute=WORKDAY_END.minute)
+            for _ in range(max_slots_per_day):
+                if current >= closing:
+                    break
+                times.append(current)
+                current += timedelta(minutes=slot_duration)
+        day += timedelta(days=1)
+    return times
+
+
+class InterviewSlotCalendar:
+    """Generación, consulta y reserva de slots de entrevista."""
+
+    def build(self, vacancy, start_date: datetime, end_date: datetime, slot_duration: int = 45,
+              max_slots_per_day: int = 8) -> List[Event]:
+        """Slots (sin guardar) de la vacante para el rango de fechas."""
+        group = requiere_slots_grupales(vacancy)
+        return [
+            Event(
+                vacancy=vacancy,
+                title=f"Entrevista {'grupal' if group else 'individual'} - {vacancy.titulo}",
+                description=f"Slot de entrevista para vacante {vacancy.id} - {vacancy.titulo}",
+                event_type=EventType.ENTREVISTA,
+                status=EventStatus.PENDIENTE,
+                start_time=start,
+                end_time=start + timedelta(minutes=slot_duration),
+                session_type="grupal" if group else "individual",
+                cupo_maximo=vacancy.numero_plazas if group else 1,
+                location=vacancy.ubicacion,
+                event_mode=getattr(vacancy, 'modalidad', None) or 'virtual'
+            )
+            for start in slot_times(start_date, end_date, slot_duration, max_slots_per_day)
+        ]
+
+    def generate(self, vacancy, start_date: datetime, end_date: datetime, slot_duration: int = 45,
+                 max_slots_per_day: int = 8) -> List[Event]:
+        """
+        Crea los slots que faltan en el rango con un solo ``bulk_create``.
+        Devuelve sólo los creados.
+        """
+        slots = self.build(vacancy, start_date, end_date, slot_duration, max_slots_per_day)
+        if not slots:
+            return []
+        existing = set(Event.objects.filter(
+            vacancy=vacancy,
+            event_type=EventType.ENTREVISTA,
+            start_time__gte=slots[0].start_time,
+            start_time__lte=slots[-1].start_time
+        ).values_list('start_time', flat=True))
+        new_slots = [slot for slot in slots if slot.start_time not in existing]
+        # ignore_conflicts: otro proceso pudo crear el mismo horario entre la consulta y el insert
+        Event.objects.bulk_create(new_slots, batch_size=500, ignore_conflicts=True)
+        logger.info(f"Generados {len(new_slots)} slots para vacante {vacancy.id} ({len(existing)} ya existían)")
+        return new_slots
+
+    def ensure_slot(self, vacancy, start_time: datetime, slot_duration: int = 45, **fields) -> Event:
+        """Slot de la vacante en ese horario, creándolo si no existe."""
+        defaults = {
+            'title': f"Entrevista - {vacancy.titulo}",
+            'description': f"Slot de entrevista para vacante {vacancy.id} - {vacancy.titulo}",
+            'end_time': start_time + timedelta(minutes=slot_duration),
+            **fields,
+        }
+        try:
+            slot, _ = Event.objects.get_or_create(
+                vacancy=vacancy, event_type=EventType.ENTREVISTA, start_time=start_time, defaults=defaults
+            )
+        except IntegrityError:
+            # Creado en paralelo por otro proceso
+            slot = Event.objects.get(vacancy=vacancy, event_type=EventType.ENTREVISTA, start_time=start_time)
+        return slot
+
+    # Consulta --------------------------------------------------------------------
+
+    def available(self, vacancy, start_date: datetime, end_date: datetime, session_type: Optional[str] = None):
+        """Slots con cupo libre, anotados con ``spots`` (lugares disponibles)."""
+        queryset = Event.objects.filter(
+            vacancy=vacancy,
+            event_type=EventType.ENTREVISTA,
+            start_time__gte=start_date,
+            start_time__lte=end_date,
+            status__in=ACTIVE_STATUSES
+        )
+        if session_type:
+            queryset = queryset.filter(session_type=session_type)
+        return queryset.annotate(
+            spots=capacity_expression() - F('booked_count')
+        ).filter(spots__gt=0).order_by('start_time')
+
+    # Reservas --------------------------------------------------------------------
+
+    def book(self, slot_id: Any, person, notes: str = '', vacancy=None) -> Event:
+        """
+        Registra a la persona en el slot si queda cupo. Lanza ``SlotNotFound``,
+        ``SlotFull`` o ``AlreadyBooked``.
+        """
+        slots = Event.objects.filter(pk=slot_id, event_type=EventType.ENTREVISTA, status__in=ACTIVE_STATUSES)
+        if vacancy is not None:
+            # Los slots anteriores a la llave foránea aún no tienen vacante
+            slots = slots.filter(Q(vacancy=vacancy) | Q(vacancy__isnull=True))
+        try:
+            with transaction.atomic():
+                # UPDATE ... WHERE booked_count < cupo: la base de datos serializa
+                # las reservas concurrentes sobre la misma fila
+                updated = slots.annotate(capacity=capacity_expression()).filter(
+                    booked_count__lt=F('capacity')
+                ).update(booked_count=F('booked_count') + 1, status=EventStatus.CONFIRMADO)
+                if not updated:
+                    if not slots.exists():
+                        raise SlotNotFound('Slot no encontrado')
+                    raise SlotFull('Slot sin cupo disponible')
+                # unique_together (event, person): un registro duplicado revierte el incremento
+                EventParticipant.objects.create(
+                    event_id=slot_id, person=person, status=EventStatus.CONFIRMADO, notes=notes
+                )
+        except IntegrityError:
+            raise AlreadyBooked('Ya estás registrado en este slot')
+        return Event.objects.get(pk=slot_id)
+
+    def book_first_available(self, vacancy, person, start_date: datetime, end_date: datetime,
+                             session_type: Optional[str] = None, notes: str = '') -> Optional[Event]:
+        """Reserva el primer slot con cupo del rango; ``None`` si no queda ninguno."""
+        for slot_id in self.available(vacancy, start_date, end_date, session_type).values_list('pk', flat=True):
+            try:
+                return self.book(slot_id, person, notes=notes, vacancy=vacancy)
+            except SlotFull:
+                continue    # otro candidato tomó el último lugar entre la consulta y la reserva
+        return None
+
+    def release(self, slot_id: Any, person) -> bool:
+        """Elimina a la persona del slot y libera su lugar."""
+        with transaction.atomic():
+            deleted, _ = EventParticipant.objects.filter(event_id=slot_id, person=person).delete()
+            if not deleted:
+                return False
+            Event.objects.filter(pk=slot_id, booked_count__gt=0).update(booked_count=F('booked_count') - 1)
+        return True
+
+    def release_for(self, vacancy, person, start_time: datetime) -> bool:
+        """Libera el lugar de la persona en el slot de la vacante a esa hora."""
+        slot_id = Event.objects.filter(
+            vacancy=vacancy, event_type=EventType.ENTREVISTA, start_time=start_time,
+            participants__person=person
+        ).values_list('pk', flat=True).first()
+        return slot_id is not None and self.release(slot_id, person)
+
+    # Mantenimiento ---------------------------------------------------------------
+
+    def backfill(self) -> Dict[str, int]:
+        """
+        Liga a su vacante los slots creados antes de la llave foránea (por la
+        descripción) y recalcula ``booked_count`` a partir de los participantes.
+        """
+        from app.models import Vacante
+
+        legacy = Event.objects.filter(
+            event_type=EventType.ENTREVISTA, vacancy__isnull=True, description__contains='vacante '
+        ).values_list('pk', 'description')
+        links: Dict[int, List[Any]] = {}
+        for pk, description in legacy.iterator():
+            match = LEGACY_VACANCY_PATTERN.search(description or '')
+            if match:
+                links.setdefault(int(match.group(1)), []).append(pk)
+        known = set(Vacante.objects.filter(pk__in=links).values_list('pk', flat=True))
+        linked = 0
+        for vacancy_id, pks in links.items():
+            if vacancy_id in known:
+                try:
+                    linked += Event.objects.filter(pk__in=pks).update(vacancy_id=vacancy_id)
+                except IntegrityError:
+                    logger.warning(f"Slots duplicados para la vacante {vacancy_id}; se ligan uno por uno")
+                    for pk in pks:
+                        try:
+                            with transaction.atomic():
+                                linked += Event.objects.filter(pk=pk).update(vacancy_id=vacancy_id)
+                        except IntegrityError:
+                            continue
+
+        participants = EventParticipant.objects.filter(event=OuterRef('pk')).order_by().values('event')
+        recounted = Event.objects.filter(event_type=EventType.ENTREVISTA).update(
+            booked_count=Coalesce(Subquery(participants.annotate(total=Count('pk')).values('total')), Value(0))
+        )
+        return {'linked': linked, 'recounted': recounted}
+
+
+slot_calendar = InterviewSlotCalendar()
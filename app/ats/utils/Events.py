@@ -27,6 +27,10 @@ class Event(models.Model):
     end_time = models.DateTimeField()
     location = models.CharField(max_length=255, null=True, blank=True)
     virtual_link = models.URLField(null=True, blank=True)
+    vacancy = models.ForeignKey(
+        'app.Vacante', on_delete=models.CASCADE, null=True, blank=True, related_name='interview_slots',
+        help_text="Vacante del slot de entrevista (ver app/ats/services/interview_slots.py)."
+    )
     SESSION_TYPE_CHOICES = [
         ("individual", "Individual"),
         ("grupal", "Grupal"),
@@ -41,6 +45,10 @@ class Event(models.Model):
         null=True, blank=True,
         help_text="Máximo de participantes para slots grupales. Solo aplica si session_type es grupal."
     )
+    booked_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Participantes registrados; se actualiza de forma atómica al reservar o liberar."
+    )
     EVENT_MODE_CHOICES = [
         ("presencial", "Presencial"),
         ("virtual", "Virtual"),
@@ -59,6 +67,16 @@ class Event(models.Model):
         ordering = ['-start_time']
         verbose_name = 'Evento'
         verbose_name_plural = 'Eventos'
+        indexes = [
+            models.Index(fields=['vacancy', 'event_type', 'start_time'], name='event_vacancy_slot_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vacancy', 'event_type', 'start_time'],
+                condition=models.Q(vacancy__isnull=False),
+                name='event_unique_vacancy_slot'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.event_type}: {self.title} [{self.get_event_mode_display()}]'
@@ -71,11 +89,16 @@ class Event(models.Model):
         """Verifica si el evento ya pasó."""
         return self.end_time < timezone.now()
 
-    def lugares_disponibles(self) -> int:
-        """Devuelve el número de lugares disponibles para slots grupales."""
+    @property
+    def capacity(self) -> int:
+        """Cupo del slot: ``cupo_maximo`` si es grupal, 1 si es individual."""
         if self.session_type == "grupal" and self.cupo_maximo:
-            return max(0, self.cupo_maximo - self.participants.count())
-        return 1  # Para individuales, solo 1 lugar
+            return self.cupo_maximo
+        return 1
+
+    def lugares_disponibles(self) -> int:
+        """Devuelve el número de lugares disponibles (sin consultar participantes)."""
+        return max(0, self.capacity - self.booked_count)
 
 class EventParticipant(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='participants')
@@ -15,67 +15,33 @@ from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
 
+from app.ats.utils.tiered_cache import tiered_cache
+
 logger = logging.getLogger(__name__)
 
-def cache_result(prefix: str, timeout: int = 3600, use_pickle: bool = False):
+def cache_result(prefix: Optional[str] = None, timeout: Optional[int] = None, use_pickle: bool = True,
+                 ttl: Optional[int] = None):
     """
-    Decorador para cachear resultados de funciones con Redis.
-    Optimiza las consultas frecuentes siguiendo las reglas de CPU efficiency.
+    Decorador para cachear resultados de funciones (síncronas o async).
+    
+    Usa la caché de dos niveles (``tiered_cache``): L1 en memoria del proceso
+    delante de Redis, con invalidación entre procesos.
     
     Args:
-        prefix: Prefijo para la clave de caché
+        prefix: Namespace de la caché (por defecto, el módulo de la función)
         timeout: Tiempo de expiración en segundos
-        use_pickle: Si se debe usar pickle para serializar objetos complejos
+        use_pickle: Serializar con pickle (objetos arbitrarios); si es False se usa JSON
+        ttl: Alias de ``timeout``
         
     Returns:
         Callable: Decorador para la función
     """
+    expiration = ttl or timeout or 3600
+    serializer = 'pickle' if use_pickle else 'json'
+
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generar clave única para la consulta
-            key_parts = [prefix, func.__name__]
-            
-            # Añadir args y kwargs serializables a la clave
-            for arg in args:
-                if isinstance(arg, (str, int, float, bool)):
-                    key_parts.append(str(arg))
-            
-            for k, v in sorted(kwargs.items()):
-                if isinstance(v, (str, int, float, bool)):
-                    key_parts.append(f"{k}:{v}")
-            
-            # Generar clave única con hash
-            cache_key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
-            
-            # Intentar obtener desde caché
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit para {func.__name__}: {cache_key}")
-                if use_pickle:
-                    try:
-                        return pickle.loads(cached_result)
-                    except Exception as e:
-                        logger.error(f"Error deserializando caché: {str(e)}")
-                        # Continuar para recalcular
-                else:
-                    return cached_result
-            
-            # Ejecutar función si no está en caché
-            logger.debug(f"Cache miss para {func.__name__}: {cache_key}")
-            result = func(*args, **kwargs)
-            
-            # Cachear resultado
-            try:
-                if use_pickle and not isinstance(result, (str, int, float, bool, dict, list)):
-                    cache.set(cache_key, pickle.dumps(result), timeout)
-                else:
-                    cache.set(cache_key, result, timeout)
-            except Exception as e:
-                logger.error(f"Error cacheando resultado: {str(e)}")
-            
-            return result
-        return wrapper
+        namespace = prefix or func.__module__
+        return tiered_cache.cached(namespace, ttl=expiration, serializer=serializer)(func)
     return decorator
 
 
@@ -84,11 +50,14 @@ def invalidate_cache(prefix: str = None, keys: list = None):
     Invalida claves de caché por prefijo o lista específica.
     
     Args:
-        prefix: Prefijo de claves a invalidar
+        prefix: Namespace (de ``cache_result``) o prefijo de claves a invalidar
         keys: Lista específica de claves a invalidar
     """
     if prefix:
-        # Usar clave de patrón para compatibilidad con Redis
+        # Namespace de la caché de dos niveles (incluye el L1 de otros procesos)
+        tiered_cache.namespace(prefix).clear()
+
+        # Claves antiguas guardadas directamente en el caché de Django
         pattern = f"{prefix}*"
         try:
             # Si es Redis, usar scan_iter() para claves con patrón
@@ -97,9 +66,6 @@ def invalidate_cache(prefix: str = None, keys: list = None):
                 if keys_to_delete:
                     cache._cache.delete(*keys_to_delete)
                     logger.info(f"Caché invalidado para patrón: {pattern}, {len(keys_to_delete)} claves")
-            else:
-                # Fallback para otros backends de caché
-                logger.warning(f"Invalidación por patrón no soportada en este backend")
         except Exception as e:
             logger.error(f"Error invalidando caché por patrón: {str(e)}")
     
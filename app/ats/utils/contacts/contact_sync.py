@@ -9,6 +9,7 @@ command* (`manage.py sync_contacts`) para ejecución manual.
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
 from typing import Any, Dict, List, Optional, Sequence
 
@@ -16,9 +17,9 @@ import phonenumbers
 from asgiref.sync import sync_to_async
 from django.db import transaction
 from django.utils import timezone
-from rapidfuzz import fuzz, process as fuzz_process
 
 from app.models import Person  # type: ignore[attr-defined]
+from app.ats.utils.dedup import KEY_FIELDS, dedup_engine
 
 from . import PROVIDERS
 from .base_service import BaseContactService
@@ -105,42 +106,26 @@ class ContactSync:
                 )
                 to_create.append(person)
 
+        # bulk_create/bulk_update no pasan por Person.save: claves de dedup a mano
+        for person in itertools.chain(to_create, to_update):
+            person.refresh_dedup_keys()
         if to_create:
             await sync_to_async(Person.objects.bulk_create)(to_create, batch_size=1000)
         if to_update:
-            fields = ["phone", "email", "metadata"]
+            fields = ["phone", "email", "metadata", *KEY_FIELDS]
             await sync_to_async(Person.objects.bulk_update)(to_update, fields, batch_size=500)
 
     # ------------------------------------------------------------------
     @staticmethod
     async def _find_existing(data: Dict[str, Any]) -> Optional[Person]:
-        email = data.get("email")
-        phone = data.get("phone")
         linkedin_url = data.get("linkedin_url")
-        query = Person.objects.all()
-        if email:
-            person = await sync_to_async(query.filter(email__iexact=email).first)()
-            if person:
-                return person
-        if phone:
-            person = await sync_to_async(query.filter(phone=phone).first)()
-            if person:
-                return person
-        if linkedin_url:
-            person = await sync_to_async(query.filter(metadata__linkedin_url=linkedin_url).first)()
-            if person:
-                return person
-        # Fallback fuzzy match by name + company
-        name = data.get("name")
-        company = (data.get("company") or "").lower()
-        if not name:
-            return None
-        possibles = await sync_to_async(list)(query.filter(nombre__iexact=name))
-        for p in possibles:
-            comp = (p.metadata.get("company", "") or "").lower()
-            if comp and company and fuzz.ratio(comp, company) > 90:
-                return p
-        return None
+        # Correo, teléfono y nombre + empresa por las claves indexadas de dedup
+        person = await sync_to_async(dedup_engine.find_match)(
+            data.get("name"), email=data.get("email"), phone=data.get("phone"), company=data.get("company")
+        )
+        if person or not linkedin_url:
+            return person
+        return await sync_to_async(Person.objects.filter(metadata__linkedin_url=linkedin_url).first)()
 
 
 # ----------------------------------------------------------------------
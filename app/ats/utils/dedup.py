@@ -0,0 +1,568 @@
+# /home/pablo/app/ats/utils/dedup.py
+"""
+Motor de deduplicación de candidatos (``Person``) con claves de bloqueo.
+
+Cada persona guarda claves normalizadas en columnas indexadas, que
+``Person.save`` recalcula:
+
+    dedup_email     correo en minúsculas (Gmail sin puntos ni ``+etiqueta``)
+    dedup_phone     teléfono en E.164 (``DEFAULT_REGION`` si no trae lada)
+    dedup_name_key  clave fonética de nombre + apellido paterno
+    dedup_company   última empresa normalizada (sin sufijos como S.A. de C.V.)
+
+Una clave vacía (``''``) significa "sin dato"; ``NULL`` significa que aún no se
+ha calculado (ver ``refresh_keys``).
+
+Modos de uso:
+
+- En línea: ``dedup_engine.find_match(...)`` consulta sólo los bloques que
+  comparten clave (correo, teléfono, nombre + empresa) con búsquedas por
+  índice que devuelven tuplas pequeñas, y compara los nombres con similitud
+  difusa dentro del bloque.
+- Por lotes: ``dedup_engine.deduplicate()`` recorre la tabla por cada clave
+  ordenada (cursor en streaming, ``iterator(chunk_size)``), agrupa duplicados
+  con union-find y fusiona cada grupo en el registro de ID menor con la
+  semántica de ``merge_candidate_data``: ``bulk_update`` de los que se quedan,
+  las filas relacionadas (postulaciones, entrevistas, tablas M2M...) se
+  reasignan al que se queda y un solo ``DELETE`` por lote para los duplicados.
+
+Un nombre fonético parecido nunca basta por sí solo: sin correo ni teléfono
+en común, la coincidencia por nombre exige además la misma empresa.
+"""
+
+import itertools
+import logging
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+try:
+    import phonenumbers
+except ImportError:  # pragma: no cover - depende del entorno
+    phonenumbers = None
+
+logger = logging.getLogger(__name__)
+
+KEY_FIELDS = ('dedup_email', 'dedup_phone', 'dedup_name_key', 'dedup_company')
+SOURCE_FIELDS = ('nombre', 'apellido_paterno', 'email', 'phone', 'metadata')
+
+DEFAULT_REGION = 'MX'
+NAME_THRESHOLD = 0.88        # similitud mínima de nombres dentro de un bloque nombre + empresa
+PHONE_NAME_THRESHOLD = 0.6   # un teléfono compartido (familia, oficina) exige nombres parecidos
+MAX_BLOCK_SIZE = 200         # bloques mayores sólo se agrupan por nombre idéntico
+CHUNK_SIZE = 5000
+
+_GMAIL_DOMAINS = {'gmail.com', 'googlemail.com'}
+_COMPANY_SUFFIXES = {
+    'sa', 'de', 'cv', 'sapi', 'sab', 'srl', 'rl', 'sc', 'ac', 'inc', 'llc', 'ltd', 'corp',
+    'corporation', 'co', 'company', 'gmbh', 'sas', 'spa', 'plc',
+}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_PHONETIC_RULES = (
+    (re.compile(r"ph"), 'f'),
+    (re.compile(r"ch"), 'X'),
+    (re.compile(r"ll"), 'y'),
+    (re.compile(r"qu"), 'k'),
+    (re.compile(r"gu(?=[ei])"), 'G'),
+    (re.compile(r"g(?=[ei])"), 'j'),
+    (re.compile(r"G"), 'g'),
+    (re.compile(r"c(?=[ei])"), 's'),
+    (re.compile(r"[cq]"), 'k'),
+    (re.compile(r"z"), 's'),
+    (re.compile(r"v"), 'b'),
+    (re.compile(r"w"), 'u'),
+    (re.compile(r"h"), ''),
+    (re.compile(r"y$"), 'i'),
+    (re.compile(r"(.)\1+"), r"\1"),
+)
+
+
+class Match(NamedTuple):
+    person_id: int
+    reason: str     # 'email', 'phone' o 'name'
+    score: float
+
+
+# Normalización --------------------------------------------------------------------
+
+def _ascii(value: Any) -> str:
+    text = unicodedata.normalize('NFKD', str(value or ''))
+    return text.encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def normalize_text(value: Any) -> str:
+    """Minúsculas, sin acentos ni puntuación y con espacios simples."""
+    return _NON_ALNUM.sub(' ', _ascii(value)).strip()
+
+
+def normalize_email(email: Any) -> str:
+    email = str(email or '').strip().lower()
+    if email.count('@') != 1:
+        return ''
+    local, domain = email.split('@')
+    if not local or '.' not in domain:
+        return ''
+    if domain in _GMAIL_DOMAINS:
+        local, domain = local.split('+', 1)[0].replace('.', ''), 'gmail.com'
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone: Any, region: Optional[str] = None) -> str:
+    """Teléfono en E.164 (``+5215512345678`` -> ``+525512345678``) o ``''``."""
+    raw = str(phone or '').strip()
+    if not raw or raw.startswith('placeholder'):
+        return ''
+    region = region or _config().get('DEFAULT_REGION', DEFAULT_REGION)
+    if phonenumbers is not None:
+        try:
+            parsed = phonenumbers.parse(raw, region)
+            if not phonenumbers.is_possible_number(parsed):
+                return ''
+            digits = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)[1:]
+        except phonenumbers.NumberParseException:
+            return ''
+    else:
+        # Sin phonenumbers: sólo dígitos, lada de México por defecto
+        digits = re.sub(r"\D", '', raw)
+        if raw.startswith('00'):
+            digits = digits[2:]
+        elif not raw.startswith('+') and len(digits) == 10 and region == 'MX':
+            digits = f"52{digits}"
+    # Celulares de México: el '1' tras la lada ya no se marca (WhatsApp aún lo envía)
+    if digits.startswith('521') and len(digits) == 13:
+        digits = f"52{digits[3:]}"
+    return f"+{digits}" if 8 <= len(digits) <= 15 else ''
+
+
+def phonetic_key(word: Any) -> str:
+    """Clave fonética para nombres en español (``Gutiérrez`` == ``Gutierres``)."""
+    text = re.sub(r"[^a-z]", '', _ascii(word))
+    for pattern, replacement in _PHONETIC_RULES:
+        text = pattern.sub(replacement, text)
+    return text.lower()
+
+
+def normalize_company(company: Any) -> str:
+    # Sin puntos antes de separar: "S.A. de C.V." -> "sa de cv"
+    tokens = [token for token in normalize_text(_ascii(company).replace('.', '')).split()
+              if token not in _COMPANY_SUFFIXES]
+    return ''.join(tokens)[:100]
+
+
+def split_name(first_name: Any, last_name: Any = None) -> Tuple[str, str]:
+    """
+    Primer nombre y apellido paterno. Si el apellido no viene aparte
+    (contactos importados con el nombre completo) se toma del nombre:
+    ``Juan Carlos Pérez García`` -> (``juan``, ``perez``).
+    """
+    tokens = normalize_text(first_name).split()
+    surname = normalize_text(last_name).split()
+    if surname:
+        return (tokens[0] if tokens else '', surname[0])
+    if len(tokens) >= 3:
+        return tokens[0], tokens[-2]
+    if len(tokens) == 2:
+        return tokens[0], tokens[1]
+    return (tokens[0] if tokens else '', '')
+
+
+def name_key(first_name: Any, last_name: Any = None) -> str:
+    first, surname = split_name(first_name, last_name)
+    if not first or not surname:
+        return ''
+    return f"{phonetic_key(first)} {phonetic_key(surname)}"[:64]
+
+
+def full_name(first_name: Any, last_name: Any = None) -> str:
+    return ' '.join(part for part in (normalize_text(first_name), normalize_text(last_name)) if part)
+
+
+def name_similarity(first: str, second: str) -> float:
+    """Similitud 0-1 de nombres ya normalizados, sin importar el orden de las palabras."""
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    return SequenceMatcher(None, ' '.join(sorted(first.split())), ' '.join(sorted(second.split()))).ratio()
+
+
+def person_company(metadata: Any) -> str:
+    if not isinstance(metadata, dict):
+        return ''
+    return metadata.get('last_company') or metadata.get('company') or ''
+
+
+def blocking_keys(first_name: Any = None, last_name: Any = None, email: Any = None,
+                  phone: Any = None, company: Any = None) -> Dict[str, str]:
+    """Claves de bloqueo para los campos ``dedup_*`` de ``Person``."""
+    return {
+        'dedup_email': normalize_email(email),
+        'dedup_phone': normalize_phone(phone),
+        'dedup_name_key': name_key(first_name, last_name),
+        'dedup_company': normalize_company(company),
+    }
+
+
+def person_keys(person) -> Dict[str, str]:
+    return blocking_keys(person.nombre, person.apellido_paterno, person.email,
+                         person.phone, person_company(person.metadata))
+
+
+# Fusión ------------------------------------------------------------------------------
+
+def _merge_lists(current: list, new: list) -> list:
+    merged = list(current)
+    for item in new:
+        if item not in merged:
+            merged.append(item)
+    return merged
+
+
+def merge_candidate_data(existing, new_data: Dict):
+    """
+    Fusiona los datos del candidato 'new_data' en el registro 'existing'.
+    Para cada campo, si en el registro existente no hay información o está vacía,
+    se actualiza con la información de new_data. En metadata las listas se unen
+    sin duplicados y conservando el orden.
+    """
+    for field in ('nombre', 'apellido_paterno', 'email', 'phone'):
+        if not getattr(existing, field, None) and new_data.get(field):
+            setattr(existing, field, new_data[field])
+
+    metadata = existing.metadata or {}
+    for key, value in (new_data.get('metadata') or {}).items():
+        if key not in metadata or not metadata[key]:
+            metadata[key] = value
+        elif isinstance(metadata[key], list) and isinstance(value, list):
+            metadata[key] = _merge_lists(metadata[key], value)
+    existing.metadata = metadata
+    return existing
+
+
+def person_data(person) -> Dict[str, Any]:
+    return {field: getattr(person, field) for field in SOURCE_FIELDS}
+
+
+# Agrupación por bloques -----------------------------------------------------------------
+
+class Clusters:
+    """Union-find de IDs; sólo guarda los que tienen algún duplicado."""
+
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while item != root:
+            parent[item], item = root, parent.get(item, item)
+        return root
+
+    def union(self, first: int, second: int) -> bool:
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        # La raíz es el ID menor, que es el registro que se conserva
+        if second < first:
+            first, second = second, first
+        self.parent[second] = first
+        self.parent.setdefault(first, first)
+        return True
+
+    def groups(self) -> List[List[int]]:
+        grouped: Dict[int, List[int]] = {}
+        for item in self.parent:
+            grouped.setdefault(self.find(item), []).append(item)
+        return sorted(sorted(group) for group in grouped.values() if len(group) > 1)
+
+
+def link_blocks(rows: Iterable[Tuple[int, Any, str]], clusters: Clusters,
+                threshold: Optional[float] = None, allow_missing_names: bool = False,
+                max_block_size: int = MAX_BLOCK_SIZE) -> int:
+    """
+    Une los duplicados de filas ``(id, clave, nombre normalizado)`` ordenadas
+    por clave. Sin ``threshold`` todo el bloque es un mismo candidato; con él,
+    sólo los pares cuyos nombres se parecen al menos ``threshold``.
+    Devuelve cuántas uniones nuevas hubo.
+    """
+    linked = 0
+    for _, block in itertools.groupby(rows, key=lambda row: row[1]):
+        block = list(block)
+        if len(block) < 2:
+            continue
+        if threshold is None:
+            for row in block[1:]:
+                linked += clusters.union(block[0][0], row[0])
+            continue
+        if len(block) > max_block_size:
+            # Nombres comunes: comparar todos contra todos sería cuadrático
+            block.sort(key=lambda row: row[2])
+            for name, same in itertools.groupby(block, key=lambda row: row[2]):
+                same = list(same)
+                for row in same[1:]:
+                    linked += clusters.union(same[0][0], row[0])
+            continue
+        named = [row for row in block if row[2]]
+        for index, (person_id, _, name) in enumerate(named):
+            for other_id, _, other_name in named[:index]:
+                if clusters.find(person_id) != clusters.find(other_id) and \
+                        name_similarity(name, other_name) >= threshold:
+                    linked += clusters.union(person_id, other_id)
+        if allow_missing_names and len(named) < len(block):
+            # Los registros sin nombre van con el de ID menor, sin servir de
+            # puente entre personas distintas que comparten la clave
+            anchor = min(row[0] for row in block if row[2]) if named else min(row[0] for row in block)
+            for person_id, _, name in block:
+                if not name:
+                    linked += clusters.union(anchor, person_id)
+    return linked
+
+
+def _best_in_block(name: str, rows: Sequence[Tuple[int, Any, Any]], threshold: float,
+                   allow_missing_names: bool = False) -> Optional[Tuple[int, float]]:
+    best = None
+    for person_id, first_name, last_name in rows:
+        other = full_name(first_name, last_name)
+        if allow_missing_names and (not name or not other):
+            score = 1.0
+        else:
+            score = name_similarity(name, other)
+        if score >= threshold and (best is None or score > best[1] or (score == best[1] and person_id < best[0])):
+            best = (person_id, score)
+    return best
+
+
+def repoint_relations(mapping: Dict[int, int], batch_size: int = 500) -> int:
+    """
+    Reasigna al sobreviviente (``mapping`` duplicado -> sobreviviente) todas
+    las filas con FK o uno-a-uno hacia ``Person``, incluidas las tablas
+    intermedias de los M2M. Si mover una fila viola una restricción única (el
+    sobreviviente ya tiene ese perfil o ese vínculo), la fila se queda y se
+    borra en cascada con el duplicado. Devuelve las filas movidas.
+    """
+    from django.db import IntegrityError, transaction
+    from django.db.models import Case, IntegerField, Value, When
+    from app.models import Person
+
+    moved = 0
+    items = list(mapping.items())
+    for relation in Person._meta.get_fields(include_hidden=True):
+        if not (relation.auto_created and not relation.concrete and (relation.one_to_many or relation.one_to_one)):
+            continue
+        field = relation.field
+        if field.target_field != Person._meta.pk:
+            continue
+        manager = relation.related_model._base_manager
+        column = field.attname
+        for start in range(0, len(items), batch_size):
+            chunk = dict(items[start:start + batch_size])
+            rows = manager.filter(**{f"{column}__in": list(chunk)})
+            new_owner = Case(
+                *[When(**{column: duplicate}, then=Value(survivor)) for duplicate, survivor in chunk.items()],
+                output_field=IntegerField(),
+            )
+            try:
+                with transaction.atomic():
+                    moved += rows.update(**{column: new_owner})
+                continue
+            except IntegrityError:
+                pass
+            # Fila por fila para mover todo lo que no choca con el sobreviviente
+            for pk, duplicate in rows.values_list('pk', column):
+                try:
+                    with transaction.atomic():
+                        moved += manager.filter(pk=pk).update(**{column: chunk[duplicate]})
+                except IntegrityError:
+                    pass
+    return moved
+
+
+def _config() -> Dict[str, Any]:
+    try:
+        return getattr(settings, 'DEDUP', None) or {}
+    except Exception:
+        return {}
+
+
+class DedupEngine:
+    """
+    Búsqueda de duplicados en línea y deduplicación por lotes de ``Person``.
+
+    Args:
+        name_threshold: Similitud mínima de nombres en el bloque nombre + empresa.
+        phone_name_threshold: Similitud mínima de nombres con el mismo teléfono.
+        chunk_size: Filas por lote al recorrer la tabla.
+    """
+
+    def __init__(self, name_threshold: Optional[float] = None, phone_name_threshold: Optional[float] = None,
+                 chunk_size: Optional[int] = None):
+        config = _config()
+        self.name_threshold = name_threshold or config.get('NAME_THRESHOLD', NAME_THRESHOLD)
+        self.phone_name_threshold = phone_name_threshold or config.get('PHONE_NAME_THRESHOLD', PHONE_NAME_THRESHOLD)
+        self.chunk_size = chunk_size or config.get('CHUNK_SIZE', CHUNK_SIZE)
+        self.max_block_size = config.get('MAX_BLOCK_SIZE', MAX_BLOCK_SIZE)
+
+    @staticmethod
+    def _queryset():
+        from app.models import Person
+        return Person.objects.all()
+
+    # En línea --------------------------------------------------------------------------
+
+    def match(self, first_name: Any = None, last_name: Any = None, email: Any = None, phone: Any = None,
+              company: Any = None, exclude_id: Optional[int] = None) -> Optional[Match]:
+        """
+        El candidato existente que corresponde a estos datos, en orden de
+        confianza: mismo correo, mismo teléfono con nombre parecido, o mismo
+        bloque fonético de nombre y misma empresa con nombre parecido. Sin
+        empresa no se acepta una coincidencia sólo por nombre: dos personas
+        homónimas no son la misma. Sólo consulta columnas indexadas.
+        """
+        keys = blocking_keys(first_name, last_name, email, phone, company)
+        queryset = self._queryset()
+        if exclude_id is not None:
+            queryset = queryset.exclude(id=exclude_id)
+        name = full_name(first_name, last_name)
+
+        if keys['dedup_email']:
+            found = queryset.filter(dedup_email=keys['dedup_email']).order_by('id').values_list('id', flat=True).first()
+            if found is not None:
+                return Match(found, 'email', 1.0)
+
+        if keys['dedup_phone']:
+            rows = list(queryset.filter(dedup_phone=keys['dedup_phone'])
+                        .order_by('id').values_list('id', 'nombre', 'apellido_paterno')[:self.max_block_size])
+            best = _best_in_block(name, rows, self.phone_name_threshold, allow_missing_names=True)
+            if best:
+                return Match(best[0], 'phone', round(best[1], 4))
+
+        if keys['dedup_name_key'] and keys['dedup_company']:
+            block = queryset.filter(dedup_name_key=keys['dedup_name_key'], dedup_company=keys['dedup_company'])
+            rows = list(block.order_by('id').values_list('id', 'nombre', 'apellido_paterno')[:self.max_block_size])
+            best = _best_in_block(name, rows, self.name_threshold)
+            if best:
+                return Match(best[0], 'name', round(best[1], 4))
+        return None
+
+    def find_match(self, *args, **kwargs):
+        """Como ``match`` pero devuelve la ``Person`` (o ``None``)."""
+        found = self.match(*args, **kwargs)
+        if found is None:
+            return None
+        return self._queryset().filter(id=found.person_id).first()
+
+    # Claves -------------------------------------------------------------------------------
+
+    def refresh_keys(self, only_missing: bool = True) -> int:
+        """Calcula las claves ``dedup_*`` (por defecto sólo las que faltan)."""
+        from app.models import Person
+        queryset = self._queryset()
+        if only_missing:
+            queryset = queryset.filter(dedup_name_key__isnull=True)
+        rows = queryset.order_by().values_list('id', *SOURCE_FIELDS).iterator(chunk_size=self.chunk_size)
+        updated = 0
+        batch = []
+        for person_id, first_name, last_name, email, phone, metadata in rows:
+            keys = blocking_keys(first_name, last_name, email, phone, person_company(metadata))
+            batch.append(Person(id=person_id, **keys))
+            if len(batch) >= self.chunk_size:
+                updated += Person.objects.bulk_update(batch, KEY_FIELDS, batch_size=1000)
+                batch = []
+        if batch:
+            updated += Person.objects.bulk_update(batch, KEY_FIELDS, batch_size=1000)
+        return updated
+
+    # Por lotes -----------------------------------------------------------------------------
+
+    def _stream(self, key_fields: Sequence[str]):
+        queryset = self._queryset()
+        for field in key_fields:
+            queryset = queryset.exclude(**{f"{field}__isnull": True}).exclude(**{field: ''})
+        rows = (queryset.order_by(*key_fields, 'id')
+                .values_list('id', *key_fields, 'nombre', 'apellido_paterno')
+                .iterator(chunk_size=self.chunk_size))
+        width = len(key_fields)
+        for row in rows:
+            key = row[1] if width == 1 else row[1:1 + width]
+            yield row[0], key, full_name(row[-2], row[-1])
+
+    def find_clusters(self) -> Clusters:
+        """
+        Grupos de duplicados: mismo correo; mismo teléfono con nombres
+        parecidos; mismo nombre fonético y misma empresa con nombres muy
+        parecidos. Los registros sin empresa sólo se unen por correo o teléfono.
+        """
+        clusters = Clusters()
+        link_blocks(self._stream(['dedup_email']), clusters)
+        link_blocks(self._stream(['dedup_phone']), clusters, self.phone_name_threshold,
+                    allow_missing_names=True, max_block_size=self.max_block_size)
+        link_blocks(self._stream(['dedup_name_key', 'dedup_company']), clusters, self.name_threshold,
+                    max_block_size=self.max_block_size)
+        return clusters
+
+    def merge_groups(self, groups: Iterable[Sequence[int]]) -> List[int]:
+        """
+        Fusiona cada grupo en su ID menor; devuelve los IDs eliminados. Los
+        grupos se procesan por lotes de ``chunk_size`` registros, cada lote en
+        una transacción. Antes de borrar, las filas que apuntan a un duplicado
+        se reasignan al que se queda (``repoint_relations``).
+        """
+        from django.db import transaction
+        from app.models import Person
+
+        removed: List[int] = []
+        pending: List[Sequence[int]] = []
+        size = 0
+        for group in itertools.chain(groups, [None]):
+            if group is not None:
+                pending.append(group)
+                size += len(group)
+                if size < self.chunk_size:
+                    continue
+            if not pending:
+                break
+            with transaction.atomic():
+                people = Person.objects.in_bulk([person_id for group in pending for person_id in group])
+                survivors, duplicates, mapping = [], [], {}
+                for members in pending:
+                    members = [people[person_id] for person_id in sorted(members) if person_id in people]
+                    if len(members) < 2:
+                        continue
+                    survivor = members[0]
+                    for duplicate in members[1:]:
+                        merge_candidate_data(survivor, person_data(duplicate))
+                        duplicates.append(duplicate.id)
+                        mapping[duplicate.id] = survivor.id
+                    for field, value in person_keys(survivor).items():
+                        setattr(survivor, field, value)
+                    survivors.append(survivor)
+                Person.objects.bulk_update(survivors, SOURCE_FIELDS + KEY_FIELDS, batch_size=1000)
+                repoint_relations(mapping)
+                Person.objects.filter(id__in=duplicates).delete()
+            removed.extend(duplicates)
+            logger.info(f"Deduplicación: {len(survivors)} grupos fusionados, {len(duplicates)} duplicados eliminados")
+            pending, size = [], 0
+        return removed
+
+    def deduplicate(self, dry_run: bool = False, refresh: bool = True) -> Dict[str, Any]:
+        """
+        Deduplicación completa en streaming. Con ``dry_run`` sólo reporta los
+        grupos encontrados sin modificar nada.
+        """
+        refreshed = self.refresh_keys() if refresh else 0
+        groups = self.find_clusters().groups()
+        duplicates = sum(len(group) - 1 for group in groups)
+        result = {'refreshed': refreshed, 'groups': len(groups), 'duplicates': duplicates, 'removed': []}
+        if dry_run:
+            result['sample'] = groups[:20]
+            return result
+        result['removed'] = self.merge_groups(groups)
+        return result
+
+
+dedup_engine = DedupEngine()
@@ -36,6 +36,7 @@ from django.conf import settings
 from django.db import transaction, models, connection
 from django.core.cache import cache
 from django.utils import timezone as django_timezone
+from asgiref.sync import sync_to_async
 
 # Web Scraping
 from bs4 import BeautifulSoup
@@ -69,6 +70,7 @@ from tenacity import (
 # Importaciones de modelos y utilidades locales
 from app.models import BusinessUnit, Person, ChatState, USER_AGENTS
 from app.ats.chatbot.utils.chatbot_utils import ChatbotUtils
+from app.ats.utils.dedup import dedup_engine, merge_candidate_data
 
 # Configuración de logging
 logging.basicConfig(
@@ -415,40 +417,18 @@ def deduplicate_persons(
     last_name: str,
     email: Optional[str],
     company: Optional[str],
-    position: Optional[str]
+    position: Optional[str],
+    phone: Optional[str] = None
 ) -> Optional[Person]:
-    query = Person.objects.all()
-    if email:
-        existing = query.filter(email__iexact=email).first()
-        if existing:
-            return existing
-
-    filters = {'nombre__iexact': first_name}
-    if last_name:
-        filters['apellido_paterno__iexact'] = last_name
-
-    possible_matches = query.filter(**filters)
-    if company and company.strip():
-        possible_matches = [p for p in possible_matches if p.metadata.get('last_company','').lower() == company.lower()]
-
-    return possible_matches[0] if possible_matches else None
-
-async def deduplicate_persons(first_name: str, last_name: str, email: Optional[str], company: Optional[str], position: Optional[str]) -> Optional[Person]:
-    query = Person.objects.all()
-    if email:
-        existing = await sync_to_async(query.filter(email__iexact=email).first)()
-        if existing:
-            return existing
-
-    filters = {'nombre__iexact': first_name}
-    if last_name:
-        filters['apellido_paterno__iexact'] = last_name
-
-    possible_matches = await sync_to_async(list)(query.filter(**filters))
-    if company and company.strip():
-        possible_matches = [p for p in possible_matches if p.metadata.get('last_company', '').lower() == company.lower()]
+    """
+    Candidato existente que corresponde a estos datos (correo, teléfono o
+    nombre fonético + empresa), buscado por las claves indexadas de dedup.
+    """
+    return dedup_engine.find_match(first_name, last_name, email=email, phone=phone, company=company)
 
-    return possible_matches[0] if possible_matches else None
+async def adeduplicate_persons(first_name: str, last_name: str, email: Optional[str], company: Optional[str],
+                               position: Optional[str], phone: Optional[str] = None) -> Optional[Person]:
+    return await sync_to_async(dedup_engine.find_match)(first_name, last_name, email=email, phone=phone, company=company)
 
 def normalize_and_save_person(first_name, last_name, email, linkedin_url, business_unit):
     """
@@ -471,7 +451,7 @@ def save_person_record(
     Crea o actualiza un registro en la base de datos.
     """
     with transaction.atomic():
-        existing = deduplicate_persons(first_name, last_name, email, company, position)
+        existing = deduplicate_persons(first_name, last_name, email, company, position, phone)
         if existing:
             # Actualizar datos existentes
             updated = False
@@ -533,52 +513,13 @@ def normalize_candidate_key(person):
         person.phone.strip() if person.phone else ""
     )
 
-def deduplicate_candidates():
+def deduplicate_candidates(dry_run: bool = False) -> List[int]:
     """
-    Agrupa candidatos según nombre, apellido, email y teléfono;
-    conserva el de ID menor y elimina los duplicados.
+    Agrupa candidatos por correo, teléfono y nombre fonético + empresa;
+    fusiona cada grupo en el de ID menor y elimina los duplicados.
+    Devuelve los IDs eliminados.
     """
-    all_candidates = Person.objects.all().order_by('nombre', 'apellido_paterno', 'email', 'phone', 'id')
-    duplicates = []
-    for key, group in itertools.groupby(all_candidates, key=normalize_candidate_key):
-        group_list = list(group)
-        if len(group_list) > 1:
-            to_keep = min(group_list, key=lambda p: p.id)
-            for candidate in group_list:
-                if candidate.id != to_keep.id:
-                    duplicates.append(candidate.id)
-                    candidate.delete()
-    return duplicates
-
-def merge_candidate_data(existing: Person, new_data: Dict) -> Person:
-    """
-    Fusiona los datos del candidato 'new_data' en el registro 'existing'.
-    Para cada campo, si en el registro existente no hay información o está vacía,
-    se actualiza con la información de new_data.
-    """
-    # Por ejemplo, para campos básicos:
-    if not existing.nombre and new_data.get('nombre'):
-        existing.nombre = new_data['nombre']
-    if not existing.apellido_paterno and new_data.get('apellido_paterno'):
-        existing.apellido_paterno = new_data['apellido_paterno']
-    if not existing.email and new_data.get('email'):
-        existing.email = new_data['email']
-    if not existing.phone and new_data.get('phone'):
-        existing.phone = new_data['phone']
-    
-    # Para metadata, se puede fusionar de forma similar:
-    metadata = existing.metadata or {}
-    new_metadata = new_data.get('metadata', {})
-    for key, value in new_metadata.items():
-        if key not in metadata or not metadata[key]:
-            metadata[key] = value
-        # Si ambos tienen datos, podrías definir reglas específicas (por ejemplo, unir listas, etc.)
-        elif isinstance(metadata[key], list) and isinstance(value, list):
-            # Unir sin duplicados
-            metadata[key] = list(set(metadata[key] + value))
-    existing.metadata = metadata
-
-    return existing
+    return dedup_engine.deduplicate(dry_run=dry_run)['removed']
 
 def procesar_cumpleaños(fecha_str):
     """
@@ -629,7 +570,7 @@ async def process_csv(csv_path: str, business_unit: BusinessUnit):
             }
 
             try:
-                candidate = await deduplicate_persons(fn, ln, email, None, None)
+                candidate = await adeduplicate_persons(fn, ln, email, None, None, phone=phone_number)
                 if candidate:
                     candidate = merge_candidate_data(candidate, candidate_data)
                     candidate.number_interaction += 1
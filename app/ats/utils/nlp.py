@@ -17,6 +17,7 @@ from cachetools import TTLCache
 from app.models import Person, Vacante, BusinessUnit
 from app.ats.utils.skills_utils import create_skill_processor
 from app.ats.utils.skills.base.base_models import Skill, Competency
+from app.ats.utils.skills.skill_dictionary import get_skill_dictionary
 
 logger = logging.getLogger(__name__)
 
@@ -458,20 +459,22 @@ class NLPProcessor:
             return []
             
     def _extract_skills(self, doc) -> List[Dict]:
-        """Extrae habilidades del documento."""
+        """Extrae habilidades del documento con el diccionario compilado de la BU."""
         try:
+            dictionary = get_skill_dictionary(self.business_unit)
             skills = []
-            for token in doc:
-                if token.pos_ == "NOUN" and token.text.lower() in [
-                    "python", "java", "sql", "javascript", "react", "angular",
-                    "vue", "node", "django", "flask", "fastapi", "spring",
-                    "hibernate", "docker", "kubernetes", "jenkins", "gitlab"
-                ]:
-                    skills.append({
-                        "name": token.text,
-                        "confidence": 0.8,
-                        "category": "technical"
-                    })
+            seen = set()
+            for match in dictionary.extract(doc.text):
+                if match.skill_id in seen:
+                    continue
+                seen.add(match.skill_id)
+                skills.append({
+                    "id": match.skill_id,
+                    "name": match.text,
+                    "canonical_name": match.name,
+                    "confidence": 0.8,
+                    "category": match.category
+                })
             return skills
             
         except Exception as e:
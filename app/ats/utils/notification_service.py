@@ -72,6 +72,15 @@ class NotificationService:
         }
     }
     
+    # Canales que se envían a un solo destino (ALL se expande a los de la BU)
+    SINGLE_CHANNELS = (
+        NotificationChannel.EMAIL,
+        NotificationChannel.SMS,
+        NotificationChannel.WHATSAPP,
+        NotificationChannel.INTERNAL,
+        NotificationChannel.PUSH,
+    )
+    
     # Configuración por defecto para cualquier BU no especificada
     DEFAULT_CONFIG = {
         'default_channel': NotificationChannel.EMAIL,
@@ -169,8 +178,9 @@ class NotificationService:
         }
         
         try:
-            if channel == NotificationChannel.EMAIL:
-                result = cls._send_email(
+            if channel in cls.SINGLE_CHANNELS:
+                result = cls._send_via_channel(
+                    channel,
                     recipient_info,
                     subject,
                     message,
@@ -178,32 +188,6 @@ class NotificationService:
                     full_context,
                     bu_name
                 )
-            elif channel == NotificationChannel.SMS:
-                result = cls._send_sms(
-                    recipient_info,
-                    message,
-                    full_context
-                )
-            elif channel == NotificationChannel.WHATSAPP:
-                result = cls._send_whatsapp(
-                    recipient_info,
-                    message,
-                    full_context
-                )
-            elif channel == NotificationChannel.INTERNAL:
-                result = cls._send_internal(
-                    recipient_info,
-                    subject,
-                    message,
-                    full_context
-                )
-            elif channel == NotificationChannel.PUSH:
-                result = cls._send_push(
-                    recipient_info,
-                    subject,
-                    message,
-                    full_context
-                )
             elif channel == NotificationChannel.ALL:
                 # Enviar por todos los canales disponibles
                 results = []
@@ -369,6 +353,29 @@ class NotificationService:
     
     # Métodos para canales específicos
     
+    @classmethod
+    def _send_via_channel(cls, channel, recipient, subject, message, template, context, bu_name):
+        """
+        Envía por un único canal sin registrar el intento.
+        
+        Lo usan send_notification y el envío masivo (que registra por lotes).
+        """
+        if channel == NotificationChannel.EMAIL:
+            return cls._send_email(recipient, subject, message, template, context, bu_name)
+        if channel == NotificationChannel.SMS:
+            return cls._send_sms(recipient, message, context)
+        if channel == NotificationChannel.WHATSAPP:
+            return cls._send_whatsapp(recipient, message, context)
+        if channel == NotificationChannel.INTERNAL:
+            return cls._send_internal(recipient, subject, message, context)
+        if channel == NotificationChannel.PUSH:
+            return cls._send_push(recipient, subject, message, context)
+        return {
+            'success': False,
+            'error': f"Canal no soportado: {channel}",
+            'channel': channel
+        }
+    
     @classmethod
     def _send_email(cls, recipient, subject, message, template, context, bu_name):
         """Envía notificación por email."""
@@ -799,6 +806,53 @@ class NotificationService:
             logger.error(f"Error logging notification attempt: {str(e)}")
             return None
     
+    @classmethod
+    def _log_notification_batch(cls, entries, subject, priority, bu_name):
+        """
+        Registra en una sola inserción los envíos ya resueltos de un lote masivo.
+        
+        Args:
+            entries: Lista de dicts con recipient, channel, success, error y metadata
+            
+        Returns:
+            int: Número de registros creados
+        """
+        if not entries:
+            return 0
+            
+        try:
+            from app.models import NotificationLog
+            
+            now = datetime.now()
+            logs = []
+            for entry in entries:
+                recipient = entry['recipient'] if isinstance(entry['recipient'], dict) else {}
+                recipient_id = recipient.get('id')
+                logs.append(NotificationLog(
+                    recipient_id=recipient_id,
+                    recipient_type=recipient.get('model'),
+                    recipient_identifier=(
+                        recipient.get('email') or
+                        recipient.get('phone') or
+                        str(recipient_id)
+                    ),
+                    subject=subject,
+                    channel=entry['channel'],
+                    priority=priority,
+                    bu_name=bu_name,
+                    status='delivered' if entry['success'] else 'failed',
+                    error_message=entry.get('error'),
+                    delivered_at=now if entry['success'] else None,
+                    metadata=json.dumps(entry.get('metadata') or {}, default=str)
+                ))
+            
+            NotificationLog.objects.bulk_create(logs, batch_size=500)
+            return len(logs)
+            
+        except Exception as e:
+            logger.error(f"Error logging notification batch: {str(e)}")
+            return 0
+    
     @classmethod
     def _update_notification_status(cls, notification_id, success, error=None):
         """Actualiza el estado de una notificación en la base de datos."""
@@ -11,8 +11,10 @@ import backoff
 import traceback
 import sys
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Generator, AsyncGenerator
+from typing import Any, List, Dict, Optional, Tuple, Generator, AsyncGenerator
 from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from functools import wraps
 from asgiref.sync import sync_to_async
@@ -28,6 +30,8 @@ import smtplib
 from email.mime.text import MIMEText
 from playwright.async_api import async_playwright
 from app.ats.utils.parser import parse_job_listing, save_job_to_vacante, extract_url
+from app.ats.utils.parser import save_job_to_vacante_advanced as save_to_vacante
+from app.ats.utils.scraping.imap_sync import MailboxConfig, MailboxSync, sync_mailboxes
 from app.ats.utils.logger_utils import get_module_logger, log_async_function_call, ResourceMonitor
 # from app.core.monitoring_system import record_email_metric  # Removed - using existing monitoring
 
@@ -54,6 +58,11 @@ EMAIL_SCRAPER_CONFIG = {
     'error_recovery': True,     # Recuperación automática de errores
     'success_threshold': 96.0,  # Umbral objetivo de éxito
     'warning_threshold': 92.0,  # Umbral de advertencia
+    # Sincronización incremental por UID (ver imap_sync.py)
+    'header_batch': 500,        # UID por cada FETCH de encabezados
+    'body_batch': 25,           # Cuerpos completos por FETCH
+    'initial_backfill': 200,    # Mensajes recientes en la primera sincronización
+    'sync_concurrency': 4,      # Carpetas/cuentas sincronizadas a la vez
 }
 
 # Patrones de validación mejorados
@@ -376,108 +385,133 @@ async def connect_to_imap_advanced() -> Optional[aioimaplib.IMAP4_SSL]:
         logger.error(f"❌ Error conectando a IMAP: {e}")
         raise
 
+def configured_mailboxes() -> List[MailboxConfig]:
+    """
+    Carpetas a sincronizar: ``settings.EMAIL_SCRAPER_MAILBOXES`` (lista de
+    dicts con host, account, password y folders) o la cuenta del entorno con
+    las carpetas de ``EMAIL_SCRAPER_FOLDERS``.
+    """
+    accounts = getattr(settings, 'EMAIL_SCRAPER_MAILBOXES', None) or [{
+        'host': IMAP_SERVER,
+        'account': EMAIL_ACCOUNT,
+        'password': EMAIL_PASSWORD,
+        'folders': [folder.strip() for folder in EMAIL_SCRAPER_FOLDERS.split(',') if folder.strip()],
+    }]
+    return [
+        MailboxConfig(account['host'], account['account'], account['password'], folder)
+        for account in accounts
+        for folder in account.get('folders') or [FOLDER_CONFIG["inbox"]]
+    ]
+
+
+def _sync_options(max_messages: Optional[int]) -> Dict[str, Any]:
+    return {
+        'excluded_patterns': EMAIL_VALIDATION_PATTERNS['excluded_patterns'],
+        'max_messages': max_messages,
+        'header_batch': EMAIL_SCRAPER_CONFIG['header_batch'],
+        'body_batch': EMAIL_SCRAPER_CONFIG['body_batch'],
+        'initial_backfill': EMAIL_SCRAPER_CONFIG['initial_backfill'],
+        'fetch_timeout': EMAIL_SCRAPER_CONFIG['fetch_timeout'],
+    }
+
+
+def _validate_message(validator: EmailContentValidator, email_id: str, email_message) -> bool:
+    """Validación completa del contenido (ya con el cuerpo descargado)."""
+    if not EMAIL_SCRAPER_CONFIG['content_validation']:
+        return True
+    is_valid, score, reason = validator.validate_email_content(email_message)
+    if not is_valid:
+        logger.info(f"⏭️ Email {email_id} omitido: {reason} (score: {score:.2f})")
+        advanced_email_stats.record_skip(f"invalid_content: {reason}")
+        return False
+    logger.debug(f"✅ Email {email_id} validado (score: {score:.2f}): {reason}")
+    return True
+
+
+async def send_email(business_unit_name: str, subject: str, to_email: str, body: str,
+                     from_email: Optional[str] = None) -> bool:
+    """Aviso por correo (SMTP SSL con la cuenta del scraper); ``False`` si no se pudo enviar."""
+    def send():
+        message = MIMEText(body, 'plain', 'utf-8')
+        message['Subject'] = subject
+        message['From'] = from_email or EMAIL_ACCOUNT
+        message['To'] = to_email
+        with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT, timeout=CONNECTION_TIMEOUT) as server:
+            server.login(EMAIL_ACCOUNT, EMAIL_PASSWORD)
+            server.sendmail(message['From'], [to_email], message.as_string())
+
+    try:
+        await sync_to_async(send, thread_sensitive=False)()
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error enviando aviso a {to_email} ({business_unit_name}): {e}")
+        return False
+
+
+def _log_sync_results(results) -> None:
+    for result in results:
+        mailbox = f"{result.mailbox.account}/{result.mailbox.folder}"
+        if result.error:
+            advanced_email_stats.record_connection_failure()
+            advanced_email_stats.record_failure(f"Sync error {mailbox}: {result.error}")
+        for reason, count in result.skipped.items():
+            for _ in range(count):
+                advanced_email_stats.record_skip(f"header_filter: {reason}")
+        logger.info(
+            f"📬 {mailbox}: {result.headers_fetched} encabezados, {result.bodies_fetched} cuerpos, "
+            f"{result.delivered} entregados, UID {result.last_uid}{' (UIDVALIDITY reiniciado)' if result.reset else ''}"
+        )
+
+
 @log_async_function_call(logger)
 async def fetch_emails_advanced(batch_size: int = EMAIL_SCRAPER_CONFIG['batch_size_default']) -> AsyncGenerator[Tuple[str, email.message.Message], None]:
-    """Fetch de emails mejorado con validación y recuperación de errores."""
+    """
+    Emails nuevos de la bandeja de entrada (sincronización incremental por
+    UID), ya validados. La marca de la carpeta avanza conforme el consumidor
+    termina cada mensaje.
+    """
     start_time = time.time()
     emails_processed = 0
-    client = None
+    validator = EmailContentValidator()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    finished = object()
+    
+    async def handler(sync, uid, email_message):
+        email_id = str(uid)
+        if _validate_message(validator, email_id, email_message):
+            done = asyncio.Event()
+            await queue.put((email_id, email_message, done))
+            await done.wait()
     
+    async def run_sync():
+        try:
+            mailbox = configured_mailboxes()[0]
+            advanced_email_stats.record_connection_attempt()
+            result = await MailboxSync(mailbox, **_sync_options(batch_size)).run(handler)
+            _log_sync_results([result])
+        finally:
+            await queue.put(finished)
+    
+    task = asyncio.ensure_future(run_sync())
     try:
-        # Conectar con método avanzado
-        client = await connect_to_imap_advanced()
-        
-        # Seleccionar carpeta
-        status, data = await client.select(FOLDER_CONFIG["inbox"])
-        if status != 'OK':
-            raise Exception(f"Error selecting inbox: {data}")
-        
-        # Buscar emails
-        status, messages = await client.search('ALL')
-        if status != 'OK':
-            raise Exception(f"Error searching messages: {messages}")
-        
-        email_ids = messages[0].split()
-        emails_found = len(email_ids)
-        
-        logger.info(f"📧 Encontrados {emails_found} emails para procesar")
-        
-        # Inicializar validador
-        validator = EmailContentValidator()
-        
-        # Procesar emails con validación
-        for i in range(0, min(emails_found, batch_size)):
-            if i > 0 and i % 10 == 0:
-                logger.info(f"📊 Progreso: {i}/{min(emails_found, batch_size)} emails procesados")
-            
-            email_id = email_ids[i]
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            email_id, email_message, done = item
             try:
-                # Fetch con timeout extendido
-                fetch_task = client.fetch(email_id, "(BODY.PEEK[])")
-                status, data = await asyncio.wait_for(fetch_task, timeout=EMAIL_SCRAPER_CONFIG['fetch_timeout'])
-                
-                if status != 'OK' or not data:
-                    logger.warning(f"⚠️ Falló fetch del email ID {email_id}")
-                    advanced_email_stats.record_failure(f"Fetch failed for ID {email_id}", email_id)
-                    continue
-                
-                # Parsear email
-                raw_email = data[0][1]
-                if not raw_email:
-                    logger.warning(f"⚠️ Contenido vacío para email ID {email_id}")
-                    advanced_email_stats.record_failure(f"Empty content for ID {email_id}", email_id)
-                    continue
-                
-                # Crear objeto email
-                try:
-                    email_message = email.message_from_bytes(raw_email)
-                except Exception as parsing_error:
-                    logger.error(f"❌ Error parseando email ID {email_id}: {str(parsing_error)}")
-                    advanced_email_stats.record_failure(f"Parse error: {str(parsing_error)}", email_id)
-                    continue
-                
-                # Validar contenido
-                if EMAIL_SCRAPER_CONFIG['content_validation']:
-                    is_valid, score, reason = validator.validate_email_content(email_message)
-                    
-                    if not is_valid:
-                        logger.info(f"⏭️ Email {email_id} omitido: {reason} (score: {score:.2f})")
-                        advanced_email_stats.record_skip(f"invalid_content: {reason}")
-                        continue
-                    
-                    logger.debug(f"✅ Email {email_id} validado (score: {score:.2f}): {reason}")
-                
                 emails_processed += 1
                 yield email_id, email_message
-                
-            except asyncio.TimeoutError:
-                logger.error(f"⏰ Timeout fetch email ID {email_id}")
-                advanced_email_stats.record_failure(f"Timeout fetching ID {email_id}", email_id)
-                continue
-                
-            except Exception as e:
-                logger.error(f"❌ Error procesando email ID {email_id}: {str(e)}")
-                advanced_email_stats.record_failure(f"Error: {str(e)}", email_id)
-                continue
+            finally:
+                done.set()
+        await task
         
-        # Registrar métricas
         elapsed = time.time() - start_time
-        logger.info(f"✅ Fetch completado: {emails_processed}/{min(emails_found, batch_size)} emails en {elapsed:.2f}s")
-        
-    except Exception as e:
-        logger.error(f"❌ Error en fetch_emails_advanced: {str(e)}", exc_info=True)
-        raise
+        logger.info(f"✅ Fetch completado: {emails_processed} emails en {elapsed:.2f}s")
         
     finally:
-        # Cerrar conexión
-        if client:
-            try:
-                await client.close()
-                await client.logout()
-                logger.debug("🔒 Conexión IMAP cerrada correctamente")
-            except Exception as e:
-                logger.warning(f"⚠️ Error cerrando conexión IMAP: {str(e)}")
-                
+        if not task.done():
+            task.cancel()
         # Registrar uso de memoria
         ResourceMonitor.log_memory_usage(logger, "after_fetch_emails_advanced")
 
@@ -495,7 +529,7 @@ async def extract_job_info_advanced(email_message) -> Optional[Dict[str, Any]]:
         
         # Cache key mejorado
         cache_key = f"email_advanced_{hash(subject)}_{hash(from_addr)}"
-        cached_result = await sync_to_async(lambda: cache.get)(cache_key)
+        cached_result = await sync_to_async(cache.get)(cache_key)
         if cached_result:
             logger.info(f"💾 Usando cache para: {subject[:30]}...")
             return cached_result
@@ -523,7 +557,7 @@ async def extract_job_info_advanced(email_message) -> Optional[Dict[str, Any]]:
             
             if is_valid:
                 # Guardar en cache
-                await sync_to_async(lambda: cache.set)(cache_key, job_info, timeout=3600*24)
+                await sync_to_async(cache.set)(cache_key, job_info, timeout=3600*24)
                 
                 parse_time = time.time() - parse_start_time
                 logger.info(f"✅ Oportunidad detectada en {parse_time:.2f}s: {subject} (score: {score:.2f})")
@@ -719,61 +753,74 @@ async def _validate_job_info(job_info: Dict[str, Any]) -> Tuple[bool, float, str
 @log_async_function_call(logger)
 async def process_emails_advanced(batch_size=EMAIL_SCRAPER_CONFIG['batch_size_default'], 
                                 business_unit_name="huntred", 
-                                notify_admin=True):
-    """Procesamiento avanzado de emails con validación estricta."""
+                                notify_admin=True, store=None, connect=None):
+    """
+    Procesamiento avanzado de emails con validación estricta.
+
+    ``store`` y ``connect`` se pasan a ``MailboxSync`` (marca de UID y
+    conexión IMAP); por defecto la base de datos y ``connect_imap``.
+    """
     logger.info(f"🚀 Iniciando procesamiento avanzado de emails (batch_size={batch_size})")
     
     try:
         # Obtener business unit
         bu = await sync_to_async(BusinessUnit.objects.get)(name=business_unit_name)
         
-        # Semáforo para limitar concurrencia
-        semaphore = asyncio.Semaphore(3)
-        client = None
+        validator = EmailContentValidator()
         
-        async def process_single_email_advanced(email_id, email_message):
-            async with semaphore:
-                nonlocal client
-                try:
-                    # Extraer información con método avanzado
-                    job_info = await extract_job_info_advanced(email_message)
+        async def process_single_email_advanced(sync, uid, email_message):
+            email_id = f"{sync.mailbox.folder}:{uid}"
+            if not _validate_message(validator, email_id, email_message):
+                return
+            try:
+                # Extraer información con método avanzado
+                job_info = await extract_job_info_advanced(email_message)
+                
+                if job_info:
+                    # Guardar en base de datos
+                    vacante = await save_to_vacante(job_info, bu)
                     
-                    if job_info:
-                        # Guardar en base de datos
-                        vacante = await save_to_vacante(job_info, bu)
+                    if vacante:
+                        # Mover a carpeta de parseados
+                        await sync.move(uid, FOLDER_CONFIG["parsed_folder"])
                         
-                        if vacante:
-                            # Mover a carpeta de parseados
-                            if client:
-                                await move_email(client, email_id, "parsed_folder")
-                            
-                            logger.info(f"✅ Email {email_id} procesado exitosamente como vacante {vacante.id}")
-                            
-                            # Notificar al manager
-                            if vacante.responsible_email and notify_admin:
-                                await send_email(
-                                    business_unit_name=bu.name,
-                                    subject=f"Nueva vacante detectada: {vacante.titulo}",
-                                    to_email=vacante.responsible_email,
-                                    body=f"Se ha detectado una nueva vacante: {vacante.titulo}\n\n"
-                                         f"Empresa: {vacante.empresa}\n"
-                                         f"Ubicación: {vacante.ubicacion}\n"
-                                         f"Ver detalles: {settings.DOMAIN}/admin/app/vacante/{vacante.id}/change/",
-                                    from_email="noreply@huntred.com"
-                                )
-                        else:
-                            logger.warning(f"⚠️ No se pudo guardar vacante para email {email_id}")
-                            advanced_email_stats.record_failure("Failed to save vacancy", email_id)
-                    else:
-                        logger.debug(f"ℹ️ No se detectó oportunidad en email {email_id}")
+                        logger.info(f"✅ Email {email_id} procesado exitosamente como vacante {vacante.id}")
                         
-                except Exception as e:
-                    logger.error(f"❌ Error procesando email {email_id}: {str(e)}")
-                    advanced_email_stats.record_failure(f"Processing error: {str(e)}", email_id)
-        
-        # Procesar emails
-        async for email_id, email_message in fetch_emails_advanced(batch_size):
-            await process_single_email_advanced(email_id, email_message)
+                        # Notificar al manager
+                        if vacante.responsible_email and notify_admin:
+                            await send_email(
+                                business_unit_name=bu.name,
+                                subject=f"Nueva vacante detectada: {vacante.titulo}",
+                                to_email=vacante.responsible_email,
+                                body=f"Se ha detectado una nueva vacante: {vacante.titulo}\n\n"
+                                     f"Empresa: {vacante.empresa}\n"
+                                     f"Ubicación: {vacante.ubicacion}\n"
+                                     f"Ver detalles: {settings.DOMAIN}/admin/app/vacante/{vacante.id}/change/",
+                                from_email="noreply@huntred.com"
+                            )
+                    else:
+                        logger.warning(f"⚠️ No se pudo guardar vacante para email {email_id}")
+                        advanced_email_stats.record_failure("Failed to save vacancy", email_id)
+                else:
+                    logger.debug(f"ℹ️ No se detectó oportunidad en email {email_id}")
+                    
+            except Exception as e:
+                logger.error(f"❌ Error procesando email {email_id}: {str(e)}")
+                advanced_email_stats.record_failure(f"Processing error: {str(e)}", email_id)
+        
+        # Sincronizar sólo el correo nuevo de cada carpeta, varias a la vez
+        mailboxes = configured_mailboxes()
+        for _ in mailboxes:
+            advanced_email_stats.record_connection_attempt()
+        results = await sync_mailboxes(
+            mailboxes,
+            process_single_email_advanced,
+            concurrency=EMAIL_SCRAPER_CONFIG['sync_concurrency'],
+            store=store,
+            connect=connect,
+            **_sync_options(batch_size)
+        )
+        _log_sync_results(results)
         
         # Finalizar estadísticas
         advanced_email_stats.finish_execution()
@@ -802,17 +849,17 @@ async def process_emails_advanced(batch_size=EMAIL_SCRAPER_CONFIG['batch_size_de
 # ============================================================================
 
 # Mantener funciones existentes para compatibilidad
-async def fetch_emails(batch_size=BATCH_SIZE_DEFAULT):
+async def fetch_emails(batch_size=None):
     """Función de compatibilidad."""
-    return fetch_emails_advanced(batch_size)
+    return fetch_emails_advanced(batch_size or BATCH_SIZE_DEFAULT)
 
 async def extract_job_info(email_message):
     """Función de compatibilidad."""
     return await extract_job_info_advanced(email_message)
 
-async def process_emails(batch_size=BATCH_SIZE_DEFAULT, business_unit_name="huntred", notify_admin=True):
+async def process_emails(batch_size=None, business_unit_name="huntred", notify_admin=True):
     """Función de compatibilidad."""
-    return await process_emails_advanced(batch_size, business_unit_name, notify_admin)
+    return await process_emails_advanced(batch_size or BATCH_SIZE_DEFAULT, business_unit_name, notify_admin)
 
 # Mantener variables y configuraciones existentes
 IMAP_SERVER = env("IMAP_SERVER", default="mail.huntred.com")
@@ -825,6 +872,7 @@ BATCH_SIZE_DEFAULT = env.int("BATCH_SIZE_DEFAULT", default=10)
 MAX_RETRIES = env.int("MAX_RETRIES", default=3)
 RETRY_DELAY = env.int("RETRY_DELAY", default=5)
 MAX_ATTEMPTS = env.int("MAX_ATTEMPTS", default=10)
+EMAIL_SCRAPER_FOLDERS = env("EMAIL_SCRAPER_FOLDERS", default="INBOX")
 
 FOLDER_CONFIG = {
     "inbox": "INBOX",
@@ -0,0 +1,333 @@
+"""
+Sincronización incremental de buzones IMAP para el scraper de correos.
+
+Cada carpeta guarda en ``EmailMailboxState`` su UIDVALIDITY y el último UID
+procesado. En cada ejecución:
+
+1. ``SELECT`` de la carpeta: si el UIDVALIDITY cambió, los UID anteriores ya
+   no sirven y la marca se reinicia. En la primera sincronización se parte de
+   los últimos ``initial_backfill`` mensajes.
+2. ``UID FETCH <desde>:<hasta>`` de sólo encabezados (remitente, asunto,
+   fecha, tamaño) por rangos de UID, filtrados con ``header_filter``.
+3. ``UID FETCH`` de los cuerpos completos, en lotes, sólo de los mensajes
+   que pasaron el filtro.
+4. La marca avanza hasta el último mensaje procesado.
+
+Así el tráfico IMAP de cada ejecución depende del correo nuevo y no del
+tamaño del buzón. ``sync_mailboxes`` procesa varias carpetas o cuentas a la
+vez, cada una con su propia conexión.
+"""
+
+import asyncio
+import email
+import logging
+import re
+from dataclasses import dataclass, field
+from email.message import Message
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HEADER_FIELDS = ('FROM', 'SUBJECT', 'DATE', 'MESSAGE-ID')
+HEADER_BATCH = 500
+BODY_BATCH = 25
+INITIAL_BACKFILL = 200
+
+_FETCH_LITERAL = re.compile(rb'^\d+ FETCH \(.*\{(\d+)\}$')
+_UID = re.compile(rb'UID (\d+)')
+_SIZE = re.compile(rb'RFC822\.SIZE (\d+)')
+_UIDVALIDITY = re.compile(rb'UIDVALIDITY (\d+)')
+_UIDNEXT = re.compile(rb'UIDNEXT (\d+)')
+
+
+@dataclass
+class MailboxConfig:
+    host: str
+    account: str
+    password: str
+    folder: str = 'INBOX'
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return self.host, self.account, self.folder
+
+
+@dataclass
+class MailboxState:
+    uidvalidity: Optional[int] = None
+    last_uid: int = 0
+    messages_seen: int = 0
+
+
+@dataclass
+class HeaderInfo:
+    uid: int
+    headers: Message
+    size: int = 0
+
+
+@dataclass
+class SyncResult:
+    mailbox: MailboxConfig
+    headers_fetched: int = 0
+    bodies_fetched: int = 0
+    delivered: int = 0
+    skipped: Dict[str, int] = field(default_factory=dict)
+    last_uid: int = 0
+    reset: bool = False
+    error: Optional[str] = None
+
+
+# Parsing de respuestas IMAP -------------------------------------------------------
+
+def parse_select(lines: Iterable[Any]) -> Tuple[Optional[int], Optional[int]]:
+    """(UIDVALIDITY, UIDNEXT) de la respuesta a ``SELECT``."""
+    uidvalidity = uidnext = None
+    for line in lines:
+        if not isinstance(line, (bytes, bytearray)):
+            line = str(line).encode()
+        match = _UIDVALIDITY.search(line)
+        if match:
+            uidvalidity = int(match.group(1))
+        match = _UIDNEXT.search(line)
+        if match:
+            uidnext = int(match.group(1))
+    return uidvalidity, uidnext
+
+
+def parse_fetch(lines: List[Any]) -> List[Tuple[int, int, bytes]]:
+    """
+    ``[(uid, tamaño, literal)]`` de una respuesta a ``UID FETCH``. El UID (y
+    RFC822.SIZE) puede venir antes o después del literal.
+    """
+    items = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        match = _FETCH_LITERAL.match(bytes(line)) if isinstance(line, (bytes, bytearray)) else None
+        if not match or index + 1 >= len(lines):
+            index += 1
+            continue
+        literal = bytes(lines[index + 1])
+        trailer = bytes(lines[index + 2]) if index + 2 < len(lines) and isinstance(lines[index + 2], (bytes, bytearray)) else b''
+        uid = _UID.search(bytes(line)) or _UID.search(trailer)
+        size = _SIZE.search(bytes(line)) or _SIZE.search(trailer)
+        if uid:
+            items.append((int(uid.group(1)), int(size.group(1)) if size else len(literal), literal))
+        index += 2
+    return items
+
+
+def uid_ranges(first: int, last: int, size: int) -> List[Tuple[int, int]]:
+    """Rangos ``(desde, hasta)`` de a lo más ``size`` UID."""
+    return [(start, min(start + size - 1, last)) for start in range(first, last + 1, size)]
+
+
+def header_filter(headers: Message, excluded_patterns: Iterable[str] = ()) -> Tuple[bool, str]:
+    """
+    Filtro previo con sólo los encabezados. Únicamente descarta lo que
+    ``EmailContentValidator`` también descartaría: sin asunto, sin remitente o
+    patrón excluido en el asunto. La marca avanza sobre lo descartado, así que
+    aquí no se agregan reglas propias (tamaño, rebotes, respuestas automáticas).
+    """
+    subject = str(headers.get('Subject', '') or '')
+    sender = str(headers.get('From', '') or '')
+    if not subject:
+        return False, 'sin_asunto'
+    if not sender:
+        return False, 'sin_remitente'
+    for pattern in excluded_patterns:
+        if re.search(pattern, subject, re.IGNORECASE):
+            return False, 'patron_excluido'
+    return True, ''
+
+
+# Estado persistido ----------------------------------------------------------------
+
+class DatabaseStateStore:
+    """Marcas de sincronización en ``EmailMailboxState``."""
+
+    def load(self, mailbox: MailboxConfig) -> MailboxState:
+        from app.models import EmailMailboxState
+
+        row = EmailMailboxState.objects.filter(
+            host=mailbox.host, account=mailbox.account, folder=mailbox.folder
+        ).values('uidvalidity', 'last_uid', 'messages_seen').first()
+        return MailboxState(**row) if row else MailboxState()
+
+    def save(self, mailbox: MailboxConfig, state: MailboxState):
+        from app.models import EmailMailboxState
+
+        EmailMailboxState.objects.update_or_create(
+            host=mailbox.host, account=mailbox.account, folder=mailbox.folder,
+            defaults={
+                'uidvalidity': state.uidvalidity,
+                'last_uid': state.last_uid,
+                'messages_seen': state.messages_seen,
+                'last_synced_at': timezone.now(),
+            }
+        )
+
+
+async def connect_imap(mailbox: MailboxConfig, timeout: int = 90):
+    """Conexión ``aioimaplib`` autenticada."""
+    import aioimaplib
+
+    client = aioimaplib.IMAP4_SSL(host=mailbox.host, timeout=timeout)
+    await asyncio.wait_for(client.wait_hello_from_server(), timeout=30)
+    status, data = await client.login(mailbox.account, mailbox.password)
+    if status != 'OK':
+        raise ConnectionError(f"Login IMAP fallido para {mailbox.account}: {data}")
+    return client
+
+
+# Sincronización -------------------------------------------------------------------
+
+Handler = Callable[['MailboxSync', int, Message], Awaitable[Any]]
+
+
+class MailboxSync:
+    """
+    Sincroniza una carpeta. ``handler(sync, uid, mensaje)`` recibe cada mensaje
+    que pasó el filtro de encabezados; puede mover el mensaje con ``move``.
+
+    Args:
+        mailbox: Servidor, cuenta y carpeta.
+        store: Donde se guarda la marca (por defecto la base de datos).
+        connect: ``async (mailbox) -> cliente`` (por defecto ``connect_imap``).
+        excluded_patterns: Expresiones que descartan un asunto.
+        max_messages: Mensajes a entregar por ejecución; el resto queda para
+            la siguiente (la marca sólo avanza hasta el último entregado).
+    """
+
+    def __init__(self, mailbox: MailboxConfig, store: Any = None,
+                 connect: Optional[Callable[[MailboxConfig], Awaitable[Any]]] = None,
+                 excluded_patterns: Iterable[str] = (), max_messages: Optional[int] = None,
+                 header_batch: int = HEADER_BATCH, body_batch: int = BODY_BATCH,
+                 initial_backfill: int = INITIAL_BACKFILL, fetch_timeout: int = 60):
+        self.mailbox = mailbox
+        self.store = store or DatabaseStateStore()
+        self.connect = connect or connect_imap
+        self.excluded_patterns = list(excluded_patterns)
+        self.max_messages = max_messages
+        self.header_batch = header_batch
+        self.body_batch = body_batch
+        self.initial_backfill = initial_backfill
+        self.fetch_timeout = fetch_timeout
+        self.client = None
+
+    async def _uid(self, command: str, *args) -> List[Any]:
+        status, lines = await asyncio.wait_for(self.client.uid(command, *args), timeout=self.fetch_timeout)
+        if status != 'OK':
+            raise RuntimeError(f"UID {command.upper()} falló en {self.mailbox.folder}: {lines}")
+        return lines
+
+    async def fetch_headers(self, first: int, last: int) -> List[HeaderInfo]:
+        fields = ' '.join(HEADER_FIELDS)
+        lines = await self._uid('fetch', f"{first}:{last}", f"(UID RFC822.SIZE BODY.PEEK[HEADER.FIELDS ({fields})])")
+        return [
+            HeaderInfo(uid, email.message_from_bytes(literal), size)
+            for uid, size, literal in parse_fetch(lines)
+            if first <= uid <= last      # "N:M" devuelve el último mensaje aunque N > UID máximo
+        ]
+
+    async def fetch_bodies(self, uids: List[int]) -> Dict[int, Message]:
+        lines = await self._uid('fetch', ','.join(str(uid) for uid in uids), '(UID BODY.PEEK[])')
+        return {uid: email.message_from_bytes(literal) for uid, _, literal in parse_fetch(lines)}
+
+    async def move(self, uid: int, folder: str):
+        """Mueve el mensaje (``UID MOVE`` o ``COPY`` + ``\\Deleted``)."""
+        if self.client.has_capability('MOVE'):
+            await self._uid('move', str(uid), folder)
+            return
+        await self._uid('copy', str(uid), folder)
+        await self._uid('store', str(uid), '+FLAGS.SILENT', '(\\Deleted)')
+        await self.client.expunge()
+
+    async def run(self, handler: Handler) -> SyncResult:
+        result = SyncResult(self.mailbox)
+        state = await sync_to_async(self.store.load)(self.mailbox)
+        try:
+            self.client = await self.connect(self.mailbox)
+            status, lines = await self.client.select(self.mailbox.folder)
+            if status != 'OK':
+                raise RuntimeError(f"No se pudo seleccionar {self.mailbox.folder}: {lines}")
+            uidvalidity, uidnext = parse_select(lines)
+
+            if state.uidvalidity is not None and uidvalidity != state.uidvalidity:
+                logger.warning(f"UIDVALIDITY cambió en {self.mailbox.account}/{self.mailbox.folder}; se reinicia la marca")
+                state.last_uid, result.reset = 0, True
+            if state.uidvalidity is None or result.reset:
+                # Primera sincronización: sólo los mensajes más recientes
+                state.last_uid = max(0, (uidnext or 1) - 1 - self.initial_backfill)
+            state.uidvalidity = uidvalidity
+
+            last = (uidnext or 0) - 1
+            if last > state.last_uid:
+                await self._sync_range(state, state.last_uid + 1, last, handler, result)
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"Error sincronizando {self.mailbox.account}/{self.mailbox.folder}: {e}")
+        finally:
+            result.last_uid = state.last_uid
+            if state.uidvalidity is not None:
+                await sync_to_async(self.store.save)(self.mailbox, state)
+            await self._close()
+        return result
+
+    async def _sync_range(self, state: MailboxState, first: int, last: int, handler: Handler, result: SyncResult):
+        for start, end in uid_ranges(first, last, self.header_batch):
+            headers = await self.fetch_headers(start, end)
+            result.headers_fetched += len(headers)
+            wanted = []
+            skipped: Dict[str, List[int]] = {}
+            for info in headers:
+                ok, reason = header_filter(info.headers, self.excluded_patterns)
+                if ok:
+                    wanted.append(info.uid)
+                else:
+                    skipped.setdefault(reason, []).append(info.uid)
+                    result.skipped[reason] = result.skipped.get(reason, 0) + 1
+            for reason, uids in skipped.items():
+                logger.info(f"{self.mailbox.account}/{self.mailbox.folder}: UID omitidos ({reason}): {uids}")
+
+            for batch_start in range(0, len(wanted), self.body_batch):
+                batch = wanted[batch_start:batch_start + self.body_batch]
+                bodies = await self.fetch_bodies(batch)
+                result.bodies_fetched += len(bodies)
+                for uid in batch:
+                    if self.max_messages is not None and result.delivered >= self.max_messages:
+                        return
+                    if uid in bodies:
+                        await handler(self, uid, bodies[uid])
+                        result.delivered += 1
+                        state.messages_seen += 1
+                    state.last_uid = uid
+            # Todo el rango quedó revisado (lo filtrado incluido)
+            state.last_uid = max(state.last_uid, end)
+
+    async def _close(self):
+        if self.client is None:
+            return
+        try:
+            await self.client.close()
+            await self.client.logout()
+        except Exception as e:
+            logger.warning(f"Error cerrando conexión IMAP de {self.mailbox.folder}: {e}")
+        finally:
+            self.client = None
+
+
+async def sync_mailboxes(mailboxes: Iterable[MailboxConfig], handler: Handler, concurrency: int = 4,
+                         **options) -> List[SyncResult]:
+    """Sincroniza varias carpetas o cuentas a la vez (una conexión por carpeta)."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(mailbox: MailboxConfig) -> SyncResult:
+        async with semaphore:
+            return await MailboxSync(mailbox, **options).run(handler)
+
+    return list(await asyncio.gather(*(run(mailbox) for mailbox in mailboxes)))
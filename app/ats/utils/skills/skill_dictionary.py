@@ -0,0 +1,629 @@
+# app/ats/utils/skills/skill_dictionary.py
+"""
+Diccionario compilado de habilidades para Grupo huntRED®.
+
+Reúne en un solo autómata Aho-Corasick los catálogos (skills.json, ESCO y
+skill_db_relax), la ontología base y la específica por BU, y los sinónimos.
+Cada forma de superficie apunta a un ID canónico de habilidad, de modo que la
+extracción es una sola pasada lineal sobre el texto normalizado (minúsculas,
+sin acentos) con validación de límites de palabra y selección del match más
+largo.
+
+El diccionario compilado se guarda en disco con pickle, con el fingerprint de
+las fuentes en el nombre del archivo, y se comparte entre procesos: el primer
+worker lo construye y el resto sólo lo carga.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DICTIONARY_VERSION = 1
+DEFAULT_COMPILED_DIR = "/home/pablo/skills_data/compiled"
+ONTOLOGY_PATH = "skills_ontology.json"
+MIN_TERM_LENGTH = 2
+MAX_SKILLS = int(os.getenv('MAX_SKILLS', 10000))
+# Segundos entre revisiones del fingerprint de las fuentes (stat de los archivos)
+FINGERPRINT_CHECK_INTERVAL = 60
+
+# Catálogos de habilidades por modo y profundidad
+FILE_PATHS = {
+    "candidate_quick": "/home/pablo/skills_data/skill_db_relax_20.json",
+    "candidate_deep": "/home/pablo/skills_data/ESCO_occup_skills.json",
+    "opportunity_quick": "/home/pablo/app/utilidades/catalogs/skills.json",
+    "opportunity_deep": "/home/pablo/skills_data/ESCO_occup_skills.json",
+}
+
+CATEGORIES = ("technical", "soft", "tools", "certifications")
+
+# Términos que antes se buscaban con patrones re.findall y listas fijas de tokens
+BASE_TECHNICAL_TERMS = [
+    "python", "java", "sql", "javascript", "typescript", "c++", "c#", "ruby", "php", "go", "rust", "swift",
+    "machine learning", "deep learning", "ai", "artificial intelligence",
+    "cloud", "aws", "azure", "gcp", "docker", "kubernetes",
+    "devops", "ci/cd", "testing", "qa",
+    "react", "angular", "vue", "node", "django", "flask", "fastapi", "spring", "hibernate",
+    "jenkins", "gitlab",
+]
+
+DEFAULT_SKILL_ONTOLOGY = {
+    "technical": {
+        "programming": ["python", "java", "javascript", "c++", "c#"],
+        "frameworks": ["django", "react", "angular", "vue.js"],
+        "databases": ["sql", "nosql", "mongodb", "postgresql"],
+        "cloud": ["aws", "azure", "gcp"],
+        "devops": ["docker", "kubernetes", "terraform"]
+    },
+    "soft": {
+        "communication": ["communication", "teamwork", "leadership"],
+        "problem_solving": ["problem solving", "analytical thinking"],
+        "management": ["project management", "time management"]
+    }
+}
+
+BU_SKILL_ONTOLOGY = {
+    'amigro': {
+        'technical': {
+            'migration': ['migración', 'relocalización', 'adaptación cultural'],
+            'languages': ['español', 'inglés', 'portugués', 'francés']
+        },
+        'soft': {
+            'adaptability': ['adaptabilidad', 'resiliencia', 'flexibilidad'],
+            'cultural_awareness': ['conciencia cultural', 'sensibilidad cultural']
+        }
+    },
+    'huntu': {
+        'technical': {
+            'academic': ['investigación', 'publicaciones', 'tesis', 'tesina'],
+            'projects': ['proyectos', 'investigación', 'publicaciones']
+        },
+        'soft': {
+            'academic': ['aprendizaje continuo', 'curiosidad académica']
+        }
+    },
+    'huntred': {
+        'technical': {
+            'management': ['gestión', 'liderazgo', 'estrategia'],
+            'digital': ['digitalización', 'transformación digital']
+        },
+        'soft': {
+            'leadership': ['liderazgo', 'gestión de equipos', 'visión estratégica']
+        }
+    },
+    'huntred_executive': {
+        'technical': {
+            'executive': ['c-suite', 'estrategia corporativa', 'governance'],
+            'board': ['gobierno corporativo', 'dirección']
+        },
+        'soft': {
+            'executive': ['visión estratégica', 'governance', 'leadership']
+        }
+    },
+    'sexsi': {
+        'technical': {
+            'intimacy': ['intimidad', 'relaciones', 'comunicación íntima'],
+            'health': ['salud sexual', 'educación sexual']
+        },
+        'soft': {
+            'emotional': ['inteligencia emocional', 'empatía', 'comunicación']
+        }
+    },
+    'milkyleak': {
+        'technical': {
+            'social_media': ['redes sociales', 'influencer', 'content creator'],
+            'digital': ['digital marketing', 'content creation']
+        },
+        'soft': {
+            'creativity': ['creatividad', 'innovación', 'originalidad']
+        }
+    }
+}
+
+SKILL_SYNONYMS = {
+    "technical": {
+        "python": ["pythonista", "python developer"],
+        "java": ["java developer", "java engineer"],
+        "sql": ["sql expert", "sql specialist"]
+    },
+    "soft": {
+        "communication": ["comunicación", "comunicación efectiva"],
+        "leadership": ["liderazgo", "gestión de equipos"]
+    }
+}
+
+# Normalización ------------------------------------------------------------
+
+_WHITESPACE = re.compile(r"\s+")
+_SLUG = re.compile(r"[^a-z0-9+#]+")
+_ACCENT_TABLE = str.maketrans(
+    "áàäâãéèëêíìïîóòöôõúùüûñçÁÀÄÂÃÉÈËÊÍÌÏÎÓÒÖÔÕÚÙÜÛÑÇ\t\n\r\xa0",
+    "aaaaaeeeeiiiiooooouuuuncAAAAAEEEEIIIIOOOOOUUUUNC    "
+)
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas y sin acentos conservando la longitud (los offsets siguen siendo válidos)."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+    return lowered.translate(_ACCENT_TABLE)
+
+
+def normalize_term(term: str) -> str:
+    """Forma de búsqueda de un término: normalizado y con espacios colapsados."""
+    term = unicodedata.normalize('NFC', str(term))
+    return _WHITESPACE.sub(' ', normalize_text(term)).strip()
+
+
+def skill_id_for(name: str) -> str:
+    """ID canónico estable para el nombre de una habilidad."""
+    return _SLUG.sub('_', normalize_term(name)).strip('_')
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+# Catálogos ----------------------------------------------------------------
+
+def load_skills_catalog(mode: str, analysis_depth: str) -> Dict[str, List[Dict[str, str]]]:
+    """Carga un catálogo de habilidades según el modo y nivel de procesamiento."""
+    catalog = {"technical": [], "soft": [], "tools": [], "certifications": []}
+    key = f"{mode}_{analysis_depth}"
+    file_path = FILE_PATHS.get(key)
+
+    if not file_path or not os.path.exists(file_path):
+        logger.error(f"Archivo no encontrado: {file_path}. Usando catálogo vacío.")
+        return catalog
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            if key == "candidate_quick":
+                type_mapping = {
+                    "Hard Skill": "technical",
+                    "Soft Skill": "soft",
+                    "Tool": "tools",
+                    "Certification": "certifications"
+                }
+                for skill_id, skill_data in data.items():
+                    skill_type = skill_data.get("skill_type", "Hard Skill")
+                    category = type_mapping.get(skill_type, "technical")
+                    skill_cleaned = skill_data.get("skill_cleaned", skill_data.get("skill_name", "")).lower()
+                    if skill_cleaned:
+                        catalog[category].append({"original": skill_cleaned})
+            elif key == "candidate_deep":
+                skill_count = 0
+                for _, occ_data in data.items():
+                    for skill_field in ["hasEssentialSkill", "hasOptionalSkill"]:
+                        for skill in occ_data.get(skill_field, []):
+                            skill_name = skill.get("title", "").lower()
+                            if skill_name:
+                                catalog[_esco_category(skill_name)].append({"original": skill_name})
+                                skill_count += 1
+                                if skill_count >= MAX_SKILLS:
+                                    break
+                    if skill_count >= MAX_SKILLS:
+                        break
+            elif key == "opportunity_quick":
+                for role_group, roles in data.items():
+                    for role, categories in roles.items():
+                        for category, skills in categories.items():
+                            target_category = {
+                                "Habilidades Técnicas": "technical",
+                                "Habilidades Blandas": "soft",
+                                "Herramientas": "tools",
+                                "Certificaciones": "certifications"
+                            }.get(category, "technical")
+                            for skill in skills:
+                                catalog[target_category].append({"original": skill.lower(), "role": role})
+            elif key == "opportunity_deep":
+                skill_count = 0
+                for _, occ_data in data.items():
+                    role = occ_data.get("preferredLabel", {}).get("es", "").lower()
+                    for skill_field in ["hasEssentialSkill", "hasOptionalSkill"]:
+                        for skill in occ_data.get(skill_field, []):
+                            skill_name = skill.get("title", "").lower()
+                            if skill_name:
+                                catalog[_esco_category(skill_name)].append({"original": skill_name, "role": role})
+                                skill_count += 1
+                                if skill_count >= MAX_SKILLS:
+                                    break
+                    if skill_count >= MAX_SKILLS:
+                        break
+            total_skills = sum(len(v) for v in catalog.values())
+            logger.info(f"Cargadas {total_skills} habilidades desde {file_path} ({key})")
+    except json.JSONDecodeError as e:
+        logger.error(f"Error parseando JSON en {file_path}: {str(e)}. Usando catálogo vacío.")
+    except Exception as e:
+        logger.error(f"Error cargando {file_path}: {str(e)}. Usando catálogo vacío.")
+    return catalog
+
+
+def _esco_category(skill_name: str) -> str:
+    if "certificación" in skill_name or "certificado" in skill_name:
+        return "certifications"
+    if "herramienta" in skill_name or "tool" in skill_name:
+        return "tools"
+    if "blanda" in skill_name or "soft" in skill_name:
+        return "soft"
+    return "technical"
+
+
+def load_ontology(bu_name: Optional[str] = None, ontology_path: str = ONTOLOGY_PATH) -> Dict[str, Dict[str, List[str]]]:
+    """Ontología base (archivo o valores por defecto) combinada con la de la BU."""
+    try:
+        with open(ontology_path, "r", encoding="utf-8") as f:
+            ontology = json.load(f)
+    except FileNotFoundError:
+        ontology = json.loads(json.dumps(DEFAULT_SKILL_ONTOLOGY))
+    except Exception as e:
+        logger.error(f"Error cargando ontología {ontology_path}: {e}")
+        ontology = json.loads(json.dumps(DEFAULT_SKILL_ONTOLOGY))
+
+    for category, groups in BU_SKILL_ONTOLOGY.get((bu_name or '').lower(), {}).items():
+        ontology.setdefault(category, {}).update(groups)
+    return ontology
+
+
+# Autómata -----------------------------------------------------------------
+
+class SkillAutomaton:
+    """
+    Autómata Aho-Corasick sobre caracteres.
+
+    Las transiciones se guardan en un solo dict con clave ``estado << 21 | ord(c)``
+    y los enlaces de fallo en un ``array``, para que el pickle sea compacto y
+    rápido de cargar.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        goto: Dict[int, int] = {}
+        children: List[List[Tuple[int, int]]] = [[]]
+        outputs: Dict[int, Tuple[int, ...]] = {}
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                key = state << 21 | ord(ch)
+                nxt = goto.get(key)
+                if nxt is None:
+                    nxt = len(children)
+                    children.append([])
+                    goto[key] = nxt
+                    children[state].append((ord(ch), nxt))
+                state = nxt
+            outputs[state] = outputs.get(state, ()) + (index,)
+
+        fail = array('i', [0]) * len(children)
+        queue = deque(child for _, child in children[0])
+        while queue:
+            state = queue.popleft()
+            for code, child in children[state]:
+                queue.append(child)
+                target = fail[state]
+                while target and (target << 21 | code) not in goto:
+                    target = fail[target]
+                target = goto.get(target << 21 | code, 0)
+                fail[child] = target if target != child else 0
+                if fail[child] in outputs:
+                    outputs[child] = outputs.get(child, ()) + outputs[fail[child]]
+
+        self.goto = goto
+        self.fail = fail
+        self.outputs = outputs
+
+    def __len__(self) -> int:
+        return len(self.fail)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Genera ``(posición final, índice de patrón)`` para cada ocurrencia."""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for position, ch in enumerate(text):
+            code = ord(ch)
+            while True:
+                nxt = goto.get(state << 21 | code)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            found = outputs.get(state)
+            if found:
+                for index in found:
+                    yield position, index
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    """Ocurrencia de una habilidad en el texto original."""
+    skill_id: str
+    name: str
+    category: str
+    start: int
+    end: int
+    text: str
+
+
+class SkillDictionary:
+    """Formas de superficie -> habilidad canónica, con extracción en una pasada."""
+
+    def __init__(self, skills: Dict[str, Dict[str, Any]], surfaces: Dict[str, str], fingerprint: str = ''):
+        self.skills = skills
+        self.surfaces = surfaces
+        self.fingerprint = fingerprint
+        self._terms = list(surfaces)
+        self._term_skills = [surfaces[term] for term in self._terms]
+        self._term_lengths = [len(term) for term in self._terms]
+        self._automaton = SkillAutomaton(self._terms)
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    # Construcción --------------------------------------------------------
+
+    @classmethod
+    def build(cls, bu_name: Optional[str] = None, include_catalogs: bool = True,
+              ontology_path: str = ONTOLOGY_PATH) -> 'SkillDictionary':
+        """Construye el diccionario desde sinónimos, ontologías y catálogos."""
+        builder = _DictionaryBuilder()
+        for category, synonyms in SKILL_SYNONYMS.items():
+            for skill, variants in synonyms.items():
+                builder.add(skill, category, variants)
+        for term in BASE_TECHNICAL_TERMS:
+            builder.add(term, "technical")
+        for category, groups in load_ontology(bu_name, ontology_path).items():
+            for group, terms in (groups or {}).items():
+                for term in terms:
+                    builder.add(term, category, group=group)
+        if include_catalogs:
+            for mode, depth in _catalog_keys():
+                for category, entries in load_skills_catalog(mode, depth).items():
+                    for entry in entries:
+                        builder.add(entry.get("original", ""), category)
+
+        dictionary = cls(builder.skills, builder.surfaces, source_fingerprint(bu_name, ontology_path))
+        logger.info(
+            f"Diccionario de habilidades ({bu_name or 'default'}): {len(dictionary.skills)} habilidades, "
+            f"{len(dictionary.surfaces)} formas, {len(dictionary._automaton)} estados"
+        )
+        return dictionary
+
+    def save(self, path: str):
+        """Escribe el diccionario compilado de forma atómica."""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'SkillDictionary':
+        with open(path, 'rb') as f:
+            dictionary = pickle.load(f)
+        if not isinstance(dictionary, cls):
+            raise TypeError(f"{path} no contiene un SkillDictionary")
+        return dictionary
+
+    # Consulta ------------------------------------------------------------
+
+    def extract(self, text: str) -> List[SkillMatch]:
+        """Habilidades del texto en una sola pasada (match más largo, sin traslapes)."""
+        if not text:
+            return []
+        if not unicodedata.is_normalized('NFC', text):
+            text = unicodedata.normalize('NFC', text)
+        normalized = normalize_text(text)
+        size = len(normalized)
+        candidates = []
+        for last, index in self._automaton.iter_matches(normalized):
+            start = last - self._term_lengths[index] + 1
+            if start > 0 and _is_word(normalized[start]) and _is_word(normalized[start - 1]):
+                continue
+            if last + 1 < size and _is_word(normalized[last]) and _is_word(normalized[last + 1]):
+                continue
+            candidates.append((start, last + 1, index))
+
+        matches = []
+        covered = 0
+        for start, end, index in sorted(candidates, key=lambda c: (c[0], -c[1])):
+            if start < covered:
+                continue
+            skill_id = self._term_skills[index]
+            skill = self.skills[skill_id]
+            matches.append(SkillMatch(skill_id, skill['name'], skill['category'], start, end, text[start:end]))
+            covered = end
+        return matches
+
+    def extract_ids(self, text: str) -> List[str]:
+        """IDs canónicos únicos en orden de aparición."""
+        return list(dict.fromkeys(match.skill_id for match in self.extract(text)))
+
+    def by_category(self, text: str) -> Dict[str, List[str]]:
+        """Nombres canónicos agrupados por categoría."""
+        result = {category: [] for category in CATEGORIES}
+        for skill_id in self.extract_ids(text):
+            skill = self.skills[skill_id]
+            result.setdefault(skill['category'], []).append(skill['name'])
+        return result
+
+    def canonical_id(self, skill: str) -> Optional[str]:
+        """ID canónico si el texto completo es una forma conocida."""
+        return self.surfaces.get(normalize_term(skill)) if skill else None
+
+    def canonicalize(self, skills: Iterable[str]) -> List[str]:
+        """
+        IDs canónicos de una lista de habilidades (p. ej. las de un perfil).
+
+        Las que no son una forma conocida se buscan dentro del texto y, si no
+        hay ninguna, se conservan normalizadas para compararlas literalmente.
+        """
+        result = []
+        for skill in skills:
+            if not skill:
+                continue
+            skill_id = self.canonical_id(skill)
+            if skill_id:
+                result.append(skill_id)
+                continue
+            found = self.extract_ids(skill)
+            result.extend(found or [normalize_term(skill)])
+        return list(dict.fromkeys(result))
+
+    def category_of(self, skill_id: str) -> Optional[str]:
+        skill = self.skills.get(skill_id)
+        return skill['category'] if skill else None
+
+
+class _DictionaryBuilder:
+    """Acumula habilidades; la primera fuente que registra una forma gana."""
+
+    def __init__(self):
+        self.skills: Dict[str, Dict[str, Any]] = {}
+        self.surfaces: Dict[str, str] = {}
+
+    def add(self, name: str, category: str, variants: Iterable[str] = (), group: Optional[str] = None):
+        name = (name or '').strip()
+        surface = normalize_term(name)
+        if len(surface) < MIN_TERM_LENGTH:
+            return
+        skill_id = self.surfaces.get(surface) or skill_id_for(name)
+        if not skill_id:
+            return
+        if skill_id not in self.skills:
+            self.skills[skill_id] = {
+                'name': name.lower(),
+                'category': category if category in CATEGORIES else 'technical',
+                'group': group,
+            }
+        for term in (name, *variants):
+            term = normalize_term(term)
+            if len(term) >= MIN_TERM_LENGTH:
+                self.surfaces.setdefault(term, skill_id)
+
+
+def _catalog_keys() -> List[Tuple[str, str]]:
+    """Un (modo, profundidad) por archivo de catálogo distinto."""
+    seen = set()
+    keys = []
+    for key, path in FILE_PATHS.items():
+        if path in seen:
+            continue
+        seen.add(path)
+        mode, depth = key.split('_', 1)
+        keys.append((mode, depth))
+    return keys
+
+
+def source_fingerprint(bu_name: Optional[str] = None, ontology_path: str = ONTOLOGY_PATH) -> str:
+    """Hash de las fuentes: versión, datos en código y tamaño/fecha de los archivos."""
+    digest = hashlib.sha256()
+    digest.update(f"{DICTIONARY_VERSION}|{(bu_name or '').lower()}|{MAX_SKILLS}".encode('utf-8'))
+    digest.update(json.dumps(
+        [SKILL_SYNONYMS, BASE_TECHNICAL_TERMS, DEFAULT_SKILL_ONTOLOGY,
+         BU_SKILL_ONTOLOGY.get((bu_name or '').lower(), {})],
+        sort_keys=True
+    ).encode('utf-8'))
+    for path in sorted(set(FILE_PATHS.values()) | {ontology_path}):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+        except OSError:
+            digest.update(f"{path}|missing".encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Registro compartido --------------------------------------------------------
+
+_dictionaries: Dict[str, SkillDictionary] = {}
+_checked_at: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def _compiled_dir() -> str:
+    try:
+        from django.conf import settings
+        return getattr(settings, 'SKILL_DICTIONARY_DIR', DEFAULT_COMPILED_DIR)
+    except Exception:
+        return DEFAULT_COMPILED_DIR
+
+
+def _check_interval() -> float:
+    try:
+        from django.conf import settings
+        return getattr(settings, 'SKILL_DICTIONARY_CHECK_INTERVAL', FINGERPRINT_CHECK_INTERVAL)
+    except Exception:
+        return FINGERPRINT_CHECK_INTERVAL
+
+
+def invalidate_skill_dictionaries():
+    """Fuerza a revisar las fuentes en la siguiente llamada (p. ej. tras editar la ontología)."""
+    _checked_at.clear()
+
+
+def _bu_key(business_unit: Any) -> str:
+    name = getattr(business_unit, 'name', business_unit)
+    return str(name).lower() if name else ''
+
+
+def get_skill_dictionary(business_unit: Any = None) -> SkillDictionary:
+    """
+    Diccionario compilado de la BU (nombre u objeto ``BusinessUnit``).
+
+    Se carga del disco si existe un archivo con el fingerprint vigente; si no,
+    se construye y se guarda para los demás procesos. El fingerprint (que lee
+    el ``stat`` de cada fuente) se revisa a lo más cada
+    ``SKILL_DICTIONARY_CHECK_INTERVAL`` segundos por BU.
+    """
+    key = _bu_key(business_unit)
+    dictionary = _dictionaries.get(key)
+    now = time.monotonic()
+    if dictionary is not None and now - _checked_at.get(key, float('-inf')) < _check_interval():
+        return dictionary
+
+    fingerprint = source_fingerprint(key)
+    _checked_at[key] = now
+    if dictionary is not None and dictionary.fingerprint == fingerprint:
+        return dictionary
+
+    with _lock:
+        dictionary = _dictionaries.get(key)
+        if dictionary is not None and dictionary.fingerprint == fingerprint:
+            return dictionary
+
+        path = os.path.join(_compiled_dir(), f"skills_{key or 'default'}_{fingerprint[:16]}.pkl")
+        dictionary = None
+        if os.path.exists(path):
+            try:
+                dictionary = SkillDictionary.load(path)
+            except Exception as e:
+                logger.warning(f"Diccionario compilado inválido en {path}, se reconstruye: {e}")
+        if dictionary is None:
+            dictionary = SkillDictionary.build(key or None)
+            try:
+                dictionary.save(path)
+            except OSError as e:
+                logger.warning(f"No se pudo guardar el diccionario de habilidades en {path}: {e}")
+
+        _dictionaries[key] = dictionary
+        return dictionary
@@ -0,0 +1,789 @@
+"""
+Caché de dos niveles para Grupo huntRED®.
+
+- L1: LRU en memoria del proceso, acotado por tamaño y TTL.
+- L2: Redis, compartido entre procesos y máquinas.
+- Invalidación entre procesos: cada ``delete``/``clear`` se publica en un
+  canal pub/sub y los demás procesos descartan sus copias en L1.
+
+Los datos se agrupan en namespaces, cada uno con su TTL, su serializador
+(``json``, ``numpy``, ``msgpack`` o ``pickle``) y sus estadísticas::
+
+    dashboards = tiered_cache.namespace('dashboard', ttl=300, serializer='pickle')
+    dashboards.set('bu:4', stats)
+
+    @tiered_cache.cached('matchmaking', ttl=600, serializer='numpy')
+    async def scores(person_id: int): ...
+
+L1 guarda el objeto tal cual: quien lo recibe no debe modificarlo. Si Redis
+no está disponible, la caché sigue funcionando sólo con L1. En pruebas y
+desarrollo se puede usar ``InMemoryRedis`` como sustituto local.
+"""
+
+import asyncio
+import base64
+import fnmatch
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+KEY_PREFIX = 'tc'
+INVALIDATION_CHANNEL = 'tc:invalidate'
+DEFAULT_TTL = 300
+DEFAULT_L1_MAX_SIZE = 2048
+DEFAULT_L1_TTL = 60
+
+
+# Serializadores -------------------------------------------------------------
+
+class JSONSerializer:
+    """JSON compacto; para dicts/listas de tipos básicos."""
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(',', ':'), default=self._default).encode('utf-8')
+
+    def loads(self, payload: bytes) -> Any:
+        return json.loads(payload, object_hook=self._object_hook)
+
+    def _default(self, value: Any) -> Any:
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def _object_hook(self, value: Dict) -> Any:
+        return value
+
+
+class NumpySerializer(JSONSerializer):
+    """JSON que conserva arrays y escalares de numpy (dtype y forma)."""
+
+    def _default(self, value: Any) -> Any:
+        import numpy as np
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            return {
+                '__ndarray__': base64.b64encode(array.tobytes()).decode('ascii'),
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+            }
+        if isinstance(value, np.generic):
+            return value.item()
+        return super()._default(value)
+
+    def _object_hook(self, value: Dict) -> Any:
+        if '__ndarray__' in value:
+            import numpy as np
+            data = base64.b64decode(value['__ndarray__'])
+            return np.frombuffer(data, dtype=np.dtype(value['dtype'])).reshape(value['shape']).copy()
+        return value
+
+
+class MsgpackSerializer:
+    """msgpack (requiere el paquete ``msgpack``)."""
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def dumps(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, payload: bytes) -> Any:
+        return self._msgpack.unpackb(payload, raw=False)
+
+
+class PickleSerializer:
+    """pickle; para objetos arbitrarios (sólo datos generados por nosotros)."""
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, payload: bytes) -> Any:
+        return pickle.loads(payload)
+
+
+SERIALIZERS: Dict[str, Callable[[], Any]] = {
+    'json': JSONSerializer,
+    'numpy': NumpySerializer,
+    'msgpack': MsgpackSerializer,
+    'pickle': PickleSerializer,
+}
+
+
+def register_serializer(name: str, factory: Callable[[], Any]):
+    """Registra un serializador con ``dumps(value) -> bytes`` y ``loads(bytes)``."""
+    SERIALIZERS[name] = factory
+
+
+def get_serializer(name: str):
+    try:
+        return SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Serializador de caché desconocido: {name}")
+
+
+# L1 -------------------------------------------------------------------------
+
+class LocalLRUCache:
+    """LRU en memoria con TTL por entrada; seguro entre hilos."""
+
+    def __init__(self, max_size: int = DEFAULT_L1_MAX_SIZE, ttl: Optional[float] = DEFAULT_L1_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self.clock() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+
+# Sustituto local de Redis ---------------------------------------------------
+
+class InMemoryRedis:
+    """
+    Sustituto de Redis en memoria para pruebas y desarrollo.
+
+    Implementa el subconjunto que usan ``TieredCache`` (get/set/delete,
+    scan_iter, publish y pubsub), la cola de mensajes entrantes (streams con
+    grupos de consumidores), el índice de similitud (sets, mget y
+    pipelines) y el índice por BU de la caché de prompts (sorted sets). Varias ``TieredCache`` que comparten una
+    instancia se comportan como procesos distintos contra el mismo Redis; los
+    mensajes pub/sub se entregan de forma síncrona.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._data: Dict[str, tuple] = {}
+        self._handlers: Dict[str, List[Callable]] = defaultdict(list)
+        self._streams: Dict[str, List[tuple]] = defaultdict(list)
+        self._sets: Dict[str, set] = {}
+        self._zsets: Dict[str, Dict[bytes, float]] = {}
+        self._groups: Dict[tuple, Dict[str, Any]] = {}
+        self._stream_seq = 0
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= self.clock():
+                del self._data[key]
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None, nx: bool = False):
+        with self._lock:
+            if nx and self.get(key) is not None:
+                return None
+            self._data[key] = (value, self.clock() + ex if ex else None)
+        return True
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self.get(key) for key in keys]
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(
+                (self._data.pop(key, None) is not None) | (self._sets.pop(key, None) is not None)
+                | (self._zsets.pop(key, None) is not None)
+                for key in keys
+            )
+
+    def expire(self, name: str, seconds: int) -> bool:
+        # Los sets no caducan en memoria; basta con que la llamada exista
+        with self._lock:
+            if self.get(name) is not None:
+                self._data[name] = (self._data[name][0], self.clock() + seconds)
+                return True
+            return name in self._sets or name in self._zsets
+
+    def scan_iter(self, match: str = '*', count: Optional[int] = None):
+        with self._lock:
+            keys = [key for key in list(self._data) + list(self._sets) + list(self._zsets)
+                    if fnmatch.fnmatchcase(key, match)]
+        return iter(keys)
+
+    # Sets
+    def sadd(self, name: str, *values) -> int:
+        with self._lock:
+            members = self._sets.setdefault(name, set())
+            before = len(members)
+            members.update(v if isinstance(v, bytes) else str(v).encode('utf-8') for v in values)
+            return len(members) - before
+
+    def srem(self, name: str, *values) -> int:
+        with self._lock:
+            members = self._sets.get(name, set())
+            before = len(members)
+            members.difference_update(v if isinstance(v, bytes) else str(v).encode('utf-8') for v in values)
+            if not members:
+                self._sets.pop(name, None)
+            return before - len(members)
+
+    def smembers(self, name: str) -> set:
+        with self._lock:
+            return set(self._sets.get(name, ()))
+
+    # Sorted sets
+    def zadd(self, name: str, mapping: Dict[Any, float]) -> int:
+        with self._lock:
+            members = self._zsets.setdefault(name, {})
+            before = len(members)
+            for member, score in mapping.items():
+                members[member if isinstance(member, bytes) else str(member).encode('utf-8')] = float(score)
+            return len(members) - before
+
+    def _zrank_slice(self, name: str, start: int, end: int) -> List[bytes]:
+        ordered = sorted(self._zsets.get(name, {}).items(), key=lambda item: (item[1], item[0]))
+        size = len(ordered)
+        start, end = (start + size if start < 0 else start), (end + size if end < 0 else end)
+        return [member for member, _ in ordered[max(start, 0):end + 1]]
+
+    def zrange(self, name: str, start: int, end: int) -> List[bytes]:
+        with self._lock:
+            return self._zrank_slice(name, start, end)
+
+    def zremrangebyrank(self, name: str, start: int, end: int) -> int:
+        with self._lock:
+            removed = self._zrank_slice(name, start, end)
+            members = self._zsets.get(name, {})
+            for member in removed:
+                del members[member]
+            if not members:
+                self._zsets.pop(name, None)
+            return len(removed)
+
+    def zcard(self, name: str) -> int:
+        with self._lock:
+            return len(self._zsets.get(name, {}))
+
+    def pipeline(self, transaction: bool = True):
+        return _InMemoryPipeline(self)
+
+    # Streams: sólo lo necesario para un grupo de consumidores por stream
+    def xadd(self, name: str, fields: Dict[str, Any], maxlen: Optional[int] = None, approximate: bool = True):
+        with self._lock:
+            self._stream_seq += 1
+            entry_id = f"{int(time.time() * 1000)}-{self._stream_seq}".encode('utf-8')
+            stream = self._streams[name]
+            stream.append((entry_id, {
+                k.encode('utf-8'): v if isinstance(v, bytes) else str(v).encode('utf-8')
+                for k, v in fields.items()
+            }))
+            if maxlen is not None and len(stream) > maxlen:
+                del stream[:len(stream) - maxlen]
+            return entry_id
+
+    def xlen(self, name: str) -> int:
+        with self._lock:
+            return len(self._streams.get(name, []))
+
+    def xgroup_create(self, name: str, groupname: str, id: str = '$', mkstream: bool = False):
+        with self._lock:
+            if (name, groupname) in self._groups:
+                raise Exception('BUSYGROUP Consumer Group name already exists')
+            if name not in self._streams and not mkstream:
+                raise Exception('ERR no such key')
+            self._streams[name]
+            start = len(self._streams[name]) if id == '$' else 0
+            self._groups[(name, groupname)] = {'delivered': start, 'pending': {}}
+            return True
+
+    def xreadgroup(self, groupname: str, consumername: str, streams: Dict[str, str],
+                   count: Optional[int] = None, block: Optional[int] = None, noack: bool = False):
+        result = []
+        with self._lock:
+            for name, last_id in streams.items():
+                group = self._groups.get((name, groupname))
+                if group is None:
+                    raise Exception(f"NOGROUP No such key '{name}' or consumer group '{groupname}'")
+                entries = []
+                if last_id == '>':
+                    stream = self._streams[name]
+                    while group['delivered'] < len(stream) and (count is None or len(entries) < count):
+                        entry = stream[group['delivered']]
+                        group['delivered'] += 1
+                        group['pending'][entry[0]] = consumername
+                        entries.append(entry)
+                else:
+                    pending = {entry_id for entry_id, owner in group['pending'].items() if owner == consumername}
+                    entries = [entry for entry in self._streams[name] if entry[0] in pending][:count]
+                if entries or last_id != '>':
+                    result.append([name.encode('utf-8'), entries])
+        return result
+
+    def xack(self, name: str, groupname: str, *ids) -> int:
+        with self._lock:
+            group = self._groups.get((name, groupname))
+            if group is None:
+                return 0
+            ids = [i if isinstance(i, bytes) else str(i).encode('utf-8') for i in ids]
+            return sum(group['pending'].pop(entry_id, None) is not None for entry_id in ids)
+
+    def publish(self, channel: str, message) -> int:
+        handlers = list(self._handlers.get(channel, []))
+        payload = message.encode('utf-8') if isinstance(message, str) else message
+        for handler in handlers:
+            handler({'type': 'message', 'channel': channel.encode('utf-8'), 'data': payload})
+        return len(handlers)
+
+    def pubsub(self, **kwargs):
+        return _InMemoryPubSub(self)
+
+
+class _InMemoryPipeline:
+    """Acumula comandos y los ejecuta juntos en ``execute()``."""
+
+    def __init__(self, broker: InMemoryRedis):
+        self.broker = broker
+        self._commands: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self.broker, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        with self.broker._lock:
+            return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._commands = []
+
+
+class _InMemoryPubSub:
+    def __init__(self, broker: InMemoryRedis):
+        self.broker = broker
+        self._subscriptions: Dict[str, Callable] = {}
+
+    def subscribe(self, **handlers):
+        for channel, handler in handlers.items():
+            self.broker._handlers[channel].append(handler)
+            self._subscriptions[channel] = handler
+
+    def run_in_thread(self, sleep_time: float = 0, daemon: bool = True, **kwargs):
+        return self
+
+    def stop(self):
+        self.close()
+
+    def close(self):
+        for channel, handler in self._subscriptions.items():
+            if handler in self.broker._handlers.get(channel, []):
+                self.broker._handlers[channel].remove(handler)
+        self._subscriptions.clear()
+
+
+# Estadísticas y namespaces --------------------------------------------------
+
+@dataclass
+class NamespaceStats:
+    l1_hits: int = 0
+    l2_hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    invalidations: int = 0
+    remote_invalidations: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        report = asdict(self)
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        report['hit_rate'] = round((self.l1_hits + self.l2_hits) / lookups, 4) if lookups else 0.0
+        return report
+
+
+class CacheNamespace:
+    """Vista de ``TieredCache`` con TTL, serializador y estadísticas propias."""
+
+    def __init__(self, cache: 'TieredCache', name: str, ttl: int = DEFAULT_TTL,
+                 l1_ttl: Optional[float] = None, serializer: str = 'json'):
+        self.cache = cache
+        self.name = name
+        self.ttl = ttl
+        self.l1_ttl = min(ttl, cache.l1_ttl) if l1_ttl is None else l1_ttl
+        self.serializer_name = serializer
+        self.serializer = get_serializer(serializer)
+        self.stats = NamespaceStats()
+
+    def _l1_key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _l2_key(self, key: str) -> str:
+        return f"{KEY_PREFIX}:{self.name}:{key}"
+
+    # Lectura/escritura por nivel (las versiones async llaman a estas en un hilo)
+
+    def get_local(self, key: str, default: Any = None) -> Any:
+        value = self.cache.l1.get(self._l1_key(key), _MISSING)
+        if value is _MISSING:
+            return default
+        self.stats.l1_hits += 1
+        return value
+
+    def get_remote(self, key: str, default: Any = None) -> Any:
+        redis = self.cache.redis
+        if redis is not None:
+            try:
+                payload = redis.get(self._l2_key(key))
+                if payload is not None:
+                    value = self.serializer.loads(payload)
+                    self.stats.l2_hits += 1
+                    self.cache.l1.set(self._l1_key(key), value, self.l1_ttl)
+                    return value
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Error leyendo caché L2 {self.name}:{key}: {e}")
+        self.stats.misses += 1
+        return default
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.get_local(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        return self.get_remote(key, default)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self.stats.sets += 1
+        self.cache.l1.set(self._l1_key(key), value, min(ttl, self.l1_ttl))
+        redis = self.cache.redis
+        if redis is None:
+            return
+        try:
+            redis.set(self._l2_key(key), self.serializer.dumps(value), ex=ttl)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"Error escribiendo caché L2 {self.name}:{key}: {e}")
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, *keys: str):
+        """Borra claves en L1, L2 y en el L1 de los demás procesos."""
+        self.stats.invalidations += len(keys)
+        for key in keys:
+            self.cache.l1.delete(self._l1_key(key))
+        redis = self.cache.redis
+        if redis is not None and keys:
+            try:
+                redis.delete(*[self._l2_key(key) for key in keys])
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Error borrando caché L2 {self.name}: {e}")
+        self.cache.publish_invalidation(self.name, list(keys))
+
+    def clear(self):
+        """Borra todo el namespace."""
+        self.stats.invalidations += 1
+        self.cache.l1.delete_prefix(self._l1_key(''))
+        redis = self.cache.redis
+        if redis is not None:
+            try:
+                batch = []
+                for key in redis.scan_iter(match=self._l2_key('*'), count=500):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        redis.delete(*batch)
+                        batch = []
+                if batch:
+                    redis.delete(*batch)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Error limpiando caché L2 {self.name}: {e}")
+        self.cache.publish_invalidation(self.name, None)
+
+    def _apply_remote_invalidation(self, keys: Optional[List[str]]):
+        self.stats.remote_invalidations += 1
+        if keys is None:
+            self.cache.l1.delete_prefix(self._l1_key(''))
+        else:
+            for key in keys:
+                self.cache.l1.delete(self._l1_key(key))
+
+
+# Caché de dos niveles -------------------------------------------------------
+
+def _settings(name: str) -> Dict[str, Any]:
+    try:
+        return getattr(settings, name, {}) or {}
+    except Exception:
+        # Settings aún sin configurar (import fuera de Django)
+        return {}
+
+
+def _redis_url() -> str:
+    config = _settings('REDIS_CONFIG')
+    password = config.get('password')
+    auth = f":{password}@" if password else ''
+    return f"redis://{auth}{config.get('host', 'localhost')}:{config.get('port', 6379)}/{config.get('db', 0)}"
+
+
+def _simple_key_part(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if isinstance(value, (list, tuple, dict)):
+        try:
+            return json.dumps(value, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def make_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Clave de un llamado: nombre calificado más los argumentos simples.
+
+    Los argumentos que no son tipos básicos (``self``, modelos, requests) no
+    forman parte de la clave, igual que en ``cache_result``.
+    """
+    parts = [f"{func.__module__}.{func.__qualname__}"]
+    parts.extend(part for part in map(_simple_key_part, args) if part is not None)
+    for name, value in sorted(kwargs.items()):
+        part = _simple_key_part(value)
+        if part is not None:
+            parts.append(f"{name}={part}")
+    return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+class TieredCache:
+    """
+    Punto de entrada del subsistema: L1 compartido por namespaces, cliente
+    Redis perezoso y listener de invalidaciones.
+
+    Args:
+        redis_client: Cliente Redis (o ``InMemoryRedis``); por defecto se
+            crea con ``settings.REDIS_CONFIG`` al primer uso.
+        l1_max_size: Entradas máximas de L1 (todas las namespaces).
+        l1_ttl: TTL máximo de L1 en segundos; acota cuánto puede durar una
+            copia local si se pierde un mensaje de invalidación.
+    """
+
+    def __init__(self, redis_client: Any = None, l1_max_size: Optional[int] = None,
+                 l1_ttl: Optional[float] = None, channel: str = INVALIDATION_CHANNEL):
+        config = _settings('TIERED_CACHE')
+        self.l1_ttl = l1_ttl if l1_ttl is not None else config.get('L1_TTL', DEFAULT_L1_TTL)
+        self.l1 = LocalLRUCache(
+            max_size=l1_max_size or config.get('L1_MAX_SIZE', DEFAULT_L1_MAX_SIZE),
+            ttl=self.l1_ttl,
+        )
+        self.channel = channel
+        self.instance_id = uuid.uuid4().hex
+        self._redis = redis_client
+        self._redis_checked = redis_client is not None
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        self._listener = None
+        self._lock = threading.Lock()
+
+    @property
+    def redis(self):
+        """Cliente L2, o ``None`` si Redis no está disponible."""
+        if not self._redis_checked:
+            with self._lock:
+                if not self._redis_checked:
+                    self._redis = self._connect()
+                    self._redis_checked = True
+        if self._redis is not None and self._listener is None:
+            self._start_listener()
+        return self._redis
+
+    def _connect(self):
+        try:
+            import redis
+            client = redis.Redis.from_url(
+                _settings('TIERED_CACHE').get('URL') or _redis_url(),
+                socket_timeout=2,
+                socket_connect_timeout=2,
+            )
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"Caché L2 (Redis) no disponible, usando sólo L1: {e}")
+            return None
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.channel: self._on_message})
+                self._listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            except Exception as e:
+                logger.warning(f"No se pudo suscribir a {self.channel}: {e}")
+                self._listener = False
+
+    def _on_message(self, message: Dict[str, Any]):
+        try:
+            data = json.loads(message['data'])
+            if data.get('origin') == self.instance_id:
+                return
+            namespace = self._namespaces.get(data.get('ns'))
+            if namespace is not None:
+                namespace._apply_remote_invalidation(data.get('keys'))
+            else:
+                prefix = f"{data.get('ns')}:"
+                if data.get('keys') is None:
+                    self.l1.delete_prefix(prefix)
+                else:
+                    for key in data['keys']:
+                        self.l1.delete(prefix + key)
+        except Exception as e:
+            logger.error(f"Mensaje de invalidación inválido: {e}")
+
+    def publish_invalidation(self, namespace: str, keys: Optional[List[str]]):
+        redis = self.redis
+        if redis is None:
+            return
+        try:
+            redis.publish(self.channel, json.dumps({'ns': namespace, 'keys': keys, 'origin': self.instance_id}))
+        except Exception as e:
+            logger.warning(f"No se pudo publicar la invalidación de {namespace}: {e}")
+
+    def namespace(self, name: str, ttl: int = DEFAULT_TTL, l1_ttl: Optional[float] = None,
+                  serializer: str = 'json') -> CacheNamespace:
+        """Devuelve (creándolo la primera vez) el namespace ``name``."""
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            with self._lock:
+                namespace = self._namespaces.get(name)
+                if namespace is None:
+                    namespace = CacheNamespace(self, name, ttl, l1_ttl, serializer)
+                    self._namespaces[name] = namespace
+        return namespace
+
+    def cached(self, namespace: str, ttl: int = DEFAULT_TTL, serializer: str = 'json',
+               key_func: Optional[Callable[..., str]] = None, l1_ttl: Optional[float] = None):
+        """
+        Decorador para funciones síncronas y corutinas.
+
+        En las corutinas, L1 se consulta sin salir del event loop; Redis y la
+        serialización se ejecutan en un hilo.
+        """
+        ns = self.namespace(namespace, ttl=ttl, l1_ttl=l1_ttl, serializer=serializer)
+
+        def decorator(func):
+            build_key = key_func or functools.partial(make_key, func)
+
+            def call_key(args, kwargs) -> str:
+                return build_key(*args, **kwargs) if key_func else build_key(args, kwargs)
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    key = call_key(args, kwargs)
+                    value = ns.get_local(key, _MISSING)
+                    if value is _MISSING:
+                        value = await asyncio.to_thread(ns.get_remote, key, _MISSING)
+                    if value is _MISSING:
+                        value = await func(*args, **kwargs)
+                        await asyncio.to_thread(ns.set, key, value)
+                    return value
+                async_wrapper.cache_namespace = ns
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = call_key(args, kwargs)
+                value = ns.get(key, _MISSING)
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    ns.set(key, value)
+                return value
+            wrapper.cache_namespace = ns
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Estadísticas por namespace más el estado de L1/L2."""
+        report = {name: ns.stats.as_dict() for name, ns in self._namespaces.items()}
+        report['_cache'] = {
+            'l1_entries': len(self.l1),
+            'l1_max_size': self.l1.max_size,
+            'l2_available': self._redis is not None,
+            'listening': bool(self._listener),
+        }
+        return report
+
+    def _after_fork_in_child(self):
+        # El hilo del listener no sobrevive al fork; las copias L1 pueden haber
+        # perdido invalidaciones mientras no había listener
+        self._lock = threading.Lock()
+        self.l1 = LocalLRUCache(self.l1.max_size, self.l1.ttl)
+        self._listener = None
+        self.instance_id = uuid.uuid4().hex
+
+
+tiered_cache = TieredCache()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=tiered_cache._after_fork_in_child)
@@ -2,10 +2,11 @@ from typing import Dict, Optional
 from django.conf import settings
 from django.db import transaction
 from app.models import NotificationChannel, NotificationConfig, MetaAPI, WhatsAppConfig
+from app.ats.chatbot.components.rate_limiter import rate_limiter
+from app.ats.integrations.channels.http_clients import outbound_http
 import logging
 import asyncio
 import json
-import httpx
 
 class WhatsAppApi:
     def __init__(self):
@@ -99,9 +100,11 @@ class WhatsAppApi:
                 "Content-Type": "application/json"
             }
             
+            await rate_limiter.acquire('whatsapp', self.phone_id, phone)
+
             # Enviar la solicitud
-            async with httpx.AsyncClient() as client:
-                response = await client.post(endpoint, json=payload, headers=headers)
+            async with outbound_http.client('whatsapp') as client:
+                response = await client.post(endpoint, json=payload, headers=headers, rate_limit=(self.phone_id, phone))
                 
                 if response.status_code in [200, 201]:
                     # Registrar el envío exitoso
@@ -0,0 +1,192 @@
+"""
+Directorio de teléfonos huntRED® para enrutar mensajes de WhatsApp.
+
+Resuelve un número (``5215512345678@c.us``, ``whatsapp:+52...``, ``55 1234 5678``)
+a sus rutas ``(sistema, empresa, persona)``:
+
+    payroll  empleado activo de nómina (teléfono o WhatsApp) o el número
+             de WhatsApp de la empresa de nómina
+    ats      contacto de una empresa ATS (firmante, responsable de pagos,
+             fiscal o del proceso), por el teléfono de su ``Person``
+
+Los teléfonos se guardan normalizados a E.164 en columnas indexadas
+(``PayrollEmployee.phone_e164``/``whatsapp_e164``,
+``PayrollCompany.whatsapp_phone_e164`` y ``Person.dedup_phone``), así que
+resolver un número son búsquedas por igualdad, no ``LIKE '%...%'``. El
+resultado (también "no encontrado") se guarda en el namespace
+``phone_directory`` de ``tiered_cache``: L1 en el proceso y Redis compartido.
+Las señales de ``app.core.messaging.signals`` invalidan los números que
+cambian, en todos los procesos.
+"""
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Q
+
+from app.ats.utils.dedup import normalize_phone
+from app.ats.utils.tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = 'phone_directory'
+DEFAULT_TTL = 24 * 3600
+DEFAULT_NEGATIVE_TTL = 300   # un número desconocido puede registrarse en cualquier momento
+CHUNK_SIZE = 5000
+
+# Roles de contacto de Company que identifican a la empresa en el ATS
+ATS_CONTACT_FIELDS = ('signer_id', 'payment_responsible_id', 'fiscal_responsible_id', 'process_responsible_id')
+
+
+class PhoneRoute(NamedTuple):
+    system: str                 # 'payroll' o 'ats'
+    company_id: str
+    person_id: Optional[str]    # empleado de nómina o Person del ATS
+    source: str                 # 'employee', 'company' o 'contact'
+
+
+def _settings() -> Dict[str, Any]:
+    try:
+        return getattr(settings, 'PHONE_DIRECTORY', None) or {}
+    except Exception:
+        return {}
+
+
+class PhoneDirectory:
+    """
+    Búsqueda de rutas por teléfono con caché de dos niveles.
+
+    Args:
+        cache: ``TieredCache`` a usar (por defecto el global).
+        resolver: Función ``telefono_e164 -> [PhoneRoute]``; por defecto
+            consulta la base de datos.
+    """
+
+    def __init__(self, cache: Any = None, resolver: Optional[Callable[[str], List[PhoneRoute]]] = None):
+        config = _settings()
+        self.ttl = config.get('TTL', DEFAULT_TTL)
+        self.negative_ttl = config.get('NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL)
+        self._cache = cache
+        self._resolver = resolver or self.resolve
+
+    @property
+    def namespace(self):
+        return (self._cache or tiered_cache).namespace(NAMESPACE, ttl=self.ttl)
+
+    @staticmethod
+    def normalize(phone: Any) -> str:
+        """E.164 de un número tal como llega de WhatsApp, o ``''``."""
+        phone = str(phone or '').strip()
+        if phone.lower().startswith('whatsapp:'):
+            phone = phone[len('whatsapp:'):]
+        phone = phone.split('@', 1)[0]
+        if phone.isdigit() and len(phone) > 10:
+            phone = f"+{phone}"     # WhatsApp manda el número con lada sin '+'
+        return normalize_phone(phone)
+
+    # Consulta ------------------------------------------------------------------
+
+    def lookup(self, phone: Any) -> List[PhoneRoute]:
+        """Rutas del número: primero nómina (empleado, empresa) y luego ATS."""
+        number = self.normalize(phone)
+        if not number:
+            return []
+        cached = self.namespace.get(number)
+        if cached is not None:
+            return [PhoneRoute(*route) for route in cached]
+        try:
+            routes = self._resolver(number)
+        except Exception as e:
+            logger.error(f"Error resolviendo el teléfono {number}: {e}")
+            return []
+        self.namespace.set(number, [list(route) for route in routes],
+                           ttl=self.ttl if routes else self.negative_ttl)
+        return routes
+
+    def route(self, phone: Any, system: str) -> Optional[PhoneRoute]:
+        return next((route for route in self.lookup(phone) if route.system == system), None)
+
+    def resolve(self, number: str) -> List[PhoneRoute]:
+        """Rutas de un número E.164 leídas de la base de datos (sólo índices)."""
+        from app.models import Company, Person
+        from app.payroll.models import PayrollCompany, PayrollEmployee
+
+        routes = [
+            PhoneRoute('payroll', str(company_id), str(employee_id), 'employee')
+            for employee_id, company_id in PayrollEmployee.objects.filter(
+                Q(phone_e164=number) | Q(whatsapp_e164=number), is_active=True
+            ).order_by('created_at').values_list('id', 'company_id')
+        ]
+        routes += [
+            PhoneRoute('payroll', str(company_id), None, 'company')
+            for company_id in PayrollCompany.objects.filter(
+                whatsapp_phone_e164=number, is_active=True
+            ).values_list('id', flat=True)
+        ]
+        person_ids = list(Person.objects.filter(dedup_phone=number).order_by('id').values_list('id', flat=True)[:20])
+        if person_ids:
+            contacts = Q()
+            for field in ATS_CONTACT_FIELDS:
+                contacts |= Q(**{f"{field}__in": person_ids})
+            for company_id, *contact_ids in Company.objects.filter(contacts).order_by('id').values_list(
+                    'id', *ATS_CONTACT_FIELDS):
+                person_id = next(person for person in contact_ids if person in person_ids)
+                routes.append(PhoneRoute('ats', str(company_id), str(person_id), 'contact'))
+        return routes
+
+    # Mantenimiento ---------------------------------------------------------------
+
+    def invalidate(self, *phones: Any):
+        """Descarta las rutas guardadas de estos números (en todos los procesos)."""
+        numbers = {self.normalize(phone) for phone in phones if phone}
+        numbers.discard('')
+        if numbers:
+            self.namespace.delete(*sorted(numbers))
+
+    def clear(self):
+        self.namespace.clear()
+
+    def backfill(self, only_missing: bool = True, chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Normaliza a E.164 los teléfonos ya guardados, por lotes con
+        ``bulk_update`` (sin pasar por ``save`` ni por las señales).
+        """
+        from app.ats.utils.dedup import DedupEngine
+        from app.payroll.models import PayrollCompany, PayrollEmployee
+
+        counts = {
+            'employees': self._backfill_model(
+                PayrollEmployee, {'phone': 'phone_e164', 'whatsapp_number': 'whatsapp_e164'}, only_missing, chunk_size
+            ),
+            'payroll_companies': self._backfill_model(
+                PayrollCompany, {'whatsapp_phone_number': 'whatsapp_phone_e164'}, only_missing, chunk_size
+            ),
+            'persons': DedupEngine(chunk_size=chunk_size).refresh_keys(only_missing=only_missing),
+        }
+        # Las rutas en caché (sobre todo las negativas) pueden haber cambiado
+        self.clear()
+        return counts
+
+    @staticmethod
+    def _backfill_model(model, fields: Dict[str, str], only_missing: bool, chunk_size: int) -> int:
+        queryset = model.objects.all()
+        if only_missing:
+            missing = Q()
+            for source, target in fields.items():
+                missing |= Q(**{target: ''}) & ~Q(**{source: ''})
+            queryset = queryset.filter(missing)
+        rows = queryset.order_by().values_list('pk', *fields).iterator(chunk_size=chunk_size)
+        updated, batch = 0, []
+        for pk, *values in rows:
+            batch.append(model(pk=pk, **{
+                target: normalize_phone(value) for target, value in zip(fields.values(), values)
+            }))
+            if len(batch) >= chunk_size:
+                updated += model.objects.bulk_update(batch, list(fields.values()), batch_size=1000)
+                batch = []
+        if batch:
+            updated += model.objects.bulk_update(batch, list(fields.values()), batch_size=1000)
+        return updated
+
+
+phone_directory = PhoneDirectory()
@@ -0,0 +1,75 @@
+"""
+Señales que mantienen el directorio de teléfonos de WhatsApp.
+
+Cada ``save`` normaliza los teléfonos a E.164 y deja en la instancia los
+valores anteriores (``_previous_phones``); aquí se invalidan en el directorio
+el número nuevo y el anterior, en todos los procesos. De una ``Person`` sólo
+se invalida si su teléfono cambió; de una ``Company``, los teléfonos de sus
+contactos actuales y anteriores.
+"""
+
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from app.models import Company, Person
+from app.payroll.models import PayrollCompany, PayrollEmployee
+from app.core.messaging.phone_directory import ATS_CONTACT_FIELDS, phone_directory
+
+logger = logging.getLogger(__name__)
+
+
+def _invalidate(instance, *phones):
+    try:
+        phone_directory.invalidate(*phones)
+    except Exception as e:
+        logger.warning(f"No se pudo invalidar el directorio de teléfonos ({instance.pk}): {e}")
+
+
+@receiver(post_save, sender=PayrollEmployee)
+@receiver(post_delete, sender=PayrollEmployee)
+def invalidate_employee_phones(sender, instance, **kwargs):
+    _invalidate(instance, instance.phone_e164, instance.whatsapp_e164, *getattr(instance, '_previous_phones', ()))
+
+
+@receiver(post_save, sender=PayrollCompany)
+@receiver(post_delete, sender=PayrollCompany)
+def invalidate_payroll_company_phone(sender, instance, **kwargs):
+    _invalidate(instance, instance.whatsapp_phone_e164, *getattr(instance, '_previous_phones', ()))
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Person)
+def invalidate_person_phone(sender, instance, **kwargs):
+    if kwargs.get('signal') is post_delete:
+        _invalidate(instance, instance.dedup_phone)
+        return
+    previous = getattr(instance, '_previous_phones', set())
+    if previous != {instance.dedup_phone}:
+        _invalidate(instance, instance.dedup_phone, *previous)
+
+
+@receiver(pre_save, sender=Company)
+def remember_company_contacts(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    try:
+        instance._previous_contacts = Company.objects.filter(pk=instance.pk).values_list(*ATS_CONTACT_FIELDS).first()
+    except Exception as e:
+        logger.warning(f"No se pudieron leer los contactos de la empresa {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_contact_phones(sender, instance, **kwargs):
+    contacts = {getattr(instance, field) for field in ATS_CONTACT_FIELDS}
+    contacts.update(getattr(instance, '_previous_contacts', None) or ())
+    contacts.discard(None)
+    if not contacts:
+        return
+    try:
+        phones = Person.objects.filter(id__in=contacts).values_list('dedup_phone', flat=True)
+        _invalidate(instance, *phones)
+    except Exception as e:
+        logger.warning(f"No se pudo invalidar el directorio de teléfonos (empresa {instance.pk}): {e}")
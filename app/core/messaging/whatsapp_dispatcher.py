@@ -8,13 +8,13 @@ import re
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
+from cachetools import TTLCache
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Q
 
 from app.ats.models import Company
-from app.payroll.models import PayrollCompany, PayrollEmployee
-from app.core.models import User, ConversationSession
+from app.payroll.models import PayrollCompany
+from app.core.messaging.phone_directory import PhoneRoute, phone_directory
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +35,11 @@ ATS_KEYWORDS = [
 PAYROLL_PREFIXES = ['#nomina', '#payroll', '#rh', '#hr']
 ATS_PREFIXES = ['#ats', '#vacantes', '#recruiting']
 
+# Empresas resueltas en memoria: acotadas y con TTL, porque un cambio en otro
+# proceso (empresa desactivada, número reasignado) no llega a esta caché
+COMPANY_CACHE_SIZE = 1000
+COMPANY_CACHE_TTL = 300
+
 
 class WhatsAppMessageDispatcher:
     """
@@ -48,6 +53,9 @@ class WhatsAppMessageDispatcher:
         self.ats_handlers = {}  # Map de empresas a sus handlers ATS
         self.payroll_handlers = {}  # Map de empresas a sus handlers Payroll
         
+        # Cache de empresas ya resueltas por el directorio de teléfonos
+        self.companies = TTLCache(maxsize=COMPANY_CACHE_SIZE, ttl=COMPANY_CACHE_TTL)  # (sistema, id) -> empresa
+        
         # Cache de sesiones activas
         self.active_sessions = {}  # Map de números de teléfono a sesiones
         
@@ -97,11 +105,13 @@ class WhatsAppMessageDispatcher:
             }
     
     def _normalize_phone(self, phone: str) -> str:
-        """Normaliza formato de número telefónico"""
-        # Eliminar formato WhatsApp
-        phone = phone.replace('@c.us', '').replace('@g.us', '')
+        """Normaliza el número a E.164 (mismo formato que el directorio de teléfonos)"""
+        normalized = phone_directory.normalize(phone)
+        if normalized:
+            return normalized
         
-        # Asegurar formato internacional
+        # Número no reconocible: conservar el formato anterior para la sesión
+        phone = phone.replace('@c.us', '').replace('@g.us', '')
         if not phone.startswith('+'):
             # Asumir México si no tiene código país
             if phone.startswith('52'):
@@ -135,9 +145,10 @@ class WhatsAppMessageDispatcher:
             # Continuar con la misma empresa y sistema de la sesión
             return session['company'], session['system']
         
-        # Buscar usuario en ambos sistemas
-        payroll_company = self._find_payroll_company(phone)
-        ats_company = self._find_ats_company(phone)
+        # Buscar usuario en ambos sistemas (una sola consulta al directorio)
+        routes = phone_directory.lookup(phone)
+        payroll_company = self._find_payroll_company(phone, routes)
+        ats_company = self._find_ats_company(phone, routes)
         
         if payroll_company and not ats_company:
             return payroll_company, "payroll"
@@ -193,51 +204,33 @@ class WhatsAppMessageDispatcher:
             # Por defecto, ir a ATS
             return "ats"
     
-    def _find_payroll_company(self, phone: str) -> Optional[PayrollCompany]:
-        """Busca una empresa Payroll por número de teléfono de empleado"""
-        try:
-            # Buscar empleado por teléfono
-            employee = PayrollEmployee.objects.filter(
-                Q(phone__contains=phone) | Q(whatsapp_phone__contains=phone)
-            ).select_related('company').first()
-            
-            if employee:
-                return employee.company
-                
-            # Buscar empresa directamente
-            company = PayrollCompany.objects.filter(
-                Q(whatsapp_phone_number__contains=phone) | 
-                Q(contact_phone__contains=phone)
-            ).first()
-            
-            return company
-            
-        except Exception as e:
-            logger.error(f"Error finding payroll company: {str(e)}")
-            return None
+    def _find_payroll_company(self, phone: str, routes: Optional[List[PhoneRoute]] = None) -> Optional[PayrollCompany]:
+        """Busca una empresa Payroll por teléfono de empleado o número de WhatsApp de la empresa"""
+        return self._company_for(phone, "payroll", PayrollCompany, routes)
     
-    def _find_ats_company(self, phone: str) -> Optional[Company]:
-        """Busca una empresa ATS por número de teléfono"""
+    def _find_ats_company(self, phone: str, routes: Optional[List[PhoneRoute]] = None) -> Optional[Company]:
+        """Busca una empresa ATS por el teléfono de uno de sus contactos"""
+        return self._company_for(phone, "ats", Company, routes)
+    
+    def _company_for(self, phone: str, system: str, model, routes: Optional[List[PhoneRoute]]) -> Any:
+        """Resuelve la empresa del sistema con el directorio de teléfonos (sin escanear tablas)"""
         try:
-            # Buscar empresa por teléfono
-            company = Company.objects.filter(
-                Q(whatsapp_phone__contains=phone) |
-                Q(contact_phone__contains=phone)
-            ).first()
-            
-            # Si no encontramos empresa, buscar usuarios
-            if not company:
-                user = User.objects.filter(
-                    Q(phone__contains=phone) | Q(whatsapp_phone__contains=phone)
-                ).first()
-                
-                if user and hasattr(user, 'company'):
-                    company = user.company
+            if routes is None:
+                routes = phone_directory.lookup(phone)
+            route = next((route for route in routes if route.system == system), None)
+            if route is None:
+                return None
             
+            key = (system, route.company_id)
+            company = self.companies.get(key)
+            if company is None:
+                company = model.objects.filter(pk=route.company_id).first()
+                if company is not None:
+                    self.companies[key] = company
             return company
             
         except Exception as e:
-            logger.error(f"Error finding ATS company: {str(e)}")
+            logger.error(f"Error finding {system} company: {str(e)}")
             return None
     
     def _update_session(self, phone: str, company: Any, system: str) -> Dict[str, Any]:
@@ -0,0 +1,50 @@
+"""
+Comando de Django para reconstruir los rollups del dashboard.
+
+Las señales mantienen ``DashboardRollup`` al día, pero no ven los
+``update()`` masivos ni las cargas de datos. Este comando recalcula desde las
+tablas fuente la ventana indicada (por defecto los últimos 2 días) y el estado
+actual del pipeline. Se ejecuta cada noche desde Celery beat; con ``--days``
+grande sirve para la carga inicial.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app.ats.dashboard.rollups import SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los rollups precalculados de los dashboards desde las tablas fuente'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Días hacia atrás a recalcular (por defecto 2)'
+        )
+        parser.add_argument(
+            '--source',
+            action='append',
+            choices=[source.model_name for source in SOURCES],
+            help='Modelo fuente a recalcular (se puede repetir; por defecto todos)'
+        )
+        parser.add_argument(
+            '--skip-stock',
+            action='store_true',
+            help='No recalcular las métricas de estado actual (pipeline)'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days debe ser mayor que 0')
+
+        sources = [source for source in SOURCES if not options['source'] or source.model_name in options['source']]
+        start = timezone.now() - timedelta(days=options['days'])
+        written = rebuild(start, sources=sources, include_stock=not options['skip_stock'])
+        for model_name, cells in written.items():
+            self.stdout.write(f"{model_name:<16} {cells:>9} celdas")
+        self.stdout.write(self.style.SUCCESS(f"Rollups reconstruidos desde {start:%Y-%m-%d}"))
@@ -0,0 +1,50 @@
+"""
+Comando de Django para normalizar a E.164 los teléfonos del directorio de
+WhatsApp (empleados y empresas de nómina, candidatos) en lotes.
+
+Los registros nuevos se normalizan al guardarse; este comando sirve para los
+existentes y para vaciar las rutas en caché::
+
+    python manage.py backfill_phone_directory
+    python manage.py backfill_phone_directory --all --lookup 5215512345678
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.core.messaging.phone_directory import CHUNK_SIZE, phone_directory
+
+
+class Command(BaseCommand):
+    help = 'Normaliza a E.164 los teléfonos usados para enrutar mensajes de WhatsApp'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recalcula todos los números, no sólo los que faltan'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Filas por lote (por defecto: 5000)')
+        parser.add_argument(
+            '--lookup',
+            type=str,
+            default=None,
+            help='Número a resolver al terminar, para comprobar el enrutamiento'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = phone_directory.backfill(only_missing=not options['all'], chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        for source, count in counts.items():
+            self.stdout.write(f"{source:<18} {count:>8}")
+        self.stdout.write(self.style.SUCCESS(f"Teléfonos normalizados en {elapsed:.1f}s"))
+
+        if options['lookup']:
+            routes = phone_directory.lookup(options['lookup'])
+            self.stdout.write(f"{phone_directory.normalize(options['lookup']) or options['lookup']}:")
+            for route in routes:
+                self.stdout.write(f"  {route.system:<8} empresa={route.company_id} persona={route.person_id} ({route.source})")
+            if not routes:
+                self.stdout.write('  (sin rutas)')
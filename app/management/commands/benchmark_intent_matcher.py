@@ -0,0 +1,95 @@
+"""
+Comando de Django para medir el throughput del matcher de intents.
+
+Compara, en un solo núcleo, la detección anterior (cadenas de ``any()`` en
+``ChatBotHandler`` y regex reconstruidas por llamada en ``NLPProcessor``)
+contra el matcher compilado de ``app.ats.chatbot.nlp.intent_matcher``.
+"""
+
+import re
+import time
+from django.core.management.base import BaseCommand
+
+from app.ats.chatbot.nlp.intent_matcher import (
+    BU_INTENT_KEYWORDS, GENERAL_INTENT_KEYWORDS, NLP_INTENT_PATTERNS,
+    PROFILE_CHATBOT, PROFILE_NLP, CompiledIntentMatcher, build_rules,
+    _load_pattern_rows,
+)
+
+SAMPLE_MESSAGES = [
+    "Hola, buenos días",
+    "me interesa la vacante de gerente de ventas en monterrey, cuándo puedo agendar?",
+    "ok gracias",
+    "quisiera saber más sobre el proceso y los requisitos para aplicar por favor",
+    "necesito ayuda con mi perfil, no puedo subir el cv",
+    "cuál es el salario de la oferta?",
+    "quiero actualizar perfil y cambiar mis datos de contacto",
+    "tengo una duda sobre la entrevista de mañana",
+]
+
+
+def legacy_detect_intent_local(text: str, bu_key: str) -> str:
+    """Réplica de la implementación anterior basada en subcadenas."""
+    text_lower = text.lower()
+    for intent, words in BU_INTENT_KEYWORDS.get(bu_key, []) + GENERAL_INTENT_KEYWORDS:
+        if any(word in text_lower for word in words):
+            return intent
+    return "unknown"
+
+
+def legacy_detect_intent_patterns(text: str) -> str:
+    """Réplica de la implementación anterior con el dict de regex por llamada."""
+    intent_patterns = {intent: list(patterns) for intent, patterns in NLP_INTENT_PATTERNS}
+    detected = []
+    for intent, patterns in intent_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                detected.append(intent)
+    return detected[0] if detected else "general_inquiry"
+
+
+class Command(BaseCommand):
+    help = 'Mide mensajes/segundo por núcleo del matcher de intents antes y después'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20000,
+            help='Número de mensajes a procesar por variante (por defecto: 20000)'
+        )
+        parser.add_argument(
+            '--business-unit',
+            type=str,
+            default='huntred',
+            help='Clave de la unidad de negocio (por defecto: huntred)'
+        )
+        parser.add_argument(
+            '--with-db-patterns',
+            action='store_true',
+            help='Incluye las filas activas de IntentPattern en el matcher compilado'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        bu_key = options['business_unit']
+        rows = _load_pattern_rows() if options['with_db_patterns'] else []
+        messages = [SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)] for i in range(iterations)]
+
+        chatbot_matcher = CompiledIntentMatcher(build_rules(bu_key, PROFILE_CHATBOT, rows))
+        nlp_matcher = CompiledIntentMatcher(build_rules(bu_key, PROFILE_NLP, rows))
+
+        variants = [
+            ('chatbot (anterior)', lambda text: legacy_detect_intent_local(text, bu_key)),
+            ('chatbot (compilado)', chatbot_matcher.best),
+            ('nlp (anterior)', legacy_detect_intent_patterns),
+            ('nlp (compilado)', nlp_matcher.best),
+        ]
+
+        self.stdout.write(f"Mensajes: {iterations} | BU: {bu_key} | reglas chatbot: {len(chatbot_matcher.rules)}")
+        for name, detect in variants:
+            started = time.perf_counter()
+            for text in messages:
+                detect(text)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{name:<22} {iterations / elapsed:>12,.0f} msg/s por núcleo")
@@ -0,0 +1,82 @@
+"""
+Comando de Django para medir el throughput de las APIs batch del NLP.
+
+Compara, sobre los mismos textos, el bucle texto por texto
+(``_analyze_sentiment_realtime`` / ``_extract_entities``) contra
+``iter_sentiments`` / ``iter_entities`` con ``nlp.pipe`` y mini-lotes de
+RoBERTa. Cada variante usa un procesador nuevo para no compartir cachés.
+"""
+
+import asyncio
+import time
+from django.core.management.base import BaseCommand
+
+from app.ats.chatbot.nlp.nlp import NLP_BATCH_SIZE, NLPProcessor
+
+SAMPLE_TEXTS = [
+    "El proceso de selección fue excelente y muy rápido",
+    "No recibí respuesta después de la entrevista en Monterrey",
+    "La reclutadora de Grupo huntRED me explicó todo con claridad",
+    "Pésima experiencia, cambiaron la fecha tres veces",
+    "Me interesa la vacante de gerente de ventas en Guadalajara",
+    "Gracias por la retroalimentación, fue muy útil",
+]
+
+
+class Command(BaseCommand):
+    help = 'Mide textos/segundo del análisis de sentimiento y entidades, uno a uno vs en lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--texts',
+            type=int,
+            default=2000,
+            help='Número de textos a procesar (por defecto: 2000)'
+        )
+        parser.add_argument(
+            '--unique',
+            type=float,
+            default=1.0,
+            help='Fracción de textos distintos entre 0 y 1 (por defecto: 1.0)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=NLP_BATCH_SIZE,
+            help=f'Tamaño de mini-lote (por defecto: {NLP_BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        total = options['texts']
+        distinct = max(1, int(total * options['unique']))
+        texts = [
+            f"{SAMPLE_TEXTS[index % len(SAMPLE_TEXTS)]} (caso {index % distinct})"
+            for index in range(total)
+        ]
+
+        # Carga los modelos antes de medir
+        warm = NLPProcessor()
+        asyncio.run(warm._analyze_sentiment_realtime("hola"))
+        asyncio.run(warm._extract_entities("hola"))
+
+        async def one_by_one(processor):
+            for text in texts:
+                await processor._analyze_sentiment_realtime(text)
+                await processor._extract_entities(text)
+
+        def batched(processor):
+            list(processor.iter_sentiments(texts, options['batch_size']))
+            list(processor.iter_entities(texts, options['batch_size']))
+
+        started = time.perf_counter()
+        asyncio.run(one_by_one(NLPProcessor()))
+        loop_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batched(NLPProcessor())
+        batch_seconds = time.perf_counter() - started
+
+        self.stdout.write(f"Textos: {total} ({distinct} distintos), lote {options['batch_size']}")
+        self.stdout.write(f"uno a uno  {loop_seconds:>8.2f}s  {total / loop_seconds:>9.1f} textos/s")
+        self.stdout.write(f"en lote    {batch_seconds:>8.2f}s  {total / batch_seconds:>9.1f} textos/s")
+        self.stdout.write(f"Aceleración: {loop_seconds / batch_seconds:.1f}x")
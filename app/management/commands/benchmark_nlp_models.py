@@ -0,0 +1,116 @@
+"""
+Comando de Django para medir la carga de los modelos NLP.
+
+Muestra, por modelo del registro compartido, el tiempo de carga y la memoria
+residente que agregó. Con ``--workers`` simula el esquema de Gunicorn/Celery:
+el proceso actual precarga (o no) los modelos seguros para fork y después
+crea N hijos; cada hijo usa los modelos y reporta su memoria privada (USS),
+que es lo que realmente cuesta cada worker adicional.
+"""
+
+import json
+import os
+import time
+from django.core.management.base import BaseCommand
+
+from app.ats.chatbot.nlp.model_registry import (
+    DEFAULT_PRELOAD_MODELS, current_rss_mb, model_registry, preload_for_fork,
+)
+
+
+def private_memory_mb() -> float:
+    """Memoria privada (Private_Clean + Private_Dirty) del proceso en MB."""
+    try:
+        total_kb = 0
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                    total_kb += int(line.split()[1])
+        return total_kb / 1024
+    except OSError:
+        return current_rss_mb()
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo de carga y memoria de los modelos NLP (lazy, precarga y modo ligero)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models',
+            type=str,
+            default=','.join(DEFAULT_PRELOAD_MODELS),
+            help='Modelos separados por comas (por defecto: los de precarga)'
+        )
+        parser.add_argument(
+            '--light',
+            action='store_true',
+            help='Activa el modo ligero (omite los modelos pesados)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=0,
+            help='Número de procesos hijo a crear con fork (por defecto: 0)'
+        )
+        parser.add_argument(
+            '--no-preload',
+            action='store_true',
+            help='No precargar en el padre antes del fork (cada hijo carga sus modelos)'
+        )
+
+    def handle(self, *args, **options):
+        if options['light']:
+            model_registry.light_mode = True
+        names = [name.strip() for name in options['models'].split(',') if name.strip()]
+
+        started = time.perf_counter()
+        import app.ats.chatbot.nlp.nlp  # noqa: F401  Registra los loaders
+        self.stdout.write(f"Importación del módulo NLP: {time.perf_counter() - started:.2f}s")
+
+        if options['workers'] <= 0:
+            for name in names:
+                model_registry.get(name)
+            self._print_stats(model_registry.stats())
+            return
+
+        if not options['no_preload']:
+            preload_for_fork(names)
+            self.stdout.write(f"Padre tras precarga: {current_rss_mb():.1f} MB RSS")
+
+        children = []
+        for _ in range(options['workers']):
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                child_started = time.perf_counter()
+                for name in names:
+                    model_registry.get(name)
+                report = {
+                    'seconds': time.perf_counter() - child_started,
+                    'rss_mb': current_rss_mb(),
+                    'private_mb': private_memory_mb(),
+                }
+                with os.fdopen(write_fd, 'w') as pipe:
+                    pipe.write(json.dumps(report))
+                os._exit(0)
+            os.close(write_fd)
+            children.append((pid, read_fd))
+
+        for index, (pid, read_fd) in enumerate(children, start=1):
+            with os.fdopen(read_fd) as pipe:
+                report = json.loads(pipe.read() or '{}')
+            os.waitpid(pid, 0)
+            self.stdout.write(
+                f"worker {index:>3}  listo en {report.get('seconds', 0):>6.2f}s  "
+                f"RSS {report.get('rss_mb', 0):>8.1f} MB  privada {report.get('private_mb', 0):>8.1f} MB"
+            )
+
+    def _print_stats(self, stats):
+        process = stats.pop('_process')
+        for name, model in stats.items():
+            status = 'cargado' if model['loaded'] else (model['skipped'] or model['error'] or 'sin cargar')
+            self.stdout.write(
+                f"{name:<18} {status:<14} {model['load_seconds']:>7.2f}s  {model['rss_delta_mb']:>+8.1f} MB"
+            )
+        self.stdout.write(f"Proceso {process['pid']}: {process['rss_mb']:.1f} MB RSS (modo ligero: {process['light_mode']})")
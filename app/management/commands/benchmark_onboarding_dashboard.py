@@ -0,0 +1,84 @@
+"""
+Comando de Django para medir el API de datos del dashboard de onboarding.
+
+Ejecuta cada tipo de datos de ``DashboardDataAPI`` sobre la base de datos
+actual y reporta tiempo y número de consultas. Con ``--max-queries`` falla si
+algún panel supera el presupuesto, para usarlo como prueba de regresión: el
+número de consultas no debe crecer con el número de procesos de onboarding.
+"""
+
+import time
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.ats.onboarding.dashboard_api import DashboardDataAPI
+from app.models import OnboardingProcess
+
+DATA_TYPES = {
+    'summary': 'get_summary_data',
+    'satisfaction_trend': 'get_satisfaction_trend',
+    'onboarding_metrics': 'get_onboarding_metrics',
+    'candidate_satisfaction': 'get_candidate_satisfaction',
+    'client_satisfaction': 'get_client_satisfaction',
+}
+
+
+def run_panel(api, method_name, business_unit_id, empresa_id, start_date):
+    """Ejecuta un panel y devuelve (segundos, consultas)."""
+    # async_to_sync hace que las consultas corran en este hilo y se capturen
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        async_to_sync(getattr(api, method_name))(business_unit_id, empresa_id, start_date)
+        elapsed = time.perf_counter() - started
+    return elapsed, len(queries.captured_queries)
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y consultas de cada panel del dashboard de onboarding'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Ventana de datos en días (por defecto: 90)'
+        )
+        parser.add_argument('--business-unit', type=int, default=None, help='Filtrar por unidad de negocio')
+        parser.add_argument('--empresa', type=int, default=None, help='Filtrar por empresa')
+        parser.add_argument(
+            '--data-type',
+            action='append',
+            choices=list(DATA_TYPES),
+            help='Panel a medir (se puede repetir; por defecto todos)'
+        )
+        parser.add_argument(
+            '--max-queries',
+            type=int,
+            default=None,
+            help='Falla si algún panel ejecuta más consultas que este límite'
+        )
+
+    def handle(self, *args, **options):
+        api = DashboardDataAPI()
+        start_date = timezone.now() - timedelta(days=options['days'])
+        processes = OnboardingProcess.objects.filter(hire_date__gte=start_date).count()
+        self.stdout.write(f"Procesos de onboarding en la ventana: {processes:,}")
+
+        over_budget = []
+        for data_type in options['data_type'] or DATA_TYPES:
+            elapsed, queries = run_panel(
+                api, DATA_TYPES[data_type], options['business_unit'], options['empresa'], start_date
+            )
+            self.stdout.write(f"{data_type:<24} {elapsed * 1000:>9.1f} ms {queries:>4} consultas")
+            if options['max_queries'] is not None and queries > options['max_queries']:
+                over_budget.append(f"{data_type} ({queries})")
+
+        if over_budget:
+            raise CommandError(
+                f"Paneles sobre el límite de {options['max_queries']} consultas: {', '.join(over_budget)}"
+            )
@@ -0,0 +1,117 @@
+"""
+Comando de Django para medir la construcción del grafo organizacional.
+
+Compara, con personas sintéticas, la construcción anterior de
+``NetworkAnalyzer`` (comparación de todos los pares y reescaneo de la lista
+por persona) contra ``OrganizationalGraphBuilder`` por bloques.
+"""
+
+import random
+import time
+from django.core.management.base import BaseCommand
+
+import networkx as nx
+
+from app.ml.aura.organizational.org_graph_builder import (
+    HIERARCHY_LEVELS, RELATED_DEPARTMENTS, OrganizationalGraphBuilder,
+)
+
+DEPARTMENTS = ['Engineering', 'Product', 'Design', 'Sales', 'Marketing', 'HR', 'Finance', 'Operations']
+POSITIONS = ['Junior'] * 50 + ['Senior'] * 30 + ['Manager'] * 12 + ['Director'] * 5 + ['VP'] * 2 + ['CEO']
+
+
+def synthetic_people(count: int, business_units: int, seed: int = 42):
+    """Genera filas con los mismos campos que lee el constructor."""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': person_id,
+            'name': f"Persona {person_id}",
+            'position': rng.choice(POSITIONS),
+            'department': rng.choice(DEPARTMENTS),
+            'business_unit': f"BU{person_id % business_units}",
+        }
+        for person_id in range(1, count + 1)
+    ]
+
+
+def legacy_build(persons):
+    """Réplica de la construcción anterior de NetworkAnalyzer."""
+    level = lambda p: HIERARCHY_LEVELS.get(p['position'], 0)
+    related = set(RELATED_DEPARTMENTS) | {(b, a) for a, b in RELATED_DEPARTMENTS}
+    G = nx.Graph()
+    for person in persons:
+        G.add_node(person['id'], **person)
+    for i, person1 in enumerate(persons):
+        for person2 in persons[i + 1:]:
+            if person1['department'] == person2['department']:
+                G.add_edge(person1['id'], person2['id'], weight=0.8, type='collaboration')
+            elif (person1['department'], person2['department']) in related:
+                G.add_edge(person1['id'], person2['id'], weight=0.5, type='collaboration')
+    for person in persons:
+        if person['position'] != 'CEO':
+            superiors = [p for p in persons if level(p) > level(person)]
+            for superior in superiors[:2]:
+                G.add_edge(person['id'], superior['id'], weight=0.9, type='communication')
+    for person in persons:
+        if person['position'] in ['Manager', 'Director', 'VP']:
+            for subordinate in [p for p in persons if level(p) < level(person)]:
+                G.add_edge(person['id'], subordinate['id'], weight=0.7, type='hierarchical')
+    return G
+
+
+class Command(BaseCommand):
+    help = 'Mide la construcción del grafo organizacional a 1k/10k/50k personas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            default='1000,10000,50000',
+            help='Tamaños de organización separados por comas (por defecto: 1000,10000,50000)'
+        )
+        parser.add_argument(
+            '--business-units',
+            type=int,
+            default=5,
+            help='Número de unidades de negocio sintéticas (por defecto: 5)'
+        )
+        parser.add_argument(
+            '--max-clique',
+            type=int,
+            default=None,
+            help='Tamaño de grupo a partir del cual se acotan las aristas'
+        )
+        parser.add_argument(
+            '--legacy-limit',
+            type=int,
+            default=2000,
+            help='Tamaño máximo en el que se ejecuta la construcción anterior (por defecto: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        builder_kwargs = {'max_clique': options['max_clique']} if options['max_clique'] else {}
+        builder = OrganizationalGraphBuilder(**builder_kwargs)
+
+        for size in sizes:
+            persons = synthetic_people(size, options['business_units'])
+
+            started = time.perf_counter()
+            graph = builder.build_from_rows(iter(persons))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{size:>7} personas | por bloques: {elapsed:>8.2f}s "
+                f"({graph.number_of_edges():,} conexiones)"
+            )
+
+            if size > options['legacy_limit']:
+                self.stdout.write(f"{'':>7}          | anterior: omitido (> --legacy-limit)")
+                continue
+            started = time.perf_counter()
+            legacy_graph = legacy_build(persons)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{'':>7}          | anterior:     {elapsed:>8.2f}s "
+                f"({legacy_graph.number_of_edges():,} conexiones)"
+            )
@@ -0,0 +1,57 @@
+"""
+Comando de Django para construir el índice de similitud por habilidades.
+
+Indexa candidatos, vacantes y tarjetas Kanban (MinHash-LSH en Redis). Las
+señales lo mantienen al día; este comando sirve para la carga inicial, tras
+cambiar el diccionario de habilidades o para medir consultas::
+
+    python manage.py build_similarity_index --kind card --clear
+    python manage.py build_similarity_index --kind person --query 42
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.ml.core.features.similarity_index import ENTITY_KINDS, similarity_index
+
+
+class Command(BaseCommand):
+    help = 'Construye el índice de similitud por habilidades (candidatos, vacantes, tarjetas Kanban)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=ENTITY_KINDS,
+            help='Tipo de entidad (se puede repetir; por defecto todos)'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Borra el índice del tipo antes de reconstruirlo'
+        )
+        parser.add_argument(
+            '--query',
+            type=str,
+            default=None,
+            help='Clave de una entidad para mostrar sus más parecidas y el tiempo de consulta'
+        )
+        parser.add_argument('--top', type=int, default=10, help='Resultados de --query (por defecto: 10)')
+
+    def handle(self, *args, **options):
+        kinds = options['kind'] or list(ENTITY_KINDS)
+        for kind in kinds:
+            started = time.perf_counter()
+            changed = similarity_index.build(kind, clear=options['clear'])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{kind:<8} {changed:>8} entidades indexadas  {elapsed:>7.2f}s")
+
+            if options['query']:
+                started = time.perf_counter()
+                matches = similarity_index.similar(kind, key=options['query'], k=options['top'])
+                elapsed = (time.perf_counter() - started) * 1000
+                found = ', '.join(f"{key} ({score:.2f})" for key, score in matches)
+                self.stdout.write(f"{'':<8} {found or '(sin resultados)'} ({elapsed:.2f} ms)")
+
+        self.stdout.write(self.style.SUCCESS('Índice de similitud actualizado'))
@@ -0,0 +1,51 @@
+"""
+Comando de Django para compilar los diccionarios de habilidades.
+
+Construye y guarda en disco el diccionario por defecto y el de cada unidad de
+negocio, para que los workers sólo tengan que cargarlos. Conviene ejecutarlo
+en cada despliegue o al actualizar los catálogos.
+"""
+
+import time
+from django.core.management.base import BaseCommand
+
+from app.ats.utils.skills.skill_dictionary import BU_SKILL_ONTOLOGY, get_skill_dictionary
+
+
+class Command(BaseCommand):
+    help = 'Compila y guarda en disco los diccionarios de habilidades (default y por BU)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--business-units',
+            type=str,
+            default=None,
+            help='BUs separadas por comas (por defecto: default y todas las de la ontología)'
+        )
+        parser.add_argument(
+            '--sample',
+            type=str,
+            default=None,
+            help='Texto de prueba para mostrar las habilidades extraídas'
+        )
+
+    def handle(self, *args, **options):
+        if options['business_units']:
+            business_units = [bu.strip() for bu in options['business_units'].split(',') if bu.strip()]
+        else:
+            business_units = [None] + sorted(BU_SKILL_ONTOLOGY)
+
+        for bu_name in business_units:
+            started = time.perf_counter()
+            dictionary = get_skill_dictionary(bu_name)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{bu_name or 'default':<18} {len(dictionary):>7} habilidades "
+                f"{len(dictionary.surfaces):>7} formas  {elapsed:>6.2f}s"
+            )
+            if options['sample']:
+                started = time.perf_counter()
+                matches = dictionary.extract(options['sample'])
+                elapsed = (time.perf_counter() - started) * 1000
+                found = ', '.join(f"{match.text}->{match.skill_id}" for match in matches)
+                self.stdout.write(f"{'':<18} {found or '(sin coincidencias)'} ({elapsed:.2f} ms)")
@@ -0,0 +1,31 @@
+"""
+Comando de Django para mantener el feature store de matchmaking.
+
+Las matrices son append-only: cada entidad recalculada deja su fila anterior
+como basura. Este comando muestra el tamaño de cada matriz y, con
+``--compact``, la reescribe sólo con las filas vivas.
+"""
+
+from django.core.management.base import BaseCommand
+
+from app.ml.core.features.feature_store import FeatureStore
+
+
+class Command(BaseCommand):
+    help = 'Muestra y compacta las matrices del feature store de matchmaking'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Reescribe las matrices dejando sólo las filas vivas'
+        )
+
+    def handle(self, *args, **options):
+        store = FeatureStore()
+        for kind, stats in store.stats().items():
+            self.stdout.write(f"{kind:<10} {stats['entities']:>9} entidades {stats['rows']:>9} filas {stats['mb']:>9.1f} MB")
+
+        if options['compact']:
+            for kind, (before, after) in store.compact().items():
+                self.stdout.write(f"{kind:<10} compactado: {before} -> {after} filas")
@@ -0,0 +1,58 @@
+"""
+Comando de Django para deduplicar candidatos (``Person``).
+
+Recorre la tabla en streaming por cada clave de bloqueo (correo, teléfono
+E.164, nombre fonético + empresa) y fusiona los duplicados en el registro de
+ID menor::
+
+    python manage.py deduplicate_candidates --keys-only
+    python manage.py deduplicate_candidates --dry-run
+    python manage.py deduplicate_candidates --chunk-size 20000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.ats.utils.dedup import DedupEngine
+
+
+class Command(BaseCommand):
+    help = 'Deduplica candidatos por correo, teléfono y nombre fonético + empresa'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sólo reporta los grupos de duplicados, sin fusionar ni eliminar'
+        )
+        parser.add_argument(
+            '--keys-only',
+            action='store_true',
+            help='Sólo calcula las claves de deduplicación'
+        )
+        parser.add_argument(
+            '--all-keys',
+            action='store_true',
+            help='Recalcula las claves de todos los candidatos, no sólo las que faltan'
+        )
+        parser.add_argument('--chunk-size', type=int, default=None, help='Filas por lote (por defecto: 5000)')
+
+    def handle(self, *args, **options):
+        engine = DedupEngine(chunk_size=options['chunk_size'])
+
+        started = time.perf_counter()
+        refreshed = engine.refresh_keys(only_missing=not options['all_keys'])
+        self.stdout.write(f"Claves calculadas: {refreshed} ({time.perf_counter() - started:.1f}s)")
+        if options['keys_only']:
+            return
+
+        started = time.perf_counter()
+        result = engine.deduplicate(dry_run=options['dry_run'], refresh=False)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Grupos: {result['groups']}  duplicados: {result['duplicates']}  ({elapsed:.1f}s)")
+        if options['dry_run']:
+            for group in result['sample']:
+                self.stdout.write(f"  {', '.join(str(person_id) for person_id in group)}")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Duplicados eliminados: {len(result['removed'])}"))
@@ -12,8 +12,8 @@ from django.utils import timezone
 from django.db import transaction
 
 from app.models import Vacante, BusinessUnit
-from app.ats.services.interview_service import InterviewService
-from app.ats.utils.vacantes import requiere_slots_grupales
+from app.ats.services.interview_slots import slot_calendar, slot_times
+from app.ats.utils.Events import Event, EventType
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +65,12 @@ class Command(BaseCommand):
             help='Forzar generación incluso si ya existen slots'
         )
         
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Liga a su vacante los slots anteriores y recalcula los cupos reservados antes de generar'
+        )
+        
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -83,6 +89,12 @@ class Command(BaseCommand):
             force = options.get('force')
             dry_run = options.get('dry_run')
             
+            if options.get('backfill') and not dry_run:
+                counts = slot_calendar.backfill()
+                self.stdout.write(
+                    f"Slots ligados a su vacante: {counts['linked']} - cupos recalculados: {counts['recounted']}"
+                )
+            
             # Establecer fechas por defecto
             if start_date_str:
                 start_date = datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
@@ -138,10 +150,9 @@ class Command(BaseCommand):
                 self.stdout.write(f"Procesando vacante: {vacancy.titulo}")
                 
                 # Verificar si ya existen slots para esta vacante
-                from app.ats.utils.Events import Event, EventType
                 existing_slots = Event.objects.filter(
+                    vacancy=vacancy,
                     event_type=EventType.ENTREVISTA,
-                    description__icontains=str(vacancy.id),
                     start_time__gte=start_date,
                     start_time__lte=end_date
                 ).count()
@@ -155,34 +166,16 @@ class Command(BaseCommand):
                     )
                     continue
                 
-                # Crear servicio de entrevistas
-                interview_service = InterviewService(vacancy.business_unit)
-                
                 if dry_run:
                     # Calcular cuántos slots se generarían
-                    current_date = start_date.replace(hour=9, minute=0, second=0, microsecond=0)
-                    slots_count = 0
-                    
-                    while current_date <= end_date:
-                        if current_date.weekday() < 5:  # Lunes a viernes
-                            current_time = current_date.replace(hour=9, minute=0, second=0, microsecond=0)
-                            end_time = current_date.replace(hour=17, minute=0, second=0, microsecond=0)
-                            day_slots = 0
-                            
-                            while current_time < end_time and day_slots < max_slots_per_day:
-                                slots_count += 1
-                                day_slots += 1
-                                current_time += timedelta(minutes=slot_duration)
-                        
-                        current_date += timedelta(days=1)
-                    
+                    slots_count = len(slot_times(start_date, end_date, slot_duration, max_slots_per_day))
                     self.stdout.write(f"  Se generarían {slots_count} slots")
                     total_slots_created += slots_count
                 else:
-                    # Generar slots reales
+                    # Generar slots reales (un bulk_create por vacante; los existentes se saltan)
                     try:
                         with transaction.atomic():
-                            created_slots = interview_service.generate_interview_slots(
+                            created_slots = slot_calendar.generate(
                                 vacancy=vacancy,
                                 start_date=start_date,
                                 end_date=end_date,
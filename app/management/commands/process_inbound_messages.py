@@ -0,0 +1,91 @@
+"""
+Comando de Django para consumir la cola de mensajes entrantes de los canales.
+
+Los webhooks sólo encolan; este proceso lee los streams de Redis por lotes y
+procesa cada usuario en orden, con usuarios distintos en paralelo. Para
+escalar se lanzan varios procesos por canal repartiendo las particiones::
+
+    python manage.py process_inbound_messages --channel whatsapp --worker 0 --workers 2
+    python manage.py process_inbound_messages --channel whatsapp --worker 1 --workers 2
+
+Al arrancar se reprocesan los mensajes entregados y no confirmados.
+"""
+
+import asyncio
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.ats.integrations.channels.http_clients import outbound_http
+from app.ats.integrations.channels.inbound_queue import PROCESSORS, InboundConsumer, inbound_queue
+
+
+class Command(BaseCommand):
+    help = 'Consume la cola de mensajes entrantes (WhatsApp, Telegram, Messenger, Instagram)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--channel',
+            action='append',
+            choices=list(PROCESSORS),
+            help='Canal a consumir (se puede repetir; por defecto todos)'
+        )
+        parser.add_argument('--worker', type=int, default=0, help='Índice de este proceso (por defecto: 0)')
+        parser.add_argument('--workers', type=int, default=1, help='Procesos por canal (por defecto: 1)')
+        parser.add_argument('--batch-size', type=int, default=100, help='Mensajes por lote (por defecto: 100)')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=20,
+            help='Usuarios procesados en paralelo (por defecto: 20)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesar lo pendiente y terminar'
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options['worker'] < options['workers']:
+            raise CommandError('--worker debe estar entre 0 y --workers - 1')
+        if not inbound_queue.available:
+            raise CommandError('Redis no está disponible; los webhooks procesan en línea')
+
+        consumers = [
+            InboundConsumer(
+                channel,
+                worker=options['worker'],
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+            )
+            for channel in options['channel'] or PROCESSORS
+        ]
+        for consumer in consumers:
+            self.stdout.write(f"{consumer.channel:<10} particiones {consumer.partitions}")
+
+        stats = asyncio.run(self._run(consumers, options['once']))
+        for channel, channel_stats in stats.items():
+            self.stdout.write(
+                f"{channel:<10} procesados {channel_stats['processed']:>7} "
+                f"fallidos {channel_stats['failed']:>5} lotes {channel_stats['batches']:>6}"
+            )
+        for provider, http_stats in outbound_http.stats().items():
+            self.stdout.write(
+                f"{provider:<10} HTTP {http_stats['requests']:>7} errores {http_stats['errors']:>5} "
+                f"reintentos {http_stats['retries']:>5} p95 {http_stats['latency_p95_ms']:>7} ms"
+            )
+        self.stdout.write(self.style.SUCCESS('Consumidor detenido'))
+
+    async def _run(self, consumers, once):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, lambda: [consumer.stop() for consumer in consumers])
+            except (NotImplementedError, RuntimeError):
+                pass
+        try:
+            await asyncio.gather(*(consumer.run(once=once) for consumer in consumers))
+        finally:
+            await outbound_http.aclose()
+        return {consumer.channel: consumer.stats for consumer in consumers}
@@ -0,0 +1,252 @@
+# app/ml/aura/centrality.py
+"""
+Servicio de centralidad para las redes profesionales de AURA.
+
+Calcula degree, betweenness y closeness de todos los nodos una sola vez por
+revisión del grafo y las guarda en memoria. Cada mutación hecha a través del
+servicio incrementa la revisión y marca como sucios sólo los componentes
+conexos afectados, de modo que al agregar aristas únicamente se recalculan
+esos componentes. En componentes grandes la betweenness se estima con
+k pivotes y la closeness con BFS desde los mismos pivotes.
+"""
+
+import logging
+import random
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+SAMPLE_THRESHOLD = 1000  # nodos por componente a partir de los cuales se muestrea
+SAMPLE_SIZE = 200  # pivotes usados en la estimación
+DEFAULT_SEED = 42
+
+METRIC_NAMES = ('degree_centrality', 'betweenness_centrality', 'closeness_centrality')
+
+
+class CentralityService:
+    """
+    Métricas de centralidad cacheadas por revisión de un ``nx.Graph``.
+
+    Los valores coinciden con ``nx.degree_centrality``, ``nx.betweenness_centrality``
+    y ``nx.closeness_centrality`` (sin pesos) cuando no se muestrea. Las
+    mutaciones hechas directamente sobre el grafo se detectan por su tamaño;
+    si se modifican atributos sin cambiar el tamaño hay que llamar a
+    ``invalidate``.
+    """
+
+    def __init__(
+        self,
+        graph: Optional[nx.Graph] = None,
+        sample_threshold: int = SAMPLE_THRESHOLD,
+        sample_size: int = SAMPLE_SIZE,
+        seed: int = DEFAULT_SEED
+    ):
+        self.graph = graph if graph is not None else nx.Graph()
+        self.sample_threshold = sample_threshold
+        self.sample_size = sample_size
+        self.seed = seed
+        self.revision = 0
+        self._lock = threading.Lock()
+        self._dirty_nodes: Set[Hashable] = set()
+        self._full_recompute = True
+        self._expected_size = self._size()
+        # Valores crudos por nodo, independientes del tamaño total del grafo
+        self._closeness: Dict[Hashable, Tuple[float, int]] = {}
+        self._betweenness: Dict[Hashable, float] = {}
+        self._sampled_nodes: Set[Hashable] = set()
+        self._cache_revision: Optional[int] = None
+        self._cache: Dict[Hashable, Dict[str, float]] = {}
+
+    # Mutaciones ----------------------------------------------------------
+
+    def _size(self) -> Tuple[int, int]:
+        return self.graph.number_of_nodes(), self.graph.number_of_edges()
+
+    def _touch(self, nodes: Iterable[Hashable] = ()):
+        self._dirty_nodes.update(nodes)
+        self.revision += 1
+        self._expected_size = self._size()
+
+    def add_node(self, node: Hashable, **attrs):
+        """Agrega un nodo; sólo cambia la normalización del resto."""
+        is_new = node not in self.graph
+        self.graph.add_node(node, **attrs)
+        if is_new:
+            self._touch((node,))
+
+    def add_edge(self, u: Hashable, v: Hashable, **attrs):
+        """Agrega una arista y marca como sucio el componente de sus extremos."""
+        is_new = not self.graph.has_edge(u, v)
+        self.graph.add_edge(u, v, **attrs)
+        if is_new:
+            self._touch((u, v))
+
+    def add_edges(self, edges: Iterable[Tuple[Hashable, Hashable, Dict[str, Any]]]):
+        """Agrega varias aristas ``(u, v, atributos)`` con un solo incremento de revisión."""
+        touched = []
+        for u, v, attrs in edges:
+            if not self.graph.has_edge(u, v):
+                touched.extend((u, v))
+            self.graph.add_edge(u, v, **attrs)
+        if touched:
+            self._touch(touched)
+
+    def remove_edge(self, u: Hashable, v: Hashable):
+        """Elimina una arista; el componente puede dividirse y se recalculan ambos lados."""
+        if self.graph.has_edge(u, v):
+            self.graph.remove_edge(u, v)
+            self._touch((u, v))
+
+    def remove_node(self, node: Hashable):
+        """Elimina un nodo y marca como sucios a sus vecinos."""
+        if node in self.graph:
+            neighbors = list(self.graph.neighbors(node))
+            self.graph.remove_node(node)
+            self._touch(neighbors)
+
+    def clear(self):
+        """Vacía el grafo y descarta todas las métricas."""
+        self.graph.clear()
+        self.invalidate()
+
+    def invalidate(self):
+        """Fuerza un recálculo completo en la siguiente consulta."""
+        self._full_recompute = True
+        self._dirty_nodes.clear()
+        self.revision += 1
+        self._expected_size = self._size()
+
+    # Cálculo -------------------------------------------------------------
+
+    def _dirty_components(self) -> List[Set[Hashable]]:
+        if self._full_recompute:
+            return [set(component) for component in nx.connected_components(self.graph)]
+        components = []
+        covered: Set[Hashable] = set()
+        for node in self._dirty_nodes:
+            if node in covered or node not in self.graph:
+                continue
+            component = nx.node_connected_component(self.graph, node)
+            covered.update(component)
+            components.append(component)
+        return components
+
+    def _compute_component(self, component: Set[Hashable]):
+        size = len(component)
+        if size == 1:
+            node = next(iter(component))
+            self._closeness[node] = (0.0, 1)
+            self._betweenness[node] = 0.0
+            self._sampled_nodes.discard(node)
+            return
+
+        # Copia: las vistas filtradas de networkx son muy lentas en BFS repetidos
+        subgraph = self.graph.subgraph(component).copy()
+        sampled = size > self.sample_threshold
+        if not sampled:
+            closeness = nx.closeness_centrality(subgraph, wf_improved=False)
+            betweenness = nx.betweenness_centrality(subgraph, normalized=False)
+        else:
+            closeness = self._sampled_closeness(subgraph)
+            betweenness = nx.betweenness_centrality(
+                subgraph, k=min(self.sample_size, size), normalized=False, seed=self.seed
+            )
+
+        for node in component:
+            self._closeness[node] = (closeness.get(node, 0.0), size)
+            self._betweenness[node] = betweenness.get(node, 0.0)
+        if sampled:
+            self._sampled_nodes.update(component)
+        else:
+            self._sampled_nodes.difference_update(component)
+
+    def _sampled_closeness(self, subgraph: nx.Graph) -> Dict[Hashable, float]:
+        """Estimación de closeness con BFS desde k pivotes (Eppstein-Wang)."""
+        nodes = list(subgraph.nodes())
+        size = len(nodes)
+        pivots = random.Random(self.seed).sample(nodes, min(self.sample_size, size))
+        totals = dict.fromkeys(nodes, 0)
+        for pivot in pivots:
+            for node, distance in nx.single_source_shortest_path_length(subgraph, pivot).items():
+                totals[node] += distance
+        factor = size / len(pivots)
+        return {
+            node: (size - 1) / (total * factor) if total else 0.0
+            for node, total in totals.items()
+        }
+
+    def _refresh(self):
+        if self._size() != self._expected_size:
+            logger.info("Grafo modificado fuera del servicio de centralidad, recálculo completo")
+            self._full_recompute = True
+            self.revision += 1
+            self._expected_size = self._size()
+
+        if not self._full_recompute and not self._dirty_nodes and self._cache_revision is not None:
+            return
+
+        components = self._dirty_components()
+        if self._full_recompute:
+            self._closeness.clear()
+            self._betweenness.clear()
+            self._sampled_nodes.clear()
+        else:
+            for node in [node for node in self._betweenness if node not in self.graph]:
+                del self._betweenness[node]
+                del self._closeness[node]
+                self._sampled_nodes.discard(node)
+
+        for component in components:
+            self._compute_component(component)
+
+        recomputed = sum(len(component) for component in components)
+        logger.debug(
+            f"Centralidad recalculada (revisión {self.revision}): "
+            f"{recomputed}/{self.graph.number_of_nodes()} nodos en {len(components)} componentes"
+        )
+        self._dirty_nodes.clear()
+        self._full_recompute = False
+
+    def metrics(self) -> Dict[Hashable, Dict[str, float]]:
+        """Devuelve las métricas de todos los nodos para la revisión actual."""
+        with self._lock:
+            if self._size() == self._expected_size and self._cache_revision == self.revision:
+                return self._cache
+            self._refresh()
+
+            n = self.graph.number_of_nodes()
+            degree_scale = 1 / (n - 1) if n > 1 else 1
+            betweenness_scale = 2 / ((n - 1) * (n - 2)) if n > 2 else 1
+            metrics = {}
+            for node, degree in self.graph.degree():
+                closeness, component_size = self._closeness.get(node, (0.0, 1))
+                metrics[node] = {
+                    'degree_centrality': degree * degree_scale if n > 1 else 1.0,
+                    'betweenness_centrality': self._betweenness.get(node, 0.0) * betweenness_scale,
+                    'closeness_centrality': closeness * (component_size - 1) / (n - 1) if n > 1 else 0.0,
+                }
+            self._cache = metrics
+            self._cache_revision = self.revision
+            return metrics
+
+    def node_metrics(self, node: Hashable) -> Dict[str, float]:
+        """Métricas de un nodo (ceros si no existe)."""
+        return self.metrics().get(node, dict.fromkeys(METRIC_NAMES, 0.0))
+
+    def metric(self, name: str) -> Dict[Hashable, float]:
+        """Una métrica para todos los nodos, con el formato de networkx."""
+        return {node: values[name] for node, values in self.metrics().items()}
+
+    def top(self, name: str, limit: int = 10) -> List[Tuple[Hashable, float]]:
+        """Los ``limit`` nodos con mayor valor de la métrica."""
+        values = self.metric(name)
+        return sorted(values.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    @property
+    def is_approximate(self) -> bool:
+        """Indica si alguna métrica vigente proviene de muestreo."""
+        return bool(self._sampled_nodes)
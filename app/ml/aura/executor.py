@@ -0,0 +1,414 @@
+"""
+AURA - Module Executor
+Motor de ejecución de análisis AURA por grafo de dependencias.
+
+Cada módulo (o paso de un flujo) se declara con un ``ModuleSpec``: la
+función que lo ejecuta, los módulos de los que necesita resultados
+(``requires``), dónde corre y sus límites:
+
+    mode='async'    corrutina en el event loop (I/O: APIs, redes sociales)
+    mode='thread'   función síncrona, o corrutina que bloquea, en un hilo
+    mode='process'  análisis de CPU (pandas, numpy) en un pool de procesos;
+                    ``func`` debe ser una función de módulo (picklable)
+
+``timeout`` acota cada módulo y ``cost`` se descuenta del presupuesto de la
+ejecución. Al vencer el timeout la ejecución deja de esperar al módulo, pero
+un hilo no se puede interrumpir: una función en ``mode='thread'`` sigue
+corriendo hasta terminar (su resultado se descarta), así que debe acotar su
+propio I/O. En ``mode='process'`` el pool se recicla y sus procesos se
+terminan; los módulos que compartían el pool se reenvían a uno nuevo.
+
+Los procesos del pool arrancan con ``forkserver`` (o ``spawn``), no con
+``fork``: el pool se crea de forma perezosa dentro de workers ASGI/Celery con
+hilos y un ``fork`` desde ahí puede heredar locks tomados. Cada proceso
+configura Django al iniciar; ``ModuleExecutor.start()`` crea el pool por
+adelantado (p. ej. al iniciar el worker).
+
+Los módulos que ya no caben en el presupuesto (en el orden declarado) se
+omiten, igual que los que dependen de un módulo omitido o fallido. Un módulo arranca en
+cuanto terminan sus dependencias, así que la latencia total es la de la ruta
+crítica y no la suma de todos los módulos.
+
+Los resultados se memorizan por (módulo, versión, revisión de la persona,
+contexto) en el namespace ``aura_modules`` de ``tiered_cache``.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from app.ats.utils.tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+MODES = ('async', 'thread', 'process')
+MEMO_NAMESPACE = 'aura_modules'
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MEMO_TTL = 3600
+DEFAULT_PROCESS_WORKERS = 2
+
+
+@dataclass
+class ModuleSpec:
+    """Declaración de un módulo o paso ejecutable."""
+    name: str
+    func: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    requires: Tuple[str, ...] = ()      # sus resultados llegan en ``upstream=``
+    mode: str = 'async'
+    timeout: Optional[float] = DEFAULT_TIMEOUT
+    cost: float = 1.0
+    memoize: bool = True
+    version: str = '1'                  # cambiarla invalida los resultados memorizados
+
+
+@dataclass
+class ModuleRun:
+    """Resultado de ejecución de un módulo."""
+    status: str                         # ok, cached, error, timeout, skipped
+    duration: float = 0.0
+    started: float = 0.0                # segundos desde el inicio de la ejecución
+    error: Optional[str] = None
+
+
+@dataclass
+class ExecutionReport:
+    """Resultados y tiempos de una ejecución."""
+    results: Dict[str, Any]
+    runs: Dict[str, ModuleRun]
+    wall_time: float
+    critical_path: List[str]
+    critical_path_time: float
+    total_module_time: float
+
+    def failed(self) -> Dict[str, ModuleRun]:
+        return {name: run for name, run in self.runs.items() if run.status not in ('ok', 'cached')}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'wall_time': round(self.wall_time, 4),
+            'critical_path': self.critical_path,
+            'critical_path_time': round(self.critical_path_time, 4),
+            'total_module_time': round(self.total_module_time, 4),
+            'modules': {
+                name: {'status': run.status, 'duration': round(run.duration, 4), 'error': run.error}
+                for name, run in self.runs.items()
+            },
+        }
+
+
+def stable_hash(value: Any) -> str:
+    """Hash estable entre procesos (``hash()`` de Python cambia en cada proceso)."""
+    payload = json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=12).hexdigest()
+
+
+def person_revision(person_data: Dict[str, Any]) -> str:
+    """
+    Revisión de los datos de una persona: ``id`` + ``revision``/``updated_at``
+    si vienen en los datos; si no, un hash del contenido.
+    """
+    marker = person_data.get('revision') or person_data.get('updated_at')
+    if marker is not None:
+        return f"{person_data.get('id', '')}@{marker}"
+    return stable_hash(person_data)
+
+
+def _call_sync(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Ejecuta ``func`` en un hilo o proceso; las corrutinas con su propio loop."""
+    result = func(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def _init_worker():
+    """Configura Django en cada proceso del pool (forkserver/spawn no heredan el estado)."""
+    if os.environ.get('DJANGO_SETTINGS_MODULE'):
+        import django
+        django.setup()
+
+
+def _mp_context():
+    """Contexto de multiprocessing: ``AURA_EXECUTOR['START_METHOD']``, forkserver o spawn."""
+    methods = multiprocessing.get_all_start_methods()
+    method = _settings().get('START_METHOD')
+    if method not in methods:
+        method = 'forkserver' if 'forkserver' in methods else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _settings() -> Dict[str, Any]:
+    try:
+        return getattr(settings, 'AURA_EXECUTOR', None) or {}
+    except Exception:
+        return {}
+
+
+class ModuleExecutor:
+    """
+    Ejecuta ``ModuleSpec`` respetando dependencias, con concurrencia acotada.
+
+    Args:
+        max_concurrency: Módulos en curso a la vez por ejecución.
+        process_workers: Procesos del pool para ``mode='process'``; 0 los
+            ejecuta en hilos.
+        memo_ttl: TTL en segundos de los resultados memorizados.
+        cache: ``TieredCache`` para memorizar (por defecto el global).
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, process_workers: Optional[int] = None,
+                 memo_ttl: Optional[int] = None, cache: Any = None):
+        config = _settings()
+        self.max_concurrency = max_concurrency or config.get('MAX_CONCURRENCY', 8)
+        self.process_workers = (config.get('PROCESS_WORKERS', DEFAULT_PROCESS_WORKERS)
+                                if process_workers is None else process_workers)
+        self.memo_ttl = memo_ttl or config.get('MEMO_TTL', DEFAULT_MEMO_TTL)
+        self._cache = cache
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def memo(self):
+        return (self._cache or tiered_cache).namespace(MEMO_NAMESPACE, ttl=self.memo_ttl, serializer='pickle')
+
+    # Planificación ------------------------------------------------------------------
+
+    @staticmethod
+    def validate(specs: Sequence[ModuleSpec]):
+        """Verifica nombres únicos, dependencias conocidas y ausencia de ciclos."""
+        names = [spec.name for spec in specs]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Módulos duplicados: {names}")
+        by_name = {spec.name: spec for spec in specs}
+        for spec in specs:
+            if spec.mode not in MODES:
+                raise ValueError(f"Modo desconocido para {spec.name}: {spec.mode}")
+            missing = [name for name in spec.requires if name not in by_name]
+            if missing:
+                raise ValueError(f"{spec.name} depende de módulos no declarados: {missing}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependencia circular: {' -> '.join(path + (name,))}")
+            visiting.add(name)
+            for dependency in by_name[name].requires:
+                visit(dependency, path + (name,))
+            visiting.discard(name)
+            done.add(name)
+
+        for name in names:
+            visit(name, ())
+
+    @staticmethod
+    def admit(specs: Sequence[ModuleSpec], budget: Optional[float]) -> Dict[str, str]:
+        """Módulos omitidos por presupuesto, en el orden declarado: ``{nombre: motivo}``."""
+        skipped: Dict[str, str] = {}
+        spent = 0.0
+        by_name = {spec.name: spec for spec in specs}
+        for spec in specs:
+            if any(dependency in skipped for dependency in spec.requires):
+                skipped[spec.name] = 'dependencia omitida'     # no consume presupuesto
+                continue
+            if budget is not None and spent + spec.cost > budget:
+                skipped[spec.name] = f"presupuesto agotado ({spent:g}/{budget:g})"
+                continue
+            spent += spec.cost
+
+        # Lo que depende de un módulo omitido tampoco se ejecuta
+        def blocked(name: str) -> bool:
+            return any(dependency in skipped or blocked(dependency) for dependency in by_name[name].requires)
+
+        for spec in specs:
+            if spec.name not in skipped and blocked(spec.name):
+                skipped[spec.name] = 'dependencia omitida'
+        return skipped
+
+    # Ejecución ------------------------------------------------------------------------
+
+    def _memo_key(self, spec: ModuleSpec, revision: str, context_key: str) -> str:
+        return f"{spec.name}:{spec.version}:{revision}:{context_key}"
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers <= 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.process_workers, mp_context=_mp_context(),
+                                             initializer=_init_worker)
+        return self._pool
+
+    def start(self):
+        """Crea el pool de procesos por adelantado (p. ej. al iniciar el worker)."""
+        self._process_pool()
+
+    def _recycle_pool(self, pool: ProcessPoolExecutor, name: str):
+        """Termina los procesos de ``pool``; el siguiente módulo crea uno nuevo."""
+        if self._pool is pool:
+            self._pool = None
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        logger.warning(f"Módulo AURA {name} excedió su timeout; pool de procesos reciclado")
+
+    def _task_cancelled(self, pool: ProcessPoolExecutor) -> bool:
+        """
+        True si se canceló la tarea que espera al módulo (su timeout) y no
+        sólo su future en el pool. Sin ``Task.cancelling`` (Python < 3.11) se
+        supone lo segundo si el pool ya fue reciclado.
+        """
+        cancelling = getattr(asyncio.current_task(), 'cancelling', None)
+        if cancelling is not None:
+            return cancelling() > 0
+        return self._pool is pool
+
+    async def _invoke(self, spec: ModuleSpec, upstream: Dict[str, Any]) -> Any:
+        kwargs = dict(spec.kwargs)
+        if spec.requires:
+            kwargs['upstream'] = upstream
+        if spec.mode == 'async':
+            result = spec.func(*spec.args, **kwargs)
+            return await result if asyncio.iscoroutine(result) else result
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(_call_sync, spec.func, *spec.args, **kwargs)
+        if spec.mode == 'process':
+            # Un pool caído o reciclado por el timeout de otro módulo se
+            # reemplaza una vez; si vuelve a fallar el módulo corre en un hilo
+            for _ in range(2):
+                pool = self._process_pool()
+                if pool is None:
+                    break
+                try:
+                    future = pool.submit(call)
+                    return await asyncio.wrap_future(future)
+                except asyncio.CancelledError:
+                    if future.cancelled() and not self._task_cancelled(pool):
+                        # Estaba en la cola del pool que recicló el timeout de otro módulo
+                        continue
+                    # wait_for venció: si ya está corriendo, sólo se detiene terminando el proceso
+                    if not future.cancel():
+                        self._recycle_pool(pool, spec.name)
+                    raise
+                except BrokenProcessPool as e:
+                    if self._pool is pool:
+                        logger.warning(f"Pool de procesos de AURA caído ({e}); se crea uno nuevo")
+                        self._pool = None
+            else:
+                logger.warning(f"Pool de procesos de AURA inestable; {spec.name} se ejecuta en un hilo")
+        return await loop.run_in_executor(None, call)
+
+    async def run(self, specs: Sequence[ModuleSpec], revision: Optional[str] = None, context: Any = None,
+                  budget: Optional[float] = None) -> ExecutionReport:
+        """
+        Ejecuta los módulos. ``revision`` identifica los datos de la persona
+        (ver ``person_revision``) y ``context`` el resto de entradas; sin
+        ``revision`` no se memoriza nada.
+        """
+        specs = list(specs)
+        self.validate(specs)
+        skipped = self.admit(specs, budget)
+        context_key = stable_hash(context) if context is not None else '-'
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started_at = time.perf_counter()
+        runs: Dict[str, ModuleRun] = {}
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(spec: ModuleSpec) -> bool:
+            if spec.name in skipped:
+                runs[spec.name] = ModuleRun('skipped', error=skipped[spec.name])
+                return False
+            if spec.requires:
+                outcomes = await asyncio.gather(*(tasks[name] for name in spec.requires))
+                if not all(outcomes):
+                    failed = [name for name, ok in zip(spec.requires, outcomes) if not ok]
+                    runs[spec.name] = ModuleRun('skipped', error=f"dependencia fallida: {', '.join(failed)}")
+                    return False
+
+            memo_key = self._memo_key(spec, revision, context_key) if revision and spec.memoize else None
+            if memo_key is not None:
+                cached = self.memo.get(memo_key)
+                if cached is not None:
+                    results[spec.name] = cached
+                    runs[spec.name] = ModuleRun('cached', started=time.perf_counter() - started_at)
+                    return True
+
+            async with semaphore:
+                begin = time.perf_counter()
+                run = ModuleRun('ok', started=begin - started_at)
+                try:
+                    upstream = {name: results[name] for name in spec.requires}
+                    result = await asyncio.wait_for(self._invoke(spec, upstream), timeout=spec.timeout)
+                except asyncio.TimeoutError:
+                    run.status, run.error = 'timeout', f"excedió {spec.timeout}s"
+                except Exception as e:
+                    run.status, run.error = 'error', str(e)
+                run.duration = time.perf_counter() - begin
+            runs[spec.name] = run
+            if run.status != 'ok':
+                logger.warning(f"Módulo AURA {spec.name}: {run.status} ({run.error})")
+                return False
+
+            results[spec.name] = result
+            if memo_key is not None:
+                self.memo.set(memo_key, result)
+            return True
+
+        for spec in specs:
+            tasks[spec.name] = asyncio.ensure_future(execute(spec))
+        await asyncio.gather(*tasks.values())
+
+        wall_time = time.perf_counter() - started_at
+        path, path_time = self._critical_path(specs, runs)
+        return ExecutionReport(
+            results={spec.name: results[spec.name] for spec in specs if spec.name in results},
+            runs={spec.name: runs[spec.name] for spec in specs},
+            wall_time=wall_time,
+            critical_path=path,
+            critical_path_time=path_time,
+            total_module_time=sum(run.duration for run in runs.values()),
+        )
+
+    @staticmethod
+    def _critical_path(specs: Sequence[ModuleSpec], runs: Dict[str, ModuleRun]) -> Tuple[List[str], float]:
+        """Cadena de dependencias con mayor tiempo acumulado."""
+        by_name = {spec.name: spec for spec in specs}
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def longest(name: str) -> Tuple[float, List[str]]:
+            if name not in best:
+                previous = max((longest(dependency) for dependency in by_name[name].requires),
+                               key=lambda item: item[0], default=(0.0, []))
+                best[name] = (previous[0] + runs[name].duration, previous[1] + [name])
+            return best[name]
+
+        if not specs:
+            return [], 0.0
+        total, path = max((longest(spec.name) for spec in specs), key=lambda item: item[0])
+        return path, total
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def run_specs(executor: ModuleExecutor, specs: Iterable[ModuleSpec], **kwargs):
+    """Atajo síncrono para scripts y tareas Celery."""
+    return asyncio.run(executor.run(list(specs), **kwargs))
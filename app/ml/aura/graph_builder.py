@@ -16,6 +16,7 @@ from enum import Enum
 import asyncio
 
 from app.models import Person, BusinessUnit, Vacante
+from app.ml.aura.centrality import CentralityService
 
 logger = logging.getLogger(__name__)
 
@@ -89,6 +90,7 @@ class AuraGraphBuilder:
     def __init__(self):
         """Inicializa el constructor de grafos."""
         self.graph = nx.Graph()
+        self.centrality = CentralityService(self.graph)
         self.connection_weights = {
             ConnectionType.SAME_COMPANY: 0.3,
             ConnectionType.SAME_DEPARTMENT: 0.6,
@@ -126,7 +128,7 @@ class AuraGraphBuilder:
         """
         try:
             # Limpiar grafo existente
-            self.graph.clear()
+            self.centrality.clear()
             
             # Agregar nodos
             await self._add_nodes(people_data)
@@ -329,17 +331,17 @@ class AuraGraphBuilder:
             hubs = []
             influencers = []
             
-            for node_id in self.graph.nodes():
+            # Métricas calculadas una sola vez por revisión del grafo
+            metrics = self.centrality.metrics()
+            
+            for node_id, node_metrics in metrics.items():
                 node_data = self.graph.nodes[node_id]
-                
-                # Calcular métricas de red
-                degree_centrality = nx.degree_centrality(self.graph).get(node_id, 0)
-                betweenness_centrality = nx.betweenness_centrality(self.graph).get(node_id, 0)
-                closeness_centrality = nx.closeness_centrality(self.graph).get(node_id, 0)
+                degree_centrality = node_metrics['degree_centrality']
+                betweenness_centrality = node_metrics['betweenness_centrality']
+                closeness_centrality = node_metrics['closeness_centrality']
                 
                 # Calcular scores
-                hub_score = (degree_centrality + betweenness_centrality) / 2
-                influence_score = (closeness_centrality + degree_centrality) / 2
+                hub_score, influence_score = self._hub_and_influence_scores(node_metrics)
                 
                 # Crear nodo de red
                 network_node = NetworkNode(
@@ -349,7 +351,7 @@ class AuraGraphBuilder:
                     current_role=node_data.get('current_role'),
                     skills=node_data.get('skills', []),
                     experience_years=node_data.get('experience_years', 0),
-                    connections_count=len(list(self.graph.neighbors(node_id))),
+                    connections_count=self.graph.degree(node_id),
                     influence_score=influence_score,
                     hub_score=hub_score,
                     metadata={
@@ -450,7 +452,7 @@ class AuraGraphBuilder:
             person_id = person_data['id']
             
             # Agregar nodo con atributos
-            self.graph.add_node(person_id, **person_data)
+            self.centrality.add_node(person_id, **person_data)
     
     async def _build_connections(
         self,
@@ -467,13 +469,33 @@ class AuraGraphBuilder:
                 connections = await self._find_connections_between_persons(person1, person2, include_historical)
                 
                 # Agregar conexiones al grafo
-                for connection in connections:
-                    self.graph.add_edge(
+                self.centrality.add_edges(
+                    (
                         connection.person1_id,
                         connection.person2_id,
-                        connection=connection,
-                        weight=self._calculate_edge_weight(connection)
+                        {'connection': connection, 'weight': self._calculate_edge_weight(connection)}
                     )
+                    for connection in connections
+                )
+    
+    async def add_connections(self, connections: List[ProfessionalConnection]) -> None:
+        """
+        Agrega conexiones a una red ya construida.
+        
+        Sólo se recalculan las métricas de los componentes afectados.
+        """
+        try:
+            self.centrality.add_edges(
+                (
+                    connection.person1_id,
+                    connection.person2_id,
+                    {'connection': connection, 'weight': self._calculate_edge_weight(connection)}
+                )
+                for connection in connections
+            )
+            await self._calculate_network_metrics()
+        except Exception as e:
+            logger.error(f"Error agregando conexiones: {str(e)}")
     
     async def _find_connections_between_persons(
         self,
@@ -559,20 +581,29 @@ class AuraGraphBuilder:
     async def _calculate_network_metrics(self) -> None:
         """Calcula métricas de la red."""
         try:
-            # Calcular centralidad para todos los nodos
-            degree_centrality = nx.degree_centrality(self.graph)
-            betweenness_centrality = nx.betweenness_centrality(self.graph)
-            closeness_centrality = nx.closeness_centrality(self.graph)
+            # Centralidad de todos los nodos (cacheada por revisión del grafo)
+            metrics = self.centrality.metrics()
             
             # Agregar métricas a los nodos
-            for node_id in self.graph.nodes():
-                self.graph.nodes[node_id]['degree_centrality'] = degree_centrality.get(node_id, 0)
-                self.graph.nodes[node_id]['betweenness_centrality'] = betweenness_centrality.get(node_id, 0)
-                self.graph.nodes[node_id]['closeness_centrality'] = closeness_centrality.get(node_id, 0)
+            for node_id, node_metrics in metrics.items():
+                hub_score, influence_score = self._hub_and_influence_scores(node_metrics)
+                self.graph.nodes[node_id].update(
+                    node_metrics,
+                    hub_score=hub_score,
+                    influence_score=influence_score
+                )
                 
         except Exception as e:
             logger.error(f"Error calculando métricas de red: {str(e)}")
     
+    @staticmethod
+    def _hub_and_influence_scores(node_metrics: Dict[str, float]) -> Tuple[float, float]:
+        """Calcula (hub_score, influence_score) a partir de la centralidad del nodo."""
+        degree_centrality = node_metrics['degree_centrality']
+        hub_score = (degree_centrality + node_metrics['betweenness_centrality']) / 2
+        influence_score = (node_metrics['closeness_centrality'] + degree_centrality) / 2
+        return hub_score, influence_score
+    
     async def _calculate_team_synergy(self, team1: Dict[str, Any], team2: Dict[str, Any]) -> float:
         """Calcula la sinergia entre dos equipos."""
         try:
@@ -728,13 +759,10 @@ class AuraGraphBuilder:
                     "hub_score": 0.0
                 }
             
-            # Obtener datos del nodo
-            node_data = self.graph.nodes[person_id]
-            
-            # Calcular métricas de red
+            # Métricas de red desde el servicio de centralidad
+            node_metrics = self.centrality.node_metrics(person_id)
             connections = list(self.graph.neighbors(person_id))
-            influence_score = node_data.get('influence_score', 0.0)
-            hub_score = node_data.get('hub_score', 0.0)
+            hub_score, influence_score = self._hub_and_influence_scores(node_metrics)
             
             # Sugerir conexiones (primeros 5 vecinos)
             suggested_connections = connections[:5]
@@ -744,8 +772,8 @@ class AuraGraphBuilder:
                 "suggested_connections": suggested_connections,
                 "network_size": len(connections),
                 "hub_score": hub_score,
-                "degree_centrality": node_data.get('degree_centrality', 0.0),
-                "betweenness_centrality": node_data.get('betweenness_centrality', 0.0)
+                "degree_centrality": node_metrics['degree_centrality'],
+                "betweenness_centrality": node_metrics['betweenness_centrality']
             }
             
         except Exception as e:
@@ -6,11 +6,13 @@ Orquestador inteligente que integra todos los sistemas de AURA, incluyendo integ
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 import asyncio
 import json
 
+from app.ml.aura.executor import ModuleExecutor, ModuleSpec
+
 logger = logging.getLogger(__name__)
 
 # CONFIGURACIÓN: DESHABILITADO POR DEFECTO
@@ -141,6 +143,7 @@ class AuraOrchestrator:
         }
         
         self.productivity_connector = ProductivityConnector()
+        self.executor = ModuleExecutor()
         
         self._initialize_flow_definitions()
         self._initialize_component_status()
@@ -166,6 +169,11 @@ class AuraOrchestrator:
                     "setup_achievements",
                     "initialize_chatbot"
                 ],
+                "depends_on": {
+                    "predict_career_path": ["analyze_user_profile"],
+                    "setup_achievements": ["analyze_user_profile"],
+                    "initialize_chatbot": ["analyze_user_profile"]
+                },
                 "expected_duration": 120  # segundos
             },
             
@@ -183,6 +191,10 @@ class AuraOrchestrator:
                     "generate_executive_insights",
                     "suggest_competitions"
                 ],
+                "depends_on": {
+                    "generate_executive_insights": ["analyze_current_position", "predict_market_trends"],
+                    "suggest_competitions": ["analyze_current_position"]
+                },
                 "expected_duration": 180
             },
             
@@ -200,6 +212,11 @@ class AuraOrchestrator:
                     "unlock_network_achievements",
                     "visualize_network_3d"
                 ],
+                "depends_on": {
+                    "analyze_network_sentiment": ["sync_platform_data"],
+                    "unlock_network_achievements": ["sync_platform_data"],
+                    "visualize_network_3d": ["sync_platform_data"]
+                },
                 "expected_duration": 240
             },
             
@@ -217,6 +234,10 @@ class AuraOrchestrator:
                     "track_skill_progress",
                     "provide_guidance"
                 ],
+                "depends_on": {
+                    "recommend_competitions": ["analyze_skill_demand"],
+                    "provide_guidance": ["analyze_skill_demand"]
+                },
                 "expected_duration": 150
             },
             
@@ -234,6 +255,11 @@ class AuraOrchestrator:
                     "localize_insights",
                     "ensure_compliance"
                 ],
+                "depends_on": {
+                    "generate_executive_report": ["analyze_market_data"],
+                    "localize_insights": ["generate_executive_report"],
+                    "ensure_compliance": ["generate_executive_report"]
+                },
                 "expected_duration": 200
             },
             
@@ -251,6 +277,11 @@ class AuraOrchestrator:
                     "audit_compliance",
                     "provide_executive_guidance"
                 ],
+                "depends_on": {
+                    "provide_executive_guidance": [
+                        "generate_executive_dashboard", "predict_market_movements", "audit_compliance"
+                    ]
+                },
                 "expected_duration": 300
             }
         }
@@ -296,13 +327,27 @@ class AuraOrchestrator:
             
             self.active_integrations[request_id] = request
             
-            # Ejecutar secuencia de componentes
+            # Ejecutar los pasos por dependencias: los independientes en paralelo
+            report = await self.executor.run([
+                ModuleSpec(
+                    name=step,
+                    func=self._run_integration_step,
+                    args=(step, request),
+                    requires=tuple(flow_definition.get("depends_on", {}).get(step, ())),
+                    timeout=self.integration_config["timeout_seconds"],
+                    memoize=False
+                )
+                for step in flow_definition["sequence"]
+            ])
+            
+            # Consolidar en el orden de la secuencia
             results = {}
             recommendations = []
             next_actions = []
             
             for step in flow_definition["sequence"]:
-                step_result = await self._execute_integration_step(step, request)
+                run = report.runs[step]
+                step_result = report.results.get(step, {"error": run.error, "status": run.status})
                 results[step] = step_result
                 
                 # Extraer recomendaciones y acciones
@@ -336,6 +381,13 @@ class AuraOrchestrator:
             logger.error(f"Error executing integration flow: {e}")
             return self._get_mock_integration_result(user_id, flow_type, error=str(e))
     
+    async def _run_integration_step(self, step: str, request: IntegrationRequest,
+                                    upstream: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Ejecuta un paso con los resultados de los pasos de los que depende"""
+        if upstream:
+            request = replace(request, data={**request.data, "previous_results": upstream})
+        return await self._execute_integration_step(step, request)
+    
     async def _execute_integration_step(self, step: str, request: IntegrationRequest) -> Dict[str, Any]:
         """Ejecuta un paso específico de integración"""
         try:
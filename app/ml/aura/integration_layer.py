@@ -11,7 +11,10 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, date
 import asyncio
 
+from asgiref.sync import sync_to_async
+
 from app.models import Person, BusinessUnit
+from app.ml.core.features.similarity_index import similarity_index
 from app.ats.models import Person as Candidate, Vacancy as Job, Application
 from app.ml.aura.aura import AuraEngine
 from app.ml.aura.connectors.linkedin_connector import LinkedInConnector
@@ -418,19 +421,25 @@ class AuraIntegrationLayer:
     async def _find_related_candidates(self, person_id: int) -> List[Dict[str, Any]]:
         """Encuentra candidatos relacionados en el sistema."""
         try:
-            # Buscar candidatos con habilidades similares
-            person = await self._get_person_from_system(person_id)
-            if not person:
-                return []
-            
-            # En una implementación real, esto buscaría candidatos similares
-            # Por ahora, retornamos una lista vacía
-            return []
+            # Candidatos con habilidades similares según el índice MinHash-LSH
+            return await sync_to_async(self._similar_people)(person_id)
             
         except Exception as e:
             logger.error(f"Error encontrando candidatos relacionados: {str(e)}")
             return []
     
+    def _similar_people(self, person_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        matches = similarity_index.similar_to('person', person_id, k=limit, min_similarity=0.3)
+        people = Person.objects.only('id', 'nombre', 'apellido_paterno').in_bulk([int(key) for key, _ in matches])
+        return [
+            {
+                'person_id': int(key),
+                'name': f"{people[int(key)].nombre} {people[int(key)].apellido_paterno}",
+                'skills_similarity': score,
+            }
+            for key, score in matches if int(key) in people
+        ]
+
     async def _find_internal_references(
         self,
         person_id: int,
@@ -23,9 +23,40 @@ from .core.fairness_optimizer import FairnessOptimizer
 from .truth.truth_analyzer import TruthAnalyzer
 from .social.social_verifier import SocialVerifier
 from .impact.impact_analyzer import ImpactAnalyzer
+from .executor import ModuleExecutor, ModuleSpec, person_revision, stable_hash
 
 logger = logging.getLogger(__name__)
 
+# Instancias por proceso del pool para los módulos de CPU
+_process_modules: Dict[str, Any] = {}
+
+def _process_module(name: str, factory):
+    if name not in _process_modules:
+        _process_modules[name] = factory()
+    return _process_modules[name]
+
+def _run_bias_detection(person_data: Dict[str, Any]):
+    """Análisis de sesgos (pandas) ejecutado en el pool de procesos."""
+    import pandas as pd
+    engine = _process_module("bias_detection", BiasDetectionEngine)
+    data = pd.DataFrame([person_data])
+    return asyncio.run(engine.analyze_bias_comprehensive(data, "target", ["gender", "age"]))
+
+def _run_fairness_optimizer(person_data: Dict[str, Any]):
+    """Optimización de equidad (pandas) ejecutada en el pool de procesos."""
+    import pandas as pd
+    from .core.fairness_optimizer import FairnessConstraint, FairnessMetric
+    optimizer = _process_module("fairness_optimizer", FairnessOptimizer)
+    data = pd.DataFrame([person_data])
+    constraints = [
+        FairnessConstraint(
+            metric=FairnessMetric.DEMOGRAPHIC_PARITY,
+            threshold=0.8,
+            protected_attributes=["gender", "age"]
+        )
+    ]
+    return asyncio.run(optimizer.optimize_fairness(data, "target", ["gender", "age"], constraints))
+
 class AnalysisType(Enum):
     """Tipos de análisis disponibles"""
     ETHICAL_PROFILE = "ethical_profile"
@@ -122,6 +153,26 @@ class AuraOrchestrator:
     - Auto-scaling
     """
     
+    # Cómo se ejecuta cada módulo: (modo, timeout en segundos, costo, dependencias).
+    # Los analizadores async bloquean el loop, así que van a hilos; los de pandas a procesos.
+    MODULE_EXECUTION = {
+        "ethics_engine": ("thread", 30.0, 1.0, ()),
+        "moral_reasoning": ("thread", 30.0, 1.0, ()),
+        "truth_analyzer": ("thread", 30.0, 1.0, ()),
+        "social_verifier": ("async", 45.0, 1.0, ()),
+        "bias_detection": ("process", 60.0, 2.0, ()),
+        "fairness_optimizer": ("process", 60.0, 2.0, ()),
+        "impact_analyzer": ("thread", 30.0, 1.0, ()),
+    }
+    
+    # Presupuesto de costo por análisis según el nivel de recursos (None = sin límite)
+    RESOURCE_BUDGETS = {
+        ResourceLevel.LOW: 3.0,
+        ResourceLevel.MEDIUM: 6.0,
+        ResourceLevel.HIGH: 12.0,
+        ResourceLevel.UNLIMITED: None,
+    }
+    
     def __init__(self, config: Optional[OrchestrationConfig] = None):
         """Inicializa el orquestador"""
         self.config = config or OrchestrationConfig()
@@ -134,6 +185,7 @@ class AuraOrchestrator:
         self.truth_analyzer = TruthAnalyzer()
         self.social_verifier = SocialVerifier()
         self.impact_analyzer = ImpactAnalyzer()
+        self.executor = ModuleExecutor(memo_ttl=self.config.cache_ttl)
         
         # Estado del sistema
         self.active_analyses = {}
@@ -207,7 +259,10 @@ class AuraOrchestrator:
             
             # Verificar caché
             if self.config.enable_caching:
-                cache_key = f"aura_analysis_{hash(json.dumps(person_data, sort_keys=True))}"
+                cache_key = (
+                    f"aura_analysis_{person_revision(person_data)}_"
+                    f"{stable_hash([business_context, analysis_depth, self.config.service_tier.value])}"
+                )
                 cached_result = cache.get(cache_key)
                 if cached_result:
                     logger.info(f"Resultado encontrado en caché: {analysis_id}")
@@ -225,26 +280,29 @@ class AuraOrchestrator:
             
             # Ejecutar análisis
             start_time = datetime.now()
-            results = {}
-            modules_used = []
-            
-            # Ejecutar análisis en paralelo según módulos disponibles
-            tasks = []
-            
-            for module_name in self.available_modules:
-                if self._should_use_module(module_name, analysis_depth):
-                    task = self._execute_module_analysis(module_name, request)
-                    tasks.append((module_name, task))
-                    modules_used.append(module_name)
-            
-            # Esperar resultados
-            for module_name, task in tasks:
-                try:
-                    result = await task
-                    results[module_name] = result
-                except Exception as e:
-                    logger.error(f"Error en módulo {module_name}: {str(e)}")
-                    results[module_name] = {"error": str(e), "score": 0.0}
+            
+            # Ejecutar módulos por grafo de dependencias: los independientes en
+            # paralelo y los de CPU en el pool de procesos
+            specs = [
+                self._module_spec(module_name, request)
+                for module_name in self.available_modules
+                if self._should_use_module(module_name, analysis_depth)
+            ]
+            report = await self.executor.run(
+                specs,
+                revision=person_revision(person_data),
+                context=[business_context, self.config.service_tier.value],
+                budget=self.RESOURCE_BUDGETS.get(request.resource_level)
+            )
+            modules_used = list(report.results)
+            results = dict(report.results)
+            for module_name, run in report.failed().items():
+                results[module_name] = {"error": run.error, "status": run.status, "score": 0.0}
+            logger.info(
+                f"Módulos AURA {analysis_id}: {report.wall_time:.2f}s "
+                f"(ruta crítica {' -> '.join(report.critical_path)}, "
+                f"{report.total_module_time:.2f}s de trabajo)"
+            )
             
             # Calcular métricas agregadas
             aggregated_metrics = self._aggregate_results(results)
@@ -322,7 +380,10 @@ class AuraOrchestrator:
             
             # Verificar caché
             if self.config.enable_caching:
-                cache_key = f"aura_{analysis_type.value}_{hash(json.dumps(person_data, sort_keys=True))}"
+                cache_key = (
+                    f"aura_{analysis_type.value}_{person_revision(person_data)}_"
+                    f"{stable_hash([business_context, self.config.service_tier.value])}"
+                )
                 cached_result = cache.get(cache_key)
                 if cached_result:
                     logger.info(f"Resultado específico encontrado en caché: {analysis_id}")
@@ -428,6 +489,25 @@ class AuraOrchestrator:
         else:  # deep
             return True
     
+    def _module_spec(self, module_name: str, request: AnalysisRequest) -> ModuleSpec:
+        """Declaración ejecutable de un módulo para ``ModuleExecutor``"""
+        mode, timeout, cost, requires = self.MODULE_EXECUTION.get(module_name, ("async", 30.0, 1.0, ()))
+        if module_name == "bias_detection":
+            func, args = _run_bias_detection, (request.person_data,)
+        elif module_name == "fairness_optimizer":
+            func, args = _run_fairness_optimizer, (request.person_data,)
+        else:
+            func, args = self._analyze_module, (module_name, request)
+        return ModuleSpec(
+            name=module_name,
+            func=func,
+            args=args,
+            requires=requires,
+            mode=mode,
+            timeout=timeout,
+            cost=cost
+        )
+    
     async def _execute_module_analysis(
         self,
         module_name: str,
@@ -435,62 +515,65 @@ class AuraOrchestrator:
     ) -> Dict[str, Any]:
         """Ejecuta análisis de un módulo específico"""
         try:
-            if module_name == "ethics_engine":
-                return await self.ethics_engine.analyze_ethical_profile(
-                    request.person_data, request.business_context
-                )
-            elif module_name == "moral_reasoning":
-                # Simular dilema moral
-                from .core.moral_reasoning import MoralDilemma, MoralPrinciple
-                dilemma = MoralDilemma(
-                    scenario="Evaluación de candidato",
-                    options=["Aprobar", "Rechazar", "Más información"],
-                    stakeholders=["Candidato", "Empresa", "Sociedad"],
-                    principles_involved=[MoralPrinciple.FAIRNESS, MoralPrinciple.JUSTICE],
-                    context=request.business_context or {}
-                )
-                return await self.moral_reasoning.analyze_moral_dilemma(dilemma, request.business_context)
-            elif module_name == "truth_analyzer":
-                return await self.truth_analyzer.analyze_veracity_comprehensive(
-                    request.person_data, request.business_context
-                )
-            elif module_name == "social_verifier":
-                return await self.social_verifier.verify_social_presence_comprehensive(
-                    request.person_data, request.business_context
-                )
-            elif module_name == "bias_detection":
-                # Simular datos para análisis de sesgos
-                import pandas as pd
-                data = pd.DataFrame([request.person_data])
-                return await self.bias_detection.analyze_bias_comprehensive(
-                    data, "target", ["gender", "age"]
-                )
-            elif module_name == "fairness_optimizer":
-                # Simular optimización de equidad
-                import pandas as pd
-                data = pd.DataFrame([request.person_data])
-                from .core.fairness_optimizer import FairnessConstraint, FairnessMetric
-                constraints = [
-                    FairnessConstraint(
-                        metric=FairnessMetric.DEMOGRAPHIC_PARITY,
-                        threshold=0.8,
-                        protected_attributes=["gender", "age"]
-                    )
-                ]
-                return await self.fairness_optimizer.optimize_fairness(
-                    data, "target", ["gender", "age"], constraints
-                )
-            elif module_name == "impact_analyzer":
-                return await self.impact_analyzer.analyze_impact_comprehensive(
-                    request.person_data, request.business_context
-                )
-            else:
-                return {"error": f"Módulo no implementado: {module_name}"}
-                
+            return await self._analyze_module(module_name, request)
         except Exception as e:
             logger.error(f"Error ejecutando módulo {module_name}: {str(e)}")
             return {"error": str(e), "score": 0.0}
     
+    async def _analyze_module(self, module_name: str, request: AnalysisRequest) -> Dict[str, Any]:
+        """Ejecuta un módulo; los errores se propagan al llamador"""
+        if module_name == "ethics_engine":
+            return await self.ethics_engine.analyze_ethical_profile(
+                request.person_data, request.business_context
+            )
+        elif module_name == "moral_reasoning":
+            # Simular dilema moral
+            from .core.moral_reasoning import MoralDilemma, MoralPrinciple
+            dilemma = MoralDilemma(
+                scenario="Evaluación de candidato",
+                options=["Aprobar", "Rechazar", "Más información"],
+                stakeholders=["Candidato", "Empresa", "Sociedad"],
+                principles_involved=[MoralPrinciple.FAIRNESS, MoralPrinciple.JUSTICE],
+                context=request.business_context or {}
+            )
+            return await self.moral_reasoning.analyze_moral_dilemma(dilemma, request.business_context)
+        elif module_name == "truth_analyzer":
+            return await self.truth_analyzer.analyze_veracity_comprehensive(
+                request.person_data, request.business_context
+            )
+        elif module_name == "social_verifier":
+            return await self.social_verifier.verify_social_presence_comprehensive(
+                request.person_data, request.business_context
+            )
+        elif module_name == "bias_detection":
+            # Simular datos para análisis de sesgos
+            import pandas as pd
+            data = pd.DataFrame([request.person_data])
+            return await self.bias_detection.analyze_bias_comprehensive(
+                data, "target", ["gender", "age"]
+            )
+        elif module_name == "fairness_optimizer":
+            # Simular optimización de equidad
+            import pandas as pd
+            data = pd.DataFrame([request.person_data])
+            from .core.fairness_optimizer import FairnessConstraint, FairnessMetric
+            constraints = [
+                FairnessConstraint(
+                    metric=FairnessMetric.DEMOGRAPHIC_PARITY,
+                    threshold=0.8,
+                    protected_attributes=["gender", "age"]
+                )
+            ]
+            return await self.fairness_optimizer.optimize_fairness(
+                data, "target", ["gender", "age"], constraints
+            )
+        elif module_name == "impact_analyzer":
+            return await self.impact_analyzer.analyze_impact_comprehensive(
+                request.person_data, request.business_context
+            )
+        else:
+            raise ValueError(f"Módulo no implementado: {module_name}")
+    
     def _determine_resource_level(self, analysis_depth: str) -> ResourceLevel:
         """Determina nivel de recursos según profundidad"""
         if analysis_depth == "basic":
@@ -7,6 +7,7 @@ import logging
 from typing import Dict, Any, List, Optional, Tuple, Set
 from datetime import datetime, timedelta
 import json
+import weakref
 import networkx as nx
 from collections import defaultdict, Counter
 import numpy as np
@@ -16,6 +17,8 @@ from django.utils import timezone
 from app.models import Person, Vacancy, Contract, Opportunity, BusinessUnit
 from app.ml.aura.analytics.trend_analyzer import TrendAnalyzer
 from app.ml.aura.energy_analyzer import EnergyAnalyzer
+from app.ml.aura.centrality import CentralityService
+from app.ml.aura.organizational.org_graph_builder import OrganizationalGraphBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +39,9 @@ class NetworkAnalyzer:
         self.network_cache = {}
         self.graph_models = {}
         self.pattern_database = {}
+        self.graph_builder = OrganizationalGraphBuilder()
+        # Servicio de centralidad por grafo construido (se libera con el grafo)
+        self._centrality = weakref.WeakKeyDictionary()
         
     def analyze_organizational_network(self, business_unit: Optional[str] = None,
                                      analysis_depth: str = 'comprehensive') -> Dict[str, Any]:
@@ -244,91 +250,16 @@ class NetworkAnalyzer:
             return {'error': str(e)}
     
     def _build_organizational_graph(self, business_unit: Optional[str]) -> nx.Graph:
-        """Construye el grafo de la organización."""
-        G = nx.Graph()
-        
-        # Obtener personas
-        persons_query = Person.objects.all()
-        if business_unit:
-            persons_query = persons_query.filter(business_unit__name=business_unit)
-        
-        persons = list(persons_query.values('id', 'name', 'position', 'department', 'business_unit__name'))
-        
-        # Agregar nodos
-        for person in persons:
-            G.add_node(person['id'], **person)
-        
-        # Agregar edges basados en relaciones
-        self._add_collaboration_edges(G, persons)
-        self._add_communication_edges(G, persons)
-        self._add_hierarchical_edges(G, persons)
-        
-        return G
-    
-    def _add_collaboration_edges(self, G: nx.Graph, persons: List[Dict[str, Any]]):
-        """Agrega edges de colaboración basados en proyectos compartidos."""
-        # Simular colaboraciones basadas en departamento y posición
-        for i, person1 in enumerate(persons):
-            for j, person2 in enumerate(persons[i+1:], i+1):
-                # Colaboración si están en el mismo departamento
-                if person1['department'] == person2['department']:
-                    weight = 0.8
-                # Colaboración si están en departamentos relacionados
-                elif self._are_departments_related(person1['department'], person2['department']):
-                    weight = 0.5
-                else:
-                    weight = 0.1
-                
-                if weight > 0.2:  # Solo agregar si hay colaboración significativa
-                    G.add_edge(person1['id'], person2['id'], 
-                              weight=weight, type='collaboration')
-    
-    def _add_communication_edges(self, G: nx.Graph, persons: List[Dict[str, Any]]):
-        """Agrega edges de comunicación."""
-        # Simular patrones de comunicación
-        for person in persons:
-            # Comunicación con superiores
-            if person['position'] != 'CEO':
-                superiors = [p for p in persons if self._is_superior(p, person)]
-                for superior in superiors[:2]:  # Máximo 2 superiores directos
-                    G.add_edge(person['id'], superior['id'], 
-                              weight=0.9, type='communication')
-    
-    def _add_hierarchical_edges(self, G: nx.Graph, persons: List[Dict[str, Any]]):
-        """Agrega edges jerárquicos."""
-        # Simular estructura jerárquica
-        for person in persons:
-            if person['position'] in ['Manager', 'Director', 'VP']:
-                subordinates = [p for p in persons if self._is_subordinate(p, person)]
-                for subordinate in subordinates:
-                    G.add_edge(person['id'], subordinate['id'], 
-                              weight=0.7, type='hierarchical')
-    
-    def _are_departments_related(self, dept1: str, dept2: str) -> bool:
-        """Determina si dos departamentos están relacionados."""
-        related_pairs = [
-            ('Engineering', 'Product'),
-            ('Sales', 'Marketing'),
-            ('HR', 'Finance'),
-            ('Engineering', 'Design')
-        ]
-        return (dept1, dept2) in related_pairs or (dept2, dept1) in related_pairs
-    
-    def _is_superior(self, person1: Dict[str, Any], person2: Dict[str, Any]) -> bool:
-        """Determina si person1 es superior de person2."""
-        hierarchy = {
-            'CEO': 5,
-            'VP': 4,
-            'Director': 3,
-            'Manager': 2,
-            'Senior': 1,
-            'Junior': 0
-        }
-        return hierarchy.get(person1['position'], 0) > hierarchy.get(person2['position'], 0)
+        """Construye el grafo de la organización (o de una BU) por bloques."""
+        return self.graph_builder.build(business_unit=business_unit)
     
-    def _is_subordinate(self, person1: Dict[str, Any], person2: Dict[str, Any]) -> bool:
-        """Determina si person1 es subordinado de person2."""
-        return self._is_superior(person2, person1)
+    def _get_centrality(self, G: nx.Graph) -> CentralityService:
+        """Devuelve el servicio de centralidad asociado al grafo."""
+        service = self._centrality.get(G)
+        if service is None:
+            service = CentralityService(G)
+            self._centrality[G] = service
+        return service
     
     def _calculate_network_metrics(self, G: nx.Graph) -> Dict[str, Any]:
         """Calcula métricas clave de la red."""
@@ -347,9 +278,10 @@ class NetworkAnalyzer:
         }
         
         # Centralidad
-        metrics['degree_centrality'] = nx.degree_centrality(G)
-        metrics['betweenness_centrality'] = nx.betweenness_centrality(G)
-        metrics['closeness_centrality'] = nx.closeness_centrality(G)
+        centrality = self._get_centrality(G)
+        metrics['degree_centrality'] = centrality.metric('degree_centrality')
+        metrics['betweenness_centrality'] = centrality.metric('betweenness_centrality')
+        metrics['closeness_centrality'] = centrality.metric('closeness_centrality')
         
         return metrics
     
@@ -381,17 +313,15 @@ class NetworkAnalyzer:
             return {}
         
         # Calcular métricas de centralidad
-        degree_centrality = nx.degree_centrality(G)
-        betweenness_centrality = nx.betweenness_centrality(G)
-        closeness_centrality = nx.closeness_centrality(G)
+        centrality = self._get_centrality(G).metrics()
         
         # Combinar métricas para identificar influenciadores
         influencer_scores = {}
-        for node in G.nodes():
+        for node, node_metrics in centrality.items():
             score = (
-                degree_centrality[node] * 0.4 +
-                betweenness_centrality[node] * 0.4 +
-                closeness_centrality[node] * 0.2
+                node_metrics['degree_centrality'] * 0.4 +
+                node_metrics['betweenness_centrality'] * 0.4 +
+                node_metrics['closeness_centrality'] * 0.2
             )
             influencer_scores[node] = score
         
@@ -482,8 +412,9 @@ class NetworkAnalyzer:
             return 0.0
         
         # Basado en diversidad de conexiones y estructura de red
-        degree_centrality = nx.degree_centrality(G)
-        betweenness_centrality = nx.betweenness_centrality(G)
+        centrality = self._get_centrality(G)
+        degree_centrality = centrality.metric('degree_centrality')
+        betweenness_centrality = centrality.metric('betweenness_centrality')
         
         # Diversidad de conexiones
         degree_variance = np.var(list(degree_centrality.values())) if degree_centrality else 0
@@ -603,11 +534,8 @@ class NetworkAnalyzer:
         return min(confidence, 1.0)
     
     def _build_team_graph(self, team_id: str) -> nx.Graph:
-        """Construye grafo específico de un equipo."""
-        # Implementación simplificada
-        G = nx.Graph()
-        # Aquí se agregarían los miembros del equipo específico
-        return G
+        """Construye grafo específico de un equipo sin leer el resto de la organización."""
+        return self.graph_builder.build(team_id=team_id)
     
     def _analyze_collaboration_patterns(self, G: nx.Graph) -> Dict[str, Any]:
         """Analiza patrones de colaboración."""
@@ -0,0 +1,238 @@
+"""
+AURA - Organizational Graph Builder
+Construcción por bloques del grafo organizacional usado por NetworkAnalyzer.
+
+Las personas se leen en streaming (``iterator()``) y se agrupan en una sola
+pasada por unidad de negocio, departamento y nivel de puesto. Las aristas se
+generan a partir de esos índices de grupo en lugar de comparar cada par de
+personas:
+
+- Colaboración (0.8): miembros del mismo departamento dentro de la BU.
+- Colaboración (0.5): departamentos relacionados dentro de la BU.
+- Comunicación (0.9): los primeros dos superiores del departamento
+  (o de la BU si el departamento no tiene).
+- Jerárquica (0.7): managers, directores y VPs con sus subordinados.
+
+Los grupos pequeños conservan la semántica completa (todos los pares). En
+grupos mayores a ``max_clique`` se usa una estructura acotada: anillo con
+``max_clique`` vecinos para colaboración, puentes round-robin entre
+departamentos relacionados y un organigrama en el que cada persona reporta
+al manager más cercano por encima de su nivel.
+
+``Person`` no guarda puesto, departamento ni BU: se toman del perfil
+``Manager`` de la persona o, si no lo tiene, del primer manager que la tiene
+como reporte directo.
+"""
+
+import logging
+from collections import defaultdict
+from itertools import combinations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import networkx as nx
+
+logger = logging.getLogger(__name__)
+
+PERSON_FIELDS = ('id', 'name', 'position', 'department', 'business_unit')
+
+HIERARCHY_LEVELS = {
+    'CEO': 5,
+    'VP': 4,
+    'Director': 3,
+    'Manager': 2,
+    'Senior': 1,
+    'Junior': 0
+}
+MANAGER_POSITIONS = ('Manager', 'Director', 'VP')
+RELATED_DEPARTMENTS = (
+    ('Engineering', 'Product'),
+    ('Sales', 'Marketing'),
+    ('HR', 'Finance'),
+    ('Engineering', 'Design')
+)
+
+DEFAULT_MAX_CLIQUE = 50  # tamaño de grupo a partir del cual se acotan las aristas
+ITERATOR_CHUNK_SIZE = 2000
+MAX_SUPERIORS = 2
+
+# (nivel, id, puesto)
+Member = Tuple[int, Any, Optional[str]]
+
+
+class OrganizationalGraphBuilder:
+    """Construye grafos organizacionales completos, por BU o por equipo."""
+
+    def __init__(self, max_clique: int = DEFAULT_MAX_CLIQUE,
+                 chunk_size: int = ITERATOR_CHUNK_SIZE):
+        self.max_clique = max_clique
+        self.chunk_size = chunk_size
+
+    def build(self, business_unit: Optional[str] = None,
+              team_id: Optional[Any] = None) -> nx.Graph:
+        """
+        Construye el grafo leyendo sólo las personas del alcance pedido.
+
+        Args:
+            business_unit: Nombre de la unidad de negocio (opcional)
+            team_id: ID del equipo para construir sólo su subgrafo (opcional)
+        """
+        from app.models import Person
+
+        persons_query = Person.objects.annotate(**_person_annotations()).order_by('id')
+        if business_unit:
+            persons_query = persons_query.filter(business_unit=business_unit)
+        if team_id is not None:
+            persons_query = persons_query.filter(teammember__team_id=team_id).distinct()
+
+        rows = persons_query.values(*PERSON_FIELDS).iterator(chunk_size=self.chunk_size)
+        return self.build_from_rows(rows)
+
+    def build_from_rows(self, rows: Iterable[Dict[str, Any]]) -> nx.Graph:
+        """Construye el grafo a partir de filas con ``PERSON_FIELDS`` ordenadas por id."""
+        G = nx.Graph()
+        blocks: Dict[Tuple[Any, Any], List[Member]] = defaultdict(list)
+        bu_members: Dict[Any, List[Member]] = defaultdict(list)
+
+        for row in rows:
+            position = row.get('position')
+            member = (HIERARCHY_LEVELS.get(position, 0), row['id'], position)
+            G.add_node(row['id'], **row)
+            blocks[(row.get('business_unit'), row.get('department'))].append(member)
+            bu_members[row.get('business_unit')].append(member)
+
+        # Mismo orden que la construcción original: las aristas posteriores
+        # sobrescriben el tipo de las anteriores para el mismo par
+        for members in blocks.values():
+            G.add_edges_from(self._collaboration_pairs(members), weight=0.8, type='collaboration')
+        for bu, department_a, department_b in self._related_blocks(blocks):
+            G.add_edges_from(
+                self._related_pairs(blocks[(bu, department_a)], blocks[(bu, department_b)]),
+                weight=0.5, type='collaboration'
+            )
+
+        bu_superiors = {bu: _first_superiors(members) for bu, members in bu_members.items()}
+        for (bu, _), members in blocks.items():
+            G.add_edges_from(
+                self._communication_pairs(members, bu_superiors[bu]),
+                weight=0.9, type='communication'
+            )
+        for members in blocks.values():
+            G.add_edges_from(self._hierarchical_pairs(members), weight=0.7, type='hierarchical')
+
+        logger.info(
+            f"Grafo organizacional construido: {G.number_of_nodes()} nodos, "
+            f"{G.number_of_edges()} conexiones en {len(blocks)} bloques"
+        )
+        return G
+
+    def _collaboration_pairs(self, members: List[Member]) -> Iterator[Tuple[Any, Any]]:
+        """Todos los pares del departamento o, si es grande, un anillo de ``max_clique`` vecinos."""
+        ids = [member_id for _, member_id, _ in members]
+        if len(ids) <= self.max_clique + 1:
+            yield from combinations(ids, 2)
+            return
+        # Vecinos contiguos por nivel para que los pares sean entre pares del mismo rango
+        ordered = [member_id for _, member_id, _ in sorted(members, key=lambda m: (-m[0], m[1]))]
+        size = len(ordered)
+        for i, member_id in enumerate(ordered):
+            for offset in range(1, self.max_clique // 2 + 1):
+                yield member_id, ordered[(i + offset) % size]
+
+    def _related_blocks(self, blocks) -> Iterator[Tuple[Any, str, str]]:
+        departments_by_bu: Dict[Any, set] = defaultdict(set)
+        for bu, department in blocks:
+            departments_by_bu[bu].add(department)
+        for bu, departments in departments_by_bu.items():
+            for department_a, department_b in RELATED_DEPARTMENTS:
+                if department_a in departments and department_b in departments:
+                    yield bu, department_a, department_b
+
+    def _related_pairs(self, members_a: List[Member],
+                       members_b: List[Member]) -> Iterator[Tuple[Any, Any]]:
+        """Producto completo entre departamentos o puentes round-robin si son grandes."""
+        ids_a = [member_id for _, member_id, _ in members_a]
+        ids_b = [member_id for _, member_id, _ in members_b]
+        if len(ids_a) * len(ids_b) <= self.max_clique ** 2:
+            yield from ((a, b) for a in ids_a for b in ids_b)
+            return
+        larger, smaller = (ids_a, ids_b) if len(ids_a) >= len(ids_b) else (ids_b, ids_a)
+        for i, member_id in enumerate(larger):
+            yield member_id, smaller[i % len(smaller)]
+
+    def _communication_pairs(self, members: List[Member],
+                             fallback: Dict[int, List[Any]]) -> Iterator[Tuple[Any, Any]]:
+        """Cada persona (excepto el CEO) se comunica con sus primeros superiores."""
+        superiors = _first_superiors(members)
+        for level, member_id, position in members:
+            if position == 'CEO':
+                continue
+            for superior_id in superiors.get(level) or fallback.get(level, []):
+                yield member_id, superior_id
+
+    def _hierarchical_pairs(self, members: List[Member]) -> Iterator[Tuple[Any, Any]]:
+        """Managers con subordinados: todos en bloques pequeños, organigrama en grandes."""
+        managers = [member for member in members if member[2] in MANAGER_POSITIONS]
+        if not managers:
+            return
+        if len(managers) * len(members) <= self.max_clique ** 2:
+            for manager_level, manager_id, _ in managers:
+                for level, member_id, _ in members:
+                    if level < manager_level:
+                        yield manager_id, member_id
+            return
+
+        managers_by_level: Dict[int, List[Any]] = defaultdict(list)
+        for level, manager_id, _ in managers:
+            managers_by_level[level].append(manager_id)
+        manager_levels = sorted(managers_by_level)
+        assigned: Dict[int, int] = defaultdict(int)
+        for level, member_id, _ in members:
+            # Manager más cercano por encima del nivel de la persona
+            nearest = next((candidate for candidate in manager_levels if candidate > level), None)
+            if nearest is None:
+                continue
+            candidates = managers_by_level[nearest]
+            yield candidates[assigned[nearest] % len(candidates)], member_id
+            assigned[nearest] += 1
+
+
+def _person_annotations() -> Dict[str, Any]:
+    """Expresiones que producen ``PERSON_FIELDS`` a partir de ``Person`` y ``Manager``."""
+    from django.db.models import Case, CharField, F, OuterRef, Subquery, Value, When
+    from django.db.models.functions import Coalesce
+    from app.models import Manager
+
+    # Primer manager que tiene a la persona como reporte directo
+    reports_to = Manager.objects.filter(direct_reports=OuterRef('pk')).order_by('id')
+    return {
+        'name': F('nombre'),
+        # Un perfil Manager con nivel desconocido cuenta como 'Manager'
+        'position': Case(
+            When(manager_profile__level__in=list(HIERARCHY_LEVELS), then=F('manager_profile__level')),
+            When(manager_profile__isnull=False, then=Value('Manager')),
+            default=None,
+            output_field=CharField(),
+        ),
+        'department': Coalesce(
+            F('manager_profile__department'),
+            Subquery(reports_to.values('department')[:1]),
+        ),
+        'business_unit': Coalesce(
+            F('manager_profile__business_unit__name'),
+            Subquery(reports_to.values('business_unit__name')[:1]),
+        ),
+    }
+
+
+def _first_superiors(members: List[Member]) -> Dict[int, List[Any]]:
+    """Para cada nivel presente, los primeros ``MAX_SUPERIORS`` miembros de nivel mayor."""
+    superiors: Dict[int, List[Any]] = {}
+    for level in {member[0] for member in members}:
+        found = []
+        for other_level, other_id, _ in members:
+            if other_level > level:
+                found.append(other_id)
+                if len(found) == MAX_SUPERIORS:
+                    break
+        superiors[level] = found
+    return superiors
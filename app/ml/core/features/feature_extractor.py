@@ -1,10 +1,11 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from app.models import Person, Vacante
 from app.ml.analyzers import BaseAnalyzer
 from app.ml.core.models.base import BaseModel
 from app.ml.core.utils import DistributedCache
 from app.ml.core.scheduling import AsyncProcessor
 from app.ml.analyzers import SkillAnalyzer, CulturalFitAnalyzer
+from app.ml.core.features.feature_store import FeatureStore, PAIR_DIM
 import numpy as np
 import logging
 
@@ -18,18 +19,25 @@ class FeatureExtractor:
     relevantes para el matchmaking y análisis predictivo.
     """
     
-    def __init__(self, cache: DistributedCache, async_processor: AsyncProcessor):
+    def __init__(self, cache: DistributedCache, async_processor: AsyncProcessor,
+                 feature_store: Optional[FeatureStore] = None):
         """
         Inicializa el sistema de extracción de características.
         
         Args:
             cache: Sistema de caché distribuido
             async_processor: Procesador asíncrono para análisis paralelo
+            feature_store: Feature store por entidad (por defecto uno con los
+                embeddings de SkillAnalyzer y el modelo de CulturalFitAnalyzer)
         """
         self.cache = cache
         self.async_processor = async_processor
         self.analyzers = {}
         self._initialize_analyzers()
+        self.feature_store = feature_store or FeatureStore(
+            embed_fn=lambda texts: self.skill_analyzer.embed(texts).numpy(),
+            culture_fn=lambda embeddings: self.cultural_fit_analyzer.model.predict(embeddings, verbose=0),
+        )
 
     def _initialize_analyzers(self) -> None:
         """
@@ -71,90 +79,29 @@ class FeatureExtractor:
         Returns:
             np.ndarray: Vector de características
         """
-        try:
-            # Verificar cache distribuido
-            cache_key = f"features_{person.id}_{vacancy.id}"
-            cached_features = self.cache.get(cache_key)
-            if cached_features is not None:
-                return cached_features
-                
-            # Preparar tareas de análisis
-            tasks = []
-            for analyzer_name, analyzer in self.analyzers.items():
-                if hasattr(analyzer, 'analyze_skills'):
-                    tasks.append((analyzer.analyze_skills, person.skills_text))
-                elif hasattr(analyzer, 'analyze_cultural_fit'):
-                    tasks.append((analyzer.analyze_cultural_fit, person, vacancy))
-                elif hasattr(analyzer, 'predict'):
-                    tasks.append((analyzer.predict, vacancy))
-                elif hasattr(analyzer, 'get_current_trends'):
-                    tasks.append((analyzer.get_current_trends,))
-            
-            # Ejecutar análisis en paralelo
-            results = self.async_processor.process(tasks)
-            
-            # Construir vector de características
-            features_vector = self._build_feature_vector(results, person, vacancy)
-            
-            # Almacenar en caché
-            self.cache.set(cache_key, features_vector)
-            
-            return features_vector
-            
-        except Exception as e:
-            logger.error(f"Error extrayendo características: {e}")
-            return np.zeros(14)
+        return self.extract_features_batch(person, [vacancy])[0]
 
-    def _build_feature_vector(self, results: List, person: Person, vacancy: Vacante) -> np.ndarray:
+    def extract_features_batch(self, person: Person, vacancies: Sequence[Vacante]) -> np.ndarray:
         """
-        Construye el vector de características final a partir de los resultados de análisis.
+        Vectores de características de un candidato contra varias vacantes.
+        
+        Los embeddings de candidato y vacantes salen del feature store (se
+        calculan una vez por entidad) y los vectores de par se arman de forma
+        vectorizada.
         
         Args:
-            results: Lista de resultados de los analizadores
             person: Objeto Person
-            vacancy: Objeto Vacante
+            vacancies: Vacantes a puntuar
             
         Returns:
-            np.ndarray: Vector de características completo
+            np.ndarray: Matriz (len(vacancies), 526)
         """
         try:
-            # Extraer resultados por analizador
-            skill_results = results[0]  # Resultados del SkillAnalyzer
-            cultural_fit = results[1]  # Resultados del CulturalFitAnalyzer
-            
-            # Construir vector de características
-            features = []
-            
-            # 1. Características de habilidades (512 dimensiones)
-            features.extend(skill_results['embedding'])
-            
-            # 2. Métricas de ajuste cultural (8 dimensiones)
-            features.append(cultural_fit['cultural_alignment'])
-            features.append(cultural_fit['values_alignment'])
-            features.append(cultural_fit['behavior_alignment'])
-            features.append(cultural_fit['communication_alignment'])
-            features.append(cultural_fit['team_alignment'])
-            features.append(cultural_fit['leadership_alignment'])
-            features.append(cultural_fit['workstyle_alignment'])
-            features.append(cultural_fit['growth_alignment'])
-            
-            # 3. Características adicionales (6 dimensiones)
-            features.append(person.years_of_experience / 50)  # Normalizado 0-1
-            features.append(person.education_level / 5)  # Normalizado 0-1
-            features.append(person.certifications_count / 10)  # Normalizado 0-1
-            features.append(vacancy.required_experience / 10)  # Normalizado 0-1
-            features.append(vacancy.required_education_level / 5)  # Normalizado 0-1
-            features.append(vacancy.required_certifications_count / 10)  # Normalizado 0-1
-            
-            # Convertir a numpy array y normalizar
-            features_array = np.array(features)
-            features_array = (features_array - features_array.min()) / (features_array.max() - features_array.min())
-            
-            return features_array
+            return self.feature_store.pair_features(person, list(vacancies))
             
         except Exception as e:
-            logger.error(f"Error construyendo vector de características: {e}")
-            return np.zeros(526)  # 512 + 8 + 6
+            logger.error(f"Error extrayendo características: {e}")
+            return np.zeros((len(vacancies), PAIR_DIM))
 
     def _normalize_score(self, score: float) -> float:
         """
@@ -0,0 +1,373 @@
+"""
+Feature store por entidad para el matchmaking.
+
+Las características de candidato (``Person``) y vacante (``Vacante``) se
+calculan una sola vez por entidad y se guardan en matrices float32
+append-only en disco, abiertas con ``np.memmap``: todos los workers leen las
+mismas páginas del page cache sin copiarlas. Un índice ``id -> fila`` (con la
+huella del contenido de origen) acompaña a cada matriz y se reemplaza de forma
+atómica en cada escritura.
+
+Fila de entidad (``ENTITY_DIM``):
+    [embedding de habilidades (512) | embedding cultural (512) | escalares (3)]
+
+Vector de par (``PAIR_DIM`` = 526, mismo layout que ``FeatureExtractor``):
+    [embedding de habilidades del candidato (512) |
+     alineación (8): coseno habilidades, coseno cultura, 6 factores culturales |
+     escalares del candidato (3) | escalares de la vacante (3)]
+
+Los vectores de par se arman con operaciones vectorizadas sobre las filas ya
+calculadas, así que puntuar un candidato contra miles de vacantes no vuelve a
+calcular ningún embedding.
+
+Invalidación: las señales de ``Person``/``Vacante`` eliminan la entrada del
+índice; además, una huella distinta del contenido fuerza el recálculo aunque
+la señal no se haya disparado (p. ej. ``QuerySet.update``). Cambiar
+``FEATURE_VERSION`` empieza matrices nuevas.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FEATURE_VERSION = 1
+EMBEDDING_DIM = 512
+SCALAR_DIM = 3
+ENTITY_DIM = 2 * EMBEDDING_DIM + SCALAR_DIM
+CULTURAL_FACTORS = 6
+PAIR_DIM = EMBEDDING_DIM + 2 + CULTURAL_FACTORS + 2 * SCALAR_DIM
+
+ENTITY_KINDS = ('person', 'vacancy')
+
+
+def _store_dir() -> str:
+    return getattr(settings, 'ML_FEATURE_STORE_DIR', '/home/pablo/ml_data/feature_store')
+
+
+def _clip(value: Any, scale: float) -> float:
+    try:
+        return max(0.0, min(1.0, float(value or 0) / scale))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _as_text(value: Any) -> str:
+    if not value:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value)
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def person_sources(person) -> Tuple[str, str, Tuple[float, ...]]:
+    """Textos y escalares de origen de un candidato."""
+    skills = getattr(person, 'skills_text', None) or _as_text(getattr(person, 'skills', None))
+    culture = getattr(person, 'personality_text', None) or _as_text(getattr(person, 'personality_data', None))
+    scalars = (
+        _clip(getattr(person, 'years_of_experience', None) or getattr(person, 'experience_years', None), 50),
+        _clip(getattr(person, 'education_level', None), 5),
+        _clip(getattr(person, 'certifications_count', None), 10),
+    )
+    return skills, culture, scalars
+
+
+def vacancy_sources(vacancy) -> Tuple[str, str, Tuple[float, ...]]:
+    """Textos y escalares de origen de una vacante."""
+    skills = getattr(vacancy, 'skills_text', None) or ' '.join(filter(None, [
+        _as_text(getattr(vacancy, 'skills_required', None)),
+        _as_text(getattr(vacancy, 'requisitos', None)),
+    ]))
+    culture = getattr(vacancy, 'culture_text', None) or _as_text(getattr(vacancy, 'descripcion', None))
+    scalars = (
+        _clip(getattr(vacancy, 'required_experience', None), 10),
+        _clip(getattr(vacancy, 'required_education_level', None), 5),
+        _clip(getattr(vacancy, 'required_certifications_count', None), 10),
+    )
+    return skills, culture, scalars
+
+
+ENTITY_SOURCES = {
+    'person': person_sources,
+    'vacancy': vacancy_sources,
+}
+
+
+def source_fingerprint(sources: Tuple[str, str, Tuple[float, ...]]) -> int:
+    """Huella de 64 bits (con signo, cabe en int64) del contenido de origen."""
+    digest = hashlib.blake2b(repr(sources).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class MmapMatrix:
+    """
+    Matriz float32 append-only en disco con índice ``id -> fila``.
+
+    Las escrituras (de cualquier proceso) se serializan con ``flock``; las
+    lecturas no toman lock: el índice se reemplaza con ``os.replace`` y sólo
+    apunta a filas ya escritas en el archivo de datos.
+    """
+
+    def __init__(self, directory: str, name: str, dim: int):
+        self.dim = dim
+        self.row_bytes = dim * 4
+        self.data_path = os.path.join(directory, f"{name}.f32")
+        self.index_path = os.path.join(directory, f"{name}.idx.npz")
+        self.lock_path = os.path.join(directory, f"{name}.lock")
+        self._index: Dict[int, Tuple[int, int]] = {}
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._index)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Recarga índice y memmap si otro proceso los cambió."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            self._index, self._stamp = {}, None
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        self._index = self._read_index()
+        self._stamp = stamp
+        self._open_matrix()
+
+    def _read_index(self) -> Dict[int, Tuple[int, int]]:
+        try:
+            with np.load(self.index_path) as data:
+                return dict(zip(data['ids'].tolist(), zip(data['rows'].tolist(), data['fingerprints'].tolist())))
+        except FileNotFoundError:
+            return {}
+
+    def _write_index(self, index: Dict[int, Tuple[int, int]]):
+        ids = np.fromiter(index.keys(), dtype=np.int64, count=len(index))
+        values = np.array(list(index.values()), dtype=np.int64).reshape(-1, 2)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, ids=ids, rows=values[:, 0], fingerprints=values[:, 1])
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _open_matrix(self):
+        try:
+            rows = os.path.getsize(self.data_path) // self.row_bytes
+        except FileNotFoundError:
+            rows = 0
+        if rows == 0:
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+        else:
+            self._matrix = np.memmap(self.data_path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+
+    def lookup(self, ids: Sequence[int], fingerprints: Sequence[int]) -> np.ndarray:
+        """Filas de cada id (``-1`` si falta o su huella cambió)."""
+        self.refresh()
+        rows = np.full(len(ids), -1, dtype=np.int64)
+        for position, (entity_id, fingerprint) in enumerate(zip(ids, fingerprints)):
+            entry = self._index.get(entity_id)
+            if entry is not None and entry[1] == fingerprint:
+                rows[position] = entry[0]
+        return rows
+
+    def entry(self, entity_id: int) -> Optional[Tuple[int, int]]:
+        """``(fila, huella)`` de un id, o ``None``."""
+        self.refresh()
+        return self._index.get(int(entity_id))
+
+    def take(self, rows: np.ndarray) -> np.ndarray:
+        """Copia las filas pedidas a un array en memoria."""
+        return np.asarray(self._matrix[rows], dtype=np.float32)
+
+    def append(self, ids: Sequence[int], fingerprints: Sequence[int], vectors: np.ndarray):
+        """Agrega filas nuevas y apunta los ids a ellas."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._locked():
+            with open(self.data_path, 'ab') as f:
+                start = f.tell() // self.row_bytes
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            index = self._read_index()
+            for offset, (entity_id, fingerprint) in enumerate(zip(ids, fingerprints)):
+                index[int(entity_id)] = (start + offset, int(fingerprint))
+            self._write_index(index)
+        self.refresh()
+
+    def invalidate(self, ids: Sequence[int]) -> int:
+        """Quita ids del índice; sus filas quedan como basura hasta ``compact``."""
+        with self._locked():
+            index = self._read_index()
+            removed = sum(index.pop(int(entity_id), None) is not None for entity_id in ids)
+            if removed:
+                self._write_index(index)
+        return removed
+
+    def compact(self) -> Tuple[int, int]:
+        """Reescribe sólo las filas vivas. Devuelve (filas antes, filas después)."""
+        with self._locked():
+            index = self._read_index()
+            self._stamp = None
+            self._open_matrix()
+            before = len(self._matrix)
+            ids = list(index)
+            live = self._matrix[[index[entity_id][0] for entity_id in ids]] if ids else np.empty((0, self.dim), np.float32)
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.data_path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(np.ascontiguousarray(live, dtype=np.float32).tobytes())
+            # Los lectores con el memmap anterior siguen leyendo el archivo viejo
+            os.replace(tmp_path, self.data_path)
+            self._write_index({
+                entity_id: (row, index[entity_id][1]) for row, entity_id in enumerate(ids)
+            })
+        self.refresh()
+        return before, len(ids)
+
+
+class FeatureStore:
+    """
+    Características por entidad, versionadas y compartidas entre workers.
+
+    Args:
+        embed_fn: Función ``List[str] -> array (n, 512)`` (p. ej. USE); sólo
+            se necesita para calcular entidades nuevas o modificadas.
+        culture_fn: Función ``array (n, 512) -> array (n, 6)`` con los
+            factores culturales (modelo de ``CulturalFitAnalyzer``); opcional.
+        directory: Directorio base (por defecto ``settings.ML_FEATURE_STORE_DIR``).
+    """
+
+    def __init__(self, embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+                 culture_fn: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 directory: Optional[str] = None, version: int = FEATURE_VERSION):
+        self.embed_fn = embed_fn
+        self.culture_fn = culture_fn
+        self.directory = os.path.join(directory or _store_dir(), f"v{version}")
+        self.matrices = {kind: MmapMatrix(self.directory, kind, ENTITY_DIM) for kind in ENTITY_KINDS}
+
+    def entity_features(self, kind: str, instances: Sequence[Any]) -> np.ndarray:
+        """Filas ``(n, ENTITY_DIM)`` de las entidades, calculando sólo las que faltan."""
+        matrix = self.matrices[kind]
+        sources = [ENTITY_SOURCES[kind](instance) for instance in instances]
+        ids = [int(instance.pk) for instance in instances]
+        fingerprints = [source_fingerprint(source) for source in sources]
+
+        rows = matrix.lookup(ids, fingerprints)
+        found = rows >= 0
+        features = np.empty((len(ids), ENTITY_DIM), dtype=np.float32)
+        features[found] = matrix.take(rows[found])
+
+        missing = np.flatnonzero(~found).tolist()
+        if missing:
+            # Repetidos dentro de la misma llamada se calculan una sola vez
+            unique = list({ids[position]: position for position in missing}.values())
+            vectors = self._compute([sources[position] for position in unique])
+            matrix.append([ids[p] for p in unique], [fingerprints[p] for p in unique], vectors)
+            computed = {ids[position]: vector for position, vector in zip(unique, vectors)}
+            for position in missing:
+                features[position] = computed[ids[position]]
+            logger.info(f"Feature store: {len(unique)} {kind} calculados ({len(ids) - len(missing)} reutilizados)")
+        return features
+
+    def _compute(self, sources: List[Tuple[str, str, Tuple[float, ...]]]) -> np.ndarray:
+        if self.embed_fn is None:
+            raise RuntimeError("FeatureStore sin embed_fn: no puede calcular entidades nuevas")
+        texts = [skills or ' ' for skills, _, _ in sources] + [culture or ' ' for _, culture, _ in sources]
+        embeddings = np.asarray(self.embed_fn(texts), dtype=np.float32).reshape(len(texts), EMBEDDING_DIM)
+        count = len(sources)
+        scalars = np.array([source[2] for source in sources], dtype=np.float32).reshape(count, SCALAR_DIM)
+        return np.hstack([embeddings[:count], embeddings[count:], scalars])
+
+    def pair_features(self, person, vacancies: Sequence[Any]) -> np.ndarray:
+        """Vectores de par ``(n, PAIR_DIM)`` de un candidato contra varias vacantes."""
+        if not vacancies:
+            return np.zeros((0, PAIR_DIM), dtype=np.float32)
+        person_row = self.entity_features('person', [person])[0]
+        vacancy_rows = self.entity_features('vacancy', vacancies)
+
+        person_skills = person_row[:EMBEDDING_DIM]
+        person_culture = person_row[EMBEDDING_DIM:2 * EMBEDDING_DIM]
+        vacancy_skills = vacancy_rows[:, :EMBEDDING_DIM]
+        vacancy_culture = vacancy_rows[:, EMBEDDING_DIM:2 * EMBEDDING_DIM]
+        count = len(vacancy_rows)
+
+        skills_cosine = _unit_rows(vacancy_skills) @ _unit_rows(person_skills[None, :])[0]
+        culture_cosine = _unit_rows(vacancy_culture) @ _unit_rows(person_culture[None, :])[0]
+        if self.culture_fn is not None:
+            combined = _unit_rows(vacancy_culture + person_culture)
+            factors = np.asarray(self.culture_fn(combined), dtype=np.float32).reshape(count, CULTURAL_FACTORS)
+        else:
+            factors = np.zeros((count, CULTURAL_FACTORS), dtype=np.float32)
+
+        features = np.hstack([
+            np.broadcast_to(person_skills, (count, EMBEDDING_DIM)),
+            skills_cosine[:, None],
+            culture_cosine[:, None],
+            factors,
+            np.broadcast_to(person_row[2 * EMBEDDING_DIM:], (count, SCALAR_DIM)),
+            vacancy_rows[:, 2 * EMBEDDING_DIM:],
+        ]).astype(np.float32)
+
+        # Normalización min-max por fila (igual que el vector por par anterior)
+        low = features.min(axis=1, keepdims=True)
+        span = features.max(axis=1, keepdims=True) - low
+        span[span == 0] = 1.0
+        return (features - low) / span
+
+    def invalidate(self, kind: str, ids: Sequence[int]) -> int:
+        return self.matrices[kind].invalidate(ids)
+
+    def invalidate_if_changed(self, kind: str, instance) -> bool:
+        """Invalida la entidad sólo si cambió algún campo del que dependen sus features."""
+        entry = self.matrices[kind].entry(instance.pk)
+        if entry is None or entry[1] == source_fingerprint(ENTITY_SOURCES[kind](instance)):
+            return False
+        return self.invalidate(kind, [instance.pk]) > 0
+
+    def compact(self) -> Dict[str, Tuple[int, int]]:
+        return {kind: matrix.compact() for kind, matrix in self.matrices.items()}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for kind, matrix in self.matrices.items():
+            matrix.refresh()
+            report[kind] = {
+                'entities': len(matrix._index),
+                'rows': len(matrix._matrix),
+                'mb': round(len(matrix._matrix) * matrix.row_bytes / (1024 * 1024), 1),
+            }
+        return report
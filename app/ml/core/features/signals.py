@@ -0,0 +1,82 @@
+# /home/pablo/app/ml/core/features/signals.py
+"""
+Señales que invalidan el feature store de matchmaking y mantienen el índice
+de similitud por habilidades.
+
+Al eliminar un ``Person`` o una ``Vacante``, o al guardarlo con cambios en
+los campos de los que dependen sus features, se quita su fila del índice; se
+recalcula la próxima vez que se puntúe. Los guardados que no tocan esos campos
+(contadores, estados) no reescriben el índice.
+
+El índice de similitud se actualiza en el momento: una tarjeta Kanban creada
+o movida se reindexa, y si cambian las habilidades de un candidato o de una
+vacante se reindexan también sus tarjetas.
+"""
+
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from app.models import Person, Vacante
+from app.ats.kanban.models import KanbanCard
+from app.ml.core.features.feature_store import FeatureStore
+from app.ml.core.features.similarity_index import similarity_index
+
+logger = logging.getLogger(__name__)
+
+_store = None
+
+
+def _feature_store() -> FeatureStore:
+    global _store
+    if _store is None:
+        _store = FeatureStore()
+    return _store
+
+
+def _invalidate(kind: str, instance, deleted: bool):
+    try:
+        if deleted:
+            _feature_store().invalidate(kind, [instance.pk])
+        else:
+            _feature_store().invalidate_if_changed(kind, instance)
+    except Exception as e:
+        logger.warning(f"No se pudo invalidar el feature store ({kind} {instance.pk}): {e}")
+
+
+def _update_similarity(kind: str, instance, skills, card_filter: str, deleted: bool):
+    try:
+        if deleted:
+            similarity_index.remove(kind, instance.pk)
+        elif similarity_index.add(kind, instance.pk, similarity_index.canonical_skills(skills)):
+            similarity_index.refresh('card', **{card_filter: instance.pk})
+    except Exception as e:
+        logger.warning(f"No se pudo actualizar el índice de similitud ({kind} {instance.pk}): {e}")
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Person)
+def invalidate_person_features(sender, instance, **kwargs):
+    deleted = kwargs.get('signal') is post_delete
+    _invalidate('person', instance, deleted=deleted)
+    _update_similarity('person', instance, getattr(instance, 'skills', None), 'person_id', deleted)
+
+
+@receiver(post_save, sender=Vacante)
+@receiver(post_delete, sender=Vacante)
+def invalidate_vacancy_features(sender, instance, **kwargs):
+    deleted = kwargs.get('signal') is post_delete
+    _invalidate('vacancy', instance, deleted=deleted)
+    _update_similarity('vacancy', instance, getattr(instance, 'skills_required', None), 'vacancy_id', deleted)
+
+
+@receiver(post_save, sender=KanbanCard)
+@receiver(post_delete, sender=KanbanCard)
+def update_card_similarity(sender, instance, **kwargs):
+    try:
+        if kwargs.get('signal') is post_delete:
+            similarity_index.remove('card', instance.pk)
+        else:
+            similarity_index.refresh('card', [instance.pk])
+    except Exception as e:
+        logger.warning(f"No se pudo actualizar el índice de similitud (card {instance.pk}): {e}")
@@ -0,0 +1,393 @@
+"""
+Índice de similitud por habilidades (MinHash-LSH) para tarjetas Kanban,
+candidatos y vacantes.
+
+Cada entidad se reduce a su conjunto de IDs canónicos de habilidades (del
+``SkillDictionary``) y a una firma MinHash de ``NUM_PERM`` valores. La firma
+se parte en ``BANDS`` bandas; cada banda es una cubeta (set de Redis) con las
+entidades que comparten esos valores. Para buscar las más parecidas a una
+entidad se leen sus cubetas en un pipeline, se ordenan los candidatos por
+número de bandas en común y sólo los mejores se comparan con Jaccard exacto
+sobre el conjunto guardado. No se consulta la base de datos.
+
+Tipos de entidad:
+    person   habilidades del candidato (``Person.skills``)
+    vacancy  habilidades requeridas (``Vacante.skills_required``)
+    card     tarjeta Kanban: ``v:`` habilidades de la vacante + ``p:`` del
+             candidato; el grupo es el tablero, para filtrar por tablero.
+
+Las entidades con grupo se indexan además en cubetas propias del grupo, de
+modo que una consulta por grupo sólo ve candidatos de ese grupo antes de
+recortar a ``MAX_CANDIDATES``.
+
+El índice vive en Redis (compartido por todos los procesos) y se mantiene con
+las señales de ``app.ml.core.features.signals``; si Redis no está disponible
+se usa un ``InMemoryRedis`` del proceso. La primera consulta de un tipo sin
+construir programa ``build_similarity_index_task`` y responde con lo que ya
+esté indexado; también se construye con ``build_similarity_index``.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from app.ats.utils.tiered_cache import InMemoryRedis, tiered_cache
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2       # v2: cubetas por grupo
+KEY_PREFIX = f"sim:v{INDEX_VERSION}"
+ENTITY_KINDS = ('person', 'vacancy', 'card')
+
+NUM_PERM = 64
+BANDS = 32              # 2 filas por banda: umbral LSH ~0.18 de Jaccard
+MAX_CANDIDATES = 500    # candidatos comparados con Jaccard exacto por consulta
+BUILD_BATCH_SIZE = 1000
+BUILD_LOCK_TTL = 3600   # segundos; si la tarea se pierde, otra consulta la reprograma
+
+_PRIME = 4294967311     # primo > 2^32: (a * h + b) cabe en uint64
+_SEED = 20240601
+_SPLIT = re.compile(r"[,;\n|/•]+")
+
+
+def _permutations(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Semilla fija: todos los procesos deben generar las mismas firmas
+    rng = np.random.RandomState(_SEED)
+    a = rng.randint(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def _decode(value) -> str:
+    return value.decode('utf-8') if isinstance(value, bytes) else str(value)
+
+
+def _skill_items(value: Any) -> List[str]:
+    """Lista de habilidades desde texto libre, lista de cadenas o lista de dicts."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return [item.strip() for item in _SPLIT.split(value) if item.strip()]
+        return _skill_items(parsed) if not isinstance(parsed, str) else [parsed]
+    if isinstance(value, dict):
+        return [str(key) for key in value]
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get('name') or item.get('skill') or item.get('nombre')
+        if item:
+            items.append(str(item))
+    return items
+
+
+class SimilarityIndex:
+    """
+    Índice MinHash-LSH por tipo de entidad.
+
+    Args:
+        redis_client: Cliente Redis; por defecto el de ``tiered_cache`` o, si
+            no hay conexión, un ``InMemoryRedis`` del proceso.
+        num_perm: Valores de la firma MinHash.
+        bands: Bandas LSH (``num_perm`` debe ser múltiplo).
+        dictionary: ``SkillDictionary`` para canonizar habilidades.
+    """
+
+    def __init__(self, redis_client: Any = None, num_perm: Optional[int] = None,
+                 bands: Optional[int] = None, dictionary: Any = None):
+        config = self._settings()
+        self.num_perm = num_perm or config.get('NUM_PERM', NUM_PERM)
+        self.bands = bands or config.get('BANDS', BANDS)
+        if self.num_perm % self.bands:
+            raise ValueError('num_perm debe ser múltiplo de bands')
+        self.rows = self.num_perm // self.bands
+        self.max_candidates = config.get('MAX_CANDIDATES', MAX_CANDIDATES)
+        self._a, self._b = _permutations(self.num_perm)
+        self._redis = redis_client
+        self._local = None
+        self._dictionary = dictionary
+
+    @staticmethod
+    def _settings() -> Dict[str, Any]:
+        try:
+            return getattr(settings, 'SIMILARITY_INDEX', None) or {}
+        except Exception:
+            return {}
+
+    @property
+    def redis(self):
+        if self._redis is not None:
+            return self._redis
+        client = tiered_cache.redis
+        if client is not None:
+            return client
+        if self._local is None:
+            self._local = InMemoryRedis()
+        return self._local
+
+    @property
+    def dictionary(self):
+        if self._dictionary is None:
+            from app.ats.utils.skills.skill_dictionary import get_skill_dictionary
+            self._dictionary = get_skill_dictionary()
+        return self._dictionary
+
+    # Conjuntos de habilidades ------------------------------------------------
+
+    def canonical_skills(self, value: Any) -> Set[str]:
+        """IDs canónicos de las habilidades de un campo (texto o lista)."""
+        items = _skill_items(value)
+        return set(self.dictionary.canonicalize(items)) if items else set()
+
+    def card_skills(self, vacancy_skills: Any, person_skills: Any) -> Set[str]:
+        return ({f"v:{skill}" for skill in self.canonical_skills(vacancy_skills)} |
+                {f"p:{skill}" for skill in self.canonical_skills(person_skills)})
+
+    # MinHash / LSH -------------------------------------------------------------
+
+    def signature(self, skills: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((_token_hash(skill) for skill in skills), dtype=np.uint64)
+        if not hashes.size:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        return ((np.outer(hashes, self._a) + self._b) % np.uint64(_PRIME)).min(axis=0)
+
+    def band_keys(self, kind: str, skills: Iterable[str], group: Any = None) -> List[str]:
+        """Cubetas de las habilidades; con ``group``, las cubetas propias del grupo."""
+        signature = self.signature(skills)
+        prefix = f"{KEY_PREFIX}:{kind}" if group is None else f"{KEY_PREFIX}:{kind}:g{group}"
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()
+            keys.append(f"{prefix}:b{band}:{digest}")
+        return keys
+
+    def _entity_key(self, kind: str, key: Any) -> str:
+        return f"{KEY_PREFIX}:{kind}:e:{key}"
+
+    def _built_key(self, kind: str) -> str:
+        return f"{KEY_PREFIX}:{kind}:built"
+
+    def _load(self, kind: str, keys: Sequence[Any]) -> List[Optional[Dict[str, Any]]]:
+        if not keys:
+            return []
+        raw = self.redis.mget([self._entity_key(kind, key) for key in keys])
+        return [json.loads(value) if value else None for value in raw]
+
+    # Escritura -------------------------------------------------------------------
+
+    def add_many(self, kind: str, entries: Iterable[Tuple[Any, Set[str], Any]]) -> int:
+        """
+        Indexa o actualiza entidades ``(clave, habilidades, grupo)``.
+
+        Las que no cambiaron no se reescriben; las que se quedan sin
+        habilidades se quitan del índice. Devuelve cuántas cambiaron.
+        """
+        entries = list(entries)
+        if not entries:
+            return 0
+        current = self._load(kind, [key for key, _, _ in entries])
+        pipe = self.redis.pipeline(transaction=False)
+        changed = 0
+        for (key, skills, group), doc in zip(entries, current):
+            skills = sorted(skills)
+            if doc is not None and doc['s'] == skills and doc.get('g') == group:
+                continue
+            changed += 1
+            member = str(key)
+            old_bands = set(doc['b']) if doc else set()
+            new_bands = set()
+            if skills:
+                new_bands.update(self.band_keys(kind, skills))
+                if group is not None:
+                    new_bands.update(self.band_keys(kind, skills, group))
+            for band_key in old_bands - new_bands:
+                pipe.srem(band_key, member)
+            for band_key in new_bands - old_bands:
+                pipe.sadd(band_key, member)
+            if skills:
+                pipe.set(self._entity_key(kind, key), json.dumps({'s': skills, 'g': group, 'b': sorted(new_bands)}))
+            else:
+                pipe.delete(self._entity_key(kind, key))
+        pipe.execute()
+        return changed
+
+    def add(self, kind: str, key: Any, skills: Set[str], group: Any = None) -> bool:
+        return bool(self.add_many(kind, [(key, skills, group)]))
+
+    def remove(self, kind: str, key: Any):
+        doc = self._load(kind, [key])[0]
+        if doc is None:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for band_key in doc['b']:
+            pipe.srem(band_key, str(key))
+        pipe.delete(self._entity_key(kind, key))
+        pipe.execute()
+
+    def clear(self, kind: str) -> int:
+        keys = list(self.redis.scan_iter(match=f"{KEY_PREFIX}:{kind}:*", count=1000))
+        for start in range(0, len(keys), 1000):
+            self.redis.delete(*keys[start:start + 1000])
+        return len(keys)
+
+    # Consulta ----------------------------------------------------------------------
+
+    def similar(self, kind: str, key: Any = None, skills: Optional[Set[str]] = None, k: int = 10,
+                group: Any = None, min_similarity: float = 0.0, exclude: Iterable[Any] = ()) -> List[Tuple[str, float]]:
+        """
+        Las ``k`` entidades más parecidas, como ``[(clave, jaccard), ...]``.
+
+        Se consulta por la clave de una entidad indexada o por un conjunto de
+        habilidades ad hoc. ``group`` limita el resultado a un grupo (tablero)
+        leyendo sólo las cubetas de ese grupo.
+        """
+        if skills is None:
+            doc = self._load(kind, [key])[0]
+            if doc is None:
+                return []
+            skills = doc['s']
+        skills = set(skills)
+        if not skills:
+            return []
+        band_keys = self.band_keys(kind, skills, group)
+
+        pipe = self.redis.pipeline(transaction=False)
+        for band_key in band_keys:
+            pipe.smembers(band_key)
+        hits = Counter()
+        for members in pipe.execute():
+            hits.update(_decode(member) for member in members)
+        excluded = {str(item) for item in exclude}
+        if key is not None:
+            excluded.add(str(key))
+        candidates = [member for member, _ in hits.most_common() if member not in excluded][:self.max_candidates]
+
+        results = []
+        for member, doc in zip(candidates, self._load(kind, candidates)):
+            if doc is None or (group is not None and doc.get('g') != group):
+                continue
+            score = jaccard(skills, set(doc['s']))
+            if score > 0 and score >= min_similarity:
+                results.append((member, round(score, 4)))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:k]
+
+    # Construcción desde la base de datos ------------------------------------------
+
+    def _rows(self, kind: str, ids: Optional[Sequence[Any]] = None, **filters):
+        """Filas ``(clave, habilidades, grupo)`` leídas con una sola consulta por lote."""
+        if kind == 'person':
+            from app.models import Person
+            queryset = Person.objects.values_list('id', 'skills')
+            convert = lambda row: (row[0], self.canonical_skills(row[1]), None)  # noqa: E731
+        elif kind == 'vacancy':
+            from app.models import Vacante
+            queryset = Vacante.objects.values_list('id', 'skills_required')
+            convert = lambda row: (row[0], self.canonical_skills(row[1]), None)  # noqa: E731
+        elif kind == 'card':
+            from app.ats.kanban.models import KanbanCard
+            queryset = KanbanCard.objects.values_list(
+                'id', 'column__board_id', 'vacancy__skills_required', 'person__skills'
+            )
+            convert = lambda row: (row[0], self.card_skills(row[2], row[3]), row[1])  # noqa: E731
+        else:
+            raise ValueError(f"Tipo de entidad desconocido: {kind}")
+        if ids is not None:
+            queryset = queryset.filter(id__in=list(ids))
+        if filters:
+            queryset = queryset.filter(**filters)
+        for row in queryset.order_by().iterator(chunk_size=BUILD_BATCH_SIZE):
+            yield convert(row)
+
+    def _index_rows(self, kind: str, rows) -> int:
+        changed = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BUILD_BATCH_SIZE:
+                changed += self.add_many(kind, batch)
+                batch = []
+        return changed + self.add_many(kind, batch)
+
+    def refresh(self, kind: str, ids: Optional[Sequence[Any]] = None, **filters) -> int:
+        """Reindexa las entidades indicadas (o filtradas) leyendo la base de datos."""
+        if ids is None:
+            return self._index_rows(kind, self._rows(kind, **filters))
+        rows = list(self._rows(kind, ids, **filters))
+        # Las que ya no existen (o no pasan el filtro) salen del índice
+        found = {str(key) for key, _, _ in rows}
+        for key in ids:
+            if str(key) not in found:
+                self.remove(kind, key)
+        return self._index_rows(kind, rows)
+
+    def build(self, kind: str, clear: bool = False) -> int:
+        """Indexa todas las entidades del tipo. Devuelve cuántas cambiaron."""
+        if clear:
+            self.clear(kind)
+        changed = self._index_rows(kind, self._rows(kind))
+        self.redis.set(self._built_key(kind), 1)
+        return changed
+
+    def _build_lock_key(self, kind: str) -> str:
+        return f"{self._built_key(kind)}:lock"
+
+    def build_locked(self, kind: str, clear: bool = False) -> int:
+        """``build`` que libera el candado tomado por ``ensure_built``."""
+        try:
+            changed = self.build(kind, clear=clear)
+            logger.info(f"Índice de similitud '{kind}' construido ({changed} entidades)")
+            return changed
+        finally:
+            self.redis.delete(self._build_lock_key(kind))
+
+    def ensure_built(self, kind: str) -> bool:
+        """
+        Indica si el tipo ya está construido. Si no, programa su construcción
+        una sola vez (un proceso a la vez) sin esperarla: mientras tanto las
+        consultas devuelven resultados parciales.
+        """
+        redis = self.redis
+        if redis.get(self._built_key(kind)):
+            return True
+        if not redis.set(self._build_lock_key(kind), 1, ex=BUILD_LOCK_TTL, nx=True):
+            return False
+        if redis is self._local:
+            # Índice del proceso (sin Redis): un worker de Celery no lo vería
+            threading.Thread(target=self.build_locked, args=(kind,), daemon=True).start()
+            return False
+        try:
+            from app.tasks.similarity import build_similarity_index_task
+            build_similarity_index_task.delay(kind)
+        except Exception as e:
+            logger.warning(f"No se pudo programar la construcción del índice '{kind}': {e}")
+            redis.delete(self._build_lock_key(kind))
+        return False
+
+    def similar_to(self, kind: str, key: Any, k: int = 10, **kwargs) -> List[Tuple[str, float]]:
+        """``similar`` por clave; programa la construcción del índice si hace falta."""
+        self.ensure_built(kind)
+        return self.similar(kind, key=key, k=k, **kwargs)
+
+
+similarity_index = SimilarityIndex()
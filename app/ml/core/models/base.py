@@ -1246,30 +1246,22 @@ class MatchmakingLearningSystem:
                 logger.error(f"Error predicting match for person {person_id} and vacancy {vacancy.id}: {str(e)}")
         return batch_predictions
 
-    def predict_all_active_matches(self, person, batch_size=50):
-        """Predict matches for a person across all active vacancies with batch processing."""
-        self.load_model()
-        if not self.pipeline:
-            raise FileNotFoundError("El modelo no está entrenado.")
-        
-        if self.business_unit:
-            vacancies = Vacante.objects.filter(business_unit=self.business_unit, status='activa')
-        else:
-            vacancies = Vacante.objects.filter(status='activa')
-        logger.info(f"Predicting matches for person {person.id} across {vacancies.count()} active vacancies")
-        
-        vacancy_ids = list(vacancies.values_list('id', flat=True))
-        predictions = []
-        for i in range(0, len(vacancy_ids), batch_size):
-            batch_vacancy_ids = vacancy_ids[i:i + batch_size]
-            logger.info(f"Processing batch {i // batch_size + 1} with {len(batch_vacancy_ids)} vacancies")
-            batch_result = self.predict_batch.delay(person.id, batch_vacancy_ids)
-            batch_predictions = batch_result.get()  # Wait for the batch to complete
-            predictions.extend(batch_predictions)
-            logger.info(f"Batch {i // batch_size + 1} completed, {len(batch_predictions)} predictions made")
-        
-        sorted_predictions = sorted(predictions, key=lambda x: x['score'], reverse=True)
-        return sorted_predictions[:10]  # Return top 10 matches
+    def predict_all_active_matches(self, person, top_n=10):
+        """
+        Predice el match de una persona contra todas las vacantes activas.
+
+        Construye una sola matriz de features por bloque y la puntúa con una
+        llamada a ``predict_proba`` (ver ``bulk_scoring.BulkMatchScorer``).
+        """
+        from app.ml.core.models.bulk_scoring import BulkMatchScorer
+        scorer = BulkMatchScorer(getattr(self, 'business_unit', None))
+        return scorer.score_person(person, top_k=top_n)
+
+    def predict_top_candidates(self, vacancy, top_n=10):
+        """Devuelve los ``top_n`` candidatos con mayor probabilidad de éxito para una vacante."""
+        from app.ml.core.models.bulk_scoring import BulkMatchScorer
+        scorer = BulkMatchScorer(getattr(self, 'business_unit', None) or vacancy.business_unit)
+        return scorer.score_vacancy(vacancy, top_k=top_n)
 
     # Métodos internos (sin cambios, están bien)
     def _calculate_hard_skills_match(self, application):
@@ -0,0 +1,331 @@
+# /home/pablo/app/ml/core/models/bulk_scoring.py
+"""
+Scoring masivo de matchmaking para Grupo huntRED®.
+
+Construye una única matriz de features para una persona contra todas las
+vacantes activas (o una vacante contra todos los candidatos) con un puñado
+de consultas, la puntúa con una sola llamada a ``predict_proba`` por bloque
+y devuelve el top-k mediante un heap. Sustituye el esquema anterior de
+``predict_batch.delay(...).get()`` por lotes de 50 vacantes, que recargaba el
+modelo y construía un DataFrame de una fila por vacante.
+
+Las features son las mismas que ``MatchmakingLearningSystem.predict_candidate_success``.
+"""
+
+import heapq
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+from joblib import load
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = [
+    'experience_years',
+    'hard_skills_match',
+    'soft_skills_match',
+    'salary_alignment',
+    'age',
+    'openness',
+    'conscientiousness',
+    'extraversion',
+    'agreeableness',
+    'neuroticism',
+]
+PERSONALITY_FIELDS = FEATURE_COLUMNS[5:]
+
+DEFAULT_CHUNK_SIZE = 5000  # filas por llamada a predict_proba
+
+# Pipelines cargados por proceso, indexados por (ruta, mtime)
+_pipeline_cache: Dict[Tuple[str, float], object] = {}
+_pipeline_lock = threading.Lock()
+
+
+def load_pipeline(model_file: str):
+    """Carga el pipeline entrenado una sola vez por proceso (se recarga si cambia el archivo)."""
+    if not os.path.exists(model_file):
+        raise FileNotFoundError("El modelo no está entrenado.")
+    key = (model_file, os.path.getmtime(model_file))
+    pipeline = _pipeline_cache.get(key)
+    if pipeline is None:
+        with _pipeline_lock:
+            pipeline = _pipeline_cache.get(key)
+            if pipeline is None:
+                for stale in [k for k in _pipeline_cache if k[0] == model_file]:
+                    del _pipeline_cache[stale]
+                pipeline = load(model_file)
+                _pipeline_cache[key] = pipeline
+                logger.info(f"Pipeline de matchmaking cargado desde {model_file}")
+    return pipeline
+
+
+def normalize_skills(skills) -> List[str]:
+    """Normaliza skills de texto libre (separadas por comas) o listas JSON."""
+    if not skills:
+        return []
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    normalized = []
+    for skill in skills:
+        if isinstance(skill, dict):
+            skill = skill.get('name') or skill.get('skill') or ''
+        skill = str(skill).lower().strip()
+        if skill:
+            normalized.append(skill)
+    return list(dict.fromkeys(normalized))
+
+
+class SkillMatrix:
+    """
+    Conjuntos de skills por fila codificados como CSR (``lengths`` + ``indices``).
+
+    Permite contar intersecciones contra un conjunto fijo para todas las filas
+    con una sola operación vectorizada.
+    """
+
+    def __init__(self, vocabulary: Optional[Dict[str, int]] = None):
+        self.vocabulary = vocabulary if vocabulary is not None else {}
+        self._indices: List[int] = []
+        self._lengths: List[int] = []
+
+    def encode(self, skills: Sequence[str]) -> np.ndarray:
+        vocabulary = self.vocabulary
+        return np.fromiter((vocabulary.setdefault(s, len(vocabulary)) for s in skills),
+                           dtype=np.int64, count=len(skills))
+
+    def append(self, skills: Sequence[str]):
+        vocabulary = self.vocabulary
+        for skill in skills:
+            self._indices.append(vocabulary.setdefault(skill, len(vocabulary)))
+        self._lengths.append(len(skills))
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.asarray(self._lengths, dtype=np.float64)
+
+    def intersection_counts(self, skill_ids: np.ndarray) -> np.ndarray:
+        """Número de skills de cada fila presentes en ``skill_ids``."""
+        rows = len(self._lengths)
+        if not rows or not self._indices or not len(skill_ids):
+            return np.zeros(rows, dtype=np.float64)
+        indices = np.asarray(self._indices, dtype=np.int64)
+        row_ids = np.repeat(np.arange(rows), self._lengths)
+        hits = np.isin(indices, skill_ids)
+        return np.bincount(row_ids[hits], minlength=rows).astype(np.float64)
+
+
+def match_percentage_vector(matches: np.ndarray, required_len: np.ndarray,
+                            candidate_len: np.ndarray) -> np.ndarray:
+    """Versión vectorizada de ``ml_utils.calculate_match_percentage``."""
+    required_len = np.broadcast_to(np.asarray(required_len, dtype=np.float64), matches.shape)
+    candidate_len = np.broadcast_to(np.asarray(candidate_len, dtype=np.float64), matches.shape)
+    safe_required = np.where(required_len > 0, required_len, 1.0)
+    base = matches / safe_required * 100 * 1.5
+    bonus = np.where(candidate_len > 0,
+                     np.minimum(25, (candidate_len - matches) / safe_required * 100 * 0.5), 0.0)
+    total = np.minimum(100, base + bonus)
+    return np.round(np.where(required_len > 0, total, 100.0), 2)
+
+
+def alignment_percentage_vector(expected, actual, tolerance: float = 0.2,
+                                max_diff: float = 0.5) -> np.ndarray:
+    """Versión vectorizada de ``ml_utils.calculate_alignment_percentage``."""
+    expected, actual = np.broadcast_arrays(np.asarray(expected, dtype=np.float64),
+                                           np.asarray(actual, dtype=np.float64))
+    safe_expected = np.where(expected != 0, expected, 1.0)
+    diff = np.abs(expected - actual) / safe_expected
+    partial = 100 * (1 - ((diff - tolerance) / (max_diff - tolerance)))
+    alignment = np.where(diff <= tolerance, 100.0, np.where(diff >= max_diff, 0.0, partial))
+    alignment = np.round(np.clip(alignment, 0, 100), 2)
+    zero_case = np.where(actual == 0, 100.0, 0.0)
+    return np.where(expected == 0, zero_case, alignment)
+
+
+def _age_years(fecha_nacimiento, today) -> float:
+    return (today - fecha_nacimiento).days / 365 if fecha_nacimiento else 0
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TopK:
+    """Heap acotado con los k mejores (score, id) entre bloques."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int]] = []
+
+    def push_many(self, scores: np.ndarray, ids: Sequence[int]):
+        if self.k <= 0 or not len(scores):
+            return
+        # Preselección dentro del bloque antes de tocar el heap
+        if len(scores) > self.k:
+            candidates = np.argpartition(-scores, self.k - 1)[:self.k]
+        else:
+            candidates = range(len(scores))
+        for position in candidates:
+            item = (float(scores[position]), int(ids[position]))
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item > self._heap[0]:
+                heapq.heapreplace(self._heap, item)
+
+    def results(self) -> List[Tuple[float, int]]:
+        return sorted(self._heap, reverse=True)
+
+
+class BulkMatchScorer:
+    """Scoring vectorizado persona × vacantes y vacante × candidatos."""
+
+    def __init__(self, business_unit=None, model_file: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.business_unit = business_unit
+        bu_name = getattr(business_unit, 'name', business_unit)
+        self.model_file = model_file or os.path.join(
+            settings.ML_MODELS_DIR,
+            f"matchmaking_model_{bu_name or 'global'}.pkl"
+        )
+        self.chunk_size = chunk_size
+
+    @property
+    def pipeline(self):
+        return load_pipeline(self.model_file)
+
+    def _predict(self, features: pd.DataFrame) -> np.ndarray:
+        return self.pipeline.predict_proba(features[FEATURE_COLUMNS])[:, 1]
+
+    # Persona × vacantes --------------------------------------------------
+
+    def _active_vacancies(self):
+        from app.models import Vacante
+        vacancies = Vacante.objects.filter(activa=True)
+        if self.business_unit:
+            vacancies = vacancies.filter(business_unit=self.business_unit)
+        return vacancies
+
+    def score_person(self, person, top_k: int = 10,
+                     vacancies=None) -> List[Dict[str, object]]:
+        """Top-k vacantes para una persona con una matriz de features por bloque."""
+        self.pipeline  # Falla pronto si no hay modelo
+        today = timezone.now().date()
+        person_skills = normalize_skills(person.skills)
+        person_soft = normalize_skills((person.metadata or {}).get('soft_skills', []))
+        current_salary = _as_float((person.salary_data or {}).get('current_salary', 0))
+        constants = {
+            'experience_years': person.experience_years or 0,
+            'age': _age_years(person.fecha_nacimiento, today),
+        }
+        for field in PERSONALITY_FIELDS:
+            constants[field] = getattr(person, field) or 0
+
+        rows = (vacancies if vacancies is not None else self._active_vacancies()).values_list(
+            'id', 'titulo', 'skills_required', 'salario'
+        ).iterator(chunk_size=self.chunk_size)
+
+        top = TopK(top_k)
+        titles: Dict[int, str] = {}
+        total = 0
+        for chunk in _chunks(rows, self.chunk_size):
+            matrix = SkillMatrix()
+            required_ids = matrix.encode(person_skills)
+            ids, salaries = [], []
+            for vacancy_id, titulo, skills_required, salario in chunk:
+                matrix.append(normalize_skills(skills_required))
+                ids.append(vacancy_id)
+                salaries.append(_as_float(salario))
+                titles[vacancy_id] = titulo
+
+            matches = matrix.intersection_counts(required_ids)
+            frame = pd.DataFrame({
+                'hard_skills_match': match_percentage_vector(matches, len(person_skills), matrix.lengths),
+                # Las vacantes no guardan soft skills: equivale a comparar contra lista vacía
+                'soft_skills_match': match_percentage_vector(
+                    np.zeros(len(ids)), len(person_soft), np.zeros(len(ids))
+                ),
+                'salary_alignment': alignment_percentage_vector(current_salary, salaries),
+                **{name: np.full(len(ids), value, dtype=np.float64) for name, value in constants.items()},
+            })
+            top.push_many(self._predict(frame), ids)
+            total += len(ids)
+
+        logger.info(f"Scoring masivo: persona {person.id} contra {total} vacantes activas")
+        return [
+            {'vacancy_id': vacancy_id, 'titulo': titles.get(vacancy_id), 'score': score}
+            for score, vacancy_id in top.results()
+        ]
+
+    # Vacante × candidatos ------------------------------------------------
+
+    def _candidate_pool(self):
+        from app.models import Person
+        return Person.objects.exclude(job_search_status='no_busca').exclude(skills__isnull=True).exclude(skills='')
+
+    def score_vacancy(self, vacancy, top_k: int = 10,
+                      candidates=None) -> List[Dict[str, object]]:
+        """Top-k candidatos para una vacante procesando el pool en bloques."""
+        self.pipeline  # Falla pronto si no hay modelo
+        today = timezone.now().date()
+        vacancy_skills = normalize_skills(vacancy.skills_required)
+        offered_salary = _as_float(vacancy.salario)
+
+        rows = (candidates if candidates is not None else self._candidate_pool()).values_list(
+            'id', 'skills', 'experience_years', 'fecha_nacimiento',
+            'salary_data__current_salary', 'metadata__soft_skills', *PERSONALITY_FIELDS
+        ).iterator(chunk_size=self.chunk_size)
+
+        top = TopK(top_k)
+        total = 0
+        for chunk in _chunks(rows, self.chunk_size):
+            skills = SkillMatrix()
+            soft = SkillMatrix()
+            candidate_ids = skills.encode(vacancy_skills)
+            ids, experience, ages, salaries = [], [], [], []
+            personality = {field: [] for field in PERSONALITY_FIELDS}
+            for row in chunk:
+                person_id, person_skills, years, birth, salary, soft_skills = row[:6]
+                skills.append(normalize_skills(person_skills))
+                soft.append(normalize_skills(soft_skills))
+                ids.append(person_id)
+                experience.append(years or 0)
+                ages.append(_age_years(birth, today))
+                salaries.append(_as_float(salary))
+                for field, value in zip(PERSONALITY_FIELDS, row[6:]):
+                    personality[field].append(value or 0)
+
+            matches = skills.intersection_counts(candidate_ids)
+            frame = pd.DataFrame({
+                'experience_years': np.asarray(experience, dtype=np.float64),
+                'hard_skills_match': match_percentage_vector(matches, skills.lengths, len(vacancy_skills)),
+                'soft_skills_match': match_percentage_vector(
+                    np.zeros(len(ids)), soft.lengths, np.zeros(len(ids))
+                ),
+                'salary_alignment': alignment_percentage_vector(salaries, offered_salary),
+                'age': np.asarray(ages, dtype=np.float64),
+                **{field: np.asarray(values, dtype=np.float64) for field, values in personality.items()},
+            })
+            top.push_many(self._predict(frame), ids)
+            total += len(ids)
+
+        logger.info(f"Scoring masivo: vacante {vacancy.id} contra {total} candidatos")
+        return [{'person_id': person_id, 'score': score} for score, person_id in top.results()]
+
+
+def _chunks(rows: Iterable, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
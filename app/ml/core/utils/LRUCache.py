@@ -1,24 +1,31 @@
 """
 Implementación de LRUCache para optimizar el rendimiento del sistema.
+
+Es el L1 de la caché de dos niveles (``app.ats.utils.tiered_cache``) con
+contadores de hits/misses; sin TTL por defecto.
 """
 
-from collections import OrderedDict
 from typing import Any, Dict, Optional
 
-class LRUCache:
-    def __init__(self, max_size: int = 1000):
+from app.ats.utils.tiered_cache import LocalLRUCache
+
+_MISSING = object()
+
+
+class LRUCache(LocalLRUCache):
+    def __init__(self, max_size: int = 1000, ttl: Optional[float] = None):
         """
         Inicializa el cache LRU.
         
         Args:
             max_size: Tamaño máximo del cache
+            ttl: Tiempo de vida opcional de cada entrada en segundos
         """
-        self.max_size = max_size
-        self.cache = OrderedDict()
+        super().__init__(max_size=max_size, ttl=ttl)
         self._hits = 0
         self._misses = 0
 
-    def get(self, key: str) -> Optional[Dict]:
+    def get(self, key: str, default: Any = None) -> Optional[Dict]:
         """
         Obtiene un valor del cache.
         
@@ -28,50 +35,24 @@ class LRUCache:
         Returns:
             Optional[Dict]: Valor almacenado o None si no existe
         """
-        try:
-            value = self.cache.pop(key)
-            self.cache[key] = value  # Mover a la posición más reciente
-            self._hits += 1
-            return value
-            
-        except KeyError:
+        value = super().get(key, _MISSING)
+        if value is _MISSING:
             self._misses += 1
-            return None
-
-    def set(self, key: str, value: Dict) -> None:
-        """
-        Almacena un valor en el cache.
-        
-        Args:
-            key: Clave para almacenar el valor
-            value: Valor a almacenar
-        """
-        try:
-            if key in self.cache:
-                self.cache.pop(key)
-            elif len(self.cache) >= self.max_size:
-                self.cache.popitem(last=False)  # Eliminar el menos reciente
-            
-            self.cache[key] = value
-            
-        except Exception as e:
-            print(f"Error almacenando en cache: {e}")
+            return default
+        self._hits += 1
+        return value
 
     def clear(self) -> None:
         """Limpia el cache."""
-        self.cache.clear()
+        super().clear()
         self._hits = 0
         self._misses = 0
 
     def size(self) -> int:
         """Obtiene el tamaño actual del cache."""
-        return len(self.cache)
+        return len(self)
 
     def hit_rate(self) -> float:
         """Calcula la tasa de hits del cache."""
-        try:
-            total = self._hits + self._misses
-            return self._hits / total if total > 0 else 0.0
-            
-        except ZeroDivisionError:
-            return 0.0
+        total = self._hits + self._misses
+        return self._hits / total if total > 0 else 0.0
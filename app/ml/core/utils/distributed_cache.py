@@ -1,61 +1,44 @@
 import asyncio
-from redis.asyncio import Redis
-import json
 from typing import Any, Optional, Dict
-from datetime import datetime, timedelta
 import logging
 
+from app.ats.utils.tiered_cache import TieredCache, tiered_cache
+
 logger = logging.getLogger(__name__)
 
 class DistributedCache:
     """
     Sistema de caché distribuido para el ATS AI.
     
-    Este caché utiliza Redis para almacenar datos de manera distribuida,
-    mejorando el rendimiento y la consistencia del sistema.
+    Namespace de la caché de dos niveles (``app.ats.utils.tiered_cache``):
+    L1 en memoria del proceso delante de Redis, con invalidación entre
+    procesos por pub/sub.
     """
     
-    def __init__(self, max_size: int = 10000, ttl: int = 86400):
+    def __init__(self, max_size: int = 10000, ttl: int = 86400, namespace: str = 'ml',
+                 serializer: str = 'numpy', cache: Optional[TieredCache] = None):
         """
         Inicializa el caché distribuido.
         
         Args:
-            max_size: Tamaño máximo del caché
+            max_size: Tamaño máximo del L1 compartido (sólo si se crea una caché propia)
             ttl: Tiempo de vida de los elementos en segundos
+            namespace: Namespace de las claves
+            serializer: Serializador (``numpy`` conserva arrays de características)
+            cache: Caché de dos niveles a usar (por defecto la global)
         """
         self.max_size = max_size
         self.ttl = ttl
-        self._hits = 0
-        self._misses = 0
-        self._redis = None
-        self._lock = asyncio.Lock()
-        
-        # Configuración de Redis
-        self.redis_config = {
-            'host': 'localhost',
-            'port': 6379,
-            'db': 0,
-            'decode_responses': True
-        }
+        self.cache = cache or tiered_cache
+        self._namespace = self.cache.namespace(namespace, ttl=ttl, serializer=serializer)
 
     async def initialize(self) -> None:
         """
-        Inicializa la conexión con Redis.
-        """
-        async with self._lock:
-            if self._redis is None:
-                try:
-                    self._redis = await aioredis.create_redis_pool(
-                        (self.redis_config['host'], self.redis_config['port']),
-                        db=self.redis_config['db'],
-                        encoding='utf-8'
-                    )
-                    logger.info("Conexión con Redis establecida")
-                except Exception as e:
-                    logger.error(f"Error conectando con Redis: {e}")
-                    raise
+        Inicializa la conexión con Redis (se conecta al primer uso).
+        """
+        await asyncio.to_thread(lambda: self.cache.redis)
 
-    async def get(self, key: str) -> Optional[Dict]:
+    async def get(self, key: str) -> Optional[Any]:
         """
         Obtiene un valor del caché distribuido.
         
@@ -63,25 +46,14 @@ class DistributedCache:
             key: Clave del valor a obtener
             
         Returns:
-            Optional[Dict]: Valor almacenado o None si no existe
-        """
-        try:
-            async with self._lock:
-                value = await self._redis.get(key)
-                
-                if value:
-                    self._hits += 1
-                    return json.loads(value)
-                else:
-                    self._misses += 1
-                    return None
-                    
-        except Exception as e:
-            logger.error(f"Error obteniendo valor del caché: {e}")
-            self._misses += 1
-            return None
+            Optional[Any]: Valor almacenado o None si no existe
+        """
+        value = self._namespace.get_local(key)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self._namespace.get_remote, key)
 
-    async def set(self, key: str, value: Dict) -> None:
+    async def set(self, key: str, value: Any) -> None:
         """
         Almacena un valor en el caché distribuido.
         
@@ -89,53 +61,28 @@ class DistributedCache:
             key: Clave para almacenar el valor
             value: Valor a almacenar
         """
-        try:
-            async with self._lock:
-                # Verificar tamaño del caché
-                current_size = await self._redis.dbsize()
-                if current_size >= self.max_size:
-                    # Eliminar el menos reciente
-                    oldest_key = await self._redis.scan(match='*', count=1)
-                    if oldest_key:
-                        await self._redis.delete(oldest_key[0])
-                
-                # Almacenar valor con TTL
-                await self._redis.setex(
-                    key,
-                    self.ttl,
-                    json.dumps(value)
-                )
-                
-        except Exception as e:
-            logger.error(f"Error almacenando en caché: {e}")
+        await asyncio.to_thread(self._namespace.set, key, value, self.ttl)
+
+    async def delete(self, key: str) -> None:
+        """
+        Elimina una clave en todos los procesos.
+        """
+        await asyncio.to_thread(self._namespace.delete, key)
 
     async def clear(self) -> None:
         """
-        Limpia el caché distribuido.
+        Limpia el namespace del caché distribuido.
         """
-        try:
-            async with self._lock:
-                await self._redis.flushdb()
-                self._hits = 0
-                self._misses = 0
-                
-        except Exception as e:
-            logger.error(f"Error limpiando caché: {e}")
+        await asyncio.to_thread(self._namespace.clear)
 
     async def size(self) -> int:
         """
-        Obtiene el tamaño actual del caché.
+        Obtiene el número de elementos en el L1 de este proceso.
         
         Returns:
             int: Número de elementos en el caché
         """
-        try:
-            async with self._lock:
-                return await self._redis.dbsize()
-                
-        except Exception as e:
-            logger.error(f"Error obteniendo tamaño del caché: {e}")
-            return 0
+        return len(self.cache.l1)
 
     async def hit_rate(self) -> float:
         """
@@ -144,21 +91,13 @@ class DistributedCache:
         Returns:
             float: Tasa de hits (0-1)
         """
-        try:
-            total = self._hits + self._misses
-            return self._hits / total if total > 0 else 0.0
-            
-        except ZeroDivisionError:
-            return 0.0
+        return self._namespace.stats.as_dict()['hit_rate']
+
+    def stats(self) -> Dict[str, Any]:
+        return self._namespace.stats.as_dict()
 
     async def close(self) -> None:
         """
-        Cierra la conexión con Redis.
+        La conexión es compartida por el proceso; no hay nada que cerrar.
         """
-        try:
-            async with self._lock:
-                self._redis.close()
-                await self._redis.wait_closed()
-                
-        except Exception as e:
-            logger.error(f"Error cerrando conexión con Redis: {e}")
+        return None
@@ -74,22 +74,24 @@ class MLUtils:
             return min(max(match_percentage, 0), 100)
             
         try:
-            # Clasificar habilidades usando múltiples sistemas
-            skill_classification = self.skill_classifier.classify_skills(
-                candidate_skills + required_skills
-            )
-            
-            # Obtener habilidades técnicas y blandas
-            technical_skills = skill_classification.get("technical", [])
-            soft_skills = skill_classification.get("soft", [])
+            # IDs canónicos del diccionario compilado: sinónimos y variantes cuentan igual
+            dictionary = self.skill_classifier.dictionary
+            candidate_ids = set(dictionary.canonicalize(candidate_skills))
+            required_ids = dictionary.canonicalize(required_skills)
+            if not required_ids:
+                return 0.0
             
-            # Calcular coincidencia ponderada
-            technical_overlap = len(set(technical_skills.get("person", [])).intersection(technical_skills.get("vacancy", [])))
-            soft_overlap = len(set(soft_skills.get("person", [])).intersection(soft_skills.get("vacancy", [])))
+            # Separar requeridas en técnicas y blandas
+            required_soft = {skill_id for skill_id in required_ids if dictionary.category_of(skill_id) == "soft"}
+            required_technical = set(required_ids) - required_soft
             
-            # Calcular ponderación basada en la importancia de cada tipo de habilidad
-            total_vacancy = (len(technical_skills.get("vacancy", [])) + len(soft_skills.get("vacancy", []))) or 1
-            total_overlap = (0.7 * technical_overlap + 0.3 * soft_overlap) / total_vacancy
+            # Coincidencia ponderada (70% técnicas, 30% blandas) sobre las categorías presentes
+            weighted = []
+            if required_technical:
+                weighted.append((0.7, len(required_technical & candidate_ids) / len(required_technical)))
+            if required_soft:
+                weighted.append((0.3, len(required_soft & candidate_ids) / len(required_soft)))
+            total_overlap = sum(weight * ratio for weight, ratio in weighted) / sum(weight for weight, _ in weighted)
             
             return min(max(total_overlap * 100, 0), 100)
         except Exception as e:
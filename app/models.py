@@ -871,6 +871,13 @@ class Person(models.Model):
     company_email = models.EmailField(blank=True, null=True, help_text="Correo empresarial del contacto.")
     phone = models.CharField(max_length=40, blank=True, null=True)
     linkedin_url = models.URLField(max_length=200, blank=True, null=True, help_text="URL del perfil de LinkedIn")
+
+    # Claves de bloqueo para deduplicación (ver app/ats/utils/dedup.py); se recalculan en save()
+    dedup_email = models.CharField(max_length=254, blank=True, null=True, db_index=True, editable=False)
+    dedup_phone = models.CharField(max_length=20, blank=True, null=True, db_index=True, editable=False)
+    dedup_name_key = models.CharField(max_length=64, blank=True, null=True, editable=False)
+    dedup_company = models.CharField(max_length=100, blank=True, null=True, editable=False)
+
     preferred_language = models.CharField(max_length=5, default='es_MX', help_text="Ej: es_MX, en_US")
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     tos_accepted = models.BooleanField(default=False)
@@ -958,9 +965,30 @@ class Person(models.Model):
         # o si existe alguna relación laboral previa
         return True
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['dedup_name_key', 'dedup_company'], name='person_dedup_name_idx'),
+        ]
+
     def __str__(self):
         nombre_completo=f"{self.nombre} {self.apellido_paterno or ''} {self.apellido_materno or ''}".strip()
         return nombre_completo
+
+    def refresh_dedup_keys(self):
+        """Recalcula las claves de deduplicación a partir de nombre, correo, teléfono y empresa."""
+        from app.ats.utils.dedup import person_keys
+        for field, value in person_keys(self).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        # Teléfono anterior, para invalidar el directorio de teléfonos
+        self._previous_phones = {self.dedup_phone}
+        self.refresh_dedup_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'nombre', 'apellido_paterno', 'email', 'phone', 'metadata'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'dedup_email', 'dedup_phone', 'dedup_name_key', 'dedup_company'}
+        super().save(*args, **kwargs)
+
     def is_profile_complete(self):
         required_fields=['nombre','apellido_paterno','email','phone','skills']
         missing_fields=[field for field in required_fields if not getattr(self,field,None)]
@@ -4667,6 +4695,8 @@ class Application(models.Model):
     ], default='PENDIENTE')
     fecha_aplicacion = models.DateTimeField(auto_now_add=True)
     ultima_actualizacion = models.DateTimeField(auto_now=True)
+    # Momento del paso a CONTRATADO o RECHAZADO; no cambia con ediciones posteriores
+    fecha_cierre = models.DateTimeField(null=True, blank=True, db_index=True)
     notas = models.TextField(blank=True)
     
     # Campos necesarios para el formulario (agregados)
@@ -4686,9 +4716,34 @@ class Application(models.Model):
         ordering = ['-fecha_aplicacion']
         unique_together = ['candidato', 'oportunidad']
 
+    ESTADOS_CIERRE = ('CONTRATADO', 'RECHAZADO')
+
     def __str__(self):
         return f"Aplicación de {self.candidato} a {self.oportunidad}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_guardado = instance.__dict__.get('estado')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # La fecha de cierre se fija sólo al entrar a un estado de cierre
+        estado_guardado = getattr(self, '_estado_guardado', None)
+        if self.estado not in self.ESTADOS_CIERRE:
+            fecha_cierre = None
+        elif self.fecha_cierre is None or estado_guardado not in (None, self.estado):
+            fecha_cierre = timezone.now()
+        else:
+            fecha_cierre = self.fecha_cierre
+        if fecha_cierre != self.fecha_cierre:
+            self.fecha_cierre = fecha_cierre
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'fecha_cierre'}
+        super().save(*args, **kwargs)
+        self._estado_guardado = self.estado
+
 # PaymentMilestone duplicado eliminado - ya existe en línea 3574
 
 class WeightingModel(models.Model):
@@ -4974,6 +5029,31 @@ class RegistroScraping(models.Model):
     def __str__(self):
         return f"Scraping de {self.dominio} - {self.fecha}"
 
+class EmailMailboxState(models.Model):
+    """
+    Marca de sincronización incremental de una carpeta IMAP para el scraper de
+    correos: sólo se descargan los mensajes con UID mayor a ``last_uid``
+    mientras ``uidvalidity`` no cambie.
+    """
+    host = models.CharField(max_length=255)
+    account = models.CharField(max_length=255)
+    folder = models.CharField(max_length=255)
+    uidvalidity = models.BigIntegerField(null=True, blank=True)
+    last_uid = models.BigIntegerField(default=0)
+    messages_seen = models.PositiveIntegerField(default=0)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estado de buzón de correo"
+        verbose_name_plural = "Estados de buzones de correo"
+        constraints = [
+            models.UniqueConstraint(fields=['host', 'account', 'folder'], name='email_mailbox_state_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.account}/{self.folder} (UID {self.last_uid})"
+
 class IntentPattern(models.Model):
     """Patrones de intención para el chatbot."""
     nombre = models.CharField(max_length=100)
@@ -5809,9 +5889,15 @@ class AgreementPreference(models.Model):
 
 
 
+# Días desde la contratación en que se envían encuestas de satisfacción
+SATISFACTION_PERIODS = [3, 7, 15, 30, 60, 90, 180, 365]
+
+
 class OnboardingProcess(models.Model):
     """Modelo para procesos de onboarding."""
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='onboarding_processes')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='onboarding_processes', null=True, blank=True)
+    person = models.ForeignKey('Person', on_delete=models.CASCADE, related_name='onboarding_processes', null=True, blank=True)
+    vacancy = models.ForeignKey('Vacante', on_delete=models.CASCADE, related_name='onboarding_processes', null=True, blank=True)
     status = models.CharField(max_length=20, choices=[
         ('pending', 'Pendiente'),
         ('in_progress', 'En progreso'),
@@ -5819,9 +5905,20 @@ class OnboardingProcess(models.Model):
         ('failed', 'Fallido')
     ], default='pending')
     current_step = models.PositiveIntegerField(default=0)
-    total_steps = models.PositiveIntegerField()
+    total_steps = models.PositiveIntegerField(default=0)
+    hire_date = models.DateTimeField(null=True, blank=True, help_text="Fecha de contratación")
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+
+    # Encuestas de satisfacción: {"<días>": {"<pregunta>": {"value", "score", "timestamp"}}}
+    survey_responses = models.JSONField(default=dict, blank=True)
+    completed_surveys = models.PositiveIntegerField(default=0)
+    last_survey_date = models.DateTimeField(null=True, blank=True)
+
+    # Métricas calculadas al registrar respuestas (escala 0-10)
+    satisfaction_score = models.FloatField(null=True, blank=True, help_text="Promedio de las encuestas respondidas")
+    last_response_date = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -5829,34 +5926,150 @@ class OnboardingProcess(models.Model):
         verbose_name = "Proceso de Onboarding"
         verbose_name_plural = "Procesos de Onboarding"
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['vacancy', 'hire_date'], name='onboarding_vacancy_hire_idx'),
+            models.Index(fields=['last_response_date'], name='onboarding_last_response_idx'),
+        ]
         
     def __str__(self):
-        return f"Onboarding - {self.user}"
+        return f"Onboarding - {self.person or self.user}"
+
+    def get_responses(self):
+        """Respuestas de las encuestas agrupadas por período."""
+        return self.survey_responses or {}
+
+    def add_response(self, period_days, question_id, value, score=None):
+        """
+        Registra una respuesta y recalcula las puntuaciones desnormalizadas.
+
+        ``score`` es la puntuación 0-10 de la respuesta; si no se indica y el
+        valor es numérico, se usa el valor. Guarda los campos afectados.
+        """
+        if score is None:
+            try:
+                score = float(value)
+            except (TypeError, ValueError):
+                score = None
+        self._store_answers(period_days, {question_id: (value, score)})
+
+    def record_survey_response(self, period_days, data):
+        """
+        Registra una encuesta completa (formulario web).
+
+        Sólo ``general_satisfaction`` (1-10) aporta puntuación; el resto de
+        respuestas se guardan tal cual para el detalle del dashboard.
+        """
+        answers = {}
+        for question_id, value in data.items():
+            score = None
+            if question_id == 'general_satisfaction':
+                try:
+                    score = float(value)
+                except (TypeError, ValueError):
+                    pass
+            answers[question_id] = (value, score)
+        self.completed_surveys += 1
+        self.last_survey_date = timezone.now()
+        self._store_answers(period_days, answers, extra_fields=['completed_surveys', 'last_survey_date'])
+
+    def _store_answers(self, period_days, answers, extra_fields=()):
+        now = timezone.now()
+        responses = self.get_responses()
+        period_responses = responses.setdefault(str(period_days), {})
+        for question_id, (value, score) in answers.items():
+            period_responses[question_id] = {
+                'value': value,
+                'score': score,
+                'timestamp': now.isoformat(),
+            }
+        self.survey_responses = responses
+        self.last_response_date = now
+
+        period_score = self._period_score(period_responses)
+        if period_score is not None:
+            OnboardingSurveyScore.objects.update_or_create(
+                process=self,
+                period_days=int(period_days),
+                defaults={'score': period_score, 'answered_at': now},
+            )
+            self.satisfaction_score = self.survey_scores.aggregate(avg=models.Avg('score'))['avg']
+        self.save(update_fields=[
+            'survey_responses', 'last_response_date', 'satisfaction_score', 'updated_at', *extra_fields
+        ])
+
+    @staticmethod
+    def _period_score(period_responses):
+        scores = [
+            answer['score'] for answer in period_responses.values()
+            if isinstance(answer, dict) and answer.get('score') is not None
+        ]
+        return sum(scores) / len(scores) if scores else None
+
+    def get_satisfaction_score(self, period=None):
+        """Puntuación 0-10 de un período o, sin período, el promedio desnormalizado."""
+        if period is None:
+            return self.satisfaction_score
+        return self._period_score(self.get_responses().get(str(period), {}))
+
+
+class OnboardingSurveyScore(models.Model):
+    """
+    Puntuación de una encuesta de satisfacción de onboarding (una por período).
+
+    Se escribe al registrar respuestas para que los dashboards agreguen en SQL
+    en lugar de recorrer ``survey_responses`` en Python.
+    """
+    process = models.ForeignKey(OnboardingProcess, on_delete=models.CASCADE, related_name='survey_scores')
+    period_days = models.PositiveIntegerField(help_text="Días desde la contratación")
+    score = models.FloatField(help_text="Puntuación 0-10")
+    answered_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Puntuación de Encuesta de Onboarding"
+        verbose_name_plural = "Puntuaciones de Encuestas de Onboarding"
+        unique_together = ['process', 'period_days']
+        indexes = [
+            models.Index(fields=['answered_at'], name='onboarding_score_answered_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.process} - {self.period_days} días: {self.score:.1f}"
+
 
 class OnboardingTask(models.Model):
     """Modelo para tareas de onboarding."""
-    process = models.ForeignKey(OnboardingProcess, on_delete=models.CASCADE, related_name='tasks')
-    name = models.CharField(max_length=255)
-    description = models.TextField()
-    step = models.PositiveIntegerField()
-    status = models.CharField(max_length=20, choices=[
-        ('pending', 'Pendiente'),
-        ('in_progress', 'En progreso'),
-        ('completed', 'Completado'),
-        ('failed', 'Fallido')
-    ], default='pending')
+    STATUS_CHOICES = [
+        ('PENDING', 'Pendiente'),
+        ('IN_PROGRESS', 'En progreso'),
+        ('COMPLETED', 'Completada'),
+        ('OVERDUE', 'Vencida'),
+        ('CANCELLED', 'Cancelada'),
+    ]
+
+    onboarding = models.ForeignKey(OnboardingProcess, on_delete=models.CASCADE, related_name='tasks')
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='onboarding_tasks')
+    step = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    priority = models.PositiveIntegerField(default=5, help_text="Prioridad (mayor es más urgente)")
+    due_date = models.DateTimeField(null=True, blank=True)
     started_at = models.DateTimeField(null=True, blank=True)
-    completed_at = models.DateTimeField(null=True, blank=True)
+    completion_date = models.DateTimeField(null=True, blank=True)
+    notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Tarea de Onboarding"
         verbose_name_plural = "Tareas de Onboarding"
-        ordering = ['process', 'step']
+        ordering = ['onboarding', 'step', 'due_date']
+        indexes = [
+            models.Index(fields=['onboarding', 'status'], name='onboarding_task_status_idx'),
+        ]
         
     def __str__(self):
-        return f"{self.process} - {self.name}"
+        return f"{self.onboarding} - {self.title}"
 
 class Experience(models.Model):
     """Modelo para experiencias laborales."""
@@ -7967,4 +8180,49 @@ class OrganizationalCulture(models.Model):
         ordering = ['-is_current', '-updated_at']
     
     def __str__(self):
-        return f"Cultura - {self.organization} ({self.culture_type})"
\ No newline at end of file
+        return f"Cultura - {self.organization} ({self.culture_type})"
+
+class DashboardRollup(models.Model):
+    """
+    Tabla de hechos precalculada para los dashboards.
+
+    Cada fila acumula el conteo y el monto de una métrica (aplicaciones,
+    contrataciones, facturas, pagos, satisfacción...) en un periodo y una
+    combinación de unidad de negocio, consultor y cliente. En métricas sin
+    importe, ``amount`` suma su medida (días hasta contratar, calificación).
+    Se actualiza de forma incremental desde señales
+    (``app.ats.dashboard.signals``) y se repara cada noche con
+    ``backfill_dashboard_rollups``. Las dimensiones usan 0 cuando el
+    hecho no tiene unidad, consultor o cliente.
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hora'),
+        ('day', 'Día'),
+        ('total', 'Estado actual'),
+    ]
+
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    period_start = models.DateTimeField(help_text="Inicio del periodo (hora local)")
+    metric = models.CharField(max_length=40)
+    business_unit_id = models.PositiveIntegerField(default=0)
+    consultant_id = models.PositiveIntegerField(default=0, help_text="ID de Person del consultor")
+    client_id = models.PositiveIntegerField(default=0)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rollup de Dashboard"
+        verbose_name_plural = "Rollups de Dashboard"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'period_start', 'metric', 'business_unit_id', 'consultant_id', 'client_id'],
+                name='dashboard_rollup_unique_cell',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'granularity', 'period_start'], name='dashboard_rollup_metric_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.granularity} {self.period_start:%Y-%m-%d %H:%M}: {self.count}"
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.23 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0001_add_new_payroll_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollcompany',
+            name='whatsapp_phone_e164',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16, verbose_name='Número WhatsApp (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='payrollemployee',
+            name='phone_e164',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16, verbose_name='Teléfono (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='payrollemployee',
+            name='whatsapp_e164',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16, verbose_name='WhatsApp (E.164)'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollcompany',
+            index=models.Index(fields=['whatsapp_phone_e164'], name='payroll_comp_wa_e164_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollemployee',
+            index=models.Index(fields=['phone_e164'], name='payroll_emp_phone_e164_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollemployee',
+            index=models.Index(fields=['whatsapp_e164'], name='payroll_emp_wa_e164_idx'),
+        ),
+    ]
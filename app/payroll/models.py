@@ -18,6 +18,7 @@ from django.conf import settings
 from app.models import BusinessUnit
 from app.models import Vacante as Job, Person as Candidate  # Integración ATS
 from app.ats.models import Assessment, Interview  # Integración ATS
+from app.ats.utils.dedup import normalize_phone
 from . import (
     PAYROLL_STATUSES, EMPLOYEE_TYPES, PAYROLL_FREQUENCIES,
     ATTENDANCE_STATUSES, REQUEST_TYPES, REQUEST_STATUSES,
@@ -40,6 +41,7 @@ class PayrollCompany(models.Model):
     # Configuración de WhatsApp dedicado
     whatsapp_webhook_token = models.CharField(max_length=255, unique=True, verbose_name="Token webhook WhatsApp")
     whatsapp_phone_number = models.CharField(max_length=20, verbose_name="Número WhatsApp")
+    whatsapp_phone_e164 = models.CharField(max_length=16, blank=True, default='', editable=False, verbose_name="Número WhatsApp (E.164)")
     whatsapp_business_name = models.CharField(max_length=100, verbose_name="Nombre del negocio WhatsApp")
     
     # Configuración de país y compliance
@@ -99,11 +101,21 @@ class PayrollCompany(models.Model):
             models.Index(fields=['business_unit'], name='payroll_comp_bu_idx'),
             models.Index(fields=['ats_integration_enabled'], name='payroll_comp_ats_idx'),
             models.Index(fields=['ml_attendance_mode'], name='payroll_comp_ml_idx'),
+            models.Index(fields=['whatsapp_phone_e164'], name='payroll_comp_wa_e164_idx'),
         ]
     
     def __str__(self):
         return f"{self.name} ({self.country_code})"
     
+    def save(self, *args, **kwargs):
+        """Normaliza el número de WhatsApp a E.164 para el directorio de teléfonos"""
+        self._previous_phones = {self.whatsapp_phone_e164}
+        self.whatsapp_phone_e164 = normalize_phone(self.whatsapp_phone_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'whatsapp_phone_number' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'whatsapp_phone_e164'}
+        super().save(*args, **kwargs)
+    
     def clean(self):
         """Validaciones del modelo"""
         from . import COUNTRY_CONFIG
@@ -162,6 +174,8 @@ class PayrollEmployee(models.Model):
     email = models.EmailField(verbose_name="Email")
     phone = models.CharField(max_length=20, blank=True, verbose_name="Teléfono")
     whatsapp_number = models.CharField(max_length=20, blank=True, verbose_name="WhatsApp")
+    phone_e164 = models.CharField(max_length=16, blank=True, default='', editable=False, verbose_name="Teléfono (E.164)")
+    whatsapp_e164 = models.CharField(max_length=16, blank=True, default='', editable=False, verbose_name="WhatsApp (E.164)")
     
     # Información laboral
     hire_date = models.DateField(verbose_name="Fecha de contratación")
@@ -225,11 +239,23 @@ class PayrollEmployee(models.Model):
             models.Index(fields=['supervisor'], name='payroll_emp_sup_idx'),
             models.Index(fields=['ats_candidate_id'], name='payroll_emp_ats_idx'),
             models.Index(fields=['ml_confidence_score'], name='payroll_emp_ml_idx'),
+            models.Index(fields=['phone_e164'], name='payroll_emp_phone_e164_idx'),
+            models.Index(fields=['whatsapp_e164'], name='payroll_emp_wa_e164_idx'),
         ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.employee_number})"
     
+    def save(self, *args, **kwargs):
+        """Normaliza teléfono y WhatsApp a E.164 para el directorio de teléfonos"""
+        self._previous_phones = {self.phone_e164, self.whatsapp_e164}
+        self.phone_e164 = normalize_phone(self.phone)
+        self.whatsapp_e164 = normalize_phone(self.whatsapp_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'phone', 'whatsapp_number'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'phone_e164', 'whatsapp_e164'}
+        super().save(*args, **kwargs)
+    
     def clean(self):
         """Validaciones del modelo"""
         country_config = self.company.get_country_config()
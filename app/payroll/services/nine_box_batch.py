@@ -0,0 +1,389 @@
+"""
+Cálculo masivo de la matriz 9 Boxes huntRED®
+Scores de toda la empresa con consultas agrupadas y operaciones vectorizadas
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+RUN_LOCK_TIMEOUT = 30 * 60  # 30 minutos
+DEFAULT_SCORE = 70.0
+
+ATTENDANCE_WINDOW_DAYS = 90
+NEGATIVE_FEEDBACK_WINDOW_DAYS = 30
+SHIFT_REQUEST_WINDOW_DAYS = 90
+QUICK_RESOLUTION = timedelta(days=3)
+
+# Mismos pesos que NineBoxService._calculate_potential_score; la evaluación
+# ATS sólo cuenta para empleados ligados a un candidato
+POTENTIAL_WEIGHTS = {
+    'tenure_growth': 0.2,
+    'ats_assessment': 0.3,
+    'feedback_quality': 0.2,
+    'initiative': 0.15,
+    'adaptability': 0.15
+}
+PERFORMANCE_FACTORS = ('evaluation_score', 'attendance_score', 'feedback_score')
+POTENTIAL_FACTORS = tuple(POTENTIAL_WEIGHTS)
+
+# Conteos por empleado; si no hay filas el valor es 0
+COUNT_COLUMNS = (
+    'attendance_total', 'attendance_present',
+    'feedback_resolved', 'feedback_quick', 'negative_feedback',
+    'development_requests', 'approved_shift_changes', 'recent_shift_requests'
+)
+
+# Campos capturados a mano que pasan a la nueva evaluación activa
+CARRIED_FIELDS = (
+    'development_plan', 'career_path', 'recommended_actions',
+    'timeline', 'next_review_date', 'progress_notes'
+)
+
+
+def score_levels(scores: np.ndarray) -> np.ndarray:
+    """Nivel (high/medium/low) de cada score; equivale a ``_get_performance_level``."""
+    scores = np.asarray(scores, dtype=float)
+    return np.select([scores >= 80, scores >= 60], ['high', 'medium'], default='low')
+
+
+def box_categories(performance: np.ndarray, potential: np.ndarray) -> np.ndarray:
+    """
+    Categoría del box de cada empleado; equivale a ``_calculate_box_category``.
+
+    El desempeño define la fila (alto, medio, bajo) y el potencial la columna.
+    """
+    performance = np.asarray(performance, dtype=float)
+    potential = np.asarray(potential, dtype=float)
+    row = np.select([performance >= 80, performance >= 60], [0, 1], default=2)
+    column = np.select([potential >= 80, potential >= 60], [0, 1], default=2)
+    return (row * 3 + column + 1).astype(str)
+
+
+def retention_risks(potential: np.ndarray, tenure_years: np.ndarray,
+                    negative_feedback: np.ndarray, recent_shift_requests: np.ndarray) -> np.ndarray:
+    """Riesgo de retención; equivale a ``_calculate_retention_risk``."""
+    factors = (
+        2 * (np.asarray(potential, dtype=float) < 60)
+        + (np.asarray(tenure_years, dtype=float) < 1)
+        + np.asarray(negative_feedback, dtype=int)
+        + (np.asarray(recent_shift_requests, dtype=int) > 3)
+    )
+    return np.select([factors >= 4, factors >= 2, factors >= 1], ['critical', 'high', 'medium'], default='low')
+
+
+def score_frame(frame: pd.DataFrame, today: date) -> pd.DataFrame:
+    """
+    Calcula desempeño, potencial, box y riesgo de retención para todos los
+    empleados del ``DataFrame`` (una fila por empleado, con las métricas de
+    ``NineBoxBatchScoring.load_frame``).
+    """
+    scored = frame.copy()
+    for column in COUNT_COLUMNS:
+        scored[column] = scored[column].fillna(0).astype(int)
+
+    tenure_days = (pd.Timestamp(today) - pd.to_datetime(scored['hire_date'])).dt.days
+    scored['tenure_years'] = tenure_days / 365.25
+
+    # Desempeño: última evaluación completada o, sin ella, asistencia y feedback
+    scored['evaluation_score'] = scored['latest_rating'].astype(float) * 20
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scored['attendance_score'] = np.where(
+            scored['attendance_total'] > 0,
+            scored['attendance_present'] / scored['attendance_total'] * 100,
+            DEFAULT_SCORE
+        )
+        scored['feedback_score'] = np.where(
+            scored['feedback_resolved'] > 0,
+            scored['feedback_quick'] / scored['feedback_resolved'] * 100,
+            DEFAULT_SCORE
+        )
+    scored['performance_score'] = scored['evaluation_score'].fillna(
+        scored['attendance_score'] * 0.6 + scored['feedback_score'] * 0.4
+    )
+
+    # Potencial: promedio ponderado de los factores disponibles
+    scored['tenure_growth'] = np.minimum(100, scored['tenure_years'] * 10)
+    scored['ats_assessment'] = np.where(
+        scored['has_ats'], scored['ats_score'].astype(float).fillna(DEFAULT_SCORE), np.nan
+    )
+    scored['feedback_quality'] = np.minimum(100, scored['feedback_resolved'] * 10)
+    scored['initiative'] = np.minimum(100, scored['development_requests'] * 15)
+    scored['adaptability'] = np.minimum(100, scored['approved_shift_changes'] * 20)
+
+    factors = scored[list(POTENTIAL_FACTORS)]
+    weights = pd.Series(POTENTIAL_WEIGHTS)
+    total_weight = factors.notna().mul(weights).sum(axis=1)
+    scored['potential_score'] = factors.mul(weights).sum(axis=1) / total_weight
+
+    scored['performance_score'] = scored['performance_score'].clip(0, 100).round(2)
+    scored['potential_score'] = scored['potential_score'].clip(0, 100).round(2)
+    scored['performance_level'] = score_levels(scored['performance_score'])
+    scored['potential_level'] = score_levels(scored['potential_score'])
+    scored['box_category'] = box_categories(scored['performance_score'], scored['potential_score'])
+    scored['retention_risk'] = retention_risks(
+        scored['potential_score'], scored['tenure_years'],
+        scored['negative_feedback'], scored['recent_shift_requests']
+    )
+    return scored
+
+
+def _factor_records(frame: pd.DataFrame, columns) -> List[Dict[str, float]]:
+    """Factores de cada empleado para los campos JSON (sin los que no aplican)."""
+    values = frame[list(columns)].round(2)
+    return [
+        {column: value for column, value in row.items() if not pd.isna(value)}
+        for row in values.to_dict('records')
+    ]
+
+
+class NineBoxBatchScoring:
+    """
+    Matriz 9 Boxes de toda la empresa en una sola corrida.
+
+    - Cada métrica se obtiene con una consulta agrupada por empleado (en
+      lugar de 6+ consultas por empleado).
+    - Los scores se calculan vectorizados sobre un ``DataFrame``.
+    - Sólo se escriben los empleados cuyo box, scores o riesgo cambiaron: la
+      evaluación activa anterior se desactiva (queda en el historial) y la
+      nueva se inserta con ``bulk_create``, conservando el plan de desarrollo
+      y las notas capturadas a mano.
+    """
+
+    def __init__(self, company, evaluator, today: Optional[date] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.company = company
+        self.evaluator = evaluator
+        self.today = today or date.today()
+        self.now = timezone.now()
+        self.batch_size = batch_size
+        self.lock_key = f"nine_box_batch_{company.id}"
+
+    def run(self) -> Dict[str, Any]:
+        """Calcula y guarda la matriz de la empresa."""
+        if not cache.add(self.lock_key, self.now.isoformat(), RUN_LOCK_TIMEOUT):
+            raise ValidationError(f"Ya hay un cálculo 9 boxes en curso para la empresa {self.company.id}")
+
+        try:
+            started = time.monotonic()
+            frame = self.load_frame()
+            if frame.empty:
+                return self._summary(frame, created=0, started=started)
+
+            scored = score_frame(frame, self.today)
+            created = self._save(scored)
+            summary = self._summary(scored, created=created, started=started)
+            logger.info(
+                f"Matriz 9 boxes de {self.company.id}: {summary['total_employees']} empleados, "
+                f"{created} evaluaciones nuevas en {summary['duration_seconds']}s"
+            )
+            return summary
+        finally:
+            cache.delete(self.lock_key)
+
+    # Carga ---------------------------------------------------------------------
+
+    def load_frame(self) -> pd.DataFrame:
+        """Una fila por empleado activo con todas las métricas de entrada."""
+        from ..models import PerformanceEvaluation
+
+        latest_rating = (
+            PerformanceEvaluation.objects
+            .filter(employee=OuterRef('pk'), status='completed')
+            .order_by('-evaluation_period_end')
+            .values('overall_rating')[:1]
+        )
+        employees = pd.DataFrame.from_records(
+            self.company.employees
+            .filter(is_active=True)
+            .annotate(latest_rating=Subquery(latest_rating))
+            .values('id', 'hire_date', 'ats_candidate_id', 'latest_rating'),
+            columns=['id', 'hire_date', 'ats_candidate_id', 'latest_rating']
+        ).rename(columns={'id': 'employee_id'})
+        if employees.empty:
+            return employees
+
+        employees['has_ats'] = employees['ats_candidate_id'].notna()
+        frame = employees
+        for metrics in (self._attendance(), self._feedback(), self._requests(), self._shift_requests()):
+            frame = frame.merge(metrics, on='employee_id', how='left')
+        frame = frame.merge(self._ats_scores(employees), on='ats_candidate_id', how='left')
+        return frame
+
+    def _grouped(self, queryset, **aggregates) -> pd.DataFrame:
+        rows = (
+            queryset
+            .filter(employee__company=self.company, employee__is_active=True)
+            .values('employee_id')
+            .annotate(**aggregates)
+            .order_by()
+        )
+        return pd.DataFrame.from_records(rows, columns=['employee_id', *aggregates])
+
+    def _attendance(self) -> pd.DataFrame:
+        from ..models import AttendanceRecord
+
+        start_date = self.today - timedelta(days=ATTENDANCE_WINDOW_DAYS)
+        return self._grouped(
+            AttendanceRecord.objects.filter(date__range=[start_date, self.today]),
+            attendance_total=Count('id'),
+            attendance_present=Count('id', filter=Q(status='present'))
+        )
+
+    def _feedback(self) -> pd.DataFrame:
+        from ..models import PayrollFeedback
+
+        return self._grouped(
+            PayrollFeedback.objects.all(),
+            feedback_resolved=Count('id', filter=Q(is_resolved=True)),
+            feedback_quick=Count('id', filter=Q(
+                is_resolved=True, response_date__lte=F('created_at') + QUICK_RESOLUTION
+            )),
+            negative_feedback=Count('id', filter=Q(
+                created_at__gte=self.now - timedelta(days=NEGATIVE_FEEDBACK_WINDOW_DAYS),
+                priority__in=['high', 'urgent']
+            ))
+        )
+
+    def _requests(self) -> pd.DataFrame:
+        from ..models import EmployeeRequest
+
+        return self._grouped(
+            EmployeeRequest.objects.filter(request_type__in=['training', 'advancement']),
+            development_requests=Count('id')
+        )
+
+    def _shift_requests(self) -> pd.DataFrame:
+        from ..models import ShiftChangeRequest
+
+        return self._grouped(
+            ShiftChangeRequest.objects.all(),
+            approved_shift_changes=Count('id', filter=Q(status='approved')),
+            recent_shift_requests=Count('id', filter=Q(
+                created_at__gte=self.now - timedelta(days=SHIFT_REQUEST_WINDOW_DAYS)
+            ))
+        )
+
+    def _ats_scores(self, employees: pd.DataFrame) -> pd.DataFrame:
+        """Promedio de evaluaciones ATS por candidato (escala 0-100)."""
+        columns = ['ats_candidate_id', 'ats_score']
+        candidate_ids = employees.loc[employees['has_ats'], 'ats_candidate_id'].tolist()
+        if not candidate_ids:
+            return pd.DataFrame(columns=columns)
+
+        try:
+            from app.ats.models import Assessment
+
+            # Misma búsqueda que NineBoxService._get_ats_assessment_score
+            rows = list(
+                Assessment.objects
+                .filter(candidate_id__in=candidate_ids)
+                .values('candidate_id')
+                .annotate(total=Sum('score'), count=Count('id'))
+                .order_by()
+            )
+        except Exception as e:
+            logger.warning(f"Evaluaciones ATS no disponibles, se usa el score por defecto: {str(e)}")
+            return pd.DataFrame(columns=columns)
+
+        return pd.DataFrame.from_records(
+            [(row['candidate_id'], row['total'] / row['count'] * 20) for row in rows],
+            columns=columns
+        )
+
+    # Escritura -----------------------------------------------------------------
+
+    def _current(self) -> pd.DataFrame:
+        """Evaluación activa más reciente de cada empleado."""
+        from ..models import NineBoxMatrix
+
+        columns = ['id', 'employee_id', 'box_category', 'performance_score',
+                   'potential_score', 'retention_risk', *CARRIED_FIELDS]
+        rows = (
+            NineBoxMatrix.objects
+            .filter(employee__company=self.company, is_active=True)
+            .order_by('employee_id', '-created_at')
+            .values(*columns)
+        )
+        current = pd.DataFrame.from_records(rows, columns=columns)
+        current = current.drop_duplicates('employee_id', keep='first')
+        for column in ('performance_score', 'potential_score'):
+            current[column] = current[column].astype(float)
+        return current.add_prefix('current_').rename(columns={'current_employee_id': 'employee_id'})
+
+    def _save(self, scored: pd.DataFrame) -> int:
+        from ..models import NineBoxMatrix
+
+        merged = scored.merge(self._current(), on='employee_id', how='left')
+        changed = merged[
+            merged['current_id'].isna()
+            | (merged['box_category'] != merged['current_box_category'])
+            | (merged['retention_risk'] != merged['current_retention_risk'])
+            | (merged['performance_score'] != merged['current_performance_score'])
+            | (merged['potential_score'] != merged['current_potential_score'])
+        ]
+        if changed.empty:
+            return 0
+
+        performance_factors = _factor_records(changed, PERFORMANCE_FACTORS)
+        potential_factors = _factor_records(changed, POTENTIAL_FACTORS)
+        evaluations = []
+        for index, row in enumerate(changed.itertuples(index=False)):
+            carried = {
+                field: getattr(row, f'current_{field}')
+                for field in CARRIED_FIELDS
+                if not _is_missing(getattr(row, f'current_{field}'))
+            }
+            evaluations.append(NineBoxMatrix(
+                employee_id=row.employee_id,
+                evaluator=self.evaluator,
+                performance_level=row.performance_level,
+                potential_level=row.potential_level,
+                box_category=row.box_category,
+                performance_score=round(row.performance_score, 2),
+                potential_score=round(row.potential_score, 2),
+                performance_factors=performance_factors[index],
+                potential_factors=potential_factors[index],
+                retention_risk=row.retention_risk,
+                **carried
+            ))
+
+        employee_ids = changed['employee_id'].tolist()
+        with transaction.atomic():
+            # La evaluación activa anterior queda en el historial
+            for start in range(0, len(employee_ids), self.batch_size):
+                NineBoxMatrix.objects.filter(
+                    employee_id__in=employee_ids[start:start + self.batch_size],
+                    is_active=True
+                ).update(is_active=False)
+            NineBoxMatrix.objects.bulk_create(evaluations, batch_size=self.batch_size)
+        return len(evaluations)
+
+    def _summary(self, frame: pd.DataFrame, created: int, started: float) -> Dict[str, Any]:
+        distribution = {str(box): 0 for box in range(1, 10)}
+        if not frame.empty:
+            distribution.update({box: int(count) for box, count in frame['box_category'].value_counts().items()})
+        return {
+            'company_id': str(self.company.id),
+            'total_employees': len(frame),
+            'created': created,
+            'unchanged': len(frame) - created,
+            'box_distribution': distribution,
+            'duration_seconds': round(time.monotonic() - started, 2)
+        }
+
+
+def _is_missing(value) -> bool:
+    """``NaN``/``NaT``/``None`` de las columnas que vienen del merge (listas y dicts no)."""
+    return value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value))
@@ -9,13 +9,14 @@ from datetime import datetime, date, timedelta
 from decimal import Decimal
 from django.utils import timezone
 from django.db.models import Q, Count, Avg, F, Value
-from django.db.models.functions import Coalesce
+from django.db.models.functions import Coalesce, TruncMonth
 
 from app.payroll.models import (
     PayrollEmployee, NineBoxMatrix, PerformanceEvaluation,
-    AttendanceRecord, PayrollFeedback, EmployeeRequest
+    AttendanceRecord, PayrollFeedback, EmployeeRequest, ShiftChangeRequest
 )
 from app.ats.models import Assessment, Interview  # Integración con ATS
+from .nine_box_batch import DEFAULT_BATCH_SIZE, NineBoxBatchScoring
 
 logger = logging.getLogger(__name__)
 
@@ -120,10 +121,31 @@ class NineBoxService:
             logger.error(f"Error actualizando evaluación 9 boxes: {str(e)}")
             raise
     
+    def compute_company_nine_box(self, evaluator, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Calcula la matriz 9 boxes de todos los empleados activos en una corrida
+        
+        Las métricas se obtienen con consultas agrupadas y los scores se
+        calculan vectorizados; sólo se guardan evaluaciones nuevas para los
+        empleados cuyo resultado cambió. La matriz y el reporte leen después
+        las evaluaciones guardadas.
+        
+        Args:
+            evaluator: Usuario registrado como evaluador
+            batch_size: Registros por lote al escribir
+            
+        Returns:
+            Resumen de la corrida
+        """
+        return NineBoxBatchScoring(self.company, evaluator, batch_size=batch_size).run()
+    
     def get_company_nine_box_matrix(self, include_inactive: bool = False) -> Dict[str, Any]:
         """
         Obtiene la matriz 9 boxes completa de la empresa
         
+        Lee las evaluaciones guardadas (ver ``compute_company_nine_box``); si un
+        empleado tiene varias activas se usa la más reciente.
+        
         Args:
             include_inactive: Incluir empleados inactivos
             
@@ -135,11 +157,18 @@ class NineBoxService:
             evaluations = NineBoxMatrix.objects.filter(
                 employee__company=self.company,
                 is_active=True
-            ).select_related('employee', 'evaluator')
+            )
             
             if not include_inactive:
                 evaluations = evaluations.filter(employee__is_active=True)
             
+            evaluations = evaluations.order_by('employee_id', '-created_at').values(
+                'employee_id', 'employee__first_name', 'employee__last_name',
+                'employee__department', 'employee__job_title', 'box_category',
+                'performance_score', 'potential_score', 'retention_risk',
+                'created_at', 'next_review_date'
+            )
+            
             # Organizar por box
             matrix = {
                 '1': [], '2': [], '3': [],
@@ -147,17 +176,22 @@ class NineBoxService:
                 '7': [], '8': [], '9': []
             }
             
-            for evaluation in evaluations:
-                matrix[evaluation.box_category].append({
-                    'employee_id': evaluation.employee.id,
-                    'employee_name': evaluation.employee.get_full_name(),
-                    'department': evaluation.employee.department,
-                    'job_title': evaluation.employee.job_title,
-                    'performance_score': float(evaluation.performance_score),
-                    'potential_score': float(evaluation.potential_score),
-                    'retention_risk': evaluation.retention_risk,
-                    'evaluation_date': evaluation.created_at.strftime('%Y-%m-%d'),
-                    'next_review': evaluation.next_review_date.strftime('%Y-%m-%d') if evaluation.next_review_date else None
+            seen = set()
+            for evaluation in evaluations.iterator(chunk_size=2000):
+                if evaluation['employee_id'] in seen:
+                    continue
+                seen.add(evaluation['employee_id'])
+                matrix[evaluation['box_category']].append({
+                    'employee_id': evaluation['employee_id'],
+                    'employee_name': f"{evaluation['employee__first_name']} {evaluation['employee__last_name']}",
+                    'department': evaluation['employee__department'],
+                    'job_title': evaluation['employee__job_title'],
+                    'box_category': evaluation['box_category'],
+                    'performance_score': float(evaluation['performance_score']),
+                    'potential_score': float(evaluation['potential_score']),
+                    'retention_risk': evaluation['retention_risk'],
+                    'evaluation_date': evaluation['created_at'].strftime('%Y-%m-%d'),
+                    'next_review': evaluation['next_review_date'].strftime('%Y-%m-%d') if evaluation['next_review_date'] else None
                 })
             
             # Estadísticas
@@ -277,7 +311,7 @@ class NineBoxService:
             feedback_score = self._calculate_feedback_score(employee)
             
             # Promedio ponderado
-            return (attendance_score * 0.6 + feedback_score * 0.4)
+            return attendance_score * Decimal('0.6') + feedback_score * Decimal('0.4')
             
         except Exception as e:
             logger.error(f"Error calculando performance score: {str(e)}")
@@ -336,7 +370,7 @@ class NineBoxService:
             
             for factor, score in factors.items():
                 if factor in weights:
-                    total_score += score * weights[factor]
+                    total_score += float(score) * weights[factor]
                     total_weight += weights[factor]
             
             return Decimal(str(total_score / total_weight if total_weight > 0 else 70.0))
@@ -560,23 +594,15 @@ class NineBoxService:
                     
                     if box in ['1', '2', '4']:
                         department_analysis[dept]['high_potential'] += 1
+                    
+                    # Sumas acumuladas; se convierten a promedio al final
+                    department_analysis[dept]['avg_performance'] += emp.get('performance_score', 0)
+                    department_analysis[dept]['avg_potential'] += emp.get('potential_score', 0)
             
             # Calcular promedios por departamento
-            for dept, data in department_analysis.items():
-                total_performance = 0
-                total_potential = 0
-                count = 0
-                
-                for box, employees in matrix.items():
-                    for emp in employees:
-                        if emp.get('department') == dept:
-                            total_performance += emp.get('performance_score', 0)
-                            total_potential += emp.get('potential_score', 0)
-                            count += 1
-                
-                if count > 0:
-                    data['avg_performance'] = total_performance / count
-                    data['avg_potential'] = total_potential / count
+            for data in department_analysis.values():
+                data['avg_performance'] = data['avg_performance'] / data['total']
+                data['avg_potential'] = data['avg_potential'] / data['total']
             
             return department_analysis
             
@@ -620,10 +646,15 @@ class NineBoxService:
             end_date = date.today()
             start_date = end_date - timedelta(days=365)
             
-            evaluations = NineBoxMatrix.objects.filter(
+            # Conteo por mes y box agregado en la base de datos
+            monthly_counts = NineBoxMatrix.objects.filter(
                 employee__company=self.company,
                 created_at__date__range=[start_date, end_date]
-            ).order_by('created_at')
+            ).annotate(
+                month=TruncMonth('created_at')
+            ).values('month', 'box_category').annotate(
+                total=Count('id')
+            ).order_by('month')
             
             trends = {
                 'monthly_distribution': {},
@@ -633,12 +664,12 @@ class NineBoxService:
             }
             
             # Análisis mensual
-            for evaluation in evaluations:
-                month_key = evaluation.created_at.strftime('%Y-%m')
+            for row in monthly_counts:
+                month_key = row['month'].strftime('%Y-%m')
                 if month_key not in trends['monthly_distribution']:
                     trends['monthly_distribution'][month_key] = {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0, '6': 0, '7': 0, '8': 0, '9': 0}
                 
-                trends['monthly_distribution'][month_key][evaluation.box_category] += 1
+                trends['monthly_distribution'][month_key][row['box_category']] += row['total']
             
             return trends
             
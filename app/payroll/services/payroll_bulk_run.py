@@ -0,0 +1,299 @@
+"""
+Corrida masiva de nómina huntRED®
+Cálculo por lotes, reanudable, para empresas con miles de empleados
+"""
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import date, datetime
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
+import logging
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from ..models import PayrollEmployee, PayrollPeriod
+    from .payroll_engine import PayrollEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+RUN_LOCK_TIMEOUT = 60 * 60  # 1 hora
+CENT = Decimal('0.01')
+
+# Campos del empleado que usa el cálculo (salario del período y tarifa por hora)
+EMPLOYEE_FIELDS = ('id', 'company_id', 'monthly_salary', 'hourly_rate', 'working_hours')
+
+_LOWER_KEYS = ('limite_inferior', 'lower', 'lower_limit', 'limit_inferior', 'min')
+_UPPER_KEYS = ('limite_superior', 'upper', 'upper_limit', 'limit_superior', 'max')
+_FIXED_KEYS = ('cuota_fija', 'fixed', 'fixed_fee', 'fixed_quota', 'cuota')
+_RATE_KEYS = ('porcentaje', 'rate', 'percentage')
+
+
+def _first(row: Dict[str, Any], keys: Tuple[str, ...], default=None):
+    for key in keys:
+        if key in row and row[key] is not None:
+            return row[key]
+    return default
+
+
+class TaxBracketTable:
+    """
+    Tabla progresiva (ISR) compilada una vez para búsqueda binaria.
+
+    Reproduce ``PayrollEngine.calculate_isr``: se aplica el renglón con
+    ``limite_inferior <= ingreso <= limite_superior`` y la tasa se divide
+    entre 100 sólo si viene en porcentaje (mayor que 1).
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        brackets = []
+        for row in rows:
+            upper = _first(row, _UPPER_KEYS)
+            rate = Decimal(str(_first(row, _RATE_KEYS, 0)))
+            brackets.append((
+                float(_first(row, _LOWER_KEYS, 0)),
+                float('inf') if upper is None else float(upper),
+                Decimal(str(_first(row, _LOWER_KEYS, 0))),
+                Decimal(str(_first(row, _FIXED_KEYS, 0))),
+                rate / 100 if rate > 1 else rate,
+            ))
+        brackets.sort(key=lambda bracket: bracket[0])
+        self._brackets = brackets
+        self._lowers = [bracket[0] for bracket in brackets]
+
+    def __len__(self) -> int:
+        return len(self._brackets)
+
+    def calculate(self, income: Decimal) -> Decimal:
+        value = float(income)
+        index = bisect_right(self._lowers, value) - 1
+        if index < 0:
+            return Decimal('0')
+        _, upper, lower, fixed, rate = self._brackets[index]
+        if value > upper:
+            return Decimal('0')
+        return (fixed + (income - lower) * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PayrollRates:
+    """
+    Tablas y funciones fiscales resueltas una sola vez por corrida.
+
+    Sólo se llama al proveedor fiscal por empleado si implementa el cálculo
+    correspondiente; en otro caso se usan las tablas ya cargadas, igual que el
+    fallback de ``PayrollEngine``.
+    """
+
+    def __init__(self, engine: 'PayrollEngine', period_type: str):
+        self.engine = engine
+        self.period_type = period_type
+        self.year = date.today().year
+        provider = engine.tax_provider
+        available = engine.provider_available
+        self._provider_isr = available and hasattr(provider, 'calculate_income_tax')
+        self._provider_imss = available and hasattr(provider, 'calculate_social_security')
+        self._provider_infonavit = available and hasattr(provider, 'calculate_housing_fund')
+        self._provider_employer = hasattr(provider, 'calculate_employer_contributions')
+
+        self.isr_table: Optional[TaxBracketTable] = None
+        if not self._provider_isr:
+            rows = engine.get_tax_table('isr', period_type=period_type)
+            if not rows:
+                from .payroll_engine import ISR_TABLE_MANUAL_FALLBACK
+                rows = ISR_TABLE_MANUAL_FALLBACK
+            self.isr_table = TaxBracketTable(rows)
+
+    def isr(self, taxable_income: Decimal) -> Decimal:
+        if self.isr_table is None:
+            return self.engine.calculate_isr(taxable_income, self.period_type)
+        return self.isr_table.calculate(taxable_income)
+
+    def imss(self, base_salary: Decimal) -> Decimal:
+        if self._provider_imss:
+            return self.engine.calculate_imss(base_salary)
+        return self.engine._calculate_imss_manual(base_salary)
+
+    def infonavit(self, base_salary: Decimal) -> Decimal:
+        if self._provider_infonavit:
+            return self.engine.calculate_infonavit(base_salary)
+        return (base_salary * Decimal('0.05')).quantize(CENT, rounding=ROUND_HALF_UP)
+
+    def employer_contributions(self, base_salary: Decimal) -> Tuple[Decimal, Decimal]:
+        if not self._provider_employer:
+            return Decimal('0'), Decimal('0')
+        try:
+            contributions = self.engine.tax_provider.calculate_employer_contributions(
+                base_salary=float(base_salary),
+                year=self.year
+            )
+            if contributions and isinstance(contributions, dict):
+                return (Decimal(str(contributions.get('imss', 0))),
+                        Decimal(str(contributions.get('infonavit', 0))))
+        except Exception as e:
+            logger.error(f"Error calculando aportaciones patronales: {e}")
+        return Decimal('0'), Decimal('0')
+
+
+class BulkPayrollRun:
+    """
+    Corrida de nómina por lotes para un período.
+
+    - Horas extra del período agregadas con una sola consulta agrupada.
+    - Tablas fiscales cargadas una vez (``PayrollRates``).
+    - Cada lote se guarda con ``bulk_create`` en una transacción; al reanudar
+      se omiten los empleados que ya tienen cálculo en el período, por lo que
+      los lotes terminados no se recalculan.
+    - Con ``recalculate_since`` sólo cuentan como hechos los cálculos de esa
+      fecha en adelante: los anteriores se reemplazan en el mismo lote. Así se
+      recalcula un período tras cambiar salarios o asistencias y, pasando la
+      misma fecha, se reanuda ese recálculo si se interrumpe.
+    """
+
+    def __init__(self, engine: 'PayrollEngine', period: 'PayrollPeriod',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, recalculate_since: Optional[datetime] = None):
+        self.engine = engine
+        self.period = period
+        self.chunk_size = chunk_size
+        self.recalculate_since = recalculate_since
+        self.lock_key = f"payroll_bulk_run_{period.id}"
+
+    def run(self) -> Dict[str, Any]:
+        """Ejecuta (o reanuda) la corrida y actualiza los totales del período."""
+        if not cache.add(self.lock_key, timezone.now().isoformat(), RUN_LOCK_TIMEOUT):
+            raise ValidationError(f"Ya hay una corrida de nómina en curso para el período {self.period.id}")
+
+        try:
+            rates = PayrollRates(self.engine, self.period.frequency)
+            overtime = self._load_overtime()
+            processed = 0
+            chunks = 0
+            for employees in self._pending_chunks():
+                processed += self._process_chunk(employees, rates, overtime)
+                chunks += 1
+                # Renovar el candado mientras la corrida avanza
+                cache.set(self.lock_key, timezone.now().isoformat(), RUN_LOCK_TIMEOUT)
+                logger.info(f"Nómina {self.period.id}: lote {chunks} guardado ({processed} empleados en esta corrida)")
+
+            summary = self._finalize()
+            summary['processed_in_run'] = processed
+            summary['chunks_in_run'] = chunks
+            return summary
+        finally:
+            cache.delete(self.lock_key)
+
+    def _employees(self):
+        return self.engine.company.employees.filter(is_active=True)
+
+    def _pending_chunks(self):
+        """Empleados activos sin cálculo vigente en el período, en lotes por id (keyset)."""
+        from ..models import PayrollCalculation
+
+        # Subconsulta: ambas condiciones deben cumplirse en el mismo cálculo
+        done = PayrollCalculation.objects.filter(period=self.period)
+        if self.recalculate_since is not None:
+            done = done.filter(calculation_date__gte=self.recalculate_since)
+        pending = (
+            self._employees()
+            .exclude(id__in=done.values('employee_id'))
+            .only(*EMPLOYEE_FIELDS)
+            .order_by('id')
+        )
+        last_id = None
+        while True:
+            query = pending if last_id is None else pending.filter(id__gt=last_id)
+            employees = list(query[:self.chunk_size])
+            if not employees:
+                return
+            last_id = employees[-1].id
+            yield employees
+
+    def _load_overtime(self) -> Dict[Any, Decimal]:
+        """Horas extra del período por empleado en una sola consulta agrupada."""
+        from ..models import AttendanceRecord
+
+        rows = (
+            AttendanceRecord.objects
+            .filter(
+                employee__company=self.engine.company,
+                employee__is_active=True,
+                date__range=[self.period.start_date, self.period.end_date]
+            )
+            .values('employee_id')
+            .annotate(total_overtime=Sum('overtime_hours'))
+        )
+        return {row['employee_id']: row['total_overtime'] or Decimal('0') for row in rows}
+
+    def _process_chunk(self, employees: List['PayrollEmployee'], rates: PayrollRates,
+                       overtime: Dict[Any, Decimal]) -> int:
+        from ..models import PayrollCalculation
+
+        calculations = []
+        for employee in employees:
+            result = self.engine.calculate_employee_payroll(
+                employee=employee,
+                period=self.period,
+                overtime_hours=overtime.get(employee.id, Decimal('0')),
+                rates=rates
+            )
+            calculations.append(PayrollCalculation(
+                period=self.period,
+                employee=employee,
+                base_salary=result.base_salary,
+                overtime_hours=result.overtime_hours,
+                overtime_amount=result.overtime_amount,
+                bonuses=result.bonuses,
+                commissions=result.commissions,
+                other_income=result.other_income,
+                gross_income=result.gross_income,
+                isr_withheld=result.isr_withheld,
+                imss_employee=result.imss_employee,
+                infonavit_employee=result.infonavit_employee,
+                loan_deductions=result.loan_deductions,
+                advance_deductions=result.advance_deductions,
+                other_deductions=result.other_deductions,
+                total_deductions=result.total_deductions,
+                net_pay=result.net_pay,
+                imss_employer=result.imss_employer,
+                infonavit_employer=result.infonavit_employer,
+                total_employer_cost=result.total_employer_cost
+            ))
+
+        with transaction.atomic():
+            if self.recalculate_since is not None:
+                # Cálculos anteriores al recálculo: se reemplazan
+                PayrollCalculation.objects.filter(period=self.period, employee__in=employees).delete()
+            PayrollCalculation.objects.bulk_create(calculations, batch_size=self.chunk_size)
+        return len(calculations)
+
+    def _finalize(self) -> Dict[str, Any]:
+        """Totales del período calculados en la base de datos (incluye corridas previas)."""
+        totals = self.period.calculations.aggregate(
+            count=Count('id'),
+            total_gross=Sum('gross_income'),
+            total_net=Sum('net_pay'),
+            total_taxes=Sum('total_deductions'),
+            total_employer_cost=Sum('total_employer_cost')
+        )
+        zero = Decimal('0')
+
+        self.period.total_employees = totals['count']
+        self.period.total_gross = totals['total_gross'] or zero
+        self.period.total_net = totals['total_net'] or zero
+        self.period.total_taxes = totals['total_taxes'] or zero
+        self.period.calculation_date = timezone.now()
+        self.period.status = "calculated"
+        self.period.save()
+
+        return {
+            "period_id": str(self.period.id),
+            "total_employees": totals['count'],
+            "total_gross": float(totals['total_gross'] or zero),
+            "total_net": float(totals['total_net'] or zero),
+            "total_taxes": float(totals['total_taxes'] or zero),
+            "total_employer_cost": float(totals['total_employer_cost'] or zero),
+            "calculations_count": totals['count']
+        }
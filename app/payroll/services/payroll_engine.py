@@ -37,7 +37,8 @@ SUPPORTED_COUNTRIES = {
 
 if TYPE_CHECKING:
     from ..models import PayrollEmployee, PayrollPeriod, PayrollCompany, PayrollCalculation, \
-        AttendanceRecord, PayrollCalculationResult, UMARegistry, TaxTable
+        AttendanceRecord, UMARegistry, TaxTable
+    from .payroll_bulk_run import PayrollRates
 from datetime import datetime, date, timedelta
 from dataclasses import dataclass
 
@@ -90,6 +91,21 @@ SUBSIDIO_EMPLEO_2024 = [
     {"lower": Decimal("7382.34"), "upper": None, "subsidio": Decimal("0.00")},
 ]
 
+# Tabla ISR mensual usada como fallback manual (formato limite_inferior/porcentaje)
+ISR_TABLE_MANUAL_FALLBACK = [
+    {'limite_inferior': 0, 'limite_superior': 578.52, 'cuota_fija': 0, 'porcentaje': 1.92},
+    {'limite_inferior': 578.53, 'limite_superior': 4910.18, 'cuota_fija': 11.11, 'porcentaje': 6.40},
+    {'limite_inferior': 4910.19, 'limite_superior': 8629.20, 'cuota_fija': 288.33, 'porcentaje': 10.88},
+    {'limite_inferior': 8629.21, 'limite_superior': 10031.33, 'cuota_fija': 692.96, 'porcentaje': 16.00},
+    {'limite_inferior': 10031.34, 'limite_superior': 12009.94, 'cuota_fija': 917.26, 'porcentaje': 17.92},
+    {'limite_inferior': 12009.95, 'limite_superior': 24222.31, 'cuota_fija': 1271.87, 'porcentaje': 21.36},
+    {'limite_inferior': 24222.32, 'limite_superior': 38177.69, 'cuota_fija': 3880.44, 'porcentaje': 23.52},
+    {'limite_inferior': 38177.70, 'limite_superior': 72887.50, 'cuota_fija': 7162.74, 'porcentaje': 30.00},
+    {'limite_inferior': 72887.51, 'limite_superior': 97183.33, 'cuota_fija': 17575.69, 'porcentaje': 32.00},
+    {'limite_inferior': 97183.34, 'limite_superior': 291550.00, 'cuota_fija': 25350.35, 'porcentaje': 34.00},
+    {'limite_inferior': 291550.01, 'limite_superior': float('inf'), 'cuota_fija': 91435.02, 'porcentaje': 35.00}
+]
+
 # Límites IMSS 2024
 IMSS_LOWER_LIMIT = UMA_DAILY_2024  # 1 UMA diario
 IMSS_UPPER_LIMIT = UMA_DAILY_2024 * 25  # 25 UMA diario
@@ -569,22 +585,7 @@ class PayrollEngine:
     
     def _calculate_isr_manual(self, taxable_income: Decimal) -> Decimal:
         """Cálculo manual de ISR como fallback"""
-        # Tabla ISR 2024 (valores hardcodeados como fallback)
-        isr_table = [
-            {'limite_inferior': 0, 'limite_superior': 578.52, 'cuota_fija': 0, 'porcentaje': 1.92},
-            {'limite_inferior': 578.53, 'limite_superior': 4910.18, 'cuota_fija': 11.11, 'porcentaje': 6.40},
-            {'limite_inferior': 4910.19, 'limite_superior': 8629.20, 'cuota_fija': 288.33, 'porcentaje': 10.88},
-            {'limite_inferior': 8629.21, 'limite_superior': 10031.33, 'cuota_fija': 692.96, 'porcentaje': 16.00},
-            {'limite_inferior': 10031.34, 'limite_superior': 12009.94, 'cuota_fija': 917.26, 'porcentaje': 17.92},
-            {'limite_inferior': 12009.95, 'limite_superior': 24222.31, 'cuota_fija': 1271.87, 'porcentaje': 21.36},
-            {'limite_inferior': 24222.32, 'limite_superior': 38177.69, 'cuota_fija': 3880.44, 'porcentaje': 23.52},
-            {'limite_inferior': 38177.70, 'limite_superior': 72887.50, 'cuota_fija': 7162.74, 'porcentaje': 30.00},
-            {'limite_inferior': 72887.51, 'limite_superior': 97183.33, 'cuota_fija': 17575.69, 'porcentaje': 32.00},
-            {'limite_inferior': 97183.34, 'limite_superior': 291550.00, 'cuota_fija': 25350.35, 'porcentaje': 34.00},
-            {'limite_inferior': 291550.01, 'limite_superior': float('inf'), 'cuota_fija': 91435.02, 'porcentaje': 35.00}
-        ]
-        
-        for row in isr_table:
+        for row in ISR_TABLE_MANUAL_FALLBACK:
             if row['limite_inferior'] <= taxable_income <= row['limite_superior']:
                 excess = taxable_income - row['limite_inferior']
                 isr = row['cuota_fija'] + (excess * row['porcentaje'] / 100)
@@ -692,19 +693,7 @@ class PayrollEngine:
         if table_name == 'isr' and period_type == 'monthly':
             if self.country_code == 'MX':
                 # Tabla ISR mensual México 2024
-                return [
-                    {'limite_inferior': 0, 'limite_superior': 578.52, 'cuota_fija': 0, 'porcentaje': 1.92},
-                    {'limite_inferior': 578.53, 'limite_superior': 4910.18, 'cuota_fija': 11.11, 'porcentaje': 6.40},
-                    {'limite_inferior': 4910.19, 'limite_superior': 8629.20, 'cuota_fija': 288.33, 'porcentaje': 10.88},
-                    {'limite_inferior': 8629.21, 'limite_superior': 10031.33, 'cuota_fija': 692.96, 'porcentaje': 16.00},
-                    {'limite_inferior': 10031.34, 'limite_superior': 12009.94, 'cuota_fija': 917.26, 'porcentaje': 17.92},
-                    {'limite_inferior': 12009.95, 'limite_superior': 24222.31, 'cuota_fija': 1271.87, 'porcentaje': 21.36},
-                    {'limite_inferior': 24222.32, 'limite_superior': 38177.69, 'cuota_fija': 3880.44, 'porcentaje': 23.52},
-                    {'limite_inferior': 38177.70, 'limite_superior': 72887.50, 'cuota_fija': 7162.74, 'porcentaje': 30.00},
-                    {'limite_inferior': 72887.51, 'limite_superior': 97183.33, 'cuota_fija': 17575.69, 'porcentaje': 32.00},
-                    {'limite_inferior': 97183.34, 'limite_superior': 291550.00, 'cuota_fija': 25350.35, 'porcentaje': 34.00},
-                    {'limite_inferior': 291550.01, 'limite_superior': float('inf'), 'cuota_fija': 91435.02, 'porcentaje': 35.00}
-                ]
+                return ISR_TABLE_MANUAL_FALLBACK
         
         # Si todo falla, devolver lista vacía
         return []
@@ -737,10 +726,17 @@ class PayrollEngine:
             
             # Encontrar rango aplicable y calcular ISR
             for row in tax_table:
-                if row['limite_inferior'] <= float(taxable_income) <= row['limite_superior']:
-                    excess = taxable_income - Decimal(str(row['limite_inferior']))
-                    rate = Decimal(str(row['porcentaje'])) / Decimal('100')
-                    fixed_fee = Decimal(str(row['cuota_fija']))
+                # Normalizar nombres de campos (tablas en español, del proveedor o de 2024)
+                lower = Decimal(str(row.get('limite_inferior', row.get('lower', row.get('limit_inferior', 0)))))
+                upper_value = row.get('limite_superior', row.get('upper', row.get('limit_superior')))
+                upper = None if upper_value is None else Decimal(str(upper_value))
+                if lower <= taxable_income and (upper is None or taxable_income <= upper):
+                    excess = taxable_income - lower
+                    rate = Decimal(str(row.get('porcentaje', row.get('rate', row.get('percentage', 0)))))
+                    # Ajustar si la tasa está en porcentaje (0-100) en lugar de decimal (0-1)
+                    if rate > 1:
+                        rate = rate / 100
+                    fixed_fee = Decimal(str(row.get('cuota_fija', row.get('fixed', row.get('fixed_quota', 0)))))
                     isr = fixed_fee + (excess * rate)
                     return isr.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             
@@ -794,16 +790,37 @@ class PayrollEngine:
         # Si falla el proveedor, usar cálculo manual (5% del salario base)
         return (base_salary * Decimal('0.05')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
     
-    def calculate_period_payroll(self, period: 'PayrollPeriod') -> Dict[str, Any]:
+    def calculate_period_payroll(self, period: 'PayrollPeriod', bulk: bool = False,
+                                 chunk_size: Optional[int] = None, recalculate: bool = False,
+                                 recalculate_since: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Calcula nómina completa del período
         
+        Sin ``recalculate`` la corrida masiva sólo calcula a los empleados que
+        aún no tienen cálculo en el período (reanudación); los existentes se
+        conservan aunque hayan cambiado salarios o asistencias.
+        
         Args:
             period: Período de nómina
+            bulk: Usar la corrida masiva por lotes (reanudable); la usa la
+                tarea ``run_bulk_payroll``. Devuelve el resumen de ``BulkPayrollRun``
+            chunk_size: Empleados por lote en la corrida masiva
+            recalculate: Recalcular también a los empleados ya calculados
+            recalculate_since: Inicio de un recálculo interrumpido, para
+                reanudarlo sin repetir lo ya recalculado (implica ``recalculate``)
             
         Returns:
             Resumen del cálculo
         """
+        if recalculate and recalculate_since is None:
+            recalculate_since = timezone.now()
+        if bulk:
+            from .payroll_bulk_run import BulkPayrollRun, DEFAULT_CHUNK_SIZE
+            return BulkPayrollRun(self, period, chunk_size or DEFAULT_CHUNK_SIZE,
+                                  recalculate_since=recalculate_since).run()
+        
+        if recalculate_since is not None:
+            period.calculations.all().delete()
         employees = self.company.employees.filter(is_active=True)
         calculations = []
         
@@ -899,7 +916,8 @@ class PayrollEngine:
         other_income: Decimal = Decimal("0"),
         loan_deductions: Decimal = Decimal("0"),
         advance_deductions: Decimal = Decimal("0"),
-        other_deductions: Decimal = Decimal("0")
+        other_deductions: Decimal = Decimal("0"),
+        rates: Optional['PayrollRates'] = None
     ) -> 'PayrollCalculationResult':
         """
         Calcula nómina completa de un empleado
@@ -914,12 +932,11 @@ class PayrollEngine:
             loan_deductions: Deducciones por préstamos
             advance_deductions: Deducciones por adelantos
             other_deductions: Otras deducciones
+            rates: Tablas fiscales precargadas (corrida masiva)
             
         Returns:
             Resultado del cálculo
         """
-        from ..models import PayrollCalculationResult
-        
         try:
             # 1. Calcular salario base del período
             base_salary = self._calculate_period_salary(employee, period)
@@ -932,15 +949,18 @@ class PayrollEngine:
             
             # 4. Calcular ISR usando sistema dinámico
             period_type = period.frequency
-            isr_withheld = self.calculate_isr(gross_income, period_type)
+            isr_withheld = rates.isr(gross_income) if rates else self.calculate_isr(gross_income, period_type)
             subsidio_empleo = Decimal("0")  # Obtendríamos esto de la tabla subsidio
             
             # 5. Calcular IMSS empleado usando sistema dinámico
             imss_base = gross_income  # Aplicar límites si es necesario
-            imss_employee = self.calculate_imss(imss_base)
+            imss_employee = rates.imss(imss_base) if rates else self.calculate_imss(imss_base)
             
             # 6. Calcular INFONAVIT empleado usando sistema dinámico (si aplica)
-            infonavit_employee = self.calculate_infonavit(imss_base) if getattr(employee, 'has_infonavit', False) else Decimal("0")
+            if getattr(employee, 'has_infonavit', False):
+                infonavit_employee = rates.infonavit(imss_base) if rates else self.calculate_infonavit(imss_base)
+            else:
+                infonavit_employee = Decimal("0")
             
             # 7. Calcular total deducciones
             total_deductions = (
@@ -959,7 +979,9 @@ class PayrollEngine:
             # Estas podrían venir también del sistema dinámico
             imss_employer = Decimal("0")
             infonavit_employer = Decimal("0")
-            if hasattr(self.tax_provider, 'calculate_employer_contributions'):
+            if rates:
+                imss_employer, infonavit_employer = rates.employer_contributions(imss_base)
+            elif hasattr(self.tax_provider, 'calculate_employer_contributions'):
                 try:
                     employer_contrib = self.tax_provider.calculate_employer_contributions(
                         base_salary=float(imss_base),
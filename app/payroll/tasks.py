@@ -289,6 +289,109 @@ def update_sat_tables(self) -> Dict[str, Any]:
         }
 
 
+@shared_task(bind=True, max_retries=3)
+def run_bulk_payroll(self, period_id: str, chunk_size: Optional[int] = None,
+                     recalculate: bool = False, recalculate_since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ejecuta la corrida masiva de nómina de un período
+    
+    Si la corrida se interrumpe, el reintento continúa con los empleados que
+    aún no tienen cálculo en el período. Con ``recalculate`` se recalculan
+    también los ya calculados; los reintentos reciben el inicio del recálculo
+    (``recalculate_since``) para no repetir lo ya recalculado.
+    
+    Args:
+        period_id: ID del período de nómina
+        chunk_size: Empleados por lote
+        recalculate: Recalcular a los empleados que ya tienen cálculo
+        recalculate_since: Inicio (ISO 8601) del recálculo que se reanuda
+        
+    Returns:
+        Resumen de la corrida
+    """
+    from .models import PayrollPeriod
+    
+    if recalculate and not recalculate_since:
+        recalculate_since = timezone.now().isoformat()
+    
+    try:
+        period = PayrollPeriod.objects.select_related('company').get(id=period_id)
+        logger.info(f"Iniciando corrida masiva de nómina para período {period_id}")
+        
+        engine = PayrollEngine(period.company_id)
+        summary = engine.calculate_period_payroll(
+            period, bulk=True, chunk_size=chunk_size,
+            recalculate_since=datetime.fromisoformat(recalculate_since) if recalculate_since else None
+        )
+        
+        logger.info(f"Corrida masiva de nómina completada para período {period_id}: {summary['total_employees']} empleados")
+        return {
+            'success': True,
+            **summary,
+            'timestamp': timezone.now().isoformat()
+        }
+        
+    except Exception as exc:
+        logger.error(f"Error en corrida masiva de nómina {period_id}: {str(exc)}")
+        
+        if self.request.retries < self.max_retries:
+            countdown = 2 ** self.request.retries * 60
+            raise self.retry(countdown=countdown, exc=exc, args=(), kwargs={
+                'period_id': period_id,
+                'chunk_size': chunk_size,
+                'recalculate_since': recalculate_since,
+            })
+        
+        return {
+            'success': False,
+            'error': str(exc),
+            'retries': self.request.retries
+        }
+
+
+@shared_task(bind=True, max_retries=3)
+def compute_nine_box_matrix(self, company_id: str, evaluator_id: int) -> Dict[str, Any]:
+    """
+    Calcula la matriz 9 boxes de todos los empleados activos de una empresa
+
+    Args:
+        company_id: ID de la empresa
+        evaluator_id: ID del usuario registrado como evaluador
+
+    Returns:
+        Resumen del cálculo
+    """
+    from django.contrib.auth import get_user_model
+    from .services.nine_box_service import NineBoxService
+
+    try:
+        company = PayrollCompany.objects.get(id=company_id)
+        evaluator = get_user_model().objects.get(id=evaluator_id)
+        logger.info(f"Iniciando cálculo 9 boxes para empresa {company_id}")
+
+        summary = NineBoxService(company).compute_company_nine_box(evaluator)
+
+        logger.info(f"Cálculo 9 boxes completado para empresa {company_id}: {summary['total_employees']} empleados")
+        return {
+            'success': True,
+            **summary,
+            'timestamp': timezone.now().isoformat()
+        }
+
+    except Exception as exc:
+        logger.error(f"Error en cálculo 9 boxes {company_id}: {str(exc)}")
+
+        if self.request.retries < self.max_retries:
+            countdown = 2 ** self.request.retries * 60
+            raise self.retry(countdown=countdown, exc=exc)
+
+        return {
+            'success': False,
+            'error': str(exc),
+            'retries': self.request.retries
+        }
+
+
 @shared_task
 def validate_tax_calculations() -> Dict[str, Any]:
     """
@@ -362,7 +362,7 @@ def train_matchmaking_model_task(self, business_unit_id=None):
 @shared_task
 def predict_top_candidates_task(vacancy_id, top_n=10):
     vacancy = Vacante.objects.get(id=vacancy_id)
-    ml_system = MatchmakingLearningSystem(vacancy.business_unit)
+    ml_system = MatchmakingLearningSystem()
     return ml_system.predict_top_candidates(vacancy, top_n)
 
 
@@ -1086,32 +1086,20 @@ def execute_email_scraper(dominio_id=None, batch_size=10):
         dict: Resultado de la ejecución con estadísticas.
     """
     try:
-        # Obtener credenciales desde el entorno
-        EMAIL_ACCOUNT = os.environ.get("EMAIL_ACCOUNT", "pablo@huntred.com")
-        EMAIL_PASSWORD = os.environ.get("EMAIL_PASSWORD", "Natalia&Patricio1113!")
-
-        # Instanciar el scraper
-        scraper = EmailScraperV2(EMAIL_ACCOUNT, EMAIL_PASSWORD)
+        from app.ats.utils.scraping.email_scraper import process_emails_advanced
 
         if dominio_id:
             dominio = DominioScraping.objects.get(id=dominio_id)
             logger.info(f"🚀 Ejecutando email scraper para {dominio.dominio} con batch_size={batch_size}...")
-            # Nota: Actualmente EmailScraperV2 no filtra por dominio_id, pero lo dejamos preparado
+            # Nota: la sincronización de correos aún no filtra por dominio_id, pero lo dejamos preparado
         else:
             logger.info(f"🚀 Ejecutando email scraper para todos los correos con batch_size={batch_size}...")
 
-        # Ejecutar el scraper de manera asíncrona
-        asyncio.run(scraper.process_all_emails(batch_size=batch_size))
+        # Sincronización incremental por UID: sólo se descarga el correo nuevo de cada carpeta
+        stats = asyncio.run(process_emails_advanced(batch_size=batch_size))
 
         # Retornar estadísticas
-        result = {
-            "status": "success",
-            "correos_procesados": scraper.stats["correos_procesados"],
-            "correos_exitosos": scraper.stats["correos_exitosos"],
-            "correos_error": scraper.stats["correos_error"],
-            "vacantes_extraidas": scraper.stats["vacantes_extraidas"],
-            "vacantes_guardadas": scraper.stats["vacantes_guardadas"]
-        }
+        result = {"status": "success", **stats}
         logger.info(f"✅ Email scraper ejecutado: {result}")
         return result
     except Exception as e:
@@ -4,6 +4,8 @@ Paquete de tareas de la aplicación.
 """
 from app.tasks.onboarding import send_satisfaction_survey_task
 from app.tasks.notifications.bulk import send_bulk_notifications_task
+from app.tasks.dashboard import warm_dashboard_panels_task, backfill_dashboard_rollups_task
+from app.tasks.similarity import build_similarity_index_task
 
 # Tareas temporales para resolver importaciones
 def send_interview_notification_task(*args, **kwargs):
@@ -21,6 +23,9 @@ def train_ml_task(*args, **kwargs):
 __all__ = [
     'send_satisfaction_survey_task',
     'send_bulk_notifications_task',
+    'warm_dashboard_panels_task',
+    'backfill_dashboard_rollups_task',
+    'build_similarity_index_task',
     'send_interview_notification_task',
     'schedule_interview_tracking_task',
     'train_ml_task',
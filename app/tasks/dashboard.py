@@ -0,0 +1,51 @@
+# app/tasks/dashboard.py
+"""
+Tareas de precalentamiento de paneles y reparación de rollups del dashboard.
+"""
+from celery import shared_task
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='app.tasks.warm_dashboard_panels_task', ignore_result=True)
+def warm_dashboard_panels_task(panels=None):
+    """
+    Recalcula los paneles del SuperAdminDashboard antes de que los pidan.
+
+    Se programa en Celery beat durante el horario laboral; se desactiva con
+    ``settings.DASHBOARD_PANEL_PREWARM = False``. Los paneles que otro proceso
+    ya está calculando se omiten.
+    """
+    if not getattr(settings, 'DASHBOARD_PANEL_PREWARM', True):
+        return {}
+
+    # Importar aquí para evitar dependencias circulares a nivel de módulo
+    from asgiref.sync import async_to_sync
+    from app.ats.dashboard.panel_cache import warm_panels
+    from app.ats.dashboard.super_admin_dashboard import SuperAdminDashboard
+
+    results = async_to_sync(warm_panels)(SuperAdminDashboard(), panels)
+    failed = [name for name, status in results.items() if status == 'error']
+    if failed:
+        logger.warning(f"Paneles con error al precalentar: {', '.join(failed)}")
+    logger.info(f"Paneles del dashboard precalentados: {results}")
+    return results
+
+
+@shared_task(name='app.tasks.backfill_dashboard_rollups_task', ignore_result=True)
+def backfill_dashboard_rollups_task(days=2):
+    """
+    Recalcula los rollups del dashboard de los últimos ``days`` días.
+
+    Repara lo que las señales no vieron (``update()`` masivos, cargas de
+    datos). Se programa cada noche en Celery beat.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from app.ats.dashboard.rollups import rebuild
+
+    written = rebuild(timezone.now() - timedelta(days=days))
+    logger.info(f"Rollups del dashboard reconstruidos: {written}")
+    return written
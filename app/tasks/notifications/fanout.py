@@ -0,0 +1,379 @@
+# app/tasks/notifications/fanout.py
+"""
+Envío masivo de notificaciones en paralelo (fan-out).
+
+Los destinatarios se procesan por lotes: los modelos se rehidratan con un
+``in_bulk`` por tipo, los envíos se reparten por canal y cada canal tiene su
+propio pool de hilos y limitador de tasa del proveedor. Los registros de
+notificación se escriben con una inserción por lote y el avance se agrega a un
+set de Redis por lote (``SADD``), de modo que un reintento de la tarea sólo
+reenvía lo que falló.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+CHECKPOINT_TIMEOUT = 60 * 60 * 24  # 1 día, mayor que la ventana de reintentos
+MAX_REPORTED_ERRORS = 100
+
+# Concurrencia y envíos por segundo por canal; se pueden sobrescribir con
+# settings.BULK_NOTIFICATION_CHANNEL_LIMITS
+DEFAULT_CHANNEL_LIMITS = {
+    'email': {'concurrency': 8, 'rate': 14},
+    'whatsapp': {'concurrency': 10, 'rate': 20},
+    'sms': {'concurrency': 4, 'rate': 10},
+    'telegram': {'concurrency': 5, 'rate': 25},
+    'push': {'concurrency': 10, 'rate': 50},
+    'internal': {'concurrency': 2, 'rate': 0},
+}
+FALLBACK_CHANNEL_LIMITS = {'concurrency': 2, 'rate': 5}
+
+# Fallos que no se resuelven reintentando (el destinatario no tiene el dato)
+NON_RETRYABLE_ERRORS = (
+    'No email address for recipient',
+    'No phone number for recipient',
+    'No user ID for recipient',
+    'No device token for recipient',
+    'Canal no soportado',
+    'Destinatario no encontrado',
+)
+
+
+def get_channel_limits() -> Dict[str, Dict[str, float]]:
+    """Límites por canal combinando los valores por defecto con settings."""
+    limits = {channel: dict(values) for channel, values in DEFAULT_CHANNEL_LIMITS.items()}
+    for channel, values in getattr(settings, 'BULK_NOTIFICATION_CHANNEL_LIMITS', {}).items():
+        limits.setdefault(channel, dict(FALLBACK_CHANNEL_LIMITS)).update(values)
+    return limits
+
+
+class RateLimiter:
+    """Token bucket en proceso; ``rate`` envíos por segundo (0 = sin límite)."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BulkCheckpoint:
+    """
+    Avance de un envío masivo.
+
+    Registra las entregas ``"índice:canal"`` ya resueltas (exitosas o con
+    fallo no recuperable). La clave incluye un hash del contenido para que un
+    reintento con otro payload no herede el avance.
+
+    Cada lote sólo escribe sus propias entregas: con Redis se agregan a un set
+    (``SADD``); sin Redis cada lote se guarda en su propia clave de la caché
+    de Django, numerada con ``incr``.
+    """
+
+    def __init__(self, task_id: Optional[str], payload: Dict[str, Any], redis_client: Any = None):
+        digest = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:16]
+        self.key = f"bulk_notifications:{task_id}:{digest}" if task_id else None
+        self.redis = None
+        if self.key:
+            if redis_client is None:
+                from app.ats.utils.tiered_cache import tiered_cache
+                redis_client = tiered_cache.redis
+            self.redis = redis_client
+        self.done: Set[str] = self._load() if self.key else set()
+        self.resumed = len(self.done)
+
+    def _load(self) -> Set[str]:
+        if self.redis is not None:
+            return {member.decode('utf-8') if isinstance(member, bytes) else member
+                    for member in self.redis.smembers(self.key)}
+        done: Set[str] = set()
+        for keys in cache.get_many(self._batch_keys()).values():
+            done.update(keys)
+        return done
+
+    def _batch_keys(self) -> List[str]:
+        count = cache.get(f"{self.key}:batches") or 0
+        return [f"{self.key}:{number}" for number in range(1, count + 1)]
+
+    def is_done(self, delivery_key: str) -> bool:
+        return delivery_key in self.done
+
+    def mark(self, delivery_keys: List[str]):
+        if not delivery_keys:
+            return
+        self.done.update(delivery_keys)
+        if not self.key:
+            return
+        if self.redis is not None:
+            with self.redis.pipeline(transaction=False) as pipe:
+                pipe.sadd(self.key, *delivery_keys)
+                pipe.expire(self.key, CHECKPOINT_TIMEOUT)
+                pipe.execute()
+            return
+        counter = f"{self.key}:batches"
+        cache.add(counter, 0, CHECKPOINT_TIMEOUT)
+        number = cache.incr(counter)
+        cache.set(f"{self.key}:{number}", list(delivery_keys), CHECKPOINT_TIMEOUT)
+
+    def clear(self):
+        if not self.key:
+            return
+        if self.redis is not None:
+            self.redis.delete(self.key)
+        else:
+            cache.delete_many(self._batch_keys() + [f"{self.key}:batches"])
+
+
+class BulkNotificationFanout:
+    """
+    Pipeline de envío masivo usado por ``send_bulk_notifications_task``.
+
+    Acepta los mismos destinatarios serializados que
+    ``NotificationService.send_bulk_notification``: strings (email/teléfono),
+    dicts con datos de contacto o referencias ``{'type', 'id'}`` a modelos.
+    """
+
+    def __init__(self, subject: str, message: str, channel: str = None, template: str = None,
+                 context: Dict = None, priority: str = None, bu_name: str = None,
+                 sender: Any = None, metadata: Dict = None, task_id: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, channel_limits: Optional[Dict] = None,
+                 redis_client: Any = None):
+        from app.ats.utils.notification_service import NotificationPriority, NotificationService
+
+        self.service = NotificationService
+        self.subject = subject
+        self.message = message
+        self.channel = channel
+        self.template = template
+        self.context = context or {}
+        self.priority = priority or NotificationPriority.NORMAL
+        self.bu_name = bu_name
+        self.sender = sender
+        self.metadata = {'bulk_task_id': task_id, **(metadata or {})}
+        self.task_id = task_id
+        self.batch_size = batch_size
+        self.channel_limits = channel_limits or get_channel_limits()
+        self.redis_client = redis_client
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    # Destinatarios -------------------------------------------------------
+
+    def channels_for(self, recipient: Any) -> List[str]:
+        """Canales de un destinatario: el suyo, el de la tarea o el default de la BU."""
+        from app.ats.utils.notification_service import NotificationChannel
+
+        bu_config = self.service.get_bu_config(self.bu_name)
+        channel = self.channel
+        if isinstance(recipient, dict) and recipient.get('channel'):
+            channel = recipient['channel']
+        channel = channel or bu_config['default_channel']
+        if channel == NotificationChannel.ALL:
+            return list(bu_config['channels'])
+        return [channel]
+
+    def rehydrate(self, batch: List[Tuple[int, Any]]) -> Dict[int, Any]:
+        """
+        Resuelve las referencias a modelos del lote con un ``in_bulk`` por tipo.
+
+        Los IDs se convierten al tipo de la llave primaria (en JSON suelen
+        llegar como texto). Un tipo de modelo desconocido o un ID inválido
+        resuelven a ``None`` y la entrega se omite como destinatario no
+        encontrado.
+        """
+        from django.apps import apps
+        from django.core.exceptions import ValidationError
+
+        refs: Dict[str, Dict[int, Any]] = defaultdict(dict)
+        for index, recipient in batch:
+            if isinstance(recipient, dict) and 'type' in recipient and 'id' in recipient:
+                refs[recipient['type']][index] = recipient['id']
+
+        resolved: Dict[int, Any] = {}
+        for model_name, ids_by_index in refs.items():
+            try:
+                model_class = apps.get_model(app_label='app', model_name=model_name)
+            except (LookupError, ValueError):
+                logger.warning(f"Envío masivo {self.task_id}: tipo de destinatario desconocido '{model_name}'")
+                resolved.update(dict.fromkeys(ids_by_index))
+                continue
+
+            pk_field = model_class._meta.pk
+            object_ids: Dict[int, Any] = {}
+            for index, object_id in ids_by_index.items():
+                try:
+                    object_ids[index] = pk_field.to_python(object_id)
+                except ValidationError:
+                    object_ids[index] = None
+            # Los errores de base de datos se propagan para que la tarea reintente
+            objects = model_class.objects.in_bulk({object_id for object_id in object_ids.values()
+                                                   if object_id is not None})
+            for index, object_id in object_ids.items():
+                resolved[index] = objects.get(object_id)
+        return resolved
+
+    # Envío ---------------------------------------------------------------
+
+    def _limiter(self, channel: str) -> RateLimiter:
+        if channel not in self._limiters:
+            limits = self.channel_limits.get(channel, FALLBACK_CHANNEL_LIMITS)
+            self._limiters[channel] = RateLimiter(limits.get('rate', 0))
+        return self._limiters[channel]
+
+    def _executor(self, channel: str) -> ThreadPoolExecutor:
+        if channel not in self._executors:
+            limits = self.channel_limits.get(channel, FALLBACK_CHANNEL_LIMITS)
+            self._executors[channel] = ThreadPoolExecutor(
+                max_workers=max(1, int(limits.get('concurrency', 1))),
+                thread_name_prefix=f"bulk-{channel}"
+            )
+        return self._executors[channel]
+
+    def _send_one(self, channel: str, recipient_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Envía una entrega respetando el límite de tasa del canal."""
+        self._limiter(channel).acquire()
+        context = {
+            **self.context,
+            'subject': self.subject,
+            'message': self.message,
+            'recipient': recipient_info,
+            'sender': self.sender,
+            'bu_name': self.bu_name,
+            'priority': self.priority,
+            'timestamp': datetime.now().isoformat()
+        }
+        try:
+            return self.service._send_via_channel(
+                channel, recipient_info, self.subject, self.message,
+                self.template, context, self.bu_name
+            )
+        except Exception as e:
+            return {'success': False, 'error': f"Error sending notification: {e}", 'channel': channel}
+        finally:
+            close_old_connections()
+
+    def _batches(self, recipients: List[Any]) -> Iterator[List[Tuple[int, Any]]]:
+        for start in range(0, len(recipients), self.batch_size):
+            yield list(enumerate(recipients[start:start + self.batch_size], start=start))
+
+    def run(self, recipients: List[Any]) -> Dict[str, Any]:
+        """Envía a todos los destinatarios pendientes y devuelve el resumen."""
+        checkpoint = BulkCheckpoint(self.task_id, {
+            'recipients': recipients, 'subject': self.subject, 'message': self.message,
+            'channel': self.channel, 'template': self.template, 'bu_name': self.bu_name
+        }, redis_client=self.redis_client)
+        summary = {
+            'total_recipients': len(recipients),
+            'success_count': 0,
+            'failure_count': 0,
+            'skipped_count': 0,
+            'resumed_count': checkpoint.resumed,
+            'by_channel': defaultdict(lambda: {'success': 0, 'failure': 0}),
+            'errors': []
+        }
+        started = time.perf_counter()
+        try:
+            for batch in self._batches(recipients):
+                self._run_batch(batch, checkpoint, summary)
+        finally:
+            for executor in self._executors.values():
+                executor.shutdown(wait=True)
+            self._executors.clear()
+
+        summary['by_channel'] = dict(summary['by_channel'])
+        summary['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+        if not summary['failure_count']:
+            checkpoint.clear()
+        logger.info(
+            f"Envío masivo {self.task_id}: {summary['success_count']} entregas, "
+            f"{summary['failure_count']} fallos, {summary['skipped_count']} omitidas, "
+            f"{summary['resumed_count']} ya enviadas en {summary['elapsed_seconds']}s"
+        )
+        return summary
+
+    def _run_batch(self, batch: List[Tuple[int, Any]], checkpoint: BulkCheckpoint,
+                   summary: Dict[str, Any]):
+        resolved = self.rehydrate(batch)
+        futures = {}
+        log_entries = []
+        done_keys = []
+
+        for index, raw in batch:
+            recipient = resolved[index] if index in resolved else raw
+            for channel in self.channels_for(raw):
+                delivery_key = f"{index}:{channel}"
+                if checkpoint.is_done(delivery_key):
+                    continue
+                if recipient is None:
+                    self._record(summary, log_entries, done_keys, delivery_key, channel, raw,
+                                 {'success': False, 'error': f"Destinatario no encontrado: {raw}"})
+                    continue
+                recipient_info = self.service._normalize_recipient(recipient)
+                future = self._executor(channel).submit(self._send_one, channel, recipient_info)
+                futures[future] = (delivery_key, channel, recipient_info)
+
+        for future in as_completed(futures):
+            delivery_key, channel, recipient_info = futures[future]
+            self._record(summary, log_entries, done_keys, delivery_key, channel,
+                         recipient_info, future.result())
+
+        self.service._log_notification_batch(log_entries, self.subject, self.priority, self.bu_name)
+        checkpoint.mark(done_keys)
+
+    def _record(self, summary: Dict[str, Any], log_entries: List[Dict], done_keys: List[str],
+                delivery_key: str, channel: str, recipient: Any, result: Dict[str, Any]):
+        success = bool(result.get('success'))
+        error = result.get('error')
+        log_entries.append({
+            'recipient': recipient,
+            'channel': channel,
+            'success': success,
+            'error': error,
+            'metadata': self.metadata
+        })
+        if success:
+            summary['success_count'] += 1
+            summary['by_channel'][channel]['success'] += 1
+            done_keys.append(delivery_key)
+            return
+
+        summary['by_channel'][channel]['failure'] += 1
+        if error and error.startswith(NON_RETRYABLE_ERRORS):
+            summary['skipped_count'] += 1
+            done_keys.append(delivery_key)
+        else:
+            summary['failure_count'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append(f"Failed to send notification {delivery_key}: {error}")
@@ -0,0 +1,23 @@
+# app/tasks/similarity.py
+"""
+Construcción en segundo plano del índice de similitud por habilidades.
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='app.tasks.build_similarity_index_task', ignore_result=True)
+def build_similarity_index_task(kind, clear=False):
+    """
+    Indexa todas las entidades de ``kind`` (person, vacancy o card).
+
+    La programa ``SimilarityIndex.ensure_built`` la primera vez que se consulta
+    un tipo sin construir, para no hacer la construcción completa dentro de una
+    petición web.
+    """
+    # Importar aquí para evitar dependencias circulares a nivel de módulo
+    from app.ml.core.features.similarity_index import similarity_index
+
+    return similarity_index.build_locked(kind, clear=clear)
@@ -0,0 +1,101 @@
+# /home/pablo/app/tests/test_ats/services/test_interview_slots.py
+"""
+Pruebas del calendario de slots de entrevista: generación en bloque sin
+duplicados, disponibilidad con el contador de cupo y reservas atómicas.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import BusinessUnit, Person, Vacante
+from app.ats.services.interview_slots import AlreadyBooked, SlotFull, slot_calendar, slot_times
+from app.ats.utils.Events import Event, EventStatus
+
+MONDAY = datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc)
+MONDAY_NIGHT = MONDAY.replace(hour=23)
+
+
+def make_vacancy(plazas=1):
+    business_unit = BusinessUnit.objects.create(name="test_bu")
+    return Vacante.objects.create(
+        titulo="Analista de datos",
+        empresa_id=1,
+        business_unit=business_unit,
+        fecha_publicacion=datetime.now(timezone.utc),
+        numero_plazas=plazas,
+        modalidad='virtual'
+    )
+
+
+def test_slot_times_cover_workdays_only():
+    # Lunes a domingo: 5 días hábiles, de 9:00 a 17:00 cada 45 minutos (máx. 8)
+    times = slot_times(MONDAY, MONDAY + timedelta(days=6), slot_duration=45, max_slots_per_day=8)
+
+    assert len(times) == 5 * 8
+    assert times[0] == MONDAY.replace(hour=9)
+    assert {t.weekday() for t in times} == {0, 1, 2, 3, 4}
+    assert len(slot_times(MONDAY, MONDAY_NIGHT, slot_duration=120, max_slots_per_day=8)) == 4
+
+
+@pytest.mark.django_db
+def test_generate_is_bulk_and_idempotent():
+    vacancy = make_vacancy()
+    end = MONDAY_NIGHT + timedelta(days=4)
+
+    created = slot_calendar.generate(vacancy, MONDAY, end)
+    again = slot_calendar.generate(vacancy, MONDAY, end)
+
+    assert len(created) == 40 and again == []
+    assert Event.objects.filter(vacancy=vacancy).count() == 40
+    assert slot_calendar.available(vacancy, MONDAY, end).count() == 40
+
+
+@pytest.mark.django_db
+def test_booking_respects_capacity_and_duplicates():
+    vacancy = make_vacancy(plazas=3)   # 3 plazas: slots grupales de cupo 3
+    slot_calendar.generate(vacancy, MONDAY, MONDAY_NIGHT, max_slots_per_day=1)
+    slot = Event.objects.get(vacancy=vacancy)
+    people = [Person.objects.create(nombre=f"Candidato {i}") for i in range(4)]
+
+    for person in people[:3]:
+        slot_calendar.book(slot.id, person, vacancy=vacancy)
+    with pytest.raises(AlreadyBooked):
+        slot_calendar.book(slot.id, people[0], vacancy=vacancy)
+    with pytest.raises(SlotFull):
+        slot_calendar.book(slot.id, people[3], vacancy=vacancy)
+
+    slot.refresh_from_db()
+    assert slot.booked_count == 3 and slot.participants.count() == 3
+    assert slot.status == EventStatus.CONFIRMADO
+    assert slot_calendar.available(vacancy, MONDAY, MONDAY_NIGHT).count() == 0
+
+    # Liberar un lugar lo vuelve a ofrecer
+    assert slot_calendar.release(slot.id, people[1])
+    available = slot_calendar.available(vacancy, MONDAY, MONDAY_NIGHT).get()
+    assert available.spots == 1
+
+
+def test_schedule_interview_reports_a_full_group_slot(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    from app.ats.services import interview_service
+    from app.ats.services.interview_service import InterviewService
+
+    full_slot = SimpleNamespace(id=7)
+    slots = MagicMock()
+    slots.book_first_available.return_value = None
+    slots.ensure_slot.return_value = full_slot
+    slots.book.side_effect = SlotFull("El slot ya no tiene cupo")
+    service = InterviewService.__new__(InterviewService)
+    service.slots = slots
+    service.notification_service = MagicMock()
+    monkeypatch.setattr(interview_service, 'requiere_slots_grupales', lambda vacancy: True)
+    vacancy = SimpleNamespace(id=1, titulo="Analista", numero_plazas=3, modalidad='virtual')
+
+    result = asyncio.run(service.schedule_interview(SimpleNamespace(id=1), vacancy, MONDAY.replace(hour=9), 'video'))
+
+    assert result == {'success': False, 'error': "El slot ya no tiene cupo"}
+    service.notification_service.notify_interview_scheduled.assert_not_called()
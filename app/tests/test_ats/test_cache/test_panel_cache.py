@@ -0,0 +1,88 @@
+# /home/pablo/app/tests/test_ats/test_cache/test_panel_cache.py
+"""
+Pruebas de la memoización de paneles de dashboard (stampede y stale-while-revalidate).
+"""
+
+import asyncio
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from app.ats.dashboard import panel_cache
+from app.ats.dashboard.panel_cache import dashboard_panel, warm_panels
+from app.ats.utils.tiered_cache import InMemoryRedis, TieredCache
+
+
+class Dashboard:
+    def __init__(self, consultant_id=None):
+        self.consultant_id = consultant_id
+        self.calls = 0
+
+    @dashboard_panel(ttl=60, scope=('consultant_id',))
+    async def get_overview(self, period='month'):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {'consultant': self.consultant_id, 'period': period, 'version': self.calls}
+
+    @dashboard_panel(ttl=60)
+    async def get_broken(self):
+        return {'error': 'sin datos'}
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch):
+    monkeypatch.setattr(panel_cache, 'tiered_cache', TieredCache(redis_client=InMemoryRedis()))
+    monkeypatch.setattr(panel_cache, 'cache', LocMemCache('panels', {}))
+    monkeypatch.setattr(panel_cache, 'WAIT_INTERVAL', 0.01)
+
+
+def test_concurrent_requests_trigger_one_recompute():
+    dashboard = Dashboard(consultant_id=7)
+
+    async def run():
+        return await asyncio.gather(*(dashboard.get_overview() for _ in range(50)))
+
+    results = asyncio.run(run())
+    assert dashboard.calls == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_key_includes_scope_and_filters_and_errors_are_not_cached():
+    first, second = Dashboard(consultant_id=1), Dashboard(consultant_id=2)
+
+    async def run():
+        await first.get_overview()
+        await first.get_overview(period='week')
+        await second.get_overview()
+        await first.get_broken()
+        return await first.get_broken()
+
+    assert asyncio.run(run()) == {'error': 'sin datos'}
+    assert (first.calls, second.calls) == (2, 1)
+
+
+def test_stale_value_is_served_while_revalidating(monkeypatch):
+    dashboard = Dashboard(consultant_id=3)
+    now = [1000.0]
+    monkeypatch.setattr(panel_cache.time, 'time', lambda: now[0])
+
+    async def run():
+        await dashboard.get_overview()
+        now[0] += 61
+        stale = await dashboard.get_overview()
+        await asyncio.gather(*panel_cache._background_refreshes)
+        return stale, await dashboard.get_overview()
+
+    stale, fresh = asyncio.run(run())
+    assert stale['version'] == 1
+    assert fresh['version'] == 2
+    assert dashboard.calls == 2
+
+
+def test_warm_panels_refreshes_every_panel():
+    dashboard = Dashboard()
+    results = asyncio.run(warm_panels(dashboard))
+
+    assert results == {'get_broken': 'error', 'get_overview': 'ok'}
+    asyncio.run(dashboard.get_overview())
+    assert dashboard.calls == 1
@@ -0,0 +1,81 @@
+# /home/pablo/app/tests/test_ats/test_dashboard/test_rollups.py
+"""
+Pruebas de los rollups del dashboard: traducción a hechos, celdas y deltas.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from app.ats.dashboard.rollups import (
+    DAY, HOUR, TOTAL, TOTAL_PERIOD, ApplicationRollups, Fact, bucket_starts, diff, expand
+)
+
+TZ = ZoneInfo('America/Mexico_City')
+
+
+def application(estado='PENDIENTE', bu=3, client=9, applied=datetime(2024, 5, 6, 23, 30, tzinfo=TZ), updated=None,
+                closed=None):
+    vacancy = SimpleNamespace(business_unit_id=bu, empresa_id=client)
+    return SimpleNamespace(
+        vacancy_id=1, vacancy=vacancy, estado=estado,
+        fecha_aplicacion=applied, ultima_actualizacion=updated or applied, fecha_cierre=closed,
+    )
+
+
+def test_facts_are_expanded_to_hour_day_and_total_cells():
+    cells = expand(ApplicationRollups().facts(application()), TZ)
+
+    assert cells[(HOUR, datetime(2024, 5, 6, 23, tzinfo=TZ), 'applications', 3, 0, 9)] == [1, Decimal('0')]
+    assert cells[(DAY, datetime(2024, 5, 6, tzinfo=TZ), 'applications', 3, 0, 9)] == [1, Decimal('0')]
+    assert cells[(TOTAL, TOTAL_PERIOD, 'pipeline:PENDIENTE', 3, 0, 9)] == [1, Decimal('0')]
+    assert len(cells) == 3
+
+
+def test_status_change_only_moves_affected_cells():
+    source = ApplicationRollups()
+    before = source.facts(application())
+    hired_at = datetime(2024, 5, 20, 10, 15, tzinfo=TZ)
+    after = source.facts(application(estado='CONTRATADO', updated=hired_at))
+
+    assert diff(before, after, TZ) == {
+        (TOTAL, TOTAL_PERIOD, 'pipeline:PENDIENTE', 3, 0, 9): (-1, Decimal('0')),
+        (TOTAL, TOTAL_PERIOD, 'pipeline:CONTRATADO', 3, 0, 9): (1, Decimal('0')),
+        # El monto de las contrataciones acumula los días hasta contratar
+        (HOUR, datetime(2024, 5, 20, 10, tzinfo=TZ), 'hires', 3, 0, 9): (1, Decimal('13')),
+        (DAY, datetime(2024, 5, 20, tzinfo=TZ), 'hires', 3, 0, 9): (1, Decimal('13')),
+    }
+    # Guardar sin cambios no produce escrituras
+    assert diff(after, after, TZ) == {}
+
+
+def test_hires_keep_their_closing_date_after_later_edits():
+    source = ApplicationRollups()
+    hired_at = datetime(2024, 5, 20, 10, 15, tzinfo=TZ)
+    hired = source.facts(application(estado='CONTRATADO', updated=hired_at, closed=hired_at))
+    # Editar notas semanas después cambia ultima_actualizacion, no la contratación
+    edited = source.facts(application(
+        estado='CONTRATADO', updated=datetime(2024, 6, 30, 8, tzinfo=TZ), closed=hired_at
+    ))
+
+    assert diff(hired, edited, TZ) == {}
+    assert expand(edited, TZ)[(DAY, datetime(2024, 5, 20, tzinfo=TZ), 'hires', 3, 0, 9)] == [1, Decimal('13')]
+
+
+def test_facts_in_same_cell_are_summed():
+    at = datetime(2024, 5, 6, 9, tzinfo=TZ)
+    facts = [
+        Fact('payments', at, business_unit_id=1, amount=Decimal('100.50')),
+        Fact('payments', at + timedelta(minutes=20), business_unit_id=1, amount=Decimal('49.50')),
+    ]
+    assert expand(facts, TZ)[(DAY, datetime(2024, 5, 6, tzinfo=TZ), 'payments', 1, 0, 0)] == [2, Decimal('150.00')]
+
+
+def test_bucket_starts_cover_consecutive_periods():
+    end = datetime(2024, 3, 14, 16, 40, tzinfo=TZ)
+    assert bucket_starts('month', 3, end, TZ) == [
+        datetime(2024, 1, 1, tzinfo=TZ), datetime(2024, 2, 1, tzinfo=TZ), datetime(2024, 3, 1, tzinfo=TZ)
+    ]
+    assert bucket_starts('week', 2, end, TZ) == [datetime(2024, 3, 4, tzinfo=TZ), datetime(2024, 3, 11, tzinfo=TZ)]
+    assert bucket_starts(HOUR, 2, end, TZ) == [datetime(2024, 3, 14, 15, tzinfo=TZ), datetime(2024, 3, 14, 16, tzinfo=TZ)]
@@ -0,0 +1,80 @@
+# /home/pablo/app/tests/test_ats/test_onboarding/test_dashboard_api.py
+"""
+Pruebas del API de datos del dashboard de onboarding: puntuaciones
+desnormalizadas y número de consultas constante.
+"""
+
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.ats.onboarding.dashboard_api import DashboardDataAPI
+from app.models import OnboardingProcess, OnboardingTask
+
+PANELS = [
+    'get_summary_data',
+    'get_satisfaction_trend',
+    'get_onboarding_metrics',
+    'get_candidate_satisfaction',
+    'get_client_satisfaction',
+]
+
+
+def create_processes(count):
+    now = timezone.now()
+    for i in range(count):
+        process = OnboardingProcess.objects.create(hire_date=now - timedelta(days=i % 60))
+        process.add_response(7, 'feeling', 'Bien', score=7.5)
+        process.record_survey_response(30, {'general_satisfaction': str(i % 10 + 1), 'position_match': 'yes'})
+        OnboardingTask.objects.create(
+            onboarding=process,
+            title=f"Tarea {i % 3}",
+            status='COMPLETED' if i % 2 else 'PENDING',
+            due_date=now,
+            completion_date=now + timedelta(days=1) if i % 2 else None,
+        )
+
+
+def query_counts(api, start_date):
+    counts = {}
+    for panel in PANELS:
+        with CaptureQueriesContext(connection) as queries:
+            async_to_sync(getattr(api, panel))(None, None, start_date)
+        counts[panel] = len(queries.captured_queries)
+    return counts
+
+
+@pytest.mark.django_db
+def test_responses_update_denormalized_scores():
+    process = OnboardingProcess.objects.create(hire_date=timezone.now())
+    process.add_response(7, 'feeling', 'Bien', score=7.5)
+    process.record_survey_response(30, {'general_satisfaction': '9', 'comments': 'Todo bien'})
+
+    process.refresh_from_db()
+    assert process.get_satisfaction_score(7) == 7.5
+    assert process.get_satisfaction_score(30) == 9.0
+    assert process.satisfaction_score == pytest.approx(8.25)
+    assert process.completed_surveys == 1
+    assert process.survey_scores.count() == 2
+
+
+@pytest.mark.django_db
+def test_dashboard_query_count_does_not_grow_with_processes():
+    api = DashboardDataAPI()
+    start_date = timezone.now() - timedelta(days=90)
+
+    create_processes(3)
+    small = query_counts(api, start_date)
+    create_processes(50)
+    large = query_counts(api, start_date)
+
+    assert small == large
+    assert max(large.values()) <= 5
+
+    summary = async_to_sync(api.get_summary_data)(None, None, start_date)
+    assert summary['total_candidates'] == 53
+    assert summary['task_completion_rate'] == pytest.approx(26 / 53 * 100, abs=0.01)
@@ -0,0 +1,225 @@
+# /home/pablo/app/tests/test_chatbot/test_http_clients.py
+"""
+Pruebas de los clientes HTTP salientes: reutilización del pool, reintentos
+que no duplican envíos, reintentos que pasan por el rate limiter, cierre del
+cliente al terminar su loop, concurrencia acotada y métricas por proveedor.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from app.ats.integrations.channels.http_clients import OutboundHTTP
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.calls = []
+
+    async def acquire(self, channel, account=None, recipient=None, max_wait=None):
+        self.calls.append((channel, account, recipient))
+        return True
+
+    def acquire_blocking(self, channel, account=None, recipient=None, max_wait=None):
+        self.calls.append((channel, account, recipient))
+        return True
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(OutboundHTTP, '_backoff', lambda self, config, attempt, response: 0)
+
+
+def registry(handler, limiter=None, **config):
+    return OutboundHTTP(providers={'test': config}, transport=httpx.MockTransport(handler),
+                        limiter=limiter or RecordingLimiter())
+
+
+def test_client_is_reused_within_a_loop():
+    outbound = registry(lambda request: httpx.Response(200, json={'ok': True}))
+
+    async def send_twice():
+        async with outbound.client('test') as client:
+            await client.post('https://api.example.com/send', json={'n': 1})
+        async with outbound.client('test') as client:
+            response = await client.post('https://api.example.com/send', json={'n': 2})
+        pools = list(outbound._pools.values())
+        await outbound.aclose()
+        return response, pools
+
+    response, pools = asyncio.run(send_twice())
+    assert response.json() == {'ok': True}
+    assert len(pools) == 1
+    assert outbound.stats()['test']['requests'] == 2
+
+
+def test_retries_rate_limited_response_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={'Retry-After': '1'}) if len(calls) == 1 else httpx.Response(200)
+
+    outbound = registry(handler, retries=2)
+    response = asyncio.run(outbound.post('test', 'https://api.example.com/send', json={}))
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    stats = outbound.stats()['test']
+    assert (stats['requests'], stats['retries'], stats['errors']) == (1, 1, 0)
+
+
+def test_post_gateway_errors_are_not_retried():
+    # Un 502/504 puede llegar cuando el proveedor ya entregó el mensaje
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(502)
+
+    outbound = registry(handler, retries=3)
+    response = asyncio.run(outbound.post('test', 'https://api.example.com/send', json={}))
+
+    assert response.status_code == 502
+    assert len(calls) == 1
+
+
+def test_post_retries_with_idempotency_key_or_retry_after_only():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429) if len(calls) == 1 else httpx.Response(200)
+
+    # 429 sin Retry-After ni clave de idempotencia: no se reintenta
+    outbound = registry(handler, retries=2)
+    assert asyncio.run(outbound.post('test', 'https://api.example.com/send', json={})).status_code == 429
+
+    calls.clear()
+    response = asyncio.run(outbound.post(
+        'test', 'https://api.example.com/send', json={}, headers={'Idempotency-Key': 'msg-1'}
+    ))
+    assert response.status_code == 200 and len(calls) == 2
+
+
+def test_idempotent_methods_retry_gateway_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503) if len(calls) < 3 else httpx.Response(200)
+
+    outbound = registry(handler, retries=2)
+    assert asyncio.run(outbound.get('test', 'https://api.example.com/status')).status_code == 200
+    assert len(calls) == 3
+
+
+def test_retries_go_through_the_rate_limiter():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={'Retry-After': '1'}) if len(calls) < 3 else httpx.Response(200)
+
+    limiter = RecordingLimiter()
+    outbound = registry(handler, limiter=limiter, retries=2)
+    asyncio.run(outbound.post('test', 'https://api.example.com/send', json={}, rate_limit=('acct', '5215555')))
+
+    assert limiter.calls == [('test', 'acct', '5215555')] * 2
+    assert 'rate_limit' not in calls[0].headers
+
+
+def test_client_is_closed_when_its_loop_ends():
+    outbound = registry(lambda request: httpx.Response(200))
+
+    async def send():
+        await outbound.get('test', 'https://api.example.com/')
+        return next(iter(outbound._pools.values())).client
+
+    client = asyncio.run(send())
+    assert client.is_closed
+
+
+class StatusAdapter(BaseAdapter):
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = self.statuses.pop(0)
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def sync_registry(statuses, limiter, **config):
+    outbound = registry(lambda request: httpx.Response(200), limiter=limiter, **config)
+    adapter = StatusAdapter(statuses)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    outbound._sessions['test'] = session
+    return outbound, adapter
+
+
+def test_sync_requests_follow_the_same_retry_policy():
+    limiter = RecordingLimiter()
+    outbound, adapter = sync_registry([504, 200], limiter, retries=2)
+    response = outbound.request_sync('test', 'POST', 'https://api.example.com/send', json={})
+    assert response.status_code == 504 and adapter.calls == 1
+
+    outbound, adapter = sync_registry([503, 200], limiter, retries=2)
+    response = outbound.request_sync('test', 'GET', 'https://api.example.com/status', rate_limit=('acct', None))
+    assert response.status_code == 200 and adapter.calls == 2
+    assert limiter.calls == [('test', 'acct', None)]
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={'error': 'bad request'})
+
+    outbound = registry(handler, retries=3)
+    response = asyncio.run(outbound.post('test', 'https://api.example.com/send', json={}))
+
+    assert response.status_code == 400
+    assert len(calls) == 1
+    assert outbound.stats()['test']['errors'] == 1
+
+
+def test_connection_errors_raise_after_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError('sin conexión', request=request)
+
+    outbound = registry(handler, retries=2)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(outbound.post('test', 'https://api.example.com/send'))
+    assert len(calls) == 3
+
+
+def test_concurrency_is_bounded_per_provider():
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    outbound = registry(handler, max_concurrency=3)
+
+    async def burst():
+        await asyncio.gather(*(outbound.get('test', 'https://api.example.com/') for _ in range(10)))
+
+    asyncio.run(burst())
+    stats = outbound.stats()['test']
+    assert stats['requests'] == 10
+    assert stats['max_in_flight'] == 3
@@ -0,0 +1,144 @@
+# /home/pablo/app/tests/test_chatbot/test_inbound_queue.py
+"""
+Pruebas de la cola de mensajes entrantes: deduplicación, orden por usuario,
+recuperación de pendientes y mensajes muertos.
+"""
+
+import asyncio
+
+from app.ats.integrations.channels.inbound_queue import (
+    InboundConsumer, InboundMessage, InboundQueue, accept_messages, meta_messaging_messages, stream_name,
+)
+from app.ats.utils.tiered_cache import InMemoryRedis
+
+
+def message(user_id, n, channel='whatsapp'):
+    return InboundMessage(channel=channel, message_id=f"wamid.{user_id}.{n}", user_id=user_id, payload={'n': n})
+
+
+def make_consumer(queue, processor, **kwargs):
+    consumer = InboundConsumer('whatsapp', queue=queue, processor=processor, **kwargs)
+    consumer.retry_delay = 0
+    return consumer
+
+
+def test_retries_from_provider_are_deduplicated():
+    queue = InboundQueue(redis_client=InMemoryRedis(), partitions=4)
+    batch = [message('521', 1), message('521', 2)]
+
+    assert asyncio.run(accept_messages(batch, queue)) == {'status': 'success', 'queued': 2, 'duplicates': 0}
+    assert asyncio.run(accept_messages(batch, queue)) == {'status': 'success', 'queued': 0, 'duplicates': 2}
+    assert queue.backlog('whatsapp') == 2
+
+
+def test_each_user_in_order_and_users_concurrently():
+    queue = InboundQueue(redis_client=InMemoryRedis(), partitions=4)
+    users = [f"52155{i}" for i in range(10)]
+    queue.enqueue(message(user, n) for n in range(5) for user in users)
+
+    seen = {user: [] for user in users}
+    active = {'now': 0, 'max': 0}
+
+    async def processor(inbound):
+        active['now'] += 1
+        active['max'] = max(active['max'], active['now'])
+        await asyncio.sleep(0.01)
+        seen[inbound.user_id].append(inbound.payload['n'])
+        active['now'] -= 1
+
+    consumer = make_consumer(queue, processor, batch_size=20, concurrency=5)
+    stats = asyncio.run(consumer.run(once=True))
+
+    assert stats['processed'] == 50
+    assert all(values == list(range(5)) for values in seen.values())
+    assert 1 < active['max'] <= 5
+
+
+def test_unacknowledged_messages_are_recovered_after_restart():
+    queue = InboundQueue(redis_client=InMemoryRedis(), partitions=2)
+    queue.enqueue([message('521', 1), message('522', 1)])
+    # Un consumidor anterior leyó el lote y se detuvo antes de confirmar
+    queue.read('whatsapp', [0, 1], count=10)
+
+    processed = []
+
+    async def processor(inbound):
+        processed.append(inbound.message_id)
+
+    stats = asyncio.run(make_consumer(queue, processor).run(once=True))
+    assert sorted(processed) == ['wamid.521.1', 'wamid.522.1']
+    assert stats['processed'] == 2
+    assert queue.read('whatsapp', [0, 1], count=10, pending=True) == []
+
+
+def test_failing_message_goes_to_dead_letter_after_max_attempts():
+    redis = InMemoryRedis()
+    queue = InboundQueue(redis_client=redis, partitions=1)
+    queue.enqueue([message('521', 1), message('521', 2)])
+    calls = []
+
+    async def processor(inbound):
+        calls.append(inbound.payload['n'])
+        if inbound.payload['n'] == 1:
+            raise RuntimeError('fallo')
+
+    consumer = make_consumer(queue, processor)
+    consumer.max_attempts = 2
+    stats = asyncio.run(consumer.run(once=True))
+
+    assert calls == [1, 1, 2]
+    assert (stats['processed'], stats['failed']) == (1, 1)
+    assert redis.xlen('inbound:whatsapp:dead') == 1
+    assert queue.read('whatsapp', [0], count=10, pending=True) == []
+    assert redis.xlen(stream_name('whatsapp', 0)) == 2
+
+
+def test_meta_payload_yields_every_message_and_skips_echoes():
+    payload = {'entry': [
+        {'id': 'page-1', 'messaging': [
+            {'sender': {'id': 'u1'}, 'message': {'mid': 'm1', 'text': 'hola'}},
+            {'sender': {'id': 'u2'}, 'message': {'mid': 'm2', 'text': 'hola'}},
+            {'sender': {'id': 'page-1'}, 'message': {'mid': 'm3', 'is_echo': True}},
+        ]},
+        {'id': 'page-1', 'messaging': [{'sender': {'id': 'u1'}, 'delivery': {'mids': ['m1']}}]},
+    ]}
+
+    messages = meta_messaging_messages(payload, 'messenger')
+    assert [(m.message_id, m.user_id, m.account) for m in messages] == [('m1', 'u1', 'page-1'), ('m2', 'u2', 'page-1')]
+
+
+class ScriptingRedis(InMemoryRedis):
+    """InMemoryRedis con ``register_script``: ejecuta ENQUEUE_SCRIPT de una sola vez."""
+
+    def __init__(self):
+        super().__init__()
+        self.scripts = []
+        self.calls = []
+
+    def register_script(self, source):
+        self.scripts.append(source)
+
+        def script(keys, args):
+            self.calls.append((keys, args))
+            with self._lock:
+                if not InMemoryRedis.set(self, keys[0], 1, ex=args[0], nx=True):
+                    return None
+                return self.xadd(keys[1], {'data': args[2]}, maxlen=args[1])
+        return script
+
+    def set(self, *args, **kwargs):
+        raise AssertionError('la deduplicación debe ir dentro del script')
+
+
+def test_dedup_and_xadd_run_in_one_script():
+    redis = ScriptingRedis()
+    queue = InboundQueue(redis_client=redis, partitions=4)
+    batch = [message('521', 1), message('521', 2)]
+
+    assert queue.enqueue(batch) == (2, 0)
+    assert queue.enqueue(batch) == (0, 2)
+    assert len(redis.scripts) == 1
+    seen_key, stream = redis.calls[0][0]
+    assert seen_key.endswith(':seen:whatsapp:wamid.521.1')
+    assert stream.startswith(stream_name('whatsapp', 0).rsplit(':', 1)[0])
+    assert queue.backlog('whatsapp') == 2
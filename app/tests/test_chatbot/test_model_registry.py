@@ -0,0 +1,52 @@
+# /home/pablo/app/tests/test_chatbot/test_model_registry.py
+"""
+Pruebas del registro compartido de modelos NLP.
+"""
+
+from app.ats.chatbot.nlp.model_registry import ModelRegistry
+
+
+def test_models_load_once_on_first_use():
+    calls = []
+    registry = ModelRegistry(light_mode=False)
+    registry.register('spacy_es', lambda: calls.append(1) or object())
+
+    assert not registry.is_loaded('spacy_es')
+    first = registry.get('spacy_es')
+    assert registry.get('spacy_es') is first
+    assert calls == [1]
+
+    stats = registry.stats()
+    assert stats['spacy_es']['loaded'] is True
+    assert stats['spacy_es']['hits'] == 1
+    assert stats['_process']['rss_mb'] > 0
+
+
+def test_light_mode_skips_heavy_models_and_preload_skips_unsafe():
+    registry = ModelRegistry(light_mode=True)
+    registry.register('roberta', lambda: object(), heavy=True)
+    registry.register('use', lambda: object(), fork_safe=False)
+    registry.register('skill_embeddings', lambda: {'embeddings': {}})
+
+    assert registry.get('roberta') is None
+    stats = registry.preload()
+
+    assert stats['roberta']['skipped'] == 'light_mode'
+    assert stats['use']['skipped'] == 'not_fork_safe'
+    assert stats['skill_embeddings']['loaded'] is True
+
+
+def test_failed_load_is_not_retried():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise OSError("modelo no instalado")
+
+    registry = ModelRegistry(light_mode=False)
+    registry.register('spacy_en', broken)
+
+    assert registry.get('spacy_en') is None
+    assert registry.get('spacy_en') is None
+    assert calls == [1]
+    assert registry.stats()['spacy_en']['error'] == "modelo no instalado"
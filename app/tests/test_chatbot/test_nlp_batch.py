@@ -0,0 +1,71 @@
+# /home/pablo/app/tests/test_chatbot/test_nlp_batch.py
+"""
+Pruebas de las APIs batch de NLPProcessor (sentimiento y entidades).
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.ats.chatbot.nlp.model_registry import model_registry
+from app.ats.chatbot.nlp.nlp import NLPProcessor
+
+
+class FakeSpacy:
+    def __init__(self):
+        self.piped = []
+
+    def pipe(self, texts, batch_size=32):
+        for text in texts:
+            self.piped.append(text)
+            ents = [SimpleNamespace(text=word, label_="ORG", start_char=text.index(word), end_char=text.index(word) + len(word))
+                    for word in text.split() if word.istitle()]
+            yield SimpleNamespace(ents=ents)
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    fake = FakeSpacy()
+    monkeypatch.setattr(model_registry, "_models", {"spacy_es": fake, "roberta": (object(), object())})
+    return NLPProcessor(), fake
+
+
+def test_entities_batch_deduplicates_and_keeps_order(processor):
+    nlp_processor, fake = processor
+    texts = ["trabajo en Acme", "hola", "trabajo en Acme", "vivo en Monterrey"]
+
+    entities = list(nlp_processor.iter_entities(iter(texts), batch_size=2))
+
+    assert [[ent["text"] for ent in item] for item in entities] == [["Acme"], [], ["Acme"], ["Monterrey"]]
+    assert fake.piped == ["trabajo en Acme", "hola", "vivo en Monterrey"]
+
+
+def test_sentiment_batch_uses_padded_minibatches(processor):
+    nlp_processor, _ = processor
+    batches = []
+
+    def labels(texts):
+        batches.append(list(texts))
+        return ["POS" if "excelente" in text else "NEG" for text in texts]
+
+    texts = ["servicio excelente", "muy mal", "servicio excelente", "pésimo trato y mala atención"]
+    with patch.object(NLPProcessor, "_roberta_labels", side_effect=labels):
+        results = list(nlp_processor.iter_sentiments(texts, batch_size=2))
+
+    assert [result["roberta_sentiment"] for result in results] == ["POS", "NEG", "POS", "NEG"]
+    # Textos únicos, ordenados por longitud, en lotes de 2
+    assert batches == [["muy mal", "servicio excelente"], ["pésimo trato y mala atención"]]
+    assert nlp_processor.performance_metrics["cache_hits"] == 1
+
+
+def test_batch_caches_are_bounded(processor, monkeypatch):
+    nlp_processor, fake = processor
+    monkeypatch.setattr(nlp_processor, "entity_cache", type(nlp_processor.entity_cache)(maxsize=3))
+    texts = [f"texto {number} de Acme" for number in range(10)] + ["texto 0 de Acme"]
+
+    entities = list(nlp_processor.iter_entities(texts, batch_size=2))
+
+    assert len(entities) == 11
+    assert all([ent["text"] for ent in item] == ["Acme"] for item in entities)
+    assert len(nlp_processor.entity_cache) == 3
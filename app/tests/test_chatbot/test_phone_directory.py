@@ -0,0 +1,119 @@
+# /home/pablo/app/tests/test_chatbot/test_phone_directory.py
+"""
+Pruebas del directorio de teléfonos que enruta WhatsApp entre ATS y nómina:
+normalización a E.164, caché compartida (también de números desconocidos) e
+invalidación entre procesos, y la resolución contra la base de datos.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.ats.utils.tiered_cache import InMemoryRedis, TieredCache
+from app.core.messaging.phone_directory import PhoneDirectory, PhoneRoute
+
+ROUTES = {
+    '+525512345678': [
+        PhoneRoute('payroll', 'c-1', 'e-1', 'employee'),
+        PhoneRoute('ats', '7', '42', 'contact'),
+    ],
+}
+
+
+class CountingResolver:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, number):
+        self.calls.append(number)
+        return list(ROUTES.get(number, []))
+
+
+def make_directories(count=1):
+    broker, resolver = InMemoryRedis(), CountingResolver()
+    directories = [PhoneDirectory(cache=TieredCache(redis_client=broker), resolver=resolver) for _ in range(count)]
+    return directories, resolver
+
+
+def test_whatsapp_formats_normalize_to_e164():
+    normalize = PhoneDirectory.normalize
+
+    assert normalize('5215512345678@c.us') == '+525512345678'
+    assert normalize('whatsapp:+52 55 1234 5678') == '+525512345678'
+    assert normalize('55 1234 5678') == '+525512345678'
+    assert normalize('14155550123') == '+14155550123'
+    assert normalize('') == ''
+
+
+def test_lookup_resolves_once_and_is_shared_between_processes():
+    (directory, other_process), resolver = make_directories(2)
+
+    assert directory.lookup('5215512345678@c.us') == ROUTES['+525512345678']
+    assert directory.lookup('+52 55 1234 5678') == ROUTES['+525512345678']
+    assert other_process.route('5512345678', 'ats') == PhoneRoute('ats', '7', '42', 'contact')
+    assert resolver.calls == ['+525512345678']
+
+
+def test_unknown_numbers_are_cached_until_invalidated():
+    (directory, other_process), resolver = make_directories(2)
+
+    assert directory.lookup('+14155550123') == []
+    assert other_process.lookup('+14155550123') == []
+    assert len(resolver.calls) == 1
+
+    # El número se registra: la señal de guardado lo invalida en todos los procesos
+    ROUTES['+14155550123'] = [PhoneRoute('payroll', 'c-2', None, 'company')]
+    try:
+        directory.invalidate('+1 415 555 0123')
+        assert other_process.route('+14155550123', 'payroll').company_id == 'c-2'
+        assert len(resolver.calls) == 2
+    finally:
+        del ROUTES['+14155550123']
+
+
+def test_resolver_errors_are_not_cached():
+    def failing(number):
+        raise RuntimeError('base de datos no disponible')
+
+    directory = PhoneDirectory(cache=TieredCache(redis_client=InMemoryRedis()), resolver=failing)
+
+    assert directory.lookup('+525512345678') == []
+    assert directory.namespace.get('+525512345678') is None
+
+
+@pytest.fixture
+def phone_book(db):
+    from app.models import BusinessUnit, Company, Person
+    from app.payroll.models import PayrollCompany, PayrollEmployee
+
+    payroll_company = PayrollCompany.objects.create(
+        name='Acme', business_unit=BusinessUnit.objects.create(name='huntRED'),
+        whatsapp_webhook_token='acme-token', whatsapp_phone_number='5215599990000',
+        whatsapp_business_name='Acme', country_code='MX', price_per_employee=Decimal('10'),
+    )
+    employee = PayrollEmployee.objects.create(
+        company=payroll_company, employee_number='E001', first_name='Ana', last_name='López',
+        email='ana@acme.mx', phone='55 1234 5678', hire_date=date(2024, 1, 1), job_title='Analista',
+        department='Operaciones', monthly_salary=Decimal('20000'),
+    )
+    PayrollEmployee.objects.create(
+        company=payroll_company, employee_number='E002', first_name='Baja', last_name='Inactiva',
+        email='baja@acme.mx', whatsapp_number='+52 55 1234 5678', hire_date=date(2024, 1, 1),
+        job_title='Analista', department='Operaciones', monthly_salary=Decimal('20000'), is_active=False,
+    )
+    contact = Person.objects.create(nombre='Ana', phone='+52 55 1234 5678')
+    company = Company.objects.create(name='Acme ATS', payment_responsible=contact)
+    return payroll_company, employee, contact, company
+
+
+def test_resolve_reads_routes_from_the_database(phone_book):
+    payroll_company, employee, contact, company = phone_book
+    directory = PhoneDirectory(cache=TieredCache(redis_client=InMemoryRedis()))
+
+    assert directory.resolve('+525512345678') == [
+        PhoneRoute('payroll', str(payroll_company.id), str(employee.id), 'employee'),
+        PhoneRoute('ats', str(company.id), str(contact.id), 'contact'),
+    ]
+    assert directory.resolve('+525599990000') == [PhoneRoute('payroll', str(payroll_company.id), None, 'company')]
+    assert directory.resolve('+14155550123') == []
@@ -0,0 +1,179 @@
+# /home/pablo/app/tests/test_chatbot/test_prompt_cache.py
+#
+# Tests de la caché de prompts de LLM: claves estables, single-flight y límites por BU.
+
+import asyncio
+import pytest
+from app.ats.chatbot.core.prompt_cache import PromptCache
+from app.ats.utils.tiered_cache import InMemoryRedis
+
+
+class DictCache:
+    """Backend mínimo con la interfaz de django.core.cache usada por PromptCache."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+    def add(self, key, value, timeout=None):
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def delete_many(self, keys):
+        for key in keys:
+            self.delete(key)
+
+    def get_many(self, keys):
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    def incr(self, key, delta=1):
+        if key not in self.data:
+            raise ValueError(f"Key '{key}' not found")
+        self.data[key] += delta
+        return self.data[key]
+
+
+@pytest.fixture
+def prompt_cache():
+    return PromptCache(backend=DictCache(), policies={'default': {'ttl': 60, 'max_entries': 2}},
+                       redis_client=InMemoryRedis())
+
+
+def test_key_is_stable_and_uses_full_prompt(prompt_cache):
+    prefix = "x" * 300
+    key = prompt_cache.make_key("gpt-4", prefix + " uno", "huntred")
+    assert key == prompt_cache.make_key("gpt-4", "  " + prefix + "\n uno ", "huntred")
+    assert key != prompt_cache.make_key("gpt-4", prefix + " dos", "huntred")
+    assert key != prompt_cache.make_key("gpt-4", prefix + " uno", "amigro")
+
+
+def test_concurrent_identical_prompts_call_upstream_once(prompt_cache):
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        prompt_cache.mark_cacheable(prompt_cache.make_key("m", "hola", "bu"), "respuesta")
+        return "respuesta"
+
+    async def run():
+        return await asyncio.gather(*[
+            prompt_cache.get_or_generate("m", "hola", "bu", generate) for _ in range(10)
+        ])
+
+    results = asyncio.run(run())
+    assert results == ["respuesta"] * 10
+    assert len(calls) == 1
+    stats = prompt_cache.get_stats()["bu"]
+    assert stats["coalesced"] == 9
+    assert stats["upstream_calls"] == 1
+
+    asyncio.run(prompt_cache.get_or_generate("m", "hola", "bu", generate))
+    assert len(calls) == 1
+    assert prompt_cache.get_stats()["bu"]["hits_l1"] == 1
+
+
+def test_unmarked_responses_are_not_cached(prompt_cache):
+    async def failing():
+        return "Error al comunicarse con el proveedor."
+
+    asyncio.run(prompt_cache.get_or_generate("m", "hola", "bu", failing))
+    assert prompt_cache.lookup(prompt_cache.make_key("m", "hola", "bu"), "bu") is None
+
+
+def test_size_limit_per_business_unit(prompt_cache):
+    keys = [prompt_cache.make_key("m", f"p{i}", "bu") for i in range(3)]
+    prompt_cache.store(keys[0], "r0", "bu")
+    prompt_cache.store(keys[1], "r1", "bu")
+    assert prompt_cache.lookup(keys[0], "bu")["response"] == "r0"
+    prompt_cache.store(keys[2], "r2", "bu")
+
+    # L1 expulsa la entrada menos usada recientemente
+    assert prompt_cache._l1_get("bu", keys[1]) is None
+    assert prompt_cache._l1_get("bu", keys[0])["response"] == "r0"
+    # L2 nunca supera max_entries para la BU
+    stored = [k for k in keys if prompt_cache.backend.get(k) is not None]
+    assert len(stored) == 2
+    assert prompt_cache.get_stats()["bu"]["evictions"] == 2
+
+
+def test_l2_index_is_a_sorted_set_shared_by_processes(prompt_cache):
+    other_process = PromptCache(backend=prompt_cache.backend, redis_client=prompt_cache.redis,
+                                policies={'default': {'ttl': 60, 'max_entries': 2}})
+    keys = [prompt_cache.make_key("m", f"p{i}", "bu") for i in range(4)]
+    prompt_cache.store(keys[0], "r0", "bu")
+    other_process.store(keys[1], "r1", "bu")
+    prompt_cache.store(keys[2], "r2", "bu")
+    other_process.store(keys[3], "r3", "bu")
+
+    assert [k for k in keys if prompt_cache.backend.get(k) is not None] == keys[2:]
+    assert prompt_cache.redis.zcard("gpt:v2:index:bu") == 2
+
+
+def test_shared_stats_are_incremented_not_overwritten(prompt_cache):
+    other_process = PromptCache(backend=prompt_cache.backend, redis_client=prompt_cache.redis)
+    prompt_cache._count("bu", "misses", 2)
+    prompt_cache._count("bu", "saved_latency_ms", 1.5)
+    other_process._count("bu", "misses")
+    other_process._count("otra", "hits_l1")
+
+    other_process.flush_stats()
+    stats = prompt_cache.get_stats(shared=True)
+
+    assert stats["bu"]["misses"] == 3
+    assert stats["otra"]["hits_l1"] == 1
+    # La fracción queda pendiente para el siguiente volcado
+    assert stats["bu"]["saved_latency_ms"] == 1
+    prompt_cache._count("bu", "saved_latency_ms", 0.5)
+    assert prompt_cache.get_stats(shared=True)["bu"]["saved_latency_ms"] == 2
+
+
+def test_wrapped_handler_keys_include_channel_and_lazy_model(prompt_cache):
+    from types import SimpleNamespace
+
+    class LazyHandler:
+        """Como MetaAIHandler: fija el modelo al inicializarse y recibe ``channel_api``."""
+        initialized = False
+
+        def __init__(self):
+            self.config = SimpleNamespace(model=None)
+            self.calls = []
+
+        async def initialize(self):
+            self.model = "llama"
+            self.initialized = True
+
+        async def generate_response(self, prompt, business_unit=None, channel_api=None):
+            if not self.initialized:
+                await self.initialize()
+            self.calls.append(channel_api)
+            response = f"respuesta {channel_api}"
+            prompt_cache.mark_cacheable(prompt_cache.make_key(self.model, prompt, business_unit, channel_api), response)
+            return response
+
+    LazyHandler.generate_response = prompt_cache.wrap_generate(LazyHandler.generate_response)
+    handler = LazyHandler()
+    verified, plain = SimpleNamespace(pk=1, meta_verified=True), SimpleNamespace(pk=2, meta_verified=False)
+
+    async def run():
+        return [
+            await handler.generate_response("hola", "bu", channel_api=verified),
+            await handler.generate_response("hola", "bu", verified),
+            await handler.generate_response("hola", "bu", channel_api=plain),
+            await handler.generate_response("hola", "bu", channel_api=plain),
+        ]
+
+    assert asyncio.run(run()) == ["respuesta " + str(verified)] * 2 + ["respuesta " + str(plain)] * 2
+    # Un canal distinto no comparte respuesta; el mismo canal sí, desde la primera llamada
+    assert handler.calls == [verified, plain]
+    assert prompt_cache.lookup(prompt_cache.make_key("llama", "hola", "bu", verified), "bu") is not None
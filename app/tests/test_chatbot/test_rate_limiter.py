@@ -0,0 +1,91 @@
+# /home/pablo/app/tests/test_chatbot/test_rate_limiter.py
+"""
+Pruebas del limitador de tasa de envío: ráfaga y espaciado GCRA, cubetas por
+cuenta y destinatario, y respaldo en memoria cuando Redis falla.
+"""
+
+import asyncio
+
+import pytest
+
+from app.ats.chatbot.components import rate_limiter as rate_limiter_module
+from app.ats.chatbot.components.rate_limiter import LocalBuckets, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenRedis:
+    def register_script(self, script):
+        raise ConnectionError('redis caído')
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_limiter(clock, limits):
+    return RateLimiter(limits=limits, redis_client=BrokenRedis(), local=LocalBuckets(clock=clock))
+
+
+def test_burst_then_spacing(clock):
+    limiter = make_limiter(clock, {'test': {'account': {'rate': 2, 'burst': 3}}})
+
+    assert [limiter.reserve('test', 'bu-1') for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve('test', 'bu-1') == pytest.approx(0.5)
+    assert limiter.reserve('test', 'bu-1') == pytest.approx(1.0)
+
+    clock.now += 10
+    assert limiter.reserve('test', 'bu-1') == 0.0
+
+
+def test_recipient_bucket_is_independent_per_recipient(clock):
+    limiter = make_limiter(clock, {'test': {
+        'account': {'rate': 100, 'burst': 100},
+        'recipient': {'rate': 1, 'burst': 1},
+    }})
+
+    assert limiter.reserve('test', 'bu-1', '521') == 0.0
+    assert limiter.reserve('test', 'bu-1', '522') == 0.0
+    assert limiter.reserve('test', 'bu-1', '521') == pytest.approx(1.0)
+    # Otra cuenta emisora no comparte la cubeta del destinatario
+    assert limiter.reserve('test', 'bu-2', '521') == 0.0
+
+
+def test_max_wait_rejects_without_reserving(clock):
+    limiter = make_limiter(clock, {'test': {'account': {'rate': 1, 'burst': 1}}})
+
+    assert limiter.reserve('test', 'bu-1') == 0.0
+    assert limiter.reserve('test', 'bu-1', max_wait=0) is None
+    assert limiter.reserve('test', 'bu-1') == pytest.approx(1.0)
+
+
+def test_requests_per_minute_adds_channel_bucket(clock):
+    limiter = RateLimiter(requests_per_minute={'test': 60}, redis_client=BrokenRedis(),
+                          local=LocalBuckets(clock=clock))
+
+    assert limiter.channel_limits['test']['channel'] == {'rate': 1, 'burst': 60}
+    assert limiter.reserve('unknown') == 0.0
+
+
+def test_acquire_sleeps_exactly_the_reserved_delay(clock, monkeypatch):
+    limiter = make_limiter(clock, {'test': {'account': {'rate': 4, 'burst': 1}}})
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(rate_limiter_module.asyncio, 'sleep', fake_sleep)
+
+    async def send_three():
+        return [await limiter.acquire('test', 'bu-1') for _ in range(3)]
+
+    assert asyncio.run(send_three()) == [True, True, True]
+    assert sleeps == [pytest.approx(0.25), pytest.approx(0.5)]
+    assert asyncio.run(limiter.check_limit('test', 'bu-1')) is False
@@ -0,0 +1,151 @@
+# /home/pablo/app/tests/test_ml/test_aura_executor.py
+"""
+Pruebas del ejecutor de módulos AURA: dependencias, concurrencia (latencia de
+la ruta crítica), timeouts, presupuesto, memorización por revisión y pool de
+procesos.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.ats.utils.tiered_cache import InMemoryRedis, TieredCache
+from app.ml.aura.executor import ModuleExecutor, ModuleSpec, person_revision
+
+
+def make_executor(**kwargs):
+    kwargs.setdefault('process_workers', 0)
+    return ModuleExecutor(cache=TieredCache(redis_client=InMemoryRedis()), **kwargs)
+
+
+def sleeper(name, seconds, calls=None):
+    async def module(upstream=None):
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(seconds)
+        return {'module': name, 'inputs': sorted(upstream or {})}
+    return module
+
+
+def cpu_module(value):
+    return {'value': value * 2, 'pid': os.getpid()}
+
+
+def test_independent_modules_run_concurrently_and_dependents_get_inputs():
+    specs = [
+        ModuleSpec('truth', sleeper('truth', 0.2)),
+        ModuleSpec('social', sleeper('social', 0.2)),
+        ModuleSpec('bias', sleeper('bias', 0.2)),
+        ModuleSpec('summary', sleeper('summary', 0.05), requires=('truth', 'social')),
+    ]
+    started = time.perf_counter()
+    report = asyncio.run(make_executor().run(specs))
+    elapsed = time.perf_counter() - started
+
+    # Secuencial serían 0.65s; en paralelo, la ruta crítica (0.25s)
+    assert elapsed < 0.45
+    assert report.results['summary']['inputs'] == ['social', 'truth']
+    assert report.critical_path[-1] == 'summary' and len(report.critical_path) == 2
+    assert report.total_module_time > report.wall_time
+
+
+def test_timeouts_errors_and_budget_skip_dependents():
+    def broken(upstream=None):
+        raise RuntimeError('modelo no disponible')
+
+    specs = [
+        ModuleSpec('slow', sleeper('slow', 1.0), timeout=0.05),
+        ModuleSpec('after_slow', sleeper('after_slow', 0), requires=('slow',)),
+        ModuleSpec('broken', broken, mode='thread'),
+        ModuleSpec('heavy', sleeper('heavy', 0), cost=5.0),
+        ModuleSpec('after_heavy', sleeper('after_heavy', 0), requires=('heavy',)),
+        ModuleSpec('cheap', sleeper('cheap', 0)),
+    ]
+    report = asyncio.run(make_executor().run(specs, budget=4.0))
+    status = {name: run.status for name, run in report.runs.items()}
+
+    assert status == {
+        'slow': 'timeout', 'after_slow': 'skipped', 'broken': 'error',
+        'heavy': 'skipped', 'after_heavy': 'skipped', 'cheap': 'ok',
+    }
+    assert 'modelo no disponible' in report.runs['broken'].error
+    assert list(report.results) == ['cheap']
+
+
+def test_results_are_memoized_per_person_revision():
+    calls = []
+    executor = make_executor()
+    specs = [ModuleSpec('truth', sleeper('truth', 0, calls))]
+    person = {'id': 7, 'updated_at': '2026-01-01T00:00:00'}
+
+    first = asyncio.run(executor.run(specs, revision=person_revision(person), context={'tier': 'pro'}))
+    again = asyncio.run(executor.run(specs, revision=person_revision(person), context={'tier': 'pro'}))
+    changed = dict(person, updated_at='2026-02-01T00:00:00')
+    asyncio.run(executor.run(specs, revision=person_revision(changed), context={'tier': 'pro'}))
+
+    assert calls == ['truth', 'truth']
+    assert again.runs['truth'].status == 'cached'
+    assert again.results == first.results
+    assert person_revision({'name': 'Ana'}) == person_revision({'name': 'Ana'})
+
+
+def test_cycles_are_rejected_and_cpu_modules_run_in_processes():
+    with pytest.raises(ValueError):
+        ModuleExecutor.validate([
+            ModuleSpec('a', cpu_module, requires=('b',)),
+            ModuleSpec('b', cpu_module, requires=('a',)),
+        ])
+
+    executor = make_executor(process_workers=1)
+    try:
+        report = asyncio.run(executor.run([ModuleSpec('bias', cpu_module, args=(21,), mode='process')]))
+    finally:
+        executor.shutdown()
+    assert report.results['bias']['value'] == 42
+    assert report.results['bias']['pid'] != os.getpid()
+
+
+def slow_cpu_module(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def test_process_timeout_recycles_the_pool():
+    executor = make_executor(process_workers=1)
+    executor.start()
+    try:
+        pool = executor._pool
+        begin = time.perf_counter()
+        report = asyncio.run(executor.run([
+            ModuleSpec('stuck', slow_cpu_module, args=(30,), mode='process', timeout=1),
+        ]))
+        assert report.runs['stuck'].status == 'timeout'
+        assert executor._pool is None
+        assert not any(process.is_alive() for process in (pool._processes or {}).values())
+
+        # El siguiente módulo de CPU corre en un pool nuevo
+        report = asyncio.run(executor.run([ModuleSpec('bias', cpu_module, args=(1,), mode='process')]))
+        assert report.results['bias']['value'] == 2
+        assert time.perf_counter() - begin < 20
+    finally:
+        executor.shutdown()
+
+
+def test_process_timeout_resubmits_queued_sibling_modules():
+    # Un solo proceso: los demás módulos esperan en la cola del pool que se recicla
+    executor = make_executor(process_workers=1)
+    executor.start()
+    try:
+        report = asyncio.run(executor.run(
+            [ModuleSpec('stuck', slow_cpu_module, args=(30,), mode='process', timeout=1)]
+            + [ModuleSpec(f"bias{n}", cpu_module, args=(n,), mode='process', timeout=20) for n in range(6)]
+        ))
+    finally:
+        executor.shutdown()
+
+    assert report.runs['stuck'].status == 'timeout'
+    for n in range(6):
+        assert report.runs[f"bias{n}"].status == 'ok', report.runs[f"bias{n}"]
+        assert report.results[f"bias{n}"]['value'] == 2 * n
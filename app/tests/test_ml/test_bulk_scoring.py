@@ -0,0 +1,55 @@
+# /home/pablo/app/tests/test_ml/test_bulk_scoring.py
+"""
+Pruebas de equivalencia entre el scoring masivo vectorizado y las utilidades
+escalares de ``ml_utils``.
+"""
+
+import numpy as np
+import pytest
+
+from app.ml.core.models.bulk_scoring import (
+    SkillMatrix, TopK, alignment_percentage_vector, match_percentage_vector, normalize_skills,
+)
+from app.ml.ml_utils import calculate_alignment_percentage, calculate_match_percentage
+
+
+VACANCY_SKILLS = [
+    ["python", "django", "sql"],
+    [],
+    ["excel"],
+    ["python", "docker", "aws", "sql", "linux"],
+]
+
+
+@pytest.mark.parametrize("person_skills", [
+    "Python, SQL",
+    "",
+    "excel, ventas, negociación, liderazgo",
+])
+def test_match_percentage_matches_scalar(person_skills):
+    required = normalize_skills(person_skills)
+    matrix = SkillMatrix()
+    required_ids = matrix.encode(required)
+    for skills in VACANCY_SKILLS:
+        matrix.append(skills)
+
+    matches = matrix.intersection_counts(required_ids)
+    vectorized = match_percentage_vector(matches, len(required), matrix.lengths)
+
+    expected = [calculate_match_percentage(required, skills) for skills in VACANCY_SKILLS]
+    assert vectorized.tolist() == pytest.approx(expected)
+
+
+def test_alignment_matches_scalar():
+    actual = [0, 10000, 11000, 14000, 20000, 30000]
+    for expected_salary in (0, 10000, 25000):
+        vectorized = alignment_percentage_vector(expected_salary, actual)
+        expected = [calculate_alignment_percentage(expected_salary, value) for value in actual]
+        assert vectorized.tolist() == pytest.approx(expected)
+
+
+def test_top_k_across_chunks():
+    top = TopK(3)
+    top.push_many(np.array([0.1, 0.9, 0.4]), [1, 2, 3])
+    top.push_many(np.array([0.8, 0.2, 0.95, 0.3]), [4, 5, 6, 7])
+    assert [item_id for _, item_id in top.results()] == [6, 2, 4]
@@ -0,0 +1,111 @@
+# /home/pablo/app/tests/test_ml/test_centrality.py
+"""
+Pruebas del servicio de centralidad de AURA: valores iguales a networkx en
+grafos pequeños y caché invalidada por revisión del grafo (mutaciones del
+servicio, cambios directos al grafo e ``invalidate``).
+"""
+
+import networkx as nx
+import pytest
+
+from app.ml.aura.centrality import METRIC_NAMES, CentralityService
+
+
+def reference(G):
+    return {
+        'degree_centrality': nx.degree_centrality(G),
+        'betweenness_centrality': nx.betweenness_centrality(G),
+        'closeness_centrality': nx.closeness_centrality(G),
+    }
+
+
+def assert_matches_networkx(service):
+    expected = reference(service.graph)
+    for name in METRIC_NAMES:
+        values = service.metric(name)
+        assert set(values) == set(expected[name])
+        for node, value in expected[name].items():
+            assert values[node] == pytest.approx(value), (name, node)
+
+
+def small_graph():
+    # Dos componentes y un nodo aislado: la closeness se escala por componente
+    G = nx.karate_club_graph()
+    G.add_edges_from([('a', 'b'), ('b', 'c'), ('c', 'd'), ('b', 'd')])
+    G.add_node('solo')
+    return G
+
+
+def test_metrics_match_networkx():
+    service = CentralityService(small_graph())
+
+    assert_matches_networkx(service)
+    assert not service.is_approximate
+    top_node, _ = service.top('betweenness_centrality', limit=1)[0]
+    assert top_node == max(nx.betweenness_centrality(service.graph).items(), key=lambda item: item[1])[0]
+
+
+def test_metrics_are_cached_until_the_revision_changes():
+    service = CentralityService(small_graph())
+    first = service.metrics()
+    revision = service.revision
+
+    assert service.metrics() is first
+    assert service.revision == revision
+
+    service.add_edge('d', 0)
+    assert service.revision == revision + 1
+    assert service.metrics() is not first
+    assert_matches_networkx(service)
+
+    # Una arista existente no cambia la revisión
+    service.add_edge('d', 0)
+    assert service.revision == revision + 1
+
+
+def test_only_dirty_components_are_recomputed(monkeypatch):
+    service = CentralityService(small_graph())
+    service.metrics()
+    computed = []
+    compute = CentralityService._compute_component
+
+    def recording(self, component):
+        computed.append(set(component))
+        return compute(self, component)
+
+    monkeypatch.setattr(CentralityService, '_compute_component', recording)
+    service.add_edge('a', 'c')
+
+    assert_matches_networkx(service)
+    assert computed == [{'a', 'b', 'c', 'd'}]
+
+
+def test_removals_and_direct_graph_changes_invalidate():
+    service = CentralityService(small_graph())
+    service.metrics()
+
+    service.remove_edge('b', 'c')
+    service.remove_node(0)
+    assert_matches_networkx(service)
+
+    # Cambio hecho directamente sobre el grafo: se detecta por su tamaño
+    revision = service.revision
+    service.graph.add_edge('solo', 'a')
+    assert_matches_networkx(service)
+    assert service.revision > revision
+
+    # Mismo tamaño (se cambia una arista por otra): hace falta invalidate()
+    service.graph.remove_edge('solo', 'a')
+    service.graph.add_edge('solo', 'd')
+    service.invalidate()
+    assert_matches_networkx(service)
+
+
+def test_large_components_are_sampled():
+    service = CentralityService(nx.path_graph(30), sample_threshold=10, sample_size=30)
+
+    closeness = service.metric('closeness_centrality')
+    assert service.is_approximate
+    # Con todos los nodos como pivotes la estimación es exacta
+    for node, value in nx.closeness_centrality(service.graph).items():
+        assert closeness[node] == pytest.approx(value)
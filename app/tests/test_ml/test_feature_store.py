@@ -0,0 +1,59 @@
+# /home/pablo/app/tests/test_ml/test_feature_store.py
+"""
+Pruebas del feature store por entidad (matrices memory-mapped).
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.ml.core.features.feature_store import EMBEDDING_DIM, PAIR_DIM, FeatureStore
+
+
+def fake_embed(calls):
+    def embed(texts):
+        calls.append(list(texts))
+        return np.array([np.full(EMBEDDING_DIM, (len(text) % 7) + 1, dtype=np.float32) for text in texts])
+    return embed
+
+
+def person(pk, skills="python, django"):
+    return SimpleNamespace(pk=pk, skills=skills, personality_data={"openness": 0.7}, experience_years=5)
+
+
+def vacancy(pk, skills=("python",)):
+    return SimpleNamespace(pk=pk, skills_required=list(skills), requisitos="", descripcion="Equipo ágil")
+
+
+def test_entities_are_embedded_once_and_shared_between_stores(tmp_path):
+    calls = []
+    store = FeatureStore(embed_fn=fake_embed(calls), directory=str(tmp_path))
+    vacancies = [vacancy(pk) for pk in range(1, 6)]
+
+    first = store.pair_features(person(1), vacancies)
+    assert first.shape == (5, PAIR_DIM)
+    # Una llamada por entidad nueva: candidato y lote de vacantes
+    assert [len(batch) for batch in calls] == [2, 10]
+
+    # Otro worker abre los mismos archivos sin recalcular nada
+    other = FeatureStore(embed_fn=fake_embed(calls), directory=str(tmp_path))
+    np.testing.assert_allclose(other.pair_features(person(1), vacancies), first)
+    assert len(calls) == 2
+
+
+def test_changed_content_is_recomputed_and_signals_invalidate(tmp_path):
+    calls = []
+    store = FeatureStore(embed_fn=fake_embed(calls), directory=str(tmp_path))
+    store.entity_features('vacancy', [vacancy(1), vacancy(2)])
+
+    # Guardado sin cambios relevantes: no se invalida
+    assert store.invalidate_if_changed('vacancy', vacancy(1)) is False
+    assert store.invalidate_if_changed('vacancy', vacancy(1, skills=("java",))) is True
+
+    store.entity_features('vacancy', [vacancy(1, skills=("java",)), vacancy(2)])
+    assert [len(batch) for batch in calls] == [4, 2]
+    assert store.stats()['vacancy'] == {'entities': 2, 'rows': 3, 'mb': 0.0}
+
+    assert store.compact()['vacancy'] == (3, 2)
+    store.entity_features('vacancy', [vacancy(1, skills=("java",)), vacancy(2)])
+    assert len(calls) == 2
@@ -0,0 +1,85 @@
+# /home/pablo/app/tests/test_ml/test_org_graph_builder.py
+"""
+Pruebas de ``OrganizationalGraphBuilder.build`` contra la base de datos:
+puesto, departamento y BU salen del perfil ``Manager`` (propio o del manager
+directo) y el alcance por BU o equipo sólo lee a las personas pedidas.
+"""
+
+import pytest
+
+from app.models import BusinessUnit, Manager, Person, Team, TeamMember
+from app.ml.aura.organizational.org_graph_builder import OrganizationalGraphBuilder
+
+
+@pytest.fixture
+def organization():
+    huntred = BusinessUnit.objects.create(name='huntRED')
+    amigro = BusinessUnit.objects.create(name='amigro')
+
+    director = Person.objects.create(nombre='Directora')
+    manager = Person.objects.create(nombre='Gerente')
+    analyst_a = Person.objects.create(nombre='Analista A')
+    analyst_b = Person.objects.create(nombre='Analista B')
+    seller = Person.objects.create(nombre='Vendedor')
+    sales_lead = Person.objects.create(nombre='Líder de ventas')
+
+    director_profile = Manager.objects.create(
+        person=director, title='Directora de Ingeniería', department='Engineering',
+        level='Director', business_unit=huntred
+    )
+    director_profile.direct_reports.add(analyst_a, analyst_b)
+    # Nivel fuera de HIERARCHY_LEVELS: cuenta como 'Manager'
+    Manager.objects.create(
+        person=manager, title='Gerente de plataforma', department='Engineering',
+        level='Gerente', business_unit=huntred
+    )
+    sales_profile = Manager.objects.create(
+        person=sales_lead, title='Líder', department='Sales', level='Manager', business_unit=amigro
+    )
+    sales_profile.direct_reports.add(seller)
+
+    team = Team.objects.create(name='Datos', business_unit=huntred)
+    TeamMember.objects.create(team=team, person=analyst_a, role='Analista')
+    TeamMember.objects.create(team=team, person=analyst_b, role='Analista')
+
+    return {
+        'director': director, 'manager': manager, 'analyst_a': analyst_a,
+        'analyst_b': analyst_b, 'seller': seller, 'sales_lead': sales_lead, 'team': team,
+    }
+
+
+@pytest.mark.django_db
+def test_build_reads_attributes_from_manager_profiles(organization):
+    G = OrganizationalGraphBuilder().build()
+
+    assert G.number_of_nodes() == 6
+    assert G.nodes[organization['director'].id]['position'] == 'Director'
+    assert G.nodes[organization['manager'].id]['position'] == 'Manager'
+    analyst = G.nodes[organization['analyst_a'].id]
+    assert analyst['name'] == 'Analista A'
+    assert analyst['position'] is None
+    assert (analyst['department'], analyst['business_unit']) == ('Engineering', 'huntRED')
+    assert G.nodes[organization['seller'].id]['business_unit'] == 'amigro'
+    # Sin aristas entre BUs distintas
+    assert not G.has_edge(organization['seller'].id, organization['analyst_a'].id)
+
+
+@pytest.mark.django_db
+def test_build_scoped_by_business_unit(organization):
+    G = OrganizationalGraphBuilder().build(business_unit='huntRED')
+
+    ids = {organization[key].id for key in ('director', 'manager', 'analyst_a', 'analyst_b')}
+    assert set(G.nodes) == ids
+    a, b = organization['analyst_a'].id, organization['analyst_b'].id
+    assert G.edges[a, b]['type'] == 'collaboration'
+    assert G.edges[organization['director'].id, a]['type'] == 'hierarchical'
+    assert G.edges[organization['director'].id, organization['manager'].id]['type'] == 'hierarchical'
+
+
+@pytest.mark.django_db
+def test_build_scoped_by_team(organization):
+    G = OrganizationalGraphBuilder().build(team_id=organization['team'].id)
+
+    a, b = organization['analyst_a'].id, organization['analyst_b'].id
+    assert set(G.nodes) == {a, b}
+    assert G.edges[a, b]['weight'] == 0.8
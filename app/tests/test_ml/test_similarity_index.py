@@ -0,0 +1,117 @@
+# /home/pablo/app/tests/test_ml/test_similarity_index.py
+"""
+Pruebas del índice de similitud por habilidades (MinHash-LSH).
+"""
+
+import random
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.ats.utils.tiered_cache import InMemoryRedis
+from app.ml.core.features.similarity_index import SimilarityIndex, jaccard
+
+# Diccionario mínimo: minúsculas y sin espacios sobrantes
+fake_dictionary = SimpleNamespace(canonicalize=lambda items: list(dict.fromkeys(i.strip().lower() for i in items)))
+
+
+def make_index(redis=None):
+    return SimilarityIndex(redis_client=redis or InMemoryRedis(), dictionary=fake_dictionary)
+
+
+def test_ranks_by_jaccard_and_excludes_itself():
+    index = make_index()
+    index.add_many('person', [
+        (1, {'python', 'django', 'sql', 'docker'}, None),
+        (2, {'python', 'django', 'sql'}, None),
+        (3, {'python', 'django'}, None),
+        (4, {'excel', 'ventas'}, None),
+    ])
+
+    assert index.similar('person', key=1, k=5) == [('2', 0.75), ('3', 0.5)]
+    assert index.similar('person', skills={'excel', 'ventas', 'crm'}) == [('4', round(2 / 3, 4))]
+
+
+def test_updates_are_incremental_and_visible_to_other_processes():
+    redis = InMemoryRedis()
+    index, other_process = make_index(redis), make_index(redis)
+    index.add_many('card', [
+        (10, {'v:python', 'p:python'}, 1),
+        (11, {'v:python', 'p:python'}, 1),
+        (12, {'v:python', 'p:python'}, 2),
+    ])
+
+    assert other_process.similar('card', key=10, group=1) == [('11', 1.0)]
+    assert index.add('card', 11, {'v:python', 'p:python'}, 1) is False   # sin cambios
+
+    # La tarjeta 12 se mueve al tablero 1 y la 11 se elimina
+    assert index.add('card', 12, {'v:python', 'p:python'}, 1) is True
+    index.remove('card', 11)
+    assert other_process.similar('card', key=10, group=1) == [('12', 1.0)]
+
+
+def test_entities_without_skills_leave_the_index():
+    index = make_index()
+    index.add('vacancy', 1, {'python'})
+    index.add('vacancy', 2, {'python'})
+    index.add('vacancy', 2, set())
+
+    assert index.similar('vacancy', key=1) == []
+    assert index.similar('vacancy', key=2) == []
+
+
+def test_lsh_recall_against_brute_force():
+    rng = random.Random(7)
+    vocabulary = [f"skill{i}" for i in range(300)]
+    entities = {key: set(rng.sample(vocabulary, rng.randint(5, 15))) for key in range(1500)}
+    # Variantes cercanas de algunas entidades (Jaccard alto)
+    for key in range(1500, 1600):
+        base = sorted(entities[key - 1500])
+        entities[key] = set(base[:-1] + [rng.choice(vocabulary)])
+
+    index = make_index()
+    index.add_many('person', [(key, skills, None) for key, skills in entities.items()])
+
+    found = 0
+    for key in range(1500, 1600):
+        expected = max((other for other in entities if other != key),
+                       key=lambda other: jaccard(entities[key], entities[other]))
+        result = index.similar('person', key=key, k=1)
+        found += bool(result) and jaccard(entities[key], entities[int(result[0][0])]) == \
+            jaccard(entities[key], entities[expected])
+    assert found >= 95
+
+
+def test_skill_fields_are_parsed_and_cards_keep_both_sides():
+    index = make_index()
+
+    assert index.canonical_skills('Python, Django;SQL\nDocker') == {'python', 'django', 'sql', 'docker'}
+    assert index.canonical_skills([{'name': 'Python'}, 'SQL']) == {'python', 'sql'}
+    assert index.canonical_skills('["React", "Node"]') == {'react', 'node'}
+    assert index.card_skills(['Python'], 'python, excel') == {'v:python', 'p:python', 'p:excel'}
+
+
+def test_group_is_applied_before_truncating_candidates():
+    index = make_index()
+    index.max_candidates = 3
+    # Tablero 2 lleno de tarjetas idénticas a la consulta; en el tablero 1 sólo una parecida
+    index.add_many('card', [(100 + key, {'v:python', 'p:python', 'p:sql'}, 2) for key in range(10)])
+    index.add_many('card', [
+        (1, {'v:python', 'p:python', 'p:sql'}, 1),
+        (2, {'v:python', 'p:python'}, 1),
+    ])
+
+    assert index.similar('card', key=1, group=1) == [('2', round(2 / 3, 4))]
+    assert len(index.similar('card', key=1)) == 3
+
+
+def test_first_query_schedules_the_build_instead_of_running_it(monkeypatch):
+    task = MagicMock()
+    monkeypatch.setitem(sys.modules, 'app.tasks.similarity', SimpleNamespace(build_similarity_index_task=task))
+    index = make_index()
+    monkeypatch.setattr(index, 'build', MagicMock(side_effect=AssertionError('build en la petición')))
+
+    assert index.similar_to('person', 1) == []
+    assert index.ensure_built('person') is False
+    # Una sola programación mientras el candado siga tomado
+    task.delay.assert_called_once_with('person')
@@ -0,0 +1,120 @@
+# /home/pablo/app/tests/test_payroll/test_nine_box_batch.py
+"""
+Pruebas del cálculo masivo 9 boxes: las funciones vectorizadas reproducen las
+reglas por empleado de ``NineBoxService`` (niveles, box, riesgo y los scores
+por defecto cuando faltan métricas).
+"""
+
+from datetime import date
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.payroll.services.nine_box_batch import (
+    COUNT_COLUMNS, box_categories, retention_risks, score_frame, score_levels
+)
+
+TODAY = date(2026, 6, 1)
+
+
+def employee(**values):
+    row = {
+        'employee_id': values.pop('employee_id', 1),
+        'hire_date': date(2021, 6, 1),
+        'ats_candidate_id': None,
+        'has_ats': False,
+        'latest_rating': None,
+        'ats_score': np.nan,
+        **{column: np.nan for column in COUNT_COLUMNS},
+    }
+    row.update(values)
+    return row
+
+
+@pytest.mark.parametrize("performance, potential, expected", [
+    (80, 80, '1'), (95, 79.99, '2'), (80, 59.99, '3'),
+    (60, 80, '4'), (79.99, 60, '5'), (70, 10, '6'),
+    (59.99, 100, '7'), (0, 60, '8'), (59.99, 59.99, '9'),
+])
+def test_box_categories_follow_the_scalar_rule(performance, potential, expected):
+    assert box_categories([performance], [potential])[0] == expected
+
+
+def test_levels_and_retention_risk():
+    assert list(score_levels([80, 79.99, 60, 59.99])) == ['high', 'medium', 'medium', 'low']
+    risks = retention_risks(
+        potential=[90, 50, 90, 50],
+        tenure_years=[5, 5, 0.5, 0.5],
+        negative_feedback=[0, 0, 0, 1],
+        recent_shift_requests=[0, 0, 0, 4],
+    )
+    assert list(risks) == ['low', 'high', 'medium', 'critical']
+
+
+def test_score_frame_uses_evaluation_or_attendance_and_feedback():
+    frame = pd.DataFrame([
+        # Con evaluación completada: calificación 1-5 a escala 0-100
+        employee(employee_id=1, latest_rating=4, attendance_total=10, attendance_present=1),
+        # Sin evaluación: 90% asistencia y 50% de feedback resuelto en 3 días
+        employee(employee_id=2, attendance_total=10, attendance_present=9,
+                 feedback_resolved=4, feedback_quick=2),
+        # Sin ninguna métrica: scores por defecto
+        employee(employee_id=3),
+    ])
+
+    scored = score_frame(frame, TODAY).set_index('employee_id')
+
+    assert scored.loc[1, 'performance_score'] == 80
+    assert scored.loc[2, 'performance_score'] == 74        # 90 * 0.6 + 50 * 0.4
+    assert scored.loc[3, 'performance_score'] == 70
+
+
+def test_potential_only_weights_ats_for_linked_employees():
+    frame = pd.DataFrame([
+        # 5 años (50), 2 feedback resueltos (20), 1 solicitud (15), 1 cambio aprobado (20)
+        employee(employee_id=1, feedback_resolved=2, development_requests=1, approved_shift_changes=1),
+        # Igual, ligado al ATS sin evaluaciones: cuenta con 70
+        employee(employee_id=2, has_ats=True, ats_candidate_id='c2', feedback_resolved=2,
+                 development_requests=1, approved_shift_changes=1),
+        # Recién contratado, ligado al ATS con promedio 90
+        employee(employee_id=3, hire_date=date(2026, 3, 1), has_ats=True, ats_candidate_id='c3', ats_score=90),
+    ])
+
+    scored = score_frame(frame, TODAY).set_index('employee_id')
+
+    base = 50 * 0.2 + 20 * 0.2 + 15 * 0.15 + 20 * 0.15
+    assert scored.loc[1, 'potential_score'] == round(base / 0.7, 2)
+    assert scored.loc[2, 'potential_score'] == round((base + 70 * 0.3) / 1.0, 2)
+    assert scored.loc[3, 'retention_risk'] == 'high'           # potencial < 60 y menos de un año
+    assert scored.loc[1, 'box_category'] == '9'
+
+
+def test_score_frame_scales_to_a_large_company():
+    rng = np.random.default_rng(7)
+    size = 5000
+    frame = pd.DataFrame({
+        'employee_id': np.arange(size),
+        'hire_date': pd.to_datetime('2015-01-01') + pd.to_timedelta(rng.integers(0, 4000, size), unit='D'),
+        'ats_candidate_id': None,
+        'has_ats': rng.random(size) < 0.3,
+        'latest_rating': np.where(rng.random(size) < 0.5, rng.integers(1, 6, size), np.nan),
+        'ats_score': rng.uniform(20, 100, size),
+        'attendance_total': rng.integers(0, 60, size),
+        'attendance_present': rng.integers(0, 30, size),
+        'feedback_resolved': rng.integers(0, 5, size),
+        'feedback_quick': rng.integers(0, 3, size),
+        'negative_feedback': rng.integers(0, 2, size),
+        'development_requests': rng.integers(0, 4, size),
+        'approved_shift_changes': rng.integers(0, 4, size),
+        'recent_shift_requests': rng.integers(0, 6, size),
+    })
+
+    started = time.monotonic()
+    scored = score_frame(frame, TODAY)
+
+    assert time.monotonic() - started < 2
+    assert scored['box_category'].isin([str(box) for box in range(1, 10)]).all()
+    assert scored['performance_score'].between(0, 100).all()
+    assert scored['potential_score'].between(0, 100).all()
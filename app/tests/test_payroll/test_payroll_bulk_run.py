@@ -0,0 +1,167 @@
+# /home/pablo/app/tests/test_payroll/test_payroll_bulk_run.py
+"""
+Pruebas de la corrida masiva de nómina: la tabla ISR compilada reproduce la
+búsqueda renglón por renglón de ``PayrollEngine.calculate_isr``, la corrida
+guarda por lotes, se reanuda tras un fallo sin recalcular lo terminado y
+``recalculate`` reemplaza los cálculos existentes.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.payroll.services.payroll_bulk_run import BulkPayrollRun, TaxBracketTable
+from app.payroll.services.payroll_engine import ISR_TABLE_MANUAL_FALLBACK, ISR_TABLE_MONTHLY_2024, PayrollEngine
+
+
+def table_engine(table):
+    """Motor sin proveedor fiscal que usa ``table`` como tabla ISR."""
+    engine = PayrollEngine.__new__(PayrollEngine)
+    engine.provider_available = False
+    engine.tax_provider = object()
+    engine.get_tax_table = lambda *args, **kwargs: table
+    return engine
+
+
+INCOMES = [
+    '0', '0.01', '578.52', '578.525', '578.53', '4910.18', '4910.19', '9000', '10031.335',
+    '24222.31', '38177.70', '72887.505', '97183.33', '150000', '291550.00', '291550.01', '1000000',
+]
+
+
+@pytest.mark.parametrize("income", INCOMES)
+def test_compiled_isr_table_matches_row_by_row_lookup(income):
+    income = Decimal(income)
+    engine = table_engine(ISR_TABLE_MANUAL_FALLBACK)
+
+    assert TaxBracketTable(ISR_TABLE_MANUAL_FALLBACK).calculate(income) == engine.calculate_isr(income)
+
+
+@pytest.mark.parametrize("income", INCOMES)
+def test_compiled_isr_table_matches_engine_with_fractional_rates(income):
+    # Tasas en 0-1 (tabla 2024, filas de la base o del proveedor): no se dividen entre 100
+    income = Decimal(income)
+    engine = table_engine(ISR_TABLE_MONTHLY_2024)
+
+    assert TaxBracketTable(ISR_TABLE_MONTHLY_2024).calculate(income) == engine.calculate_isr(income)
+
+
+def test_compiled_isr_table_handles_gaps_and_unsorted_rows():
+    rows = [
+        {'limite_inferior': 1000, 'limite_superior': 5000, 'cuota_fija': 20, 'porcentaje': 10},
+        {'limite_inferior': 0, 'limite_superior': 999.99, 'cuota_fija': 0, 'porcentaje': 2},
+        {'limite_inferior': 6000, 'limite_superior': 10000, 'cuota_fija': 420, 'porcentaje': 20},
+    ]
+    table = TaxBracketTable(rows)
+    engine = table_engine(rows)
+
+    for income in ('500', '999.995', '1000', '5000', '5500', '6000', '10000', '10000.01'):
+        assert table.calculate(Decimal(income)) == engine.calculate_isr(Decimal(income)), income
+    # Entre renglones y por encima de la tabla no hay ISR
+    assert table.calculate(Decimal('5500')) == Decimal('0')
+    assert table.calculate(Decimal('10000.01')) == Decimal('0')
+
+
+@pytest.fixture
+def payroll(db):
+    from app.models import BusinessUnit
+    from app.payroll.models import PayrollCompany, PayrollEmployee, PayrollPeriod
+
+    company = PayrollCompany.objects.create(
+        name='Acme', business_unit=BusinessUnit.objects.create(name='huntRED'),
+        whatsapp_webhook_token='acme-token', whatsapp_phone_number='5215512345678',
+        whatsapp_business_name='Acme', country_code='MX', price_per_employee=Decimal('10'),
+    )
+    for number in range(7):
+        PayrollEmployee.objects.create(
+            company=company, employee_number=f"E{number:03d}", first_name='Empleado', last_name=str(number),
+            email=f"e{number}@acme.mx", hire_date=date(2024, 1, 1), job_title='Analista',
+            department='Operaciones', monthly_salary=Decimal('20000') + number * 1000,
+        )
+    period = PayrollPeriod.objects.create(
+        company=company, period_name='Enero', start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+        frequency='monthly',
+    )
+    engine = PayrollEngine.__new__(PayrollEngine)
+    engine.company = company
+    engine.country_code = 'MX'
+    engine.country_config = {}
+    engine.tax_provider = object()
+    engine.provider_available = False
+    return engine, period
+
+
+def test_bulk_run_saves_every_employee_in_chunks(payroll):
+    engine, period = payroll
+
+    summary = BulkPayrollRun(engine, period, chunk_size=3).run()
+
+    assert summary['chunks_in_run'] == 3
+    assert summary['processed_in_run'] == summary['total_employees'] == 7
+    period.refresh_from_db()
+    assert period.status == 'calculated'
+    assert period.total_gross == sum(Decimal('20000') + n * 1000 for n in range(7))
+
+
+def test_bulk_run_resumes_after_a_failed_chunk(payroll, monkeypatch):
+    engine, period = payroll
+    process_chunk = BulkPayrollRun._process_chunk
+    calls = []
+
+    def failing_second_chunk(self, employees, rates, overtime):
+        calls.append([employee.id for employee in employees])
+        if len(calls) == 2:
+            raise RuntimeError('worker perdido')
+        return process_chunk(self, employees, rates, overtime)
+
+    monkeypatch.setattr(BulkPayrollRun, '_process_chunk', failing_second_chunk)
+    with pytest.raises(RuntimeError):
+        BulkPayrollRun(engine, period, chunk_size=3).run()
+    assert period.calculations.count() == 3
+    first_chunk = set(period.calculations.values_list('id', flat=True))
+
+    monkeypatch.setattr(BulkPayrollRun, '_process_chunk', process_chunk)
+    # El candado se liberó y la reanudación sólo calcula a los pendientes
+    summary = BulkPayrollRun(engine, period, chunk_size=3).run()
+
+    assert summary['processed_in_run'] == 4
+    assert summary['total_employees'] == 7
+    assert first_chunk <= set(period.calculations.values_list('id', flat=True))
+
+
+def test_recalculate_replaces_existing_calculations(payroll):
+    engine, period = payroll
+    engine.calculate_period_payroll(period, bulk=True, chunk_size=3)
+    employee = engine.company.employees.order_by('employee_number').first()
+    employee.monthly_salary = Decimal('50000')
+    employee.save()
+
+    # Sin recalculate se conserva el cálculo anterior
+    summary = engine.calculate_period_payroll(period, bulk=True, chunk_size=3)
+    assert summary['processed_in_run'] == 0
+    assert period.calculations.get(employee=employee).base_salary == Decimal('20000')
+
+    summary = engine.calculate_period_payroll(period, bulk=True, chunk_size=3, recalculate=True)
+    assert summary['processed_in_run'] == 7 and summary['total_employees'] == 7
+    assert period.calculations.get(employee=employee).base_salary == Decimal('50000')
+
+
+def test_recalculate_ignores_newer_calculations_from_other_periods(payroll):
+    from django.utils import timezone
+    from app.payroll.models import PayrollCalculation, PayrollPeriod
+
+    engine, period = payroll
+    BulkPayrollRun(engine, period, chunk_size=3).run()
+    since = timezone.now()
+    PayrollCalculation.objects.filter(period=period).update(calculation_date=since - timedelta(days=30))
+    february = PayrollPeriod.objects.create(
+        company=engine.company, period_name='Febrero', start_date=date(2026, 2, 1), end_date=date(2026, 2, 28),
+        frequency='monthly',
+    )
+    BulkPayrollRun(engine, february, chunk_size=3).run()
+
+    # Cálculo viejo en enero y uno nuevo en febrero: enero sigue pendiente de recálculo
+    summary = BulkPayrollRun(engine, period, chunk_size=3, recalculate_since=since).run()
+
+    assert summary['processed_in_run'] == 7 and summary['total_employees'] == 7
@@ -0,0 +1,132 @@
+# /home/pablo/app/tests/test_utils/test_dedup.py
+"""
+Pruebas del motor de deduplicación: claves de bloqueo, agrupación difusa
+dentro de bloques, fusión con la semántica de merge_candidate_data y
+reasignación de las filas relacionadas antes de borrar duplicados.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.ats.utils.dedup import (
+    Clusters, DedupEngine, blocking_keys, full_name, link_blocks, merge_candidate_data, name_key,
+    normalize_email, normalize_phone, phonetic_key,
+)
+
+
+def test_blocking_keys_are_normalized():
+    keys = blocking_keys('José Luis', 'Gutiérrez', ' J.Gutierrez+cv@GMail.com ', '(55) 1234-5678',
+                         'Grupo Industrial, S.A. de C.V.')
+
+    assert keys == {
+        'dedup_email': 'jgutierrez@gmail.com',
+        'dedup_phone': '+525512345678',
+        'dedup_name_key': name_key('Jose', 'Gutierres'),
+        'dedup_company': 'grupoindustrial',
+    }
+    assert normalize_phone('+52 1 55 1234 5678') == '+525512345678'
+    assert normalize_phone('placeholder-123') == ''
+    assert normalize_email('sin-arroba') == ''
+
+
+def test_phonetic_key_groups_spelling_variants():
+    assert phonetic_key('Hernández') == phonetic_key('Ernandez')
+    assert phonetic_key('Vázquez') == phonetic_key('Basques')
+    assert phonetic_key('Cecilia') == phonetic_key('Sesilia')
+    assert phonetic_key('Guillermo') == phonetic_key('Guiyermo')
+    assert phonetic_key('Pérez') != phonetic_key('Ramírez')
+    # Nombre completo en un solo campo: se toma el apellido paterno
+    assert name_key('Juan Carlos Pérez García') == name_key('Juan', 'Perez')
+
+
+def test_blocks_link_exact_keys_and_similar_names():
+    clusters = Clusters()
+    emails = [(3, 'a@x.com', ''), (7, 'a@x.com', ''), (9, 'b@x.com', '')]
+    names = [
+        (1, ('hernandes', 'acme'), full_name('María', 'Hernández')),
+        (4, ('hernandes', 'acme'), full_name('Maria', 'Hernandes')),
+        (5, ('hernandes', 'acme'), full_name('Mario', 'Hernández Ortiz')),
+        (7, ('hernandes', 'acme'), full_name('María', 'Hernández')),
+    ]
+
+    link_blocks(emails, clusters)
+    link_blocks(names, clusters, threshold=0.88)
+
+    assert clusters.groups() == [[1, 3, 4, 7]]
+
+
+def test_shared_phone_requires_similar_names():
+    clusters = Clusters()
+    rows = [
+        (1, '+525512345678', 'ana lopez'),
+        (2, '+525512345678', 'pedro lopez'),
+        (3, '+525512345678', 'ana lopes'),
+        (4, '+525512345678', ''),
+    ]
+
+    link_blocks(rows, clusters, threshold=0.6, allow_missing_names=True)
+
+    assert clusters.groups() == [[1, 3, 4]]
+
+
+def test_large_blocks_only_merge_identical_names():
+    clusters = Clusters()
+    rows = [(person_id, 'juan perez', 'juan perez' if person_id % 2 else 'juana perez')
+            for person_id in range(1, 11)]
+
+    link_blocks(rows, clusters, threshold=0.8, max_block_size=5)
+
+    assert clusters.groups() == [[1, 3, 5, 7, 9], [2, 4, 6, 8, 10]]
+
+
+def test_merge_fills_empty_fields_and_unions_lists():
+    existing = SimpleNamespace(nombre='Ana', apellido_paterno='', email=None, phone='+525512345678',
+                               metadata={'skills': ['python', {'name': 'sql'}], 'last_company': ''})
+    merge_candidate_data(existing, {
+        'apellido_paterno': 'López', 'email': 'ana@x.com', 'phone': '+520000000000',
+        'metadata': {'skills': [{'name': 'sql'}, 'django'], 'last_company': 'Acme'},
+    })
+
+    assert (existing.apellido_paterno, existing.email, existing.phone) == ('López', 'ana@x.com', '+525512345678')
+    assert existing.metadata == {'skills': ['python', {'name': 'sql'}, 'django'], 'last_company': 'Acme'}
+
+
+@pytest.mark.django_db
+def test_name_only_match_requires_the_same_company():
+    from app.models import Person
+
+    existing = Person.objects.create(nombre='Juan', apellido_paterno='Pérez',
+                                     metadata={'last_company': 'Acme S.A. de C.V.'})
+    engine = DedupEngine()
+
+    # Homónimo sin empresa, correo ni teléfono en común: no es la misma persona
+    assert engine.match('Juan', 'Perez') is None
+    assert engine.match('Juan', 'Perez', company='Otra Empresa') is None
+    found = engine.match('Juan', 'Perez', company='ACME')
+    assert found is not None and (found.person_id, found.reason) == (existing.id, 'name')
+
+
+@pytest.mark.django_db
+def test_merge_repoints_related_rows_to_the_survivor():
+    from app.models import BusinessUnit, Manager, Person, Team, TeamMember
+
+    survivor = Person.objects.create(nombre='Ana', apellido_paterno='López', email='ana@x.com')
+    duplicate = Person.objects.create(nombre='Ana', apellido_paterno='Lopez', email='ana@x.com')
+    business_unit = BusinessUnit.objects.create(name='huntRED')
+    membership = TeamMember.objects.create(team=Team.objects.create(name='Datos', business_unit=business_unit),
+                                           person=duplicate, role='Analista')
+    # Vínculos que el sobreviviente ya tiene: se quedan con el duplicado y se borran
+    Manager.objects.create(person=survivor, title='Gerente', department='Ventas')
+    Manager.objects.create(person=duplicate, title='Gerente', department='Ventas')
+    lead = Manager.objects.create(person=Person.objects.create(nombre='Líder'), title='Directora', department='Ventas')
+    lead.direct_reports.add(survivor, duplicate)
+
+    removed = DedupEngine().merge_groups([[survivor.id, duplicate.id]])
+
+    assert removed == [duplicate.id]
+    assert not Person.objects.filter(id=duplicate.id).exists()
+    membership.refresh_from_db()
+    assert membership.person_id == survivor.id
+    assert Manager.objects.filter(person=survivor).count() == 1
+    assert list(lead.direct_reports.values_list('id', flat=True)) == [survivor.id]
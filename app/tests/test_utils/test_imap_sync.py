@@ -0,0 +1,220 @@
+# /home/pablo/app/tests/test_utils/test_imap_sync.py
+"""
+Pruebas de la sincronización incremental IMAP del scraper de correos: sólo
+se piden encabezados de UID nuevos, los cuerpos sólo de lo que pasa el filtro
+y la marca se reinicia si cambia el UIDVALIDITY. También el recorrido
+completo de ``process_emails_advanced`` (la tarea programada) con un
+servidor falso.
+"""
+
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.ats.utils.scraping.imap_sync import (
+    MailboxConfig, MailboxState, MailboxSync, parse_fetch, sync_mailboxes, uid_ranges
+)
+
+
+class MemoryStore:
+    def __init__(self):
+        self.states = {}
+
+    def load(self, mailbox):
+        state = self.states.get(mailbox.key)
+        return MailboxState(**vars(state)) if state else MailboxState()
+
+    def save(self, mailbox, state):
+        self.states[mailbox.key] = MailboxState(**vars(state))
+
+
+class FakeImap:
+    """Servidor IMAP mínimo: SELECT y UID FETCH/MOVE sobre un dict uid -> mensaje."""
+
+    def __init__(self, messages, uidvalidity=1):
+        self.messages = dict(messages)
+        self.uidvalidity = uidvalidity
+        self.commands = []
+        self.moved = []
+
+    async def select(self, folder):
+        uidnext = max(self.messages, default=0) + 1
+        return 'OK', [b'FLAGS (\\Seen)', f'OK [UIDVALIDITY {self.uidvalidity}]'.encode(),
+                      f'OK [UIDNEXT {uidnext}]'.encode(), b'SELECT completed']
+
+    def _uids(self, spec):
+        if ':' in spec:
+            first, last = (int(part) for part in spec.split(':'))
+            selected = [uid for uid in sorted(self.messages) if first <= uid <= last]
+            # Como los servidores reales: "N:M" fuera de rango devuelve el último mensaje
+            return selected or sorted(self.messages)[-1:]
+        return [int(uid) for uid in spec.split(',') if int(uid) in self.messages]
+
+    async def uid(self, command, *args):
+        self.commands.append((command, *args))
+        if command == 'move':
+            self.moved.append((int(args[0]), args[1]))
+            return 'OK', [b'MOVE completed']
+        spec, items = args
+        lines = []
+        for seq, uid in enumerate(self._uids(spec), start=1):
+            raw = self.messages[uid]
+            literal = raw.split(b'\r\n\r\n', 1)[0] + b'\r\n\r\n' if 'HEADER' in items else raw
+            lines += [f'{seq} FETCH (UID {uid} RFC822.SIZE {len(raw)} BODY[] {{{len(literal)}}}'.encode(),
+                      bytearray(literal), b')']
+        return 'OK', lines + [b'FETCH completed']
+
+    def has_capability(self, name):
+        return name == 'MOVE'
+
+    async def close(self):
+        pass
+
+    async def logout(self):
+        pass
+
+
+def message(subject, sender='rh@empresa.com', body='Vacante de analista con requisitos y experiencia'):
+    return f"From: {sender}\r\nSubject: {subject}\r\n\r\n{body}".encode()
+
+
+def run_sync(server, store, **options):
+    delivered = []
+
+    async def handler(sync, uid, email_message):
+        delivered.append((uid, email_message['Subject']))
+
+    async def connect(mailbox):
+        return server
+
+    sync = MailboxSync(MailboxConfig('imap.test', 'jobs@test', 'x'), store=store, connect=connect, **options)
+    result = asyncio.run(sync.run(handler))
+    return result, delivered
+
+
+def fetched_bodies(server):
+    return [args[0] for command, *args in server.commands if command == 'fetch' and args[1] == '(UID BODY.PEEK[])']
+
+
+def test_parse_fetch_reads_uid_before_or_after_the_literal():
+    lines = [b'1 FETCH (UID 7 BODY[] {5}', bytearray(b'hello'), b')',
+             b'2 FETCH (BODY[] {3}', bytearray(b'bye'), b' UID 9 RFC822.SIZE 40)', b'FETCH completed']
+
+    assert parse_fetch(lines) == [(7, 5, b'hello'), (9, 40, b'bye')]
+    assert uid_ranges(1, 1100, 500) == [(1, 500), (501, 1000), (1001, 1100)]
+
+
+def test_incremental_runs_only_fetch_new_mail():
+    server = FakeImap({uid: message(f"Vacante {uid}") for uid in range(1, 301)})
+    store = MemoryStore()
+
+    first, delivered = run_sync(server, store, initial_backfill=50, header_batch=20)
+    assert first.last_uid == 300 and len(delivered) == 50 and delivered[0][0] == 251
+
+    # Nada nuevo: ni encabezados ni cuerpos
+    server.commands.clear()
+    second, delivered = run_sync(server, store)
+    assert delivered == [] and server.commands == []
+
+    # Dos mensajes nuevos: un solo FETCH de encabezados y uno de cuerpos
+    server.messages[301] = message("Vacante gerente")
+    server.messages[302] = message("Newsletter semanal de marketing")
+    third, delivered = run_sync(server, store, excluded_patterns=[r'\b(newsletter|marketing)\b'])
+    assert delivered == [(301, 'Vacante gerente')]
+    assert third.skipped == {'patron_excluido': 1}
+    assert fetched_bodies(server)[-1] == '301'
+    assert store.states[('imap.test', 'jobs@test', 'INBOX')].last_uid == 302
+
+
+def test_header_filter_only_skips_what_full_validation_would():
+    attachment = 'x' * (6 * 1024 * 1024)
+    server = FakeImap({
+        1: message("Vacante con anexos", body=f"Vacante de analista con requisitos\r\n{attachment}"),
+        2: b"From: rh@empresa.com\r\nAuto-Submitted: auto-generated\r\nSubject: Vacante publicada\r\n\r\nVacante",
+        3: message(""),
+    })
+
+    result, delivered = run_sync(server, MemoryStore())
+
+    assert [uid for uid, _ in delivered] == [1, 2]
+    assert result.skipped == {'sin_asunto': 1}
+
+
+def test_max_messages_leaves_the_rest_for_the_next_run():
+    server = FakeImap({uid: message(f"Vacante {uid}") for uid in range(1, 11)})
+    store = MemoryStore()
+
+    first, delivered = run_sync(server, store, max_messages=4)
+    assert [uid for uid, _ in delivered] == [1, 2, 3, 4] and first.last_uid == 4
+
+    second, delivered = run_sync(server, store, max_messages=10)
+    assert [uid for uid, _ in delivered] == [5, 6, 7, 8, 9, 10]
+
+
+def test_uidvalidity_change_resets_the_mark():
+    server = FakeImap({uid: message(f"Vacante {uid}") for uid in range(1, 6)})
+    store = MemoryStore()
+    run_sync(server, store)
+
+    # El servidor renumeró el buzón
+    server.uidvalidity = 2
+    server.messages = {uid: message(f"Vacante nueva {uid}") for uid in range(1, 4)}
+    result, delivered = run_sync(server, store)
+
+    assert result.reset and len(delivered) == 3
+    assert store.states[('imap.test', 'jobs@test', 'INBOX')].uidvalidity == 2
+
+
+def test_several_folders_sync_concurrently():
+    servers = {folder: FakeImap({1: message(f"Vacante {folder}")}) for folder in ('INBOX', 'INBOX.Jobs')}
+    store, delivered = MemoryStore(), []
+
+    async def handler(sync, uid, email_message):
+        await sync.move(uid, 'INBOX.Parsed')
+        delivered.append(email_message['Subject'])
+
+    async def connect(mailbox):
+        return servers[mailbox.folder]
+
+    mailboxes = [MailboxConfig('imap.test', 'jobs@test', 'x', folder) for folder in servers]
+    results = asyncio.run(sync_mailboxes(mailboxes, handler, store=store, connect=connect))
+
+    assert sorted(delivered) == ['Vacante INBOX', 'Vacante INBOX.Jobs']
+    assert all(result.error is None for result in results)
+    assert all(server.moved == [(1, 'INBOX.Parsed')] for server in servers.values())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_scheduled_processing_runs_the_incremental_sync(monkeypatch):
+    from app.ats.utils.scraping import email_scraper
+    from app.models import BusinessUnit
+
+    BusinessUnit.objects.create(name='huntRED')
+    job_body = ('Vacante de analista financiero. Requisitos: experiencia de 3 años. '
+                'Salario competitivo; buscamos candidato en Ciudad de México.')
+    server = FakeImap({
+        1: message("Vacante analista financiero", body=job_body),
+        2: message("Newsletter semanal de marketing", body=job_body),
+    })
+    saved = []
+
+    async def extract(email_message):
+        return {'titulo': email_message['Subject']}
+
+    async def save(job_info, bu):
+        saved.append((job_info['titulo'], bu.name))
+        return SimpleNamespace(id=len(saved), responsible_email=None)
+
+    async def connect(mailbox):
+        return server
+
+    monkeypatch.setattr(email_scraper, 'extract_job_info_advanced', extract)
+    monkeypatch.setattr(email_scraper, 'save_to_vacante', save)
+    store = MemoryStore()
+    asyncio.run(email_scraper.process_emails_advanced(business_unit_name='huntRED', store=store, connect=connect))
+
+    assert saved == [('Vacante analista financiero', 'huntRED')]
+    assert server.moved == [(1, 'INBOX.Parsed')]
+    assert store.states[(email_scraper.IMAP_SERVER, email_scraper.EMAIL_ACCOUNT, 'INBOX')].last_uid == 2
@@ -0,0 +1,79 @@
+# /home/pablo/app/tests/test_utils/test_skill_dictionary.py
+"""
+Pruebas del diccionario compilado de habilidades (Aho-Corasick).
+"""
+
+import re
+
+import pytest
+
+from app.ats.utils.skills import skill_dictionary
+from app.ats.utils.skills.skill_dictionary import SkillDictionary, get_skill_dictionary
+
+
+@pytest.fixture(scope="module")
+def dictionary():
+    return SkillDictionary.build("huntred", include_catalogs=False)
+
+
+def test_extract_word_boundaries_and_longest_match(dictionary):
+    text = "Pythonista con C++, Machine Learning y CI/CD; no goal ni going."
+    matches = dictionary.extract(text)
+
+    assert [match.skill_id for match in matches] == ["python", "c++", "machine_learning", "ci_cd"]
+    # Los offsets apuntan al texto original
+    assert [match.text for match in matches] == ["Pythonista", "C++", "Machine Learning", "CI/CD"]
+
+
+def test_synonyms_and_accents_map_to_canonical_ids(dictionary):
+    found = dictionary.by_category("Liderazgo, comunicacion efectiva y gestión de equipos")
+
+    assert found["soft"] == ["leadership", "communication"]
+    assert dictionary.canonicalize(["Python Developer", "LIDERAZGO", "cobol"]) == ["python", "leadership", "cobol"]
+
+
+def test_matches_equal_regex_scan(dictionary):
+    text = "Experiencia en docker, kubernetes y aws; testing de apis en la nube (cloud)."
+    expected = set()
+    for surface in dictionary.surfaces:
+        for match in re.finditer(r"(?<!\w)" + re.escape(surface) + r"(?!\w)", text.lower()):
+            expected.add((match.start(), match.end()))
+
+    assert {(match.start, match.end) for match in dictionary.extract(text)} == expected
+
+
+def test_compiled_dictionary_is_shared_through_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_dictionary, "_compiled_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(skill_dictionary, "FILE_PATHS", {})
+    monkeypatch.setattr(skill_dictionary, "_dictionaries", {})
+
+    built = get_skill_dictionary("amigro")
+    assert len(list(tmp_path.glob("skills_amigro_*.pkl"))) == 1
+
+    # Otro proceso: caché en memoria vacía, carga el archivo en lugar de reconstruir
+    monkeypatch.setattr(skill_dictionary, "_dictionaries", {})
+    monkeypatch.setattr(SkillDictionary, "build", classmethod(lambda cls, *a, **k: pytest.fail("no debe reconstruir")))
+    loaded = get_skill_dictionary("amigro")
+
+    assert loaded.fingerprint == built.fingerprint
+    assert loaded.extract_ids("Experiencia en migración y adaptabilidad") == ["migracion", "adaptabilidad"]
+
+
+def test_source_fingerprint_is_checked_at_most_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_dictionary, "_compiled_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(skill_dictionary, "FILE_PATHS", {})
+    monkeypatch.setattr(skill_dictionary, "_dictionaries", {})
+    monkeypatch.setattr(skill_dictionary, "_checked_at", {})
+    fingerprint = skill_dictionary.source_fingerprint
+    calls = []
+    monkeypatch.setattr(skill_dictionary, "source_fingerprint",
+                        lambda *args, **kwargs: calls.append(args) or fingerprint(*args, **kwargs))
+
+    first = get_skill_dictionary("amigro")
+    calls.clear()
+    assert get_skill_dictionary("amigro") is first
+    assert calls == []
+
+    skill_dictionary.invalidate_skill_dictionaries()
+    assert get_skill_dictionary("amigro") is first
+    assert calls == [("amigro",)]
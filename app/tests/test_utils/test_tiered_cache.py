@@ -0,0 +1,88 @@
+# /home/pablo/app/tests/test_utils/test_tiered_cache.py
+"""
+Pruebas de la caché de dos niveles (L1 en proceso + Redis) con el sustituto
+local ``InMemoryRedis``.
+"""
+
+import asyncio
+
+import numpy as np
+
+from app.ats.utils.tiered_cache import InMemoryRedis, LocalLRUCache, TieredCache, make_key
+
+
+def make_processes(count=2):
+    broker = InMemoryRedis()
+    return broker, [TieredCache(redis_client=broker, l1_ttl=60) for _ in range(count)]
+
+
+def _key(func, *args):
+    return make_key(func.__wrapped__, args, {})
+
+
+def test_l1_serves_hits_and_l2_is_shared():
+    _, (web, worker) = make_processes()
+    calls = []
+
+    @web.cached('dashboard', ttl=120)
+    def stats(bu_id):
+        calls.append(bu_id)
+        return {'bu': bu_id, 'vacantes': 3}
+
+    assert stats(4) == stats(4) == {'bu': 4, 'vacantes': 3}
+    assert calls == [4]
+    assert web.stats()['dashboard']['l1_hits'] == 1
+
+    # Otro proceso lo encuentra en L2 y lo sube a su L1
+    assert worker.namespace('dashboard').get(_key(stats, 4)) == {'bu': 4, 'vacantes': 3}
+    assert worker.stats()['dashboard']['l2_hits'] == 1
+
+
+def test_invalidation_reaches_other_processes_l1():
+    _, (web, worker) = make_processes()
+    web.namespace('scores').set('p1', [1, 2])
+    assert worker.namespace('scores').get('p1') == [1, 2]
+
+    web.namespace('scores').delete('p1')
+    assert worker.namespace('scores').get_local('p1') is None
+    assert worker.namespace('scores').get('p1') is None
+    assert worker.stats()['scores']['remote_invalidations'] == 1
+
+    web.namespace('scores').set('p2', 1)
+    worker.namespace('scores').get('p2')
+    web.namespace('scores').clear()
+    assert worker.namespace('scores').get('p2') is None
+
+
+def test_async_decorator_and_numpy_serializer():
+    _, (web, worker) = make_processes()
+    calls = []
+
+    @web.cached('vectors', ttl=60, serializer='numpy')
+    async def vector(person_id):
+        calls.append(person_id)
+        return {'id': person_id, 'v': np.arange(4, dtype=np.float32)}
+
+    async def run():
+        return await vector(7), await vector(7)
+
+    first, second = asyncio.run(run())
+    assert calls == [7]
+    np.testing.assert_array_equal(first['v'], second['v'])
+
+    remote = worker.namespace('vectors', serializer='numpy').get(_key(vector, 7))
+    assert remote['v'].dtype == np.float32
+    np.testing.assert_array_equal(remote['v'], np.arange(4))
+
+
+def test_l1_evicts_by_size_and_ttl():
+    now = [0.0]
+    l1 = LocalLRUCache(max_size=2, ttl=10, clock=lambda: now[0])
+    l1.set('a', 1)
+    l1.set('b', 2)
+    l1.get('a')
+    l1.set('c', 3)
+    assert 'b' not in l1 and l1.get('a') == 1
+
+    now[0] = 11
+    assert l1.get('a') is None
@@ -0,0 +1,91 @@
+"""
+Tests unitarios para el matcher compilado de intents
+Ubicación: /app/tests/unit/chatbot/test_intent_matcher.py
+Responsabilidad: Verificar la prioridad y el ranking del matcher por BU
+"""
+
+import asyncio
+
+from app.ats.chatbot.nlp.intent_matcher import (
+    CompiledIntentMatcher, IntentMatcherRegistry, build_rules,
+    PROFILE_CHATBOT, PROFILE_NLP
+)
+
+
+def _matcher(bu_key, profile=PROFILE_CHATBOT, rows=()):
+    return CompiledIntentMatcher(build_rules(bu_key, profile, rows))
+
+
+def test_bu_keywords_take_priority_over_general():
+    """Las palabras clave de la BU se evalúan antes que las generales"""
+    matcher = _matcher('amigro')
+    assert matcher.best('Necesito una visa de trabajo').intent == 'job_search'
+    assert matcher.best('Tengo dudas sobre mi visa').intent == 'migration_info'
+
+
+def test_keywords_match_word_prefixes_only():
+    """Las palabras clave aceptan derivados pero no subcadenas internas"""
+    matcher = _matcher('huntred')
+    assert matcher.best('Tienen vacantes abiertas?').intent == 'job_search'
+    assert matcher.best('mi hijo busca algo') is None
+
+
+def test_ranked_result_lists_every_intent():
+    """El resultado incluye todos los intents detectados en orden de prioridad"""
+    matches = _matcher('huntred').match('Hola, quiero agendar una entrevista')
+    assert [m.intent for m in matches] == ['greeting', 'interview_scheduling']
+    assert matches[1].hits == 2
+
+
+def test_nlp_profile_expands_regex_alternations():
+    """Los patrones \\b(a|b)\\s+(c|d)\\b se indexan como frases"""
+    matcher = _matcher('default', PROFILE_NLP)
+    result = matcher.best('Quiero actualizar perfil')
+    assert result.intent == 'profile_update'
+    assert matcher._regex is None
+
+
+def test_intent_pattern_rows_are_merged():
+    """Las filas de IntentPattern se integran entre las reglas de la BU y las generales"""
+    rows = [('baja', ['quiero renunciar', r'\bbaja\s+de\s+\w+'])]
+    matcher = _matcher('huntred', rows=rows)
+    assert matcher.best('Quiero renunciar hoy').intent == 'baja'
+    assert matcher.best('solicito la baja de nomina').intent == 'baja'
+    assert matcher.best('hola, quiero renunciar').intent == 'greeting'
+
+
+def test_registry_rebuilds_after_invalidate():
+    """El registro vuelve a cargar los patrones tras invalidarse"""
+    rows = [[('custom', ['alpha'])]]
+    registry = IntentMatcherRegistry(rows_loader=lambda: rows[0])
+    assert registry.get('huntred').best('alpha').intent == 'custom'
+    rows[0] = [('other', ['alpha'])]
+    assert registry.get('huntred').best('alpha').intent == 'custom'
+    registry.invalidate()
+    assert registry.get('huntred').best('alpha').intent == 'other'
+
+
+class _InvalidatedOnRead(dict):
+    """Simula un invalidate() de otro hilo justo antes de leer el matcher"""
+
+    def __contains__(self, key):
+        found = super().__contains__(key)
+        self.clear()
+        return found
+
+    def get(self, key, default=None):
+        if not getattr(self, 'raced', False):
+            self.raced = True
+            self.clear()
+        return super().get(key, default)
+
+
+def test_aget_survives_a_concurrent_invalidate():
+    """aget recompila en vez de fallar si el dict se vacía entre la verificación y la lectura"""
+    registry = IntentMatcherRegistry(rows_loader=lambda: [('custom', ['alpha'])])
+    registry.get('huntred')
+    registry._matchers = _InvalidatedOnRead(registry._matchers)
+
+    matcher = asyncio.run(registry.aget('huntred'))
+
+    assert matcher.best('alpha').intent == 'custom'
@@ -0,0 +1,126 @@
+"""
+Unit tests for the bulk notification fan-out pipeline.
+
+The channel senders and the batch logger of NotificationService are mocked;
+the tests cover channel partitioning and checkpoint-based resume.
+"""
+import pytest
+from unittest.mock import PropertyMock, patch
+from django.core.cache import cache
+
+from app.ats.utils.notification_service import NotificationService
+from app.ats.utils.tiered_cache import InMemoryRedis, TieredCache
+from app.tasks.notifications.fanout import BulkCheckpoint, BulkNotificationFanout, RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    # Sin Redis el avance se guarda en la caché de Django
+    with patch.object(TieredCache, 'redis', new_callable=PropertyMock, return_value=None):
+        yield
+    cache.clear()
+
+
+def make_fanout(**kwargs):
+    return BulkNotificationFanout(subject="Nueva vacante", message="Hola", task_id="bulk-test", **kwargs)
+
+
+@patch.object(NotificationService, '_log_notification_batch', return_value=0)
+@patch.object(NotificationService, '_send_via_channel', return_value={'success': True})
+def test_partitions_recipients_by_channel(mock_send, mock_log):
+    recipients = ['ana@example.com', {'phone': '+525512345678', 'channel': 'whatsapp'}]
+
+    result = make_fanout(channel='email').run(recipients)
+
+    channels = sorted(call.args[0] for call in mock_send.call_args_list)
+    assert channels == ['email', 'whatsapp']
+    assert result['success_count'] == 2
+    assert result['by_channel']['whatsapp']['success'] == 1
+    # Un solo insert por lote
+    assert mock_log.call_count == 1
+
+
+@patch.object(NotificationService, '_log_notification_batch', return_value=0)
+def test_retry_resumes_from_checkpoint(mock_log):
+    recipients = ['ana@example.com', 'luis@example.com', 'sin-email']
+    attempts = []
+
+    def send(channel, recipient, *args):
+        attempts.append(recipient.get('email'))
+        if recipient.get('email') == 'luis@example.com' and attempts.count('luis@example.com') == 1:
+            return {'success': False, 'error': 'Error sending email: timeout'}
+        if not recipient.get('email'):
+            return {'success': False, 'error': 'No email address for recipient'}
+        return {'success': True}
+
+    with patch.object(NotificationService, '_send_via_channel', side_effect=send):
+        first = make_fanout(channel='email').run(recipients)
+        attempts.clear()
+        second = make_fanout(channel='email').run(recipients)
+
+    assert first['failure_count'] == 1
+    assert first['skipped_count'] == 1
+    # Sólo se reenvía la entrega que falló
+    assert attempts == ['luis@example.com']
+    assert second['resumed_count'] == 2
+    assert second['failure_count'] == 0
+
+
+def test_rate_limiter_waits_for_tokens():
+    now = [0.0]
+    limiter = RateLimiter(rate=2, clock=lambda: now[0])
+    limiter.acquire()
+    limiter.acquire()
+    with patch('app.tasks.notifications.fanout.time.sleep', side_effect=lambda s: now.__setitem__(0, now[0] + s)) as sleep:
+        limiter.acquire()
+    assert sleep.call_count == 1
+    assert now[0] == pytest.approx(0.5)
+
+
+@patch.object(NotificationService, '_log_notification_batch', return_value=0)
+@patch.object(NotificationService, '_send_via_channel', return_value={'success': True})
+def test_checkpoint_is_stored_incrementally_in_a_redis_set(mock_send, mock_log):
+    redis = InMemoryRedis()
+    recipients = ['ana@example.com', 'luis@example.com', 'eva@example.com']
+    fanout = make_fanout(channel='email', batch_size=2, redis_client=redis)
+
+    with patch.object(BulkCheckpoint, 'clear'):
+        fanout.run(recipients)
+    keys = list(redis.scan_iter('bulk_notifications:bulk-test:*'))
+    assert len(keys) == 1
+    assert redis.smembers(keys[0]) == {b'0:email', b'1:email', b'2:email'}
+
+    mock_send.reset_mock()
+    second = make_fanout(channel='email', batch_size=2, redis_client=redis).run(recipients)
+    assert second['resumed_count'] == 3
+    assert mock_send.call_count == 0
+
+
+def test_checkpoint_without_redis_appends_one_cache_key_per_batch():
+    checkpoint = BulkCheckpoint('bulk-test', {'recipients': []})
+    checkpoint.mark(['0:email', '1:email'])
+    checkpoint.mark(['2:email'])
+
+    assert cache.get(f"{checkpoint.key}:batches") == 2
+    assert BulkCheckpoint('bulk-test', {'recipients': []}).done == {'0:email', '1:email', '2:email'}
+    checkpoint.clear()
+    assert BulkCheckpoint('bulk-test', {'recipients': []}).done == set()
+
+
+@pytest.mark.django_db
+def test_rehydrate_coerces_string_ids_and_skips_unknown_types():
+    from app.models import Person
+
+    person = Person.objects.create(nombre='Ana')
+    fanout = make_fanout(channel='email')
+
+    resolved = fanout.rehydrate([
+        (0, {'type': 'person', 'id': str(person.pk)}),
+        (1, {'type': 'modelo_inexistente', 'id': 1}),
+        (2, {'type': 'person', 'id': 'no-es-un-id'}),
+    ])
+
+    assert resolved[0] == person
+    assert resolved[1] is None
+    assert resolved[2] is None
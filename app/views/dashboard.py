@@ -150,7 +150,7 @@ def interview_slots_dashboard(request):
             filters['description__icontains'] = f'business_unit_{business_unit.id}'
         
         if vacancy_id:
-            filters['description__icontains'] = f'vacante_{vacancy_id}'
+            filters['vacancy_id'] = vacancy_id
         
         if session_type:
             filters['session_type'] = session_type
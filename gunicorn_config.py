@@ -83,4 +83,15 @@ worker_processes = int(os.environ.get('GUNICORN_WORKER_PROCESSES', multiprocessi
 worker_threads = int(os.environ.get('GUNICORN_WORKER_THREADS', 2))
 
 # Configuración de worker connections
-worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000)) 
\ No newline at end of file
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000)) 
+
+# Precarga de modelos NLP en el master: con preload_app los workers heredan
+# spaCy y los embeddings por copy-on-write en lugar de cargarlos cada uno
+def when_ready(server):
+    if not preload_app:
+        return
+    try:
+        from app.ats.chatbot.nlp.model_registry import preload_for_fork
+        preload_for_fork()
+    except Exception as e:
+        server.log.warning(f"No se pudieron precargar los modelos NLP: {e}")